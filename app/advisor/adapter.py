@@ -57,6 +57,7 @@ class TableStateAdapter:
             # Build game context
             game_context = {
                 'game_type': 'no_limit_holdem',
+                'hand_id': state.hand_id,
                 'num_players': len(active_players),
                 'hero_position': self._get_hero_position(hero_seat, active_players),
                 'street': self.STREET_MAPPING.get(state.street, 0),
@@ -193,14 +194,18 @@ class TableStateAdapter:
     
     def _adapt_to_basic_format(self, state: TableState) -> Dict:
         """Fallback format when OpenSpiel is not available."""
+        hero = next((seat for seat in state.seats if seat.is_hero), None)
+        position = hero.position if hero is not None else None
         return {
+            'hand_id': state.hand_id,
             'hero_cards': state.hero_hole or [],
             'board_cards': state.board,
-            'pot_size': state.pot_size,
-            'position': state.position,
+            'pot_size': state.pot,
+            'round_pot': state.round_pot or 0,
+            'position': position.value if position is not None else None,
             'street': state.street,
-            'bet_to_call': getattr(state, 'bet_to_call', 0),
-            'stack_size': getattr(state, 'effective_stack', 0),
+            'bet_to_call': state.to_call or 0,
+            'stack_size': (hero.stack if hero is not None else None) or 0,
             'num_players': len([s for s in state.seats if s.in_hand]),
             'openspiel_available': PYSPIEL_AVAILABLE
         }
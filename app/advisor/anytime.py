@@ -0,0 +1,135 @@
+"""
+Anytime decisions: answer by a deadline, keep refining afterwards.
+
+``AnytimeDecisionRunner`` drives ``EnhancedGTODecisionService.refine_gto_decision``
+(database hit, coarse solve, full solve) in a background task per table.
+``decide`` returns the best response available when the caller's deadline
+expires (the heuristic fallback if no stage has finished yet); stages that
+complete later are handed to ``publish`` so they can be pushed to clients.
+
+A repeat request for the same spot joins the refinement already running
+instead of starting over; a request for a new spot cancels the stale one.
+A table's refinement is dropped once it has finished and been answered.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.api.models import GTOResponse, TableState
+
+logger = logging.getLogger(__name__)
+
+# publish(table_id, message) pushes a refinement update to the table's clients
+Publisher = Callable[[str, Dict], Awaitable[None]]
+
+
+@dataclass
+class _Refinement:
+    """Refinement state for one spot."""
+    key: Tuple
+    best: Optional[GTOResponse] = None
+    stage: Optional[str] = None
+    answered: bool = False  # A response has been returned to a caller
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+
+
+class AnytimeDecisionRunner:
+    """Deadline-bounded decisions with background refinement."""
+
+    def __init__(self, service, publish: Optional[Publisher] = None):
+        """
+        Args:
+            service: EnhancedGTODecisionService (anything with refine_gto_decision)
+            publish: Coroutine receiving (table_id, message) for each late stage
+        """
+        self.service = service
+        self.publish = publish
+        self._runs: Dict[str, _Refinement] = {}
+
+    @staticmethod
+    def _spot_key(state: TableState, strategy_name: str) -> Tuple:
+        """Identify a decision point; equal keys share one refinement."""
+        return (state.hand_id, state.street, tuple(state.board), tuple(state.hero_hole or ()),
+                state.pot, state.to_call, strategy_name)
+
+    async def decide(self, state: TableState, strategy_name: str = "default_cash6max",
+                     deadline_ms: int = 0) -> GTOResponse:
+        """
+        Return the best decision available within deadline_ms.
+
+        The response is a copy; ``refinement_stage`` names the stage that
+        produced it and ``refining`` is set while better stages may follow.
+        """
+        key = self._spot_key(state, strategy_name)
+        run = self._runs.get(state.table_id)
+        if run is None or run.key != key:
+            if run is not None and run.task is not None:
+                run.task.cancel()
+            run = _Refinement(key)
+            run.task = asyncio.ensure_future(self._refine(run, state, strategy_name))
+            self._runs[state.table_id] = run
+
+        try:
+            await asyncio.wait_for(asyncio.shield(run.done.wait()), timeout=max(0, deadline_ms) / 1000)
+        except asyncio.TimeoutError:
+            pass
+
+        if run.best is not None:
+            response, stage = run.best, run.stage
+        else:
+            response, stage = self.service._enhanced_fallback_decision(state, strategy_name), "heuristic"
+        run.answered = True
+        response = response.model_copy(deep=True)
+        response.refinement_stage = stage
+        response.refining = not run.done.is_set()
+        self._release(state.table_id, run)
+        return response
+
+    async def _refine(self, run: _Refinement, state: TableState, strategy_name: str):
+        """Run every refinement stage, publishing those that land after an answer."""
+        try:
+            async for stage, response in self.service.refine_gto_decision(state, strategy_name):
+                run.best, run.stage = response, stage
+                if run.answered and self.publish is not None:
+                    await self._publish(state, stage, response, final=stage == "full")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Refinement failed for table {state.table_id}: {e}")
+        finally:
+            run.done.set()
+            self._release(state.table_id, run)
+
+    def _release(self, table_id: str, run: _Refinement):
+        """Forget a table's refinement once it is finished and answered (unless superseded)."""
+        if run.done.is_set() and run.answered and self._runs.get(table_id) is run:
+            del self._runs[table_id]
+
+    async def _publish(self, state: TableState, stage: str, response: GTOResponse, final: bool):
+        """Hand one refinement update to the publisher."""
+        response = response.model_copy(deep=True)
+        response.refinement_stage = stage
+        response.refining = not final
+        message = {
+            "type": "gto_refinement",
+            "table_id": state.table_id,
+            "hand_id": state.hand_id,
+            "stage": stage,
+            "final": final,
+            "response": response.model_dump(mode="json"),
+        }
+        try:
+            await self.publish(state.table_id, message)
+        except Exception as e:
+            logger.warning(f"Failed to publish refinement for table {state.table_id}: {e}")
+
+    async def shutdown(self):
+        """Cancel every refinement still running."""
+        runs, self._runs = list(self._runs.values()), {}
+        for run in runs:
+            if run.task is not None:
+                run.task.cancel()
+        await asyncio.gather(*(run.task for run in runs if run.task is not None), return_exceptions=True)
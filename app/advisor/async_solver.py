@@ -0,0 +1,254 @@
+"""
+Non-blocking TexasSolver execution for async request handlers.
+
+``AsyncSolverPool`` runs console_solver through ``asyncio.create_subprocess_exec``
+so a solve never blocks the event loop.  At most ``slots`` solver processes run
+at once; up to ``max_queue`` further requests wait for a slot and anything
+beyond that is rejected immediately (``SolverQueueFull``) so callers can fall
+back instead of piling up.  Each request may carry a deadline covering both
+queueing and solving, and a cancelled request kills its child process.
+With a ``SolverDaemonPool`` attached, jobs run on warm solver processes
+instead of a fresh process per solve.
+"""
+
+import asyncio
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import (
+    DEFAULT_SOLVER_TIMEOUT_SECONDS,
+    RUNTIME_TMP_PREFIX,
+    SOLVER_DAEMON_WORKERS,
+    SOLVER_QUEUE_SIZE,
+    SOLVER_SLOTS,
+)
+from app.advisor import texas_solver_client as tsc
+from app.advisor.solver_cache import SolverResultCache, solver_cache
+from app.advisor.solver_daemon import SolverDaemonPool
+from app.advisor.texas_solver_client import TexasSolverError, TexasSolverTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class SolverQueueFull(TexasSolverError):
+    """Every solver slot is busy and the wait queue is full."""
+
+
+async def _pump_stream(stream: asyncio.StreamReader, tag: str,
+                       sink: Optional[Callable[[str], None]] = None):
+    """Stream solver stdout/stderr line-by-line into our logs (and sink, if given)."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        decoded = line.decode(errors="replace").rstrip()
+        if decoded:
+            logger.info("[texassolver %s] %s", tag, decoded)
+            if sink is not None:
+                sink(decoded)
+
+
+async def run_solver_async(input_text: str, timeout_sec: float,
+                           exe: Optional[Path] = None, solver_dir: Optional[Path] = None) -> dict:
+    """
+    Async counterpart of ``run_solver_with_input_text``.
+
+    The script runs in its own temp dir with ``dump_result`` pointed inside
+    it, so concurrent solves never share files.  On timeout a partial dump is
+    returned if one exists; on cancellation the process is killed.
+    """
+    return (await _run_solver_async(input_text, timeout_sec, exe, solver_dir))[0]
+
+
+async def _run_solver_async(input_text: str, timeout_sec: float,
+                            exe: Optional[Path], solver_dir: Optional[Path]) -> Tuple[dict, bool]:
+    """Run the solver; returns (result, False) for a partial dump salvaged on timeout."""
+    exe = Path(exe or tsc.TEXASSOLVER_EXE)
+    solver_dir = Path(solver_dir or tsc.TEXASSOLVER_DIR)
+    tsc.verify_solver_install(exe, solver_dir)
+
+    tmpdir = Path(tempfile.mkdtemp(prefix=RUNTIME_TMP_PREFIX))
+    try:
+        input_path = tmpdir / "input.txt"
+        output_path = tmpdir / "output_result.json"
+        input_path.write_text(tsc.set_dump_result_path(input_text, output_path), encoding="utf-8")
+
+        cmd = tsc.solver_command(input_path, exe)
+        logger.info("Launching TexasSolver: %s", " ".join(cmd))
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(solver_dir),
+            env=tsc.solver_env(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        convergence = tsc.ConvergenceLog()
+        pumps = [
+            asyncio.ensure_future(_pump_stream(proc.stdout, "OUT", convergence.feed)),
+            asyncio.ensure_future(_pump_stream(proc.stderr, "ERR")),
+        ]
+
+        try:
+            rc = await asyncio.wait_for(proc.wait(), timeout=timeout_sec)
+            # Let the readers reach EOF so the last progress lines are parsed
+            await asyncio.wait(pumps, timeout=tsc.STDOUT_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            await _kill(proc)
+            try:
+                return convergence.attach(tsc.read_solver_output(output_path)), False
+            except TexasSolverError:
+                raise TexasSolverTimeout(f"TexasSolver timed out after {timeout_sec:.1f}s")
+        except asyncio.CancelledError:
+            await _kill(proc)
+            raise
+        finally:
+            for pump in pumps:
+                pump.cancel()
+
+        tsc.raise_for_exit_code(rc)
+        return convergence.attach(tsc.read_solver_output(output_path)), True
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+async def _kill(proc: asyncio.subprocess.Process):
+    """Kill a solver process and reap it."""
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    # Reap even if our own task is being cancelled again
+    await asyncio.shield(proc.wait())
+
+
+class AsyncSolverPool:
+    """Bounded pool of concurrent solver processes with a bounded wait queue."""
+
+    def __init__(self, slots: int = SOLVER_SLOTS, max_queue: int = SOLVER_QUEUE_SIZE,
+                 default_timeout_s: float = DEFAULT_SOLVER_TIMEOUT_SECONDS,
+                 exe: Optional[Path] = None, solver_dir: Optional[Path] = None,
+                 cache: Optional[SolverResultCache] = None, use_cache: bool = True,
+                 daemon: Optional[SolverDaemonPool] = None):
+        self.slots = max(1, slots)
+        self.max_queue = max(0, max_queue)
+        self.default_timeout_s = default_timeout_s
+        self.exe = exe
+        self.solver_dir = solver_dir
+        # Cache hits return without taking a slot
+        self.cache = (cache or solver_cache) if use_cache else None
+        self.daemon = daemon
+
+        # Created on first use so the semaphore binds to the serving loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.slots)
+            self._loop = loop
+            self.running = self.waiting = 0
+        return self._semaphore
+
+    async def solve(self, input_text: Any, timeout_s: Optional[float] = None,
+                    deadline_s: Optional[float] = None) -> dict:
+        """
+        Solve a script (or anything ``TexasSolverClient.solve`` accepts).
+
+        Args:
+            timeout_s: Cap on the solver process's run time
+            deadline_s: Total budget including time spent waiting for a slot;
+                scripts built from a table state use the richest tree
+                profile predicted to fit it
+
+        Raises:
+            SolverQueueFull: All slots busy and the queue is full
+            SolverBudgetExceeded: No tree profile is predicted to fit (nothing launched)
+            TexasSolverTimeout: The deadline or timeout expired with no result
+            TexasSolverError: Solver missing, crashed or produced no output
+        """
+        start = time.monotonic()
+
+        def remaining(stage: str) -> Optional[float]:
+            if deadline_s is None:
+                return None
+            left = deadline_s - (time.monotonic() - start)
+            if left <= 0:
+                raise TexasSolverTimeout(f"Deadline of {deadline_s:.1f}s passed {stage}")
+            return left
+
+        # Building the script (range buckets, profile estimates) and the gzip
+        # cache read are blocking work, so neither runs on the event loop
+        script = await asyncio.to_thread(tsc._extract_solver_script, input_text,
+                                         deadline_s * 1000 if deadline_s is not None else None)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, script)
+            if cached is not None:
+                return cached
+
+        semaphore = self._get_semaphore()
+
+        if semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise SolverQueueFull(f"{self.running} solves running and {self.waiting} queued")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=remaining("while building the script"))
+        except asyncio.TimeoutError:
+            raise TexasSolverTimeout(f"No solver slot within {deadline_s:.1f}s")
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            timeout = timeout_s or self.default_timeout_s
+            left = remaining("while queued")
+            if left is not None:
+                timeout = min(timeout, left)
+            if self.daemon is not None:
+                result, complete = await self._solve_on_daemon(script, timeout), True
+            else:
+                result, complete = await _run_solver_async(script, timeout, self.exe, self.solver_dir)
+            if complete and self.cache is not None:
+                await asyncio.to_thread(self.cache.set, script, result)
+            self.completed += 1
+            return result
+        finally:
+            self.running -= 1
+            semaphore.release()
+
+    async def _solve_on_daemon(self, script: str, timeout: float) -> dict:
+        """Run a job on a warm daemon from a worker thread; cancelling restarts that daemon."""
+        cancel = threading.Event()
+        future = asyncio.get_running_loop().run_in_executor(None, self.daemon.solve, script, timeout, cancel)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        """Current pool occupancy and counters."""
+        return {
+            "slots": self.slots,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# Global pool shared by every async caller
+solver_pool = AsyncSolverPool(daemon=SolverDaemonPool() if SOLVER_DAEMON_WORKERS > 0 else None)
@@ -12,6 +12,8 @@ from pathlib import Path
 import json
 import hashlib
 
+from app.core import canonical
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -492,8 +494,8 @@ class EnhancedGTOEngine:
         """Generate hash for situation caching."""
         # Create deterministic hash from key situation elements
         situation_data = {
-            "hero_cards": sorted(situation.hero_cards),
-            "board_cards": sorted(situation.board_cards),
+            # Suit-isomorphic spots share one cache entry
+            "cards": canonical.canonical_key(situation.hero_cards, situation.board_cards),
             "position": situation.position,
             "stack_size": round(situation.stack_size, 2),
             "pot_size": round(situation.pot_size, 2),
@@ -1,10 +1,13 @@
 """Enhanced GTO decision service with comprehensive poker analysis."""
 
-from app.advisor.texas_solver_client import TexasSolverClient
+from app.advisor.texas_solver_client import TexasSolverClient, TexasSolverError
+from app.advisor.async_solver import solver_pool
+from app.config import SOLVER_LATENCY_BUDGET_MS
 import os
 import asyncio
 import logging
-from typing import Dict, Optional, Tuple, List
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple, List
 import json
 from datetime import datetime
 
@@ -19,9 +22,43 @@ from app.core.board_analyzer import BoardAnalyzer
 from app.core.range_analyzer import RangeAnalyzer
 from app.core.position_strategy import PositionStrategy
 from app.core.opponent_modeling import OpponentModeling
+from app.core import canonical
+from app.core.parallel_equity import ParallelEquityEngine
+from app.database.gto_database import gto_db
+from app.database import poker_vectorizer
 
 logger = logging.getLogger(__name__)
 
+# Coarse refinement stage: the full stage's tree solved to a loose target, so
+# the full stage resumes the stored subgame instead of solving from scratch
+COARSE_TARGET_EXPLOITABILITY_PCT = 3.0
+
+# Multiway preflop equity inside a /decide request: sample cap and deadline
+DECIDE_EQUITY_SAMPLES = 100000
+DECIDE_EQUITY_BUDGET_MS = 150
+DECIDE_EQUITY_CHUNK = 2500
+
+# API positions onto the solution database's 9-handed positions (which
+# also pick the index shard); full-ring seats fold into their neighbour
+DATABASE_POSITIONS = {
+    Position.UTG: poker_vectorizer.Position.UTG,
+    Position.UTG1: poker_vectorizer.Position.UTG1,
+    Position.UTG2: poker_vectorizer.Position.MP,
+    Position.MP: poker_vectorizer.Position.MP,
+    Position.MP1: poker_vectorizer.Position.MP1,
+    Position.LJ: poker_vectorizer.Position.MP2,
+    Position.HJ: poker_vectorizer.Position.MP2,
+    Position.CO: poker_vectorizer.Position.CO,
+    Position.BTN: poker_vectorizer.Position.BTN,
+    Position.SB: poker_vectorizer.Position.SB,
+    Position.BB: poker_vectorizer.Position.BB,
+}
+
+DATABASE_ACTIONS = {
+    "fold": "Fold", "check": "Check", "call": "Call", "bet": "Bet",
+    "raise": "BetPlus", "allin": "All-in", "all-in": "All-in",
+}
+
 
 class EnhancedGTODecisionService:
     """Enhanced GTO decision service with comprehensive poker analysis."""
@@ -33,12 +70,20 @@ class EnhancedGTODecisionService:
         self.strategy_cache = StrategyCache()
         self.strategies_path = "app/strategies"
         self.ts_client = TexasSolverClient()
+        # Solves run as async subprocesses with bounded concurrency
+        self.solver_pool = solver_pool
         self.ts_api_url = os.getenv("TEXASSOLVER_API_URL", "http://127.0.0.1:8000")
         # Enhanced GTO components
         self.board_analyzer = BoardAnalyzer()
         self.range_analyzer = RangeAnalyzer()
         self.position_strategy = PositionStrategy()
         self.opponent_modeling = OpponentModeling()
+        # Precomputed solutions, consulted first when refining (only once loaded)
+        self.solution_db = gto_db
+        
+        # Multi-core equity for preflop multiway spots (EQUITY_WORKERS > 1 enables it)
+        equity_workers = int(os.getenv("EQUITY_WORKERS", "0"))
+        self.parallel_equity = ParallelEquityEngine(equity_workers) if equity_workers > 1 else None
         
         # Load default strategies
         self._load_strategies()
@@ -109,9 +154,12 @@ class EnhancedGTODecisionService:
         """Compute comprehensive GTO decision using all available analysis."""
         use_ts = True  # switch via env/config later
         if use_ts:
-            ts = self.ts_client.solve(state)
-            if ts.get("status") == "ok" and ts.get("actions"):
-                return self.ts_client.to_gto_response(state, ts)
+            try:
+                ts = await self.solver_pool.solve(state, deadline_s=SOLVER_LATENCY_BUDGET_MS / 1000)
+                if ts.get("status") == "ok" and ts.get("actions"):
+                    return self.ts_client.to_gto_response(state, ts)
+            except TexasSolverError as e:
+                logger.debug(f"TexasSolver unavailable, using built-in analysis: {e}")
     # fallback:
     # return a minimal, safe response or drop to OpenSpiel (if available)
         try:
@@ -153,6 +201,96 @@ class EnhancedGTODecisionService:
             # Fallback to enhanced heuristic decision
             return self._enhanced_fallback_decision(state, strategy_name)
     
+    async def refine_gto_decision(
+        self,
+        state: TableState,
+        strategy_name: str = "default_cash6max"
+    ) -> AsyncIterator[Tuple[str, GTOResponse]]:
+        """
+        Yield progressively better decisions as (stage, response) pairs.
+
+        Stages are "database" (nearest precomputed solution, if the database
+        is loaded), "coarse" (the subgame solved to a loose target) and
+        "full" (the regular compute_gto_decision result, which continues the
+        coarse subgame stored for the hand).  Stages that fail or do not
+        apply are skipped; "full" is always yielded last.
+        """
+        db = self.solution_db
+        if db is not None and db.initialized and state.hero_hole:
+            try:
+                recommendation = await asyncio.to_thread(db.get_instant_recommendation,
+                                                         self._to_poker_situation(state), aggregate=True)
+                if recommendation:
+                    yield "database", self._database_response(recommendation, state, strategy_name)
+            except Exception as e:
+                logger.debug(f"Database stage skipped: {e}")
+
+        try:
+            start_time = datetime.now()
+            enhanced_state = await self._enhance_table_state(state)
+            strategy = self._get_adjusted_strategy(enhanced_state, strategy_name)
+            game_context = self.adapter.adapt_to_openspiel(enhanced_state)
+            analysis = await self._compute_comprehensive_gto(
+                enhanced_state, game_context, strategy,
+                target_exploitability_pct=COARSE_TARGET_EXPLOITABILITY_PCT)
+            analysis["computation_time_ms"] = (datetime.now() - start_time).total_seconds() * 1000
+            yield "coarse", self._build_enhanced_response(analysis, strategy_name, enhanced_state)
+        except Exception as e:
+            logger.debug(f"Coarse stage skipped: {e}")
+
+        yield "full", await self.compute_gto_decision(state, strategy_name)
+    
+    def _to_poker_situation(self, state: TableState) -> poker_vectorizer.PokerSituation:
+        """
+        Describe the hero's spot for a solution database lookup.
+
+        Raises:
+            ValueError: The hero's position is unknown or has no database position
+        """
+        hero = next((seat for seat in state.seats if seat.is_hero), None)
+        position = DATABASE_POSITIONS.get(hero.position) if hero is not None else None
+        if position is None:
+            raise ValueError(f"No database position for hero position "
+                             f"{hero.position if hero is not None else None!r}")
+        street = state.street if state.street != "SHOWDOWN" else "RIVER"
+        # TableState lowercases cards; the vectorizer reads uppercase ranks ('Ah')
+        def cards(values):
+            return [card[0].upper() + card[1:] for card in values or []]
+
+        return poker_vectorizer.PokerSituation(
+            hole_cards=cards(state.hero_hole),
+            board_cards=cards(state.board),
+            position=position,
+            pot_size=state.pot,
+            bet_to_call=state.to_call or 0,
+            stack_size=(hero.stack if hero is not None else None) or 0,
+            num_players=len([seat for seat in state.seats if seat.in_hand]) or 2,
+            betting_round=poker_vectorizer.BettingRound[street],
+        )
+    
+    def _database_response(self, recommendation: Dict, state: TableState,
+                           strategy_name: str) -> GTOResponse:
+        """Wrap a solution database recommendation as a GTOResponse."""
+        response = self._enhanced_fallback_decision(state, strategy_name)
+        action = DATABASE_ACTIONS.get(str(recommendation.get("decision", "")).lower(), "Check")
+        size = float(recommendation.get("bet_size") or 0) if action in ("Bet", "BetPlus", "All-in") else 0.0
+        if action == "Call":
+            size = state.to_call or 0
+        confidence = float(recommendation.get("confidence", 0.0))
+        # Aggregated lookups report how much of the neighbourhood plays this action
+        frequency = float(recommendation.get("metrics", {}).get("agreement", confidence))
+        response.decision = GTODecision(
+            action=action,
+            size=size,
+            size_bb=size / state.stakes.bb if state.stakes.bb > 0 else 0,
+            size_pot_fraction=size / state.pot if state.pot > 0 else 0,
+            confidence=confidence,
+            frequency=frequency,
+            reasoning=recommendation.get("reasoning", "")
+        )
+        response.metrics.equity_breakdown.raw_equity = float(recommendation.get("equity", 0.5))
+        return response
+    
     async def _enhance_table_state(self, state: TableState) -> TableState:
         """Enhance table state with comprehensive analysis."""
         try:
@@ -301,14 +439,14 @@ class EnhancedGTODecisionService:
         return adjusted_strategy
     
     async def _compute_comprehensive_gto(self, state: TableState, 
-                                       game_context: Dict, strategy: Dict) -> Dict:
+                                       game_context: Dict, strategy: Dict, **solve_options) -> Dict:
         """Compute comprehensive GTO analysis using all components."""
         try:
             # Standard CFR computation
-            cfr_result = await self._compute_cfr_solution(game_context, strategy)
+            cfr_result = await self._compute_cfr_solution(game_context, strategy, **solve_options)
             
             # Enhanced equity analysis
-            equity_breakdown = self._compute_equity_breakdown(state, cfr_result)
+            equity_breakdown = await self._compute_equity_breakdown(state, cfr_result)
             
             # Range vs range analysis
             range_analysis = self._compute_range_analysis(state)
@@ -341,11 +479,16 @@ class EnhancedGTODecisionService:
         except Exception as e:
             logger.error(f"Comprehensive GTO computation failed: {e}")
             # Fallback to basic CFR
-            cfr_result = await self._compute_cfr_solution(game_context, strategy)
+            cfr_result = await self._compute_cfr_solution(game_context, strategy, **solve_options)
             return {"cfr_result": cfr_result, "final_decision": cfr_result}
     
-    async def _compute_cfr_solution(self, game_context: Dict, strategy: Dict) -> Dict:
-        """Compute CFR solution for the given game context."""
+    async def _compute_cfr_solution(self, game_context: Dict, strategy: Dict, **solve_options) -> Dict:
+        """
+        Compute CFR solution for the given game context.
+
+        solve_options are passed on to OpenSpielWrapper.compute_cfr_strategy
+        (e.g. target_exploitability_pct, tree).
+        """
         try:
             max_iterations = strategy.get("cfr_iterations", 10000)
             max_time_ms = strategy.get("max_compute_time_ms", 500)
@@ -354,7 +497,7 @@ class EnhancedGTODecisionService:
             loop = asyncio.get_event_loop()
             cfr_result = await loop.run_in_executor(
                 None,
-                self.openspiel_wrapper.compute_cfr_strategy,
+                partial(self.openspiel_wrapper.compute_cfr_strategy, **solve_options),
                 game_context,
                 max_iterations,
                 max_time_ms
@@ -366,10 +509,23 @@ class EnhancedGTODecisionService:
             logger.error(f"CFR computation failed: {e}")
             raise
     
-    def _compute_equity_breakdown(self, state: TableState, cfr_result: Dict) -> Dict:
+    async def _compute_equity_breakdown(self, state: TableState, cfr_result: Dict) -> Dict:
         """Compute detailed equity breakdown."""
         base_equity = cfr_result.get("equity", 0.5)
         
+        # Preflop multiway: replace the CFR estimate with a full simulation
+        num_opponents = sum(1 for seat in state.seats if seat.in_hand and not seat.is_hero)
+        if self.parallel_equity and state.hero_hole and not state.board and num_opponents > 1:
+            try:
+                result = await self.parallel_equity.hand_vs_random_async(
+                    state.hero_hole, [], num_opponents=num_opponents,
+                    samples=DECIDE_EQUITY_SAMPLES, time_budget_ms=DECIDE_EQUITY_BUDGET_MS,
+                    chunk_size=DECIDE_EQUITY_CHUNK
+                )
+                base_equity = result.equity
+            except Exception as e:
+                logger.warning(f"Parallel equity failed, using CFR equity: {e}")
+        
         return {
             "raw_equity": base_equity,
             "fold_equity": 0.2,  # Estimated fold equity
@@ -558,8 +714,10 @@ class EnhancedGTODecisionService:
         """Generate enhanced cache key including all GTO factors."""
         key_components = [
             str(game_context.get("street", 0)),
-            str(sorted(game_context.get("hero_cards", []))),
-            str(sorted(game_context.get("board_cards", []))),
+            # Suit-isomorphic spots share one cache entry
+            # (the context holds card codes with OpenSpiel, card strings without)
+            canonical.canonical_key(OpenSpielWrapper._context_cards(game_context.get("hero_cards", [])),
+                                    OpenSpielWrapper._context_cards(game_context.get("board_cards", []))),
             str(game_context.get("num_players", 2)),
             str(game_context.get("pot_size", 0)),
             str(game_context.get("to_call", 0)),
@@ -798,9 +956,14 @@ class EnhancedGTODecisionService:
             
             stack_data = analysis.get("stack_analysis", {})
             range_data = analysis.get("range_analysis", {})
+            cfr_data = analysis.get("cfr_result", {})
             
             metrics = GTOMetrics(
                 equity_breakdown=equity_breakdown,
+                exploitability=cfr_data.get("exploitability"),
+                exploitability_pct_pot=cfr_data.get("exploitability_pct"),
+                solver_iterations=cfr_data.get("iterations"),
+                convergence=cfr_data.get("convergence", []),
                 min_call=state.to_call or 0,
                 min_bet=state.bet_min or state.stakes.bb,
                 pot=state.pot,
@@ -0,0 +1,232 @@
+"""
+Content-addressed cache of TexasSolver outputs.
+
+Results are keyed by the SHA-256 of the normalized solver script, so any two
+requests that would build the same tree (same pot, stack, board, ranges and
+bet sizes) share one solve.  Entries live in a small in-memory LRU in front
+of a disk store of (optionally gzip-compressed) JSON files, evicted least
+recently used first once the store exceeds its size cap.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from app.config import SOLVER_CACHE_COMPRESS, SOLVER_CACHE_DIR, SOLVER_CACHE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Commands that change where or how fast a solve runs but not its result
+_IGNORED_COMMANDS = {"dump_result", "set_thread_num", "set_print_interval"}
+# Commands whose comma-separated argument is an unordered range
+_RANGE_COMMANDS = {"set_range_ip", "set_range_oop"}
+
+# Evict down to this fraction of the cap so eviction scans stay rare
+_EVICT_TARGET = 0.9
+
+
+def _normalize_token(token: str) -> str:
+    """Canonical spelling of a numeric token ('50' and '50.0' match)."""
+    try:
+        return repr(float(token))
+    except ValueError:
+        return token
+
+
+def normalize_script(script: str) -> str:
+    """
+    Canonical form of a solver script: whitespace collapsed, comments and
+    result-neutral commands dropped, numbers and range entries normalized.
+    """
+    lines = []
+    for raw in script.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        command, _, args = line.partition(" ")
+        if command in _IGNORED_COMMANDS:
+            continue
+        parts = [_normalize_token(p.strip()) for p in args.replace(" ", "").split(",") if p.strip()]
+        if command in _RANGE_COMMANDS:
+            parts.sort()
+        lines.append(command + (" " + ",".join(parts) if parts else ""))
+    return "\n".join(lines)
+
+
+def script_key(script: str) -> str:
+    """Cache key of a solver script."""
+    return hashlib.sha256(normalize_script(script).encode("utf-8")).hexdigest()
+
+
+class SolverResultCache:
+    """Two-level (memory LRU + size-capped disk LRU) cache of solver results."""
+
+    def __init__(self, cache_dir: Union[str, Path] = SOLVER_CACHE_DIR,
+                 max_bytes: int = SOLVER_CACHE_MAX_MB * 1024 * 1024,
+                 memory_entries: int = 256, compress: bool = SOLVER_CACHE_COMPRESS):
+        """
+        Args:
+            cache_dir: Directory for the disk store (created on first write)
+            max_bytes: Disk size cap; 0 disables the disk store
+            memory_entries: Results kept decoded in memory
+            compress: gzip entries on disk
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.compress = compress
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # Measured lazily
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, compressed: bool) -> Path:
+        return self.cache_dir / (key + (".json.gz" if compressed else ".json"))
+
+    def get(self, script: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for a script, or None.
+
+        The returned dict is shared with the cache; treat it as read-only.
+        """
+        key = script_key(script)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, result)
+        return result
+
+    def set(self, script: str, result: Dict[str, Any]) -> None:
+        """Store a complete solver result."""
+        key = script_key(script)
+        with self._lock:
+            self._remember(key, result)
+        if self.max_bytes > 0:
+            self._write_disk(key, result)
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        """Insert into the memory LRU (caller holds the lock)."""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load an entry from disk and mark it recently used."""
+        for compressed in (True, False):
+            path = self._path(key, compressed)
+            try:
+                opener = gzip.open if compressed else open
+                with opener(path, "rt", encoding="utf-8") as f:
+                    result = json.load(f)
+                os.utime(path)  # mtime is the LRU clock
+                return result
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable solver cache entry {path.name}: {e}")
+                path.unlink(missing_ok=True)
+        return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        """Atomically write an entry, then enforce the size cap."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps(result, separators=(",", ":")).encode("utf-8")
+            if self.compress:
+                payload = gzip.compress(payload, compresslevel=6)
+            path = self._path(key, self.compress)
+            tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Solver cache write failed: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(payload)
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+
+    def _entries(self):
+        return [p for p in self.cache_dir.glob("*.json*") if not p.name.endswith(".tmp")]
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict_disk(self):
+        """Delete least recently used files until under the target size (caller holds the lock)."""
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * _EVICT_TARGET
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._disk_bytes = total
+        logger.debug(f"Evicted {evicted} solver cache entries ({total} bytes remain)")
+
+    def clear(self) -> None:
+        """Drop every cached result (memory and disk)."""
+        with self._lock:
+            self._memory.clear()
+            if self.cache_dir.exists():
+                for path in self._entries():
+                    path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global cache shared by the sync client and the async pool
+solver_cache = SolverResultCache()
@@ -0,0 +1,241 @@
+"""
+Warm, long-lived TexasSolver worker processes.
+
+Instead of spawning console_solver per decision, ``SolverDaemonPool`` keeps
+pre-started solver processes running in interactive mode (no
+``--input_file``; commands arrive on stdin) and feeds each job's script down
+the pipe.  A job's ``dump_result`` is pointed at a per-job file; the job is
+done once that file holds a complete JSON document.
+
+Workers are restarted automatically if they crash (including the
+0xC0000005 case), time out or are cancelled, and are recycled after
+``max_jobs`` jobs to bound memory growth inside the solver.
+"""
+
+import logging
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from subprocess import PIPE, Popen
+from typing import Any, Dict, List, Optional
+
+from app.config import (
+    DEFAULT_SOLVER_TIMEOUT_SECONDS,
+    RUNTIME_TMP_PREFIX,
+    SOLVER_DAEMON_MAX_JOBS,
+    SOLVER_DAEMON_WORKERS,
+)
+from app.advisor import texas_solver_client as tsc
+from app.advisor.texas_solver_client import TexasSolverError, TexasSolverTimeout
+
+logger = logging.getLogger(__name__)
+
+# How often a running job checks for its dump, a crash or cancellation
+POLL_INTERVAL_SECONDS = 0.005
+
+
+class SolverDaemon:
+    """One warm solver process fed scripts over stdin."""
+
+    def __init__(self, command: List[str], cwd: Path, max_jobs: int = SOLVER_DAEMON_MAX_JOBS, name: str = "0"):
+        self.command = command
+        self.cwd = cwd
+        self.max_jobs = max_jobs
+        self.name = name
+
+        self.proc: Optional[Popen] = None
+        self.jobs_done = 0
+        self.restarts = 0
+        self._job_seq = 0
+        self._convergence = tsc.ConvergenceLog()
+        self._workdir = Path(tempfile.mkdtemp(prefix=RUNTIME_TMP_PREFIX + "daemon_"))
+
+    def start(self):
+        """Launch the solver process."""
+        logger.info("Starting solver daemon %s: %s", self.name, " ".join(self.command))
+        self.proc = Popen(self.command, cwd=str(self.cwd), env=tsc.solver_env(),
+                          stdin=PIPE, stdout=PIPE, stderr=PIPE)
+        threading.Thread(target=tsc._pump_stream, args=(self.proc.stdout, f"D{self.name} OUT", self._feed_stdout),
+                         daemon=True).start()
+        threading.Thread(target=tsc._pump_stream, args=(self.proc.stderr, f"D{self.name} ERR"), daemon=True).start()
+        self.jobs_done = 0
+
+    def stop(self):
+        """Kill and reap the solver process."""
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+    def restart(self, reason: str):
+        """Replace the solver process with a fresh one."""
+        logger.warning("Restarting solver daemon %s: %s", self.name, reason)
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def is_alive(self) -> bool:
+        """Whether the process is running."""
+        return self.proc is not None and self.proc.poll() is None
+
+    def _feed_stdout(self, line: str):
+        """Route progress lines to the running job's convergence log."""
+        self._convergence.feed(line)
+
+    def close(self):
+        """Stop the process and remove the job directory."""
+        self.stop()
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+    def run(self, script: str, timeout_sec: float, cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Run one script on the warm process.
+
+        Raises:
+            TexasSolverTimeout: No complete dump within timeout_sec
+            TexasSolverError: The process crashed or the job was cancelled
+        """
+        if self.proc is None:
+            self.start()
+        elif not self.is_alive():
+            self.restart("not running")
+
+        self._job_seq += 1
+        self._convergence = tsc.ConvergenceLog()
+        output_path = self._workdir / f"job_{self._job_seq}.json"
+        payload = tsc.set_dump_result_path(script, output_path)
+        try:
+            self.proc.stdin.write(payload.encode("utf-8"))
+            self.proc.stdin.flush()
+        except OSError as e:
+            self.restart(f"stdin closed ({e})")
+            raise TexasSolverError(f"Solver daemon {self.name} rejected the job: {e}")
+
+        deadline = time.monotonic() + timeout_sec
+        try:
+            while True:
+                if output_path.exists():
+                    try:
+                        result = tsc.read_solver_output(output_path, stream=False)
+                        break
+                    except TexasSolverError:
+                        pass  # Dump still being written
+                rc = self.proc.poll()
+                if rc is not None:
+                    self.restart(f"exited with code {rc}")
+                    tsc.raise_for_exit_code(rc)
+                    raise TexasSolverError(f"Solver daemon {self.name} exited mid-job")
+                if cancel is not None and cancel.is_set():
+                    self.restart("job cancelled")
+                    raise TexasSolverError("Solve cancelled")
+                if time.monotonic() >= deadline:
+                    self.restart("job timed out")
+                    raise TexasSolverTimeout(f"TexasSolver daemon timed out after {timeout_sec:.1f}s")
+                time.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            output_path.unlink(missing_ok=True)
+
+        # Progress lines precede the dump; any still unread in the pipe are dropped
+        result = self._convergence.attach(result)
+        self.jobs_done += 1
+        if self.max_jobs and self.jobs_done >= self.max_jobs:
+            self.restart(f"recycling after {self.jobs_done} jobs")
+        return result
+
+
+class SolverDaemonPool:
+    """Fixed set of warm solver daemons shared by blocking or async callers."""
+
+    def __init__(self, workers: int = SOLVER_DAEMON_WORKERS, max_jobs: int = SOLVER_DAEMON_MAX_JOBS,
+                 command: Optional[List[str]] = None, cwd: Optional[Path] = None):
+        """
+        Args:
+            workers: Number of solver processes
+            max_jobs: Jobs per process before it is recycled (0 = never)
+            command: Solver argv (defaults to console_solver in interactive mode)
+            cwd: Working directory (defaults to TEXASSOLVER_DIR)
+        """
+        self.workers = max(1, workers)
+        self.max_jobs = max_jobs
+        self.command = command
+        self.cwd = cwd
+
+        self._daemons: List[SolverDaemon] = []
+        self._idle: "queue.Queue[SolverDaemon]" = queue.Queue()
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start every worker on first use."""
+        if self._daemons:
+            return
+        with self._start_lock:
+            if self._daemons:
+                return
+            cwd = Path(self.cwd or tsc.TEXASSOLVER_DIR)
+            command = self.command
+            if command is None:
+                tsc.verify_solver_install()
+                command = [str(tsc.TEXASSOLVER_EXE), "--resource_dir", "resources"]
+            daemons = [SolverDaemon(command, cwd, self.max_jobs, name=str(i)) for i in range(self.workers)]
+            for daemon in daemons:
+                daemon.start()
+                self._idle.put(daemon)
+            self._daemons = daemons
+
+    def solve(self, script: str, timeout_sec: float = DEFAULT_SOLVER_TIMEOUT_SECONDS,
+              cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run a script on the next idle worker (blocks until one is free)."""
+        self._ensure_started()
+        start = time.monotonic()
+        try:
+            daemon = self._idle.get(timeout=timeout_sec)
+        except queue.Empty:
+            raise TexasSolverTimeout(f"No solver daemon free within {timeout_sec:.1f}s")
+        try:
+            remaining = max(0.0, timeout_sec - (time.monotonic() - start))
+            return daemon.run(script, remaining, cancel)
+        finally:
+            self._idle.put(daemon)
+
+    def health_check(self) -> List[Dict[str, Any]]:
+        """Restart any idle worker that has died and report every worker's state."""
+        self._ensure_started()
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for daemon in idle:
+                if not daemon.is_alive():
+                    daemon.restart("failed health check")
+        finally:
+            for daemon in idle:
+                self._idle.put(daemon)
+
+        return [{
+            "name": d.name,
+            "alive": d.is_alive(),
+            "busy": d not in idle,
+            "pid": d.proc.pid if d.proc is not None else None,
+            "jobs_done": d.jobs_done,
+            "restarts": d.restarts,
+        } for d in self._daemons]
+
+    def shutdown(self):
+        """Stop every worker."""
+        with self._start_lock:
+            for daemon in self._daemons:
+                daemon.close()
+            self._daemons = []
+            self._idle = queue.Queue()
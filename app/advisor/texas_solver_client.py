@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import re
 import shutil
 import tempfile
 import threading
@@ -8,7 +9,7 @@ import time
 import textwrap
 from pathlib import Path
 from subprocess import Popen, PIPE, TimeoutExpired
-from typing import Optional, Tuple, Dict, Any, Iterable
+from typing import Optional, Tuple, Dict, Any, Iterable, List, Callable
 
 def _safe_threads():
     # cap to 8 to avoid native crashes on some builds
@@ -21,15 +22,32 @@ from app.config import (
     RUNTIME_TMP_PREFIX,
     DEFAULT_SOLVER_TIMEOUT_SECONDS,
 )
+from app.advisor.solver_cache import SolverResultCache, solver_cache
+from app.advisor.tree_profiles import PROFILES, build_profile_input, choose_profile
+from app.api.models import TableState
+from app.core.range_builder import RangeBuilder
+
+# Optional streaming JSON parser for large dumps (pip install -e .[solver])
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 log = logging.getLogger(__name__)
 
+# How long to wait for the stdout reader to drain once the solver has exited
+STDOUT_DRAIN_SECONDS = 1.0
+
 class TexasSolverError(Exception):
     pass
 
 class TexasSolverTimeout(TexasSolverError):
     pass
 
+class SolverBudgetExceeded(TexasSolverTimeout):
+    """No tree profile is predicted to finish within the latency budget; nothing was launched."""
+
 # ---- Resolve solver paths (env > config), ensure Path objects ----
 _env_dir = os.getenv("TEXASSOLVER_DIR", None)
 _env_exe = os.getenv("TEXASSOLVER_EXE", None)
@@ -46,8 +64,45 @@ TEXASSOLVER_DIR: Path = _base_dir
 TEXASSOLVER_EXE: Path = _exe
 
 
-def _pump_stream(stream, tag: str):
-    """Stream solver stdout/stderr line-by-line into our logs."""
+# TexasSolver prints "Iter: N" and then "Total exploitability X precent" (sic)
+# every set_print_interval iterations; X is the best-response exploitability
+# in percent of the pot
+_ITER_RE = re.compile(r"^\s*Iter:?\s*(\d+)")
+_EXPLOITABILITY_RE = re.compile(r"exploitability:?\s*(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)\s*(?:precent|percent|%)",
+                                re.IGNORECASE)
+
+
+class ConvergenceLog:
+    """Convergence curve (iteration, exploitability % of pot) parsed from solver output."""
+
+    def __init__(self):
+        self.points: List[Dict[str, float]] = []
+        self._iteration: Optional[int] = None
+        self._start = time.monotonic()
+
+    def feed(self, line: str):
+        """Consume one line of solver stdout."""
+        match = _ITER_RE.match(line)
+        if match:
+            self._iteration = int(match.group(1))
+            return
+        match = _EXPLOITABILITY_RE.search(line)
+        if match and self._iteration is not None:
+            self.points.append({
+                "iteration": self._iteration,
+                "exploitability_pct": float(match.group(1)),
+                "elapsed_ms": (time.monotonic() - self._start) * 1000,
+            })
+
+    def attach(self, data: dict) -> dict:
+        """Add the curve to a solver result (left untouched if nothing was parsed)."""
+        if self.points and isinstance(data, dict):
+            data["convergence"] = list(self.points)
+        return data
+
+
+def _pump_stream(stream, tag: str, sink: Optional[Callable[[str], None]] = None):
+    """Stream solver stdout/stderr line-by-line into our logs (and sink, if given)."""
     for line in iter(stream.readline, b''):
         try:
             decoded = line.decode(errors="replace").rstrip()
@@ -55,16 +110,18 @@ def _pump_stream(stream, tag: str):
             decoded = str(line)
         if decoded:
             log.info("[texassolver %s] %s", tag, decoded)
+            if sink is not None:
+                sink(decoded)
     try:
         stream.close()
     except Exception:
         pass
 
 
-def verify_solver_install() -> None:
+def verify_solver_install(exe: Optional[Path] = None, base: Optional[Path] = None) -> None:
     """Make sure solver exe & resources are present and runnable."""
-    exe = TEXASSOLVER_EXE if isinstance(TEXASSOLVER_EXE, Path) else Path(TEXASSOLVER_EXE)
-    base = TEXASSOLVER_DIR if isinstance(TEXASSOLVER_DIR, Path) else Path(TEXASSOLVER_DIR)
+    exe = Path(exe or TEXASSOLVER_EXE)
+    base = Path(base or TEXASSOLVER_DIR)
 
     if not exe.exists():
         raise TexasSolverError(f"TexasSolver exe not found: {exe}")
@@ -96,6 +153,8 @@ def build_fast_profile_input(
       - 1 bet size per street (betsize_pct% pot)
       - include all-in on each street
       - loose accuracy & low iteration cap so it finishes quickly
+    output_path is only a default: the runners rewrite dump_result to a
+    per-run path inside their temp dir.
     """
     board_str = ",".join(board_cards) if board_cards else ""
 
@@ -148,48 +207,122 @@ def build_fast_profile_input(
     return "\n".join(script_lines) + "\n"
 
 
+def set_dump_result_path(input_text: str, output_path: Path) -> str:
+    """Point the script's dump_result command at output_path."""
+    lines = input_text.splitlines()
+    found = False
+    for i, line in enumerate(lines):
+        if line.strip().startswith("dump_result"):
+            lines[i] = f"dump_result {output_path}"
+            found = True
+    if not found:
+        raise TexasSolverError("Input script missing dump_result; expected caller to include it.")
+    return "\n".join(lines) + "\n"
+
+
+def solver_command(input_path: Path, exe: Optional[Path] = None) -> list:
+    """console_solver argv for an input file (resources resolved relative to the solver dir)."""
+    return [
+        str(exe or TEXASSOLVER_EXE),
+        "--input_file", str(input_path),
+        "--resource_dir", "resources",  # relative to cwd below
+    ]
+
+
+def solver_env() -> dict:
+    """Environment for solver processes."""
+    env = os.environ.copy()
+    env.setdefault("OMP_NUM_THREADS", "1")
+    env.setdefault("KMP_INIT_AT_FORK", "FALSE")
+    return env
+
+
+def raise_for_exit_code(rc: int) -> None:
+    """Translate a non-zero solver exit code into TexasSolverError."""
+    if rc == 0:
+        return
+    if rc == 3221225477:
+        raise TexasSolverError(
+            "TexasSolver crashed with 0xC0000005 (access violation). "
+            "Most common cause: resources not found due to working-directory issues. "
+            "We now run with cwd=C:\\TexasSolver and --resource_dir=resources. "
+            "If this persists, verify the tree/config names referenced by your input exist under C:\\TexasSolver\\resources."
+        )
+    raise TexasSolverError(f"TexasSolver exited with code {rc}")
+
+
+def read_solver_output(output_path: Path, stream: Optional[bool] = None) -> dict:
+    """
+    Parse the dumped result JSON.
+
+    With ijson installed (or stream=True) the file is parsed incrementally
+    from the byte stream instead of being read into one string first, which
+    keeps peak memory down for multi-round dumps.
+    """
+    if not output_path.exists():
+        raise TexasSolverError("TexasSolver completed but output_result.json not found (check dump_result path in your input).")
+    if stream is None:
+        stream = IJSON_AVAILABLE
+    try:
+        if stream:
+            with open(output_path, "rb") as f:
+                return next(ijson.items(f, "", use_float=True))
+        with open(output_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        raise TexasSolverError(f"Failed to parse output_result.json: {e}")
+
+
 def run_solver_with_input_text(input_text: str, timeout_sec: int = DEFAULT_SOLVER_TIMEOUT_SECONDS) -> dict:
     """
     Write input_text into a temp dir; run console_solver.exe with cwd=TEXASSOLVER_DIR.
     Stream logs, enforce timeout, parse output_result.json and return its JSON.
     """
+    return _run_solver(input_text, timeout_sec)[0]
+
+
+def solve_cached(input_text: str, timeout_sec: int = DEFAULT_SOLVER_TIMEOUT_SECONDS,
+                 cache: Optional[SolverResultCache] = None, daemon: Any = None) -> dict:
+    """
+    run_solver_with_input_text behind a result cache (partial timeout dumps
+    are not cached); with a SolverDaemonPool the solve runs on a warm worker.
+    """
+    if cache is not None:
+        cached = cache.get(input_text)
+        if cached is not None:
+            return cached
+    if daemon is not None:
+        data, complete = daemon.solve(input_text, timeout_sec), True
+    else:
+        data, complete = _run_solver(input_text, timeout_sec)
+    if cache is not None and complete:
+        cache.set(input_text, data)
+    return data
+
+
+def _run_solver(input_text: str, timeout_sec: int) -> Tuple[dict, bool]:
+    """Run the solver; returns (result, False) for a partial dump salvaged on timeout."""
     verify_solver_install()
 
     with tempfile.TemporaryDirectory(prefix=RUNTIME_TMP_PREFIX) as tmpdir:
         tmpdir_path = Path(tmpdir)
         input_path = tmpdir_path / "input.txt"
-        output_path = Path(tempfile.gettempdir()) / (RUNTIME_TMP_PREFIX + "out.json")
-
-        try:
-            if output_path.exists():
-                output_path.unlink()
-        except Exception:
-            pass
+        # Per-run output inside the run's temp dir, so concurrent solves never collide
+        output_path = tmpdir_path / "output_result.json"
+        input_path.write_text(set_dump_result_path(input_text, output_path), encoding="utf-8")
 
-        input_path.write_text(input_text, encoding="utf-8")
-
-        if "dump_result" not in input_path.read_text(encoding="utf-8"):
-            raise TexasSolverError("Input script missing dump_result; expected caller to include it.")
-
-        cmd = [
-            str(TEXASSOLVER_EXE),
-            "--input_file", str(input_path),
-            "--resource_dir", "resources",  # relative to cwd below
-        ]
+        cmd = solver_command(input_path)
         log.info("Launching TexasSolver: %s", " ".join(cmd))
 
-        env = os.environ.copy()
-        env.setdefault("OMP_NUM_THREADS", "1")
-        env.setdefault("KMP_INIT_AT_FORK", "FALSE")
-
         proc = Popen(
             cmd,
             cwd=str(TEXASSOLVER_DIR),
-            env=env,
+            env=solver_env(),
             stdout=PIPE,
             stderr=PIPE,
         )
-        t_out = threading.Thread(target=_pump_stream, args=(proc.stdout, "OUT"), daemon=True)
+        convergence = ConvergenceLog()
+        t_out = threading.Thread(target=_pump_stream, args=(proc.stdout, "OUT", convergence.feed), daemon=True)
         t_err = threading.Thread(target=_pump_stream, args=(proc.stderr, "ERR"), daemon=True)
         t_out.start()
         t_err.start()
@@ -197,46 +330,33 @@ def run_solver_with_input_text(input_text: str, timeout_sec: int = DEFAULT_SOLVE
         try:
             rc = proc.wait(timeout=timeout_sec)
         except TimeoutExpired:
-            data = None
-            try:
-                if output_path.exists():
-                    data = json.loads(output_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = None
             try:
                 proc.kill()
+                proc.wait()
             except Exception:
                 pass
+            data = None
+            try:
+                if output_path.exists():
+                    data = read_solver_output(output_path)
+            except TexasSolverError:
+                data = None
             if data is not None:
-                return data
+                t_out.join(timeout=STDOUT_DRAIN_SECONDS)
+                return convergence.attach(data), False
             raise TexasSolverTimeout(f"TexasSolver timed out after {timeout_sec}s")
 
-        if rc != 0:
-            if rc == 3221225477:
-                raise TexasSolverError(
-                    "TexasSolver crashed with 0xC0000005 (access violation). "
-                    "Most common cause: resources not found due to working-directory issues. "
-                    "We now run with cwd=C:\\TexasSolver and --resource_dir=resources. "
-                    "If this persists, verify the tree/config names referenced by your input exist under C:\\TexasSolver\\resources."
-                )
-            raise TexasSolverError(f"TexasSolver exited with code {rc}")
-
-        if not output_path.exists():
-            raise TexasSolverError("TexasSolver completed but output_result.json not found (check dump_result path in your input).")
-
-        try:
-            data = json.loads(output_path.read_text(encoding="utf-8"))
-        except Exception as e:
-            raise TexasSolverError(f"Failed to parse output_result.json: {e}")
-
-        return data
+        raise_for_exit_code(rc)
+        data = read_solver_output(output_path)
+        # Let the reader thread catch up with the last progress lines
+        t_out.join(timeout=STDOUT_DRAIN_SECONDS)
+        return convergence.attach(data), True
 
 
 # Convenience: a tiny smoke test for a HU flop with toy ranges
 def smoke_test() -> dict:
     ip_range = "AA,KK,QQ,JJ,TT,AKs,AQs,AJs,ATs,KQs,AKo,AQo"
     oop_range = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
-    out_path = Path(tempfile.gettempdir()) / (RUNTIME_TMP_PREFIX + "out.json")
     input_text = build_fast_profile_input(
         pot=10.0,
         effective_stack=100.0,
@@ -248,7 +368,6 @@ def smoke_test() -> dict:
         accuracy=25.0,
         max_iteration=12,
         allin_threshold=0.67,
-        output_path=str(out_path),
     )
     return run_solver_with_input_text(input_text, timeout_sec=15)
 
@@ -266,10 +385,34 @@ def _coerce_board_list(b: Any) -> Iterable[str]:
     return []
 
 
-def _build_script_from_state_like(state_like: Any) -> str:
+_range_builder = None
+
+
+def _ranges_from_history(state_like: Any) -> Optional[Tuple[str, str]]:
+    """Weighted (ip, oop) ranges narrowed from the state's positions and betting history."""
+    global _range_builder
+    try:
+        state = TableState(**state_like) if isinstance(state_like, dict) else state_like
+        if not isinstance(state, TableState):
+            return None
+        if _range_builder is None:
+            _range_builder = RangeBuilder()
+        return _range_builder.solver_ranges(state)
+    except Exception as e:
+        log.debug("No history-based ranges for solver script: %s", e)
+        return None
+
+
+def _build_script_from_state_like(state_like: Any, budget_ms: Optional[float] = None) -> str:
     """
     Minimal HU postflop builder from a TableState-like object or dict.
-    Uses conservative toy ranges if none provided.
+    Ranges come from positions and betting history (see range_builder);
+    explicit range strings win, and toy ranges cover states with neither.
+
+    With budget_ms the richest tree profile predicted to solve in time is
+    used; without it the fast profile.  Either way a calibrated cost model
+    refuses the spot (SolverBudgetExceeded) if no profile is predicted to
+    beat the timeout.
     """
     # Access helpers to work with either attributes or dict keys
     def get(name: str, default=None):
@@ -299,9 +442,12 @@ def _build_script_from_state_like(state_like: Any) -> str:
 
     effective_stack = min(in_players) if len(in_players) >= 2 else 100.0
 
-    # Default toy ranges; if your state later carries ranges, thread them in here.
+    # Default toy ranges when positions are unknown
     ip_range = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
     oop_range = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
+    history_ranges = _ranges_from_history(state_like)
+    if history_ranges is not None:
+        ip_range, oop_range = history_ranges
 
     # Allow overrides if present in a loose 'player_ranges'
     pr = get("player_ranges", None)
@@ -317,24 +463,24 @@ def _build_script_from_state_like(state_like: Any) -> str:
     except Exception:
         pass
 
-    out_path = Path(tempfile.gettempdir()) / (RUNTIME_TMP_PREFIX + "out.json")
-    script = build_fast_profile_input(
-        pot=pot,
-        effective_stack=effective_stack,
-        board_cards=board_cards,
-        ip_range_text=ip_range,
-        oop_range_text=oop_range,
-        betsize_pct=50,
-        threads=_safe_threads(),
-        accuracy=25.0,
-        max_iteration=12,
-        allin_threshold=0.67,
-        output_path=str(out_path),
-    )
-    return script
+    board_cards = list(board_cards)
+    threads = _safe_threads()
+    profile = PROFILES["fast"]
+    if len(board_cards) in (3, 4, 5):
+        timeout_ms = DEFAULT_SOLVER_TIMEOUT_SECONDS * 1000
+        budget = min(budget_ms, timeout_ms) if budget_ms is not None else timeout_ms
+        choice = choose_profile(budget, pot, effective_stack, board_cards, ip_range, oop_range, threads,
+                                profiles=None if budget_ms is not None else [profile])
+        if choice is None:
+            raise SolverBudgetExceeded(f"No tree profile is predicted to solve this spot within {budget:.0f}ms")
+        profile, estimate = choice
+        log.info("Tree profile %s: %d nodes, ~%.0fMB, ~%.0fms predicted",
+                 profile.name, estimate.nodes, estimate.memory_mb, estimate.solve_ms)
+
+    return build_profile_input(profile, pot, effective_stack, board_cards, ip_range, oop_range, threads=threads)
 
 
-def _extract_solver_script(maybe_script: Any) -> str:
+def _extract_solver_script(maybe_script: Any, budget_ms: Optional[float] = None) -> str:
     # Already a script string
     if isinstance(maybe_script, str):
         return maybe_script
@@ -372,7 +518,9 @@ def _extract_solver_script(maybe_script: Any) -> str:
 
     # Fallback: build from TableState-like data (board, seats, pot)
     try:
-        return _build_script_from_state_like(maybe_script)
+        return _build_script_from_state_like(maybe_script, budget_ms)
+    except SolverBudgetExceeded:
+        raise
     except Exception as e:
         raise TexasSolverError(
             "TexasSolverClient.solve expected a solver script (str). "
@@ -388,12 +536,17 @@ def _extract_solver_script(maybe_script: Any) -> str:
 class TexasSolverClient:
     """
     Thin client wrapper exposing a stable interface for API endpoints.
-    Uses the module-level helpers you already have.
+    Uses the module-level helpers you already have; solves go through the
+    shared solver result cache unless use_cache=False, and on warm solver
+    processes when given a SolverDaemonPool.
     """
 
-    def __init__(self, base_url: Optional[str] = None, **_ignored: Any):
+    def __init__(self, base_url: Optional[str] = None, cache: Optional[SolverResultCache] = None,
+                 use_cache: bool = True, daemon: Any = None, **_ignored: Any):
         # Accept base_url for compatibility; not used by the local exe wrapper.
         self.base_url = base_url
+        self.cache = (cache or solver_cache) if use_cache else None
+        self.daemon = daemon
 
     def healthcheck(self) -> Dict[str, Any]:
         exe = TEXASSOLVER_EXE if isinstance(TEXASSOLVER_EXE, Path) else Path(TEXASSOLVER_EXE)
@@ -408,17 +561,20 @@ class TexasSolverClient:
             "resources_exists": resources.exists() and resources.is_dir(),
         }
 
-    def solve(self, input_text: Any, timeout_s: Optional[int] = None) -> dict:
+    def solve(self, input_text: Any, timeout_s: Optional[int] = None, budget_ms: Optional[float] = None) -> dict:
         """
         Accepts either:
           - a solver input script (str), or
-          - an object/dict providing enough state to build a minimal HU script.
+          - an object/dict providing enough state to build a minimal HU script
+            (budget_ms picks the richest tree profile predicted to fit).
         Returns parsed solver JSON or raises TexasSolverError/Timeout.
         """
-        script = _extract_solver_script(input_text)
-        return run_solver_with_input_text(
+        script = _extract_solver_script(input_text, budget_ms)
+        return solve_cached(
             script,
             timeout_sec=timeout_s or DEFAULT_SOLVER_TIMEOUT_SECONDS,
+            cache=self.cache,
+            daemon=self.daemon,
         )
 
     def solve_from_text(self, input_text: Any, timeout_s: Optional[int] = None) -> Tuple[int, Optional[dict], Optional[str]]:
@@ -428,7 +584,7 @@ class TexasSolverClient:
         """
         try:
             script = _extract_solver_script(input_text)
-            result = run_solver_with_input_text(script, timeout_sec=timeout_s or DEFAULT_SOLVER_TIMEOUT_SECONDS)
+            result = solve_cached(script, timeout_sec=timeout_s or DEFAULT_SOLVER_TIMEOUT_SECONDS, cache=self.cache, daemon=self.daemon)
             return (0, result, None)
         except TexasSolverTimeout as e:
             return (408, None, str(e))
@@ -457,7 +613,6 @@ class TexasSolverClient:
         timeout_s: Optional[int] = None,
     ) -> dict:
         """Helper: build a minimal fast-profile tree and solve it."""
-        out_path = Path(tempfile.gettempdir()) / (RUNTIME_TMP_PREFIX + "out.json")
         script = build_fast_profile_input(
             pot=pot,
             effective_stack=effective_stack,
@@ -469,17 +624,18 @@ class TexasSolverClient:
             accuracy=accuracy,
             max_iteration=max_iteration,
             allin_threshold=allin_threshold,
-            output_path=str(out_path),
         )
-        return run_solver_with_input_text(script, timeout_sec=timeout_s or DEFAULT_SOLVER_TIMEOUT_SECONDS)
+        return solve_cached(script, timeout_sec=timeout_s or DEFAULT_SOLVER_TIMEOUT_SECONDS, cache=self.cache, daemon=self.daemon)
 
 
 __all__ = [
     "TexasSolverError",
     "TexasSolverTimeout",
+    "SolverBudgetExceeded",
     "verify_solver_install",
     "build_fast_profile_input",
     "run_solver_with_input_text",
+    "solve_cached",
     "smoke_test",
     "TexasSolverClient",
 ]
@@ -0,0 +1,335 @@
+"""
+Bet-size abstraction profiles for TexasSolver trees, with cost estimates.
+
+Each ``TreeProfile`` names a bet/raise size abstraction plus the solver's
+stopping rule.  Before launching a solve, ``count_tree`` counts the tree
+the profile would build for a spot (mirroring TexasSolver's sizing and
+all-in rules) and ``TreeCostModel`` turns the count into predicted memory
+and solve time.  ``choose_profile`` picks the richest profile predicted to
+finish within a latency budget, so solves that cannot finish are never
+started.
+
+The cost model's coefficients are fitted to a local benchmark corpus (JSON
+lines, one timed solve per line; see ``app.tools.calibrate_tree_profiles``).
+Until a fitted model is saved, conservative defaults rank the profiles but
+never refuse a spot on predicted time alone.
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import TREE_COST_MODEL_PATH, TREE_MAX_MEMORY_MB
+from app.core import hand_combos, table_evaluator
+
+logger = logging.getLogger(__name__)
+
+OOP, IP = 0, 1
+STREETS = ("flop", "turn", "river")
+
+# Share of the budget a predicted solve may use (predictions are rough)
+BUDGET_MARGIN = 0.8
+
+
+@dataclass(frozen=True)
+class TreeProfile:
+    """Bet-size abstraction and stopping rule for one solver tree."""
+    name: str
+    bet_sizes: Tuple[int, ...]  # Percent of the pot
+    raise_sizes: Tuple[int, ...]  # Percent of the pot after calling
+    raise_limit: int = 3  # Raises allowed per street after the first bet
+    allin_threshold: float = 0.67  # Bets this close to all-in become all-in
+    accuracy: float = 5.0  # Target exploitability, percent of the pot
+    max_iteration: int = 50
+
+
+# Ordered from cheapest to richest
+PROFILES: Dict[str, TreeProfile] = {
+    "fast": TreeProfile("fast", bet_sizes=(50,), raise_sizes=(50,), raise_limit=2,
+                        accuracy=25.0, max_iteration=12),
+    "standard": TreeProfile("standard", bet_sizes=(33, 75), raise_sizes=(60,), raise_limit=3,
+                            accuracy=5.0, max_iteration=50),
+    "deep": TreeProfile("deep", bet_sizes=(25, 50, 100), raise_sizes=(50, 100), raise_limit=3,
+                        accuracy=1.0, max_iteration=200),
+}
+
+
+@dataclass(frozen=True)
+class TreeSize:
+    """Node counts of a betting tree, summed over every chance branch."""
+    action_nodes: int
+    chance_nodes: int
+    terminal_nodes: int
+    action_slots: Tuple[int, int]  # Actions summed over each player's nodes
+
+    @property
+    def nodes(self) -> int:
+        return self.action_nodes + self.chance_nodes + self.terminal_nodes
+
+    def __add__(self, other: "TreeSize") -> "TreeSize":
+        return TreeSize(self.action_nodes + other.action_nodes, self.chance_nodes + other.chance_nodes,
+                        self.terminal_nodes + other.terminal_nodes,
+                        (self.action_slots[0] + other.action_slots[0], self.action_slots[1] + other.action_slots[1]))
+
+    def __mul__(self, k: int) -> "TreeSize":
+        return TreeSize(self.action_nodes * k, self.chance_nodes * k, self.terminal_nodes * k,
+                        (self.action_slots[0] * k, self.action_slots[1] * k))
+
+
+_EMPTY = TreeSize(0, 0, 0, (0, 0))
+_TERMINAL = TreeSize(0, 0, 1, (0, 0))
+
+
+@dataclass
+class TreeEstimate:
+    """Predicted size and cost of solving one spot with one profile."""
+    profile: str
+    nodes: int
+    action_nodes: int
+    combos: Tuple[int, int]  # (ip, oop) live combos
+    slots: int  # Action-node combo slots (regret/strategy entries)
+    work: float  # Per-iteration work units (see TreeCostModel)
+    memory_mb: float
+    solve_ms: float
+
+
+def build_profile_input(profile: TreeProfile, pot: float, effective_stack: float, board_cards: Sequence[str],
+                        ip_range_text: str, oop_range_text: str, threads: int = 1,
+                        output_path: str = "output_result.json") -> str:
+    """TexasSolver input script for a spot under a profile (same layout as build_fast_profile_input)."""
+    bets = ",".join(str(s) for s in profile.bet_sizes)
+    raises = ",".join(str(s) for s in profile.raise_sizes)
+    lines = [f"set_pot {pot}", f"set_effective_stack {effective_stack}"]
+    if board_cards:
+        lines.append(f"set_board {','.join(board_cards)}")
+    lines.extend([f"set_range_ip {ip_range_text}", f"set_range_oop {oop_range_text}"])
+    for street in STREETS:
+        for player in ("oop", "ip"):
+            lines.extend([
+                f"set_bet_sizes {player},{street},bet,{bets}",
+                f"set_bet_sizes {player},{street},raise,{raises}",
+                f"set_bet_sizes {player},{street},allin",
+            ])
+    lines.extend([
+        f"set_allin_threshold {profile.allin_threshold}",
+        f"set_raise_limit {profile.raise_limit}",
+        "build_tree",
+        f"set_thread_num {threads}",
+        f"set_accuracy {profile.accuracy}",
+        f"set_max_iteration {profile.max_iteration}",
+        "set_print_interval 1",
+        "start_solve",
+        "set_dump_rounds 2",
+        f"dump_result {output_path}",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+def count_tree(profile: TreeProfile, pot: float, effective_stack: float, board_size: int) -> TreeSize:
+    """Count the tree TexasSolver builds for a profile from a 3, 4 or 5 card board."""
+    if board_size not in (3, 4, 5):
+        raise ValueError(f"postflop trees start from 3-5 board cards, got {board_size}")
+    return _count_street(profile, round(pot, 6), round(effective_stack, 6), board_size)
+
+
+@lru_cache(maxsize=4096)
+def _count_street(profile: TreeProfile, pot: float, stack: float, board_size: int) -> TreeSize:
+    """Size of one street's betting (and everything after it) from a pot and the chips behind."""
+    closes: Dict[float, int] = {}  # Chips each player adds this street -> lines that close on it
+    size = _count_action(profile, pot, stack, (0.0, 0.0), OOP, 0, False, closes)
+
+    for added, lines in closes.items():
+        if board_size == 5 or added >= stack:
+            size = size + _TERMINAL * lines  # Showdown, or all-in with the runout dealt
+        else:
+            # A chance node dealing every remaining card, each followed by the next street
+            cards = 52 - board_size  # Hole cards are ranges, so only the board is removed
+            next_street = _count_street(profile, round(pot + 2 * added, 6), round(stack - added, 6), board_size + 1)
+            size = size + (TreeSize(0, 1, 0, (0, 0)) + next_street * cards) * lines
+    return size
+
+
+def _count_action(profile: TreeProfile, pot: float, stack: float, bets: Tuple[float, float], player: int,
+                  raises: int, checked: bool, closes: Dict[float, int]) -> TreeSize:
+    """Size of the subtree with ``player`` to act; street-closing lines are tallied in ``closes``."""
+    me, opp = player, 1 - player
+    pot_now = pot + bets[0] + bets[1]
+    facing = bets[opp] - bets[me]
+    behind = stack - bets[me]
+    children = _EMPTY
+    actions = 0
+
+    def close(added: float):
+        key = round(added, 6)
+        closes[key] = closes.get(key, 0) + 1
+
+    if facing > 0:
+        children = children + _TERMINAL  # Fold
+        close(bets[opp])  # Call
+        actions += 2
+        if raises < profile.raise_limit and stack - bets[opp] > 0:
+            amounts = [bets[opp] + s / 100 * (pot_now + facing) - bets[me] for s in profile.raise_sizes]
+            sub, n = _count_aggressive(profile, pot, stack, bets, me, amounts, behind, raises + 1, closes)
+            children, actions = children + sub, actions + n
+    else:
+        if checked:
+            close(bets[me])
+        else:
+            children = children + _count_action(profile, pot, stack, bets, opp, raises, True, closes)
+        actions += 1
+        if behind > 0:
+            amounts = [s / 100 * pot_now for s in profile.bet_sizes]
+            sub, n = _count_aggressive(profile, pot, stack, bets, me, amounts, behind, raises, closes)
+            children, actions = children + sub, actions + n
+
+    slots = (actions, 0) if me == OOP else (0, actions)
+    return TreeSize(1, 0, 0, slots) + children
+
+
+def _count_aggressive(profile: TreeProfile, pot: float, stack: float, bets: Tuple[float, float], me: int,
+                      amounts: List[float], behind: float, raises: int,
+                      closes: Dict[float, int]) -> Tuple[TreeSize, int]:
+    """Bet/raise children, folding sizes past the all-in threshold into the all-in."""
+    size, seen = _EMPTY, set()
+    for amount in amounts:
+        if amount <= 0 or amount >= behind * profile.allin_threshold or round(amount, 6) in seen:
+            continue
+        seen.add(round(amount, 6))
+        new_bets = list(bets)
+        new_bets[me] += amount
+        size = size + _count_action(profile, pot, stack, tuple(new_bets), 1 - me, raises, False, closes)
+    new_bets = list(bets)
+    new_bets[me] = stack
+    size = size + _count_action(profile, pot, stack, tuple(new_bets), 1 - me, raises, False, closes)
+    return size, len(seen) + 1
+
+
+def range_combos(range_text: str, board_cards: Sequence[str] = ()) -> int:
+    """Live combos in a (weighted) TexasSolver range string."""
+    combos, _ = hand_combos.range_to_combos(range_text, table_evaluator.cards_to_codes(board_cards))
+    return len(combos)
+
+
+@dataclass
+class TreeCostModel:
+    """
+    Linear cost model over a tree's per-iteration work.
+
+    work = sum over action nodes of (actions x acting player's combos)
+           + terminal nodes x (both players' combos)
+    solve_ms = overhead_ms + ns_per_unit * work * max_iteration / threads / 1e6
+    memory_mb = base_memory_mb + bytes_per_slot * (action-node combo slots) / 2**20
+    """
+    ns_per_unit: float = 4.0
+    overhead_ms: float = 250.0
+    bytes_per_slot: float = 8.0
+    base_memory_mb: float = 64.0
+    samples: int = 0  # Benchmark records the model was fitted to
+
+    def estimate(self, profile: TreeProfile, pot: float, effective_stack: float, board_cards: Sequence[str],
+                 ip_range_text: str, oop_range_text: str, threads: int = 1) -> TreeEstimate:
+        """Predict the size, memory and solve time of a spot under a profile."""
+        tree = count_tree(profile, pot, effective_stack, len(board_cards))
+        ip_combos = range_combos(ip_range_text, board_cards)
+        oop_combos = range_combos(oop_range_text, board_cards)
+        slots = tree.action_slots[OOP] * oop_combos + tree.action_slots[IP] * ip_combos
+        work = float(slots + tree.terminal_nodes * (ip_combos + oop_combos))
+        return TreeEstimate(
+            profile=profile.name,
+            nodes=tree.nodes,
+            action_nodes=tree.action_nodes,
+            combos=(ip_combos, oop_combos),
+            slots=slots,
+            work=work,
+            memory_mb=self.base_memory_mb + self.bytes_per_slot * slots / 2**20,
+            solve_ms=self.overhead_ms + self.ns_per_unit * work * profile.max_iteration / max(threads, 1) / 1e6,
+        )
+
+    def calibrate(self, records: Iterable[Dict]) -> "TreeCostModel":
+        """
+        Fit the coefficients to benchmark records.
+
+        Each record carries ``work``, ``max_iteration``, ``threads`` and the
+        measured ``solve_ms``; records that also carry ``memory_mb`` and
+        ``slots`` fit the memory terms.  Coefficients without enough data
+        keep their current values.
+        """
+        records = list(records)
+        timed = [r for r in records if r.get("solve_ms") is not None]
+        if len(timed) >= 2:
+            x = np.array([r["work"] * r["max_iteration"] / max(r["threads"], 1) / 1e6 for r in timed])
+            y = np.array([r["solve_ms"] for r in timed], dtype=np.float64)
+            (overhead, slope), *_ = np.linalg.lstsq(np.column_stack([np.ones_like(x), x]), y, rcond=None)
+            if overhead < 0:
+                overhead, slope = 0.0, float(x @ y / (x @ x))
+            if slope > 0:
+                self.overhead_ms, self.ns_per_unit = float(overhead), float(slope)
+
+        sized = [r for r in records if r.get("memory_mb") is not None and r.get("slots")]
+        if len(sized) >= 2:
+            x = np.array([r["slots"] / 2**20 for r in sized])
+            y = np.array([r["memory_mb"] for r in sized], dtype=np.float64)
+            (base, slope), *_ = np.linalg.lstsq(np.column_stack([np.ones_like(x), x]), y, rcond=None)
+            if slope > 0:
+                self.base_memory_mb, self.bytes_per_slot = float(max(base, 0.0)), float(slope)
+
+        self.samples = len(timed)
+        return self
+
+    def save(self, path: Path = TREE_COST_MODEL_PATH):
+        """Write the coefficients as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path = TREE_COST_MODEL_PATH) -> "TreeCostModel":
+        """Read saved coefficients, falling back to the defaults."""
+        try:
+            return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            return cls()
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable tree cost model {path}: {e}")
+            return cls()
+
+
+_default_model: Optional[TreeCostModel] = None
+
+
+def default_model() -> TreeCostModel:
+    """The saved (calibrated) cost model, loaded on first use."""
+    global _default_model
+    if _default_model is None:
+        _default_model = TreeCostModel.load()
+    return _default_model
+
+
+def choose_profile(budget_ms: float, pot: float, effective_stack: float, board_cards: Sequence[str],
+                   ip_range_text: str, oop_range_text: str, threads: int = 1,
+                   model: Optional[TreeCostModel] = None, max_memory_mb: float = TREE_MAX_MEMORY_MB,
+                   profiles: Optional[Sequence[TreeProfile]] = None) -> Optional[Tuple[TreeProfile, TreeEstimate]]:
+    """
+    Richest profile predicted to solve within budget_ms and max_memory_mb.
+
+    Returns (profile, estimate), or None when even the cheapest profile is
+    predicted to overrun.  An uncalibrated model (no benchmark samples) only
+    ranks profiles: its time predictions never refuse a spot, so the
+    cheapest profile within max_memory_mb is used when none fits the budget.
+    """
+    model = model or default_model()
+    estimate = None
+    for profile in reversed(list(profiles or PROFILES.values())):
+        estimate = model.estimate(profile, pot, effective_stack, board_cards, ip_range_text, oop_range_text, threads)
+        if estimate.solve_ms <= budget_ms * BUDGET_MARGIN and estimate.memory_mb <= max_memory_mb:
+            return profile, estimate
+    if model.samples == 0 and estimate is not None and estimate.memory_mb <= max_memory_mb:
+        logger.info(f"Uncalibrated tree cost model predicts {estimate.solve_ms:.0f}ms > {budget_ms:.0f}ms; "
+                    f"using the {profile.name} profile anyway")
+        return profile, estimate
+    return None
@@ -6,7 +6,8 @@ Provides endpoints to interact with the hybrid database system.
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import asyncio
 import logging
 
 from ..database.gto_database import gto_db
@@ -26,6 +27,16 @@ class InstantGTORequest(BaseModel):
     stack_size: float
     num_players: int = 6
     betting_round: str = "preflop"  # "preflop", "flop", "turn", "river"
+    aggregate: bool = False  # Blend all top_k neighbours instead of the nearest
+
+MAX_BATCH_SITUATIONS = 50000
+MAX_BATCH_TOP_K = 100
+
+class InstantGTOBatchRequest(BaseModel):
+    """Request model for batched instant GTO recommendations."""
+    situations: List[InstantGTORequest]
+    top_k: int = Field(5, ge=1, le=MAX_BATCH_TOP_K)
+    aggregate: bool = False  # Blend all top_k neighbours instead of the nearest
 
 class DatabaseStatsResponse(BaseModel):
     """Database performance statistics."""
@@ -36,6 +47,30 @@ class DatabaseStatsResponse(BaseModel):
     database_size_mb: float
     status: str
 
+POSITION_MAP = {
+    'UTG': Position.UTG, 'UTG1': Position.UTG1, 'MP': Position.MP,
+    'MP1': Position.MP1, 'MP2': Position.MP2, 'CO': Position.CO,
+    'BTN': Position.BTN, 'SB': Position.SB, 'BB': Position.BB
+}
+
+BETTING_ROUND_MAP = {
+    'preflop': BettingRound.PREFLOP, 'flop': BettingRound.FLOP,
+    'turn': BettingRound.TURN, 'river': BettingRound.RIVER
+}
+
+def _to_poker_situation(request: InstantGTORequest) -> PokerSituation:
+    """Convert an instant-GTO request into a PokerSituation."""
+    return PokerSituation(
+        hole_cards=request.hole_cards,
+        board_cards=request.board_cards,
+        position=POSITION_MAP.get(request.position.upper(), Position.BTN),
+        pot_size=request.pot_size,
+        bet_to_call=request.bet_to_call,
+        stack_size=request.stack_size,
+        num_players=request.num_players,
+        betting_round=BETTING_ROUND_MAP.get(request.betting_round.lower(), BettingRound.PREFLOP)
+    )
+
 @router.post("/instant-gto", summary="Get Instant GTO Recommendation")
 async def get_instant_gto_recommendation(request: InstantGTORequest) -> JSONResponse:
     """
@@ -44,30 +79,11 @@ async def get_instant_gto_recommendation(request: InstantGTORequest) -> JSONResp
     """
     try:
         # Convert request to PokerSituation
-        position_map = {
-            'UTG': Position.UTG, 'UTG1': Position.UTG1, 'MP': Position.MP,
-            'MP1': Position.MP1, 'MP2': Position.MP2, 'CO': Position.CO,
-            'BTN': Position.BTN, 'SB': Position.SB, 'BB': Position.BB
-        }
+        situation = _to_poker_situation(request)
         
-        betting_round_map = {
-            'preflop': BettingRound.PREFLOP, 'flop': BettingRound.FLOP,
-            'turn': BettingRound.TURN, 'river': BettingRound.RIVER
-        }
-        
-        situation = PokerSituation(
-            hole_cards=request.hole_cards,
-            board_cards=request.board_cards,
-            position=position_map.get(request.position.upper(), Position.BTN),
-            pot_size=request.pot_size,
-            bet_to_call=request.bet_to_call,
-            stack_size=request.stack_size,
-            num_players=request.num_players,
-            betting_round=betting_round_map.get(request.betting_round.lower(), BettingRound.PREFLOP)
-        )
-        
-        # Get instant recommendation from database
-        recommendation = gto_db.get_instant_recommendation(situation)
+        # Get instant recommendation from database (k-NN, SQLite and lock waits off the loop)
+        recommendation = await asyncio.to_thread(gto_db.get_instant_recommendation, situation,
+                                                 aggregate=request.aggregate)
         
         if recommendation:
             return JSONResponse({
@@ -131,6 +147,34 @@ async def get_instant_gto_recommendation(request: InstantGTORequest) -> JSONResp
         logger.error(f"Instant GTO recommendation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@router.post("/instant-gto-batch", summary="Get Instant GTO Recommendations in Batch")
+async def get_instant_gto_recommendations_batch(request: InstantGTOBatchRequest) -> JSONResponse:
+    """
+    Get instant GTO recommendations for many situations in one call.
+    Uses one vectorized k-NN query and one row fetch for the whole batch;
+    misses come back as null without a CFR fallback.
+    """
+    if len(request.situations) > MAX_BATCH_SITUATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SITUATIONS} situations per batch")
+    
+    try:
+        situations = [_to_poker_situation(item) for item in request.situations]
+        # The k-NN query, row fetch and lock wait block, so they run in a worker thread
+        recommendations = await asyncio.to_thread(gto_db.get_instant_recommendations_batch, situations,
+                                                  top_k=request.top_k, aggregate=request.aggregate)
+        
+        return JSONResponse({
+            "success": True,
+            "recommendations": recommendations,
+            "hits": sum(1 for r in recommendations if r is not None),
+            "total": len(recommendations),
+            "method": "instant_database_lookup_batch"
+        })
+        
+    except Exception as e:
+        logger.error(f"Batch instant GTO recommendation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
 @router.get("/database-stats", response_model=DatabaseStatsResponse, summary="Database Performance Statistics")
 async def get_database_stats():
     """Get database performance and status statistics."""
@@ -51,6 +51,7 @@ from app.api.models import (
 )
 from app.advisor.gto_service import GTODecisionService
 from app.advisor.enhanced_gto_service import EnhancedGTODecisionService
+from app.advisor.anytime import AnytimeDecisionRunner
 from app.scraper.scraper_manager import ScraperManager
 from app.scraper.manual_trigger import ManualTriggerService
 from app.api.training_endpoints import router as training_router
@@ -128,6 +129,22 @@ except Exception as e:
         logger.error(f"Failed to initialize any GTO Service: {e2}")
         gto_service = None
 
+
+async def broadcast_to_table(table_id: str, message: Dict[str, Any]):
+    """Send a JSON message to every websocket watching a table."""
+    for websocket in list(active_websockets.get(table_id, [])):
+        try:
+            await websocket.send_json(message)
+        except Exception as e:
+            logger.debug(f"Dropping websocket for table {table_id}: {e}")
+            if websocket in active_websockets[table_id]:
+                active_websockets[table_id].remove(websocket)
+
+
+# Anytime /decide: answer by the deadline, push later refinements over /ws
+anytime_runner = (AnytimeDecisionRunner(gto_service, publish=broadcast_to_table)
+                  if isinstance(gto_service, EnhancedGTODecisionService) else None)
+
 # Initialize scraper manager
 scraper_manager = None
 manual_trigger_service = None
@@ -282,9 +299,18 @@ async def manual_gto_solver(
 async def make_gto_decision(
     state: TableState,
     strategy_name: str = "default_cash6max",
+    deadline_ms: Optional[int] = None,
     token: str = Depends(verify_token)
 ):
-    """Generate GTO decision for given table state."""
+    """
+    Generate GTO decision for given table state.
+
+    With deadline_ms the best decision available by then is returned
+    (database hit, coarse solve or full solve) and refinement continues in
+    the background, pushing improved decisions over /ws/{table_id}.
+    deadline_ms needs the enhanced GTO service; other services ignore it
+    (and log that they did).
+    """
     start_time = datetime.now()
 
     try:
@@ -298,7 +324,13 @@ async def make_gto_decision(
         )
 
         # Compute GTO decision
-        result = await gto_service.compute_gto_decision(state, strategy_name)
+        if deadline_ms is not None and anytime_runner is not None:
+            result = await anytime_runner.decide(state, strategy_name, deadline_ms)
+        else:
+            if deadline_ms is not None:
+                logger.warning(f"Ignoring deadline_ms={deadline_ms}: {type(gto_service).__name__} "
+                               f"does not support anytime decisions")
+            result = await gto_service.compute_gto_decision(state, strategy_name)
 
                 # ---- NEW: build user-facing summary (typed) ----
         summary_model: Optional[SolverSummary] = None
@@ -198,6 +198,13 @@ class EquityBreakdown(BaseModel):
     draw_equity: float = 0.0  # Additional equity from draws
 
 
+class ConvergencePoint(BaseModel):
+    """One exploitability check during a solve."""
+    iteration: int
+    exploitability_pct: float  # Best-response exploitability in % of pot
+    elapsed_ms: Optional[float] = None
+
+
 class GTOMetrics(BaseModel):
     """Comprehensive GTO analysis metrics."""
     equity_breakdown: EquityBreakdown
@@ -207,6 +214,9 @@ class GTOMetrics(BaseModel):
     players: int  # Number of active players
     ev: Optional[float] = None  # Expected value of recommended action
     exploitability: Optional[float] = None  # Nash distance metric
+    exploitability_pct_pot: Optional[float] = None  # Best-response exploitability in % of pot
+    solver_iterations: Optional[int] = None  # Iterations the solve ran
+    convergence: List[ConvergencePoint] = []  # Exploitability curve of the solve
     
     # Stack and pot considerations
     spr: float  # Stack-to-pot ratio
@@ -269,6 +279,11 @@ class GTOResponse(BaseModel):
     # NEW: concise, user‑facing summary of the solver output
     summary: Optional[SolverSummary] = None
 
+    # Anytime mode: stage that produced this response, and whether better
+    # stages will follow over /ws/{table_id}
+    refinement_stage: Optional[str] = None
+    refining: bool = False
+
 
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -1,13 +1,21 @@
 from fastapi import APIRouter, HTTPException
 from app.api.models import TableState, GTOResponse
-from app.advisor.texas_solver_client import TexasSolverClient
+from app.advisor.texas_solver_client import TexasSolverClient, TexasSolverError, TexasSolverTimeout
+from app.advisor.async_solver import SolverQueueFull, solver_pool
 
 router = APIRouter()
 _client = TexasSolverClient()
 
 @router.post("/solver/nhle_decide", response_model=GTOResponse)
-def solver_decide(state: TableState) -> GTOResponse:
-    ts = _client.solve(state)
+async def solver_decide(state: TableState) -> GTOResponse:
+    try:
+        ts = await solver_pool.solve(state)
+    except SolverQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TexasSolverTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except TexasSolverError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     if ts.get("status") != "ok":
         raise HTTPException(status_code=502, detail={"upstream": ts})
     return _client.to_gto_response(state, ts)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 # TexasSolver base dir & exe
@@ -8,3 +9,25 @@ TEXASSOLVER_EXE = TEXASSOLVER_DIR / "console_solver.exe"
 # Where we write temp input/output files (per-run temp dir inside OS temp)
 RUNTIME_TMP_PREFIX = "texassolver_"
 DEFAULT_SOLVER_TIMEOUT_SECONDS = 15  # hard stop (we keep this tight for day 1)
+
+# Concurrent solver processes and how many requests may wait for one
+SOLVER_SLOTS = int(os.environ.get("SOLVER_SLOTS", max(1, (os.cpu_count() or 1) // 4)))
+SOLVER_QUEUE_SIZE = int(os.environ.get("SOLVER_QUEUE_SIZE", 32))
+
+# Content-addressed cache of solver outputs (gzip JSON files, LRU by size)
+SOLVER_CACHE_DIR = Path(os.environ.get("SOLVER_CACHE_DIR", Path(tempfile.gettempdir()) / "texassolver_cache"))
+SOLVER_CACHE_MAX_MB = int(os.environ.get("SOLVER_CACHE_MAX_MB", 512))
+SOLVER_CACHE_COMPRESS = os.environ.get("SOLVER_CACHE_COMPRESS", "1") != "0"
+
+# Warm solver daemons (0 = spawn one solver process per solve) and jobs per
+# daemon before it is recycled
+SOLVER_DAEMON_WORKERS = int(os.environ.get("SOLVER_DAEMON_WORKERS", 0))
+SOLVER_DAEMON_MAX_JOBS = int(os.environ.get("SOLVER_DAEMON_MAX_JOBS", 200))
+
+# Tree-profile selection: cost model fitted by app.tools.calibrate_tree_profiles,
+# the benchmark corpus it is fitted to, the latency budget for service solves
+# and the memory a predicted tree may use
+TREE_COST_MODEL_PATH = Path(os.environ.get("TREE_COST_MODEL_PATH", Path(__file__).parent / "data" / "tree_cost_model.json"))
+TREE_BENCHMARK_CORPUS = Path(os.environ.get("TREE_BENCHMARK_CORPUS", Path(__file__).parent / "data" / "tree_benchmarks.jsonl"))
+SOLVER_LATENCY_BUDGET_MS = int(os.environ.get("SOLVER_LATENCY_BUDGET_MS", 3000))
+TREE_MAX_MEMORY_MB = int(os.environ.get("TREE_MAX_MEMORY_MB", 8192))
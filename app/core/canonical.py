@@ -0,0 +1,118 @@
+"""Suit-isomorphic canonical forms for hole cards, boards and ranges.
+
+Two spots that differ only by a relabelling of suits (AhKh on Qh7h2c vs
+AsKs on Qs7s2d) are strategically identical.  ``canonicalize`` picks, among
+the 24 suit permutations, the one that makes the spot's card codes
+lexicographically smallest, so every member of an equivalence class maps to
+the same representative (e.g. the 22,100 flops collapse to 1,755).
+
+Board cards are grouped by street (flop as a set, then turn, then river) so
+a spot only merges with spots that dealt the same cards on the same streets.
+Cards use the ``rank * 4 + suit`` codes of ``table_evaluator``.
+"""
+
+import itertools
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.core.table_evaluator import card_to_code, code_to_card
+
+# All 24 relabellings of suits 0..3: permutation[old_suit] = new_suit
+SUIT_PERMUTATIONS: List[Tuple[int, ...]] = list(itertools.permutations(range(4)))
+IDENTITY: Tuple[int, ...] = SUIT_PERMUTATIONS[0]
+
+
+def permute_code(code: int, permutation: Sequence[int]) -> int:
+    """Relabel one card code's suit."""
+    return (code & ~3) | permutation[code & 3]
+
+
+def permute_codes(codes: Iterable[int], permutation: Sequence[int]) -> List[int]:
+    """Relabel the suits of several card codes."""
+    return [permute_code(code, permutation) for code in codes]
+
+
+def invert_permutation(permutation: Sequence[int]) -> Tuple[int, ...]:
+    """Permutation that undoes ``permutation`` (canonical -> original suits)."""
+    inverse = [0] * 4
+    for old, new in enumerate(permutation):
+        inverse[new] = old
+    return tuple(inverse)
+
+
+def _spot_key(hole: Sequence[int], board: Sequence[int], permutation: Sequence[int]) -> Tuple:
+    """Order-insensitive-within-street key of a spot under a permutation."""
+    flop = tuple(sorted(permute_codes(board[:3], permutation)))
+    later = tuple(permute_codes(board[3:], permutation))
+    return flop + (-1,) + later + (-1,) + tuple(sorted(permute_codes(hole, permutation)))
+
+
+def canonical_permutation(hole: Sequence[int], board: Sequence[int] = ()) -> Tuple[int, ...]:
+    """Suit permutation that maps the spot to its canonical representative."""
+    return min(SUIT_PERMUTATIONS, key=lambda p: _spot_key(hole, board, p))
+
+
+def canonicalize_codes(hole: Sequence[int], board: Sequence[int] = ()
+                       ) -> Tuple[List[int], List[int], Tuple[int, ...]]:
+    """
+    Canonical form of a spot given as card codes.
+
+    Returns:
+        (sorted canonical hole codes, canonical board codes with the flop
+        sorted and turn/river kept in order, permutation applied)
+    """
+    permutation = canonical_permutation(hole, board)
+    canon_board = sorted(permute_codes(board[:3], permutation)) + permute_codes(board[3:], permutation)
+    return sorted(permute_codes(hole, permutation)), canon_board, permutation
+
+
+def canonicalize(hole_cards: Sequence[str], board_cards: Sequence[str] = ()
+                 ) -> Tuple[List[str], List[str], Tuple[int, ...]]:
+    """
+    Canonical form of a spot given as card strings (invalid cards are dropped).
+
+    Returns:
+        (canonical hole cards, canonical board cards, permutation applied)
+    """
+    hole = [c for c in (card_to_code(card) for card in hole_cards) if c >= 0]
+    board = [c for c in (card_to_code(card) for card in board_cards) if c >= 0]
+    canon_hole, canon_board, permutation = canonicalize_codes(hole, board)
+    return ([code_to_card(c) for c in canon_hole],
+            [code_to_card(c) for c in canon_board],
+            permutation)
+
+
+def canonical_key(hole_cards: Sequence[str], board_cards: Sequence[str] = ()) -> str:
+    """Compact string key shared by every suit-isomorphic version of a spot."""
+    canon_hole, canon_board, _ = canonicalize(hole_cards, board_cards)
+    return "".join(canon_hole) + "|" + "".join(canon_board)
+
+
+def canonical_codes_key(hole: Sequence[int], board: Sequence[int] = ()) -> str:
+    """canonical_key for card codes (e.g. the adapter's game_context)."""
+    canon_hole, canon_board, _ = canonicalize_codes(
+        [c for c in hole if 0 <= c < 52], [c for c in board if 0 <= c < 52]
+    )
+    return "".join(code_to_card(c) for c in canon_hole) + "|" + "".join(code_to_card(c) for c in canon_board)
+
+
+def permute_range(range_hands: Iterable[str], permutation: Sequence[int]) -> List[str]:
+    """
+    Relabel explicit combos in a range ('AhKd' -> 'AsKc'); suit-free notation
+    ('AKs', 'QQ', weights like 'AKo:0.5') is unchanged.
+    """
+    permuted = []
+    for entry in range_hands:
+        hand, sep, weight = entry.partition(":")
+        if len(hand) == 4:
+            codes = [card_to_code(hand[:2]), card_to_code(hand[2:])]
+            if min(codes) >= 0:
+                cards = [code_to_card(permute_code(c, permutation)) for c in codes]
+                hand = "".join(card[0].upper() + card[1] for card in cards)
+        permuted.append(hand + sep + weight)
+    return permuted
+
+
+def canonical_range_key(range_hands: Iterable[str], permutation: Optional[Sequence[int]] = None) -> str:
+    """Order-independent key of a range after relabelling it with a spot's permutation."""
+    hands = permute_range(range_hands, permutation or IDENTITY)
+    return ",".join(sorted(hands))
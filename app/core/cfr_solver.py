@@ -0,0 +1,807 @@
+"""Vectorized CFR solver for heads-up turn and river subgames.
+
+The subgame starts at the beginning of a street with equal contributions and
+is described by the pot, the effective stack, the board and both players'
+ranges as 1,326-length weight vectors (``hand_combos.ALL_COMBOS`` order).
+A betting tree is built from pot-fraction bet and raise sizes, and
+Discounted CFR (or CFR+) runs over it with alternating updates, every node
+operating on whole range vectors at once.
+
+Terminal values are array ops over precomputed hand-strength orderings:
+showdowns use cumulative sums of the opponent's reach over its hands sorted
+by strength, with per-card cumulative sums subtracting blocked combos, so a
+showdown costs O(N) after a one-off sort rather than O(N^2).  In turn
+subgames every river card is dealt at once: the river subtree below a chance
+node is built a single time and its arrays carry a leading axis with one
+row per river card.
+
+Player 0 is out of position (acts first), player 1 is in position.
+Values are chips won from the start of the subgame: the pot is dead money
+both players compete for, so payoffs in every outcome sum to the pot.
+
+A solved turn subgame can seed the river re-solve once the card lands
+(``SubgameSolver.from_parent``): the players' reach through the turn line
+becomes the river ranges, the parent's river strategy warm-starts the
+regrets, and a re-solve gadget lets one player take their counterfactual
+value from the parent solution instead of entering the river, keeping the
+re-solve safe against that player.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core import hand_combos, table_evaluator
+
+logger = logging.getLogger(__name__)
+
+OOP, IP = 0, 1
+
+# Discounted CFR (Brown & Sandholm): positive regrets decay by t^a/(t^a+1),
+# negative ones by t^b/(t^b+1) and the average strategy by (t/(t+1))^g
+DCFR_PARAMS = (1.5, 0.0, 2.0)
+ALGORITHMS = ("dcfr", "cfr+")
+
+# The default budget trades accuracy for latency.  Narrow ranges reach the
+# target well inside it, but a BB-vs-BTN opening-range river (10 pot, 100
+# behind, default tree) needs ~115 iterations (~400 ms on one core) for 0.5%
+# of the pot and stops at ~2-3% after the 40-55 iterations 200 ms buys;
+# test_default_ranges_tradeoff pins both sides
+DEFAULT_TARGET_EXPLOITABILITY_PCT = 0.5
+DEFAULT_TIME_BUDGET_MS = 200.0
+DEFAULT_MAX_ITERATIONS = 2000
+# Iterations between exploitability checks (each costs about one iteration)
+DEFAULT_CHECK_EVERY = 10
+# Iterations a warm-started re-solve is credited with for its seed strategy
+WARM_START_ITERATIONS = 20
+
+TERMINALS = ("fold", "showdown", "exit")
+
+Board = Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class TreeConfig:
+    """Bet sizing for the betting tree."""
+    bet_sizes: Tuple[float, ...] = (0.5, 1.0)  # Fractions of the pot
+    raise_sizes: Tuple[float, ...] = (1.0,)  # Fractions of the pot after calling
+    max_raises: int = 2  # Raises allowed per street after the first bet
+    allin: bool = True
+    allin_threshold: float = 0.67  # Bets this close to all-in become all-in
+
+
+class _Node:
+    """
+    Betting-tree node; ``kind`` is 'action', 'chance', 'fold', 'showdown' or
+    'exit' (a re-solve gadget's opt-out, paying the gadget player ``alt``).
+
+    ``boards`` holds one board per row of the node's arrays: a single board
+    before the river card, every possible river after a chance node.
+    """
+
+    __slots__ = ("kind", "player", "actions", "children", "bets", "boards", "cards",
+                 "regrets", "strategy_sum", "strategy", "folder", "alt")
+
+    def __init__(self, kind: str, bets: Tuple[float, float], boards: Tuple[Board, ...], player: int = -1):
+        self.kind = kind
+        self.player = player
+        self.bets = bets
+        self.boards = boards
+        self.actions: List[str] = []
+        self.children: List["_Node"] = []
+        self.cards: List[int] = []  # Chance nodes: card dealt to each row of the child
+        self.folder = -1
+        self.alt: Optional[np.ndarray] = None  # Exit nodes: gadget player's value per hand
+        # Action nodes: (actions, boards, hands)
+        self.regrets: Optional[np.ndarray] = None
+        self.strategy: Optional[np.ndarray] = None  # Regret-matching strategy for the next visit
+        self.strategy_sum: Optional[np.ndarray] = None
+
+
+class _Hands:
+    """One player's live hands: codes, weights and card incidence."""
+
+    def __init__(self, combos: np.ndarray, weights: np.ndarray):
+        self.combos = combos
+        self.weights = weights
+        self.onehot = np.zeros((52, len(combos)))
+        self.onehot[combos[:, 0], np.arange(len(combos))] = 1.0
+        self.onehot[combos[:, 1], np.arange(len(combos))] = 1.0
+        self.cards = np.ascontiguousarray(self.onehot.T)
+        self.index = {(int(a), int(b)): i for i, (a, b) in enumerate(combos)}
+
+
+class _Showdown:
+    """Strength orderings of one player's hands against the other's, per river board.
+
+    The opponent's hands are listed by strength, then each again under both
+    of its cards sorted by (card, strength).  One cumulative sum of the
+    opponent's reach over that list gives, by differences, the reach a hand
+    beats or ties and how much of it the hand's own cards block.  Indices
+    are flat over all boards so a whole batch is two gathers and a cumsum.
+    """
+
+    # Weights of the gathered prefix sums in (win - lose + compat), see _net_wins
+    COEFFS = np.array([1.0, 1.0, -1.0, -1.0, -1.0, -1.0, 2.0, 2.0])
+
+    def __init__(self, boards: Sequence[Board], hero: _Hands, opp: _Hands):
+        n = len(opp.combos)
+        orders, indexes = [], []
+        for b, board in enumerate(boards):
+            order, index = self._orderings(board, hero, opp)
+            orders.append(order + b * n)
+            indexes.append(index + b * (3 * n + 1))
+        self.order = np.stack(orders)
+        self.index = np.stack(indexes)
+        self.prefix = np.zeros((len(boards), 3 * n + 1))
+
+    @staticmethod
+    def _orderings(board: Board, hero: _Hands, opp: _Hands) -> Tuple[np.ndarray, np.ndarray]:
+        # Hands that hold a board card score -1; they have no reach on this board
+        hero_strength = table_evaluator.evaluate_batch(hero.combos, board).astype(np.int64)
+        opp_strength = table_evaluator.evaluate_batch(opp.combos, board).astype(np.int64)
+        n = len(opp.combos)
+        by_strength = np.argsort(opp_strength, kind="stable")
+        sorted_strength = opp_strength[by_strength]
+
+        cards = opp.combos.T.reshape(-1).astype(np.int64)
+        keys = (cards << 32) + np.tile(opp_strength, 2)
+        by_card = np.argsort(keys, kind="stable")
+        sorted_keys = keys[by_card]
+        order = np.concatenate((by_strength, np.tile(np.arange(n), 2)[by_card]))
+
+        # Prefix-sum positions: opponent hands weaker / not stronger than each
+        # hand, then the same within each of the hand's two card groups, then
+        # the start of both card groups
+        rows = [np.searchsorted(sorted_strength, hero_strength, side=side) for side in ("left", "right")]
+        groups = [c.astype(np.int64) << 32 for c in (hero.combos[:, 0], hero.combos[:, 1])]
+        for side in ("left", "right"):
+            rows += [n + np.searchsorted(sorted_keys, g + hero_strength, side=side) for g in groups]
+        rows += [n + np.searchsorted(sorted_keys, g, side="left") for g in groups]
+        return order, np.stack(rows)
+
+
+class SubgameSolver:
+    """Counterfactual regret minimization over one heads-up turn or river subgame."""
+
+    def __init__(self, board: Sequence[str], pot: float, stack: float,
+                 oop_range: np.ndarray, ip_range: np.ndarray,
+                 tree: TreeConfig = TreeConfig(), algorithm: str = "dcfr",
+                 gadget: Optional[Tuple[int, np.ndarray]] = None):
+        """
+        Args:
+            board: 4 or 5 board cards ('Ah', ...)
+            pot: Pot at the start of the street
+            stack: Effective stack behind for both players
+            oop_range, ip_range: 1,326 combo weights (ALL_COMBOS order)
+            tree: Bet sizing
+            algorithm: 'dcfr' or 'cfr+'
+            gadget: (player, 1,326 values) for a safe re-solve: before the
+                subgame starts, that player may exit with each hand's value
+                (chips per matchup, from the start of the subgame)
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+        codes = table_evaluator.cards_to_codes(board)
+        if len(codes) not in (4, 5) or len(codes) != len(board) or len(set(codes)) != len(codes):
+            raise ValueError(f"subgames need a valid 4 or 5 card board, got {board}")
+        if pot <= 0 or stack < 0:
+            raise ValueError("pot must be positive and stack non-negative")
+
+        self.board: Board = tuple(codes)
+        self.pot = float(pot)
+        self.stack = float(stack)
+        self.config = tree
+        self.algorithm = algorithm
+
+        board_mask = np.zeros(52, dtype=bool)
+        board_mask[list(codes)] = True
+        all_combos = hand_combos.ALL_COMBOS.astype(np.int64)
+        self.hands: List[_Hands] = []
+        for weights in (oop_range, ip_range):
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != (hand_combos.NUM_COMBOS,):
+                raise ValueError(f"ranges must have {hand_combos.NUM_COMBOS} weights")
+            live = (weights > 0) & ~board_mask[all_combos[:, 0]] & ~board_mask[all_combos[:, 1]]
+            if not live.any():
+                raise ValueError("a range has no combos left after board removal")
+            self.hands.append(_Hands(all_combos[live], weights[live]))
+
+        # Each hand's index in the opponent's list, for adding back the
+        # identical combo that card blocking removes twice
+        self._same = []
+        for p in (OOP, IP):
+            same = np.array([self.hands[1 - p].index.get((int(a), int(b)), -1) for a, b in self.hands[p].combos])
+            self._same.append((np.maximum(same, 0), (same >= 0).astype(np.float64)))
+
+        # River cards and, per player, which hands each one leaves live
+        self._deal_cards = [c for c in range(52) if c not in self.board] if len(self.board) == 4 else []
+        self._deal_masks = [1.0 - h.onehot[self._deal_cards] for h in self.hands]
+        self._showdowns: Dict[Tuple[int, Tuple[Board, ...]], _Showdown] = {}
+
+        self.root = self._build((self.board,), (0.0, 0.0), OOP, 0, False)
+        # Iterations run from the top: the gadget's exit/follow choice, if any
+        self._top = self.root
+        if gadget is not None:
+            player, values = gadget
+            exit_node = _Node("exit", (0.0, 0.0), (self.board,))
+            exit_node.player = player
+            exit_node.alt = np.asarray(values, dtype=np.float64)[self._full_index(player)]
+            self._top = _Node("action", (0.0, 0.0), (self.board,), player)
+            self._add(self._top, "exit", exit_node)
+            self._add(self._top, "follow", self.root)
+        self._allocate(self._top)
+        self.iterations = 0
+        self.elapsed_ms = 0.0
+        # One point per exploitability check: iteration, % of pot, ms spent solving
+        self.convergence: List[Dict[str, float]] = []
+        self._discounts = (1.0, 1.0, 1.0)
+        # (regret, average) weights while seeding a warm start, else None
+        self._seed: Optional[Tuple[float, float]] = None
+
+    def _full_index(self, p: int) -> np.ndarray:
+        """Position of each of p's hands in the 1,326-combo order."""
+        return np.array([hand_combos.combo_index(int(a), int(b)) for a, b in self.hands[p].combos])
+
+    @classmethod
+    def from_parent(cls, parent: "SubgameSolution", history: Sequence[str],
+                    gadget_player: Optional[int] = None,
+                    warm_iterations: int = WARM_START_ITERATIONS,
+                    tree: Optional[TreeConfig] = None, algorithm: Optional[str] = None) -> "SubgameSolver":
+        """
+        Subgame for the street a solved parent deals into.
+
+        ``history`` leads through the parent to a dealt card (e.g.
+        ['check', 'bet 50%', 'call', '7c']).  The new subgame starts from the
+        pot and stacks at that point with both players' reach as ranges and,
+        unless warm_iterations is 0, the parent's strategy below it as a warm
+        start.  With gadget_player set, that player's counterfactual values
+        in the parent bound what the re-solve may concede to them.
+        """
+        history = list(history)
+        before, _ = parent.solver.node_at(history[:-1])
+        node, row = parent.solver.node_at(history)
+        if before.kind != "chance" or node.kind != "action":
+            raise ValueError("history must end with a card dealt into a street with betting left")
+
+        bet = node.bets[0]
+        oop_range, ip_range = parent.reach_ranges(history)
+        gadget = None
+        if gadget_player is not None:
+            # The parent counts the street's bets as losses; here they are pot
+            gadget = (gadget_player, parent.counterfactual_values(gadget_player, history) + bet)
+        board = [table_evaluator.code_to_card(code) for code in node.boards[row]]
+        solver = cls(board, parent.solver.pot + 2 * bet, parent.solver.stack - bet, oop_range, ip_range,
+                     tree or parent.solver.config, algorithm or parent.solver.algorithm, gadget)
+        if warm_iterations > 0:
+            solver.warm_start(parent, history, warm_iterations)
+        return solver
+
+    def warm_start(self, parent: "SubgameSolution", history: Sequence[str],
+                   iterations: int = WARM_START_ITERATIONS):
+        """
+        Seed regrets and the average strategy from a parent solution's strategy
+        at ``history``, as if ``iterations`` iterations had played it.
+
+        Each hand's regrets are set in proportion to the warm strategy and
+        to the size of its counterfactual regrets against it, so the first
+        iteration plays the warm strategy.  Nodes whose actions differ from
+        the parent's keep a uniform seed.
+        """
+        node, row = parent.solver.node_at(history)
+        self._copy_strategy(self.root, node, row, parent.solver)
+        if self._top is not self.root:
+            self._top.strategy[:] = 0.0
+            self._top.strategy[1] = 1.0
+
+        if self.algorithm == "cfr+":
+            self._seed = (float(iterations), iterations * (iterations + 1) / 2.0)
+        else:
+            self._seed = (float(iterations), max(1.0, iterations / 3.0))
+        try:
+            for p in (OOP, IP):
+                self._cfr(self._top, p, self.hands[p].weights[None, :], self.hands[1 - p].weights[None, :])
+        finally:
+            self._seed = None
+        self._refresh_strategy(self._top)
+        self.iterations = iterations
+
+    def _copy_strategy(self, node: _Node, source: _Node, row: int, parent: "SubgameSolver"):
+        """Copy a parent's average strategy (at one of its rows) onto a matching subtree."""
+        if node.kind != "action" or source.kind != "action" or node.actions != source.actions:
+            return
+        average = SubgameSolver._average_strategy(source)[:, row]
+        index = parent.hands[node.player].index
+        columns = np.array([index.get((int(a), int(b)), -1) for a, b in self.hands[node.player].combos])
+        found = columns >= 0
+        node.strategy[:, 0, found] = average[:, columns[found]]
+        for child, source_child in zip(node.children, source.children):
+            self._copy_strategy(child, source_child, row, parent)
+
+    def _refresh_strategy(self, node: _Node):
+        if node.kind == "action":
+            node.strategy = self._current_strategy(node)
+        for child in node.children:
+            self._refresh_strategy(child)
+
+    # ------------------------------------------------------------------ tree
+
+    def _build(self, boards: Tuple[Board, ...], bets: Tuple[float, float], player: int,
+               raises: int, checked: bool) -> _Node:
+        """Build the subtree for ``player`` to act with ``bets`` in."""
+        node = _Node("action", bets, boards, player)
+        me, opp = player, 1 - player
+        pot_now = self.pot + bets[0] + bets[1]
+        facing = bets[opp] - bets[me]
+        behind = self.stack - bets[me]
+
+        if facing > 0:
+            self._add(node, "fold", self._fold(boards, bets, me))
+            called = (bets[opp], bets[opp])
+            self._add(node, "call", self._close_street(boards, called))
+            if raises < self.config.max_raises and self.stack - bets[opp] > 0:
+                sizes = [(f"raise {int(round(s * 100))}%", bets[opp] + s * (pot_now + facing) - bets[me])
+                         for s in self.config.raise_sizes]
+                self._add_aggressive(node, sizes, behind, bets, me, boards, raises + 1)
+        else:
+            if checked:
+                self._add(node, "check", self._close_street(boards, bets))
+            else:
+                self._add(node, "check", self._build(boards, bets, opp, raises, True))
+            if behind > 0:
+                sizes = [(f"bet {int(round(s * 100))}%", s * pot_now) for s in self.config.bet_sizes]
+                self._add_aggressive(node, sizes, behind, bets, me, boards, raises)
+        return node
+
+    def _add_aggressive(self, node: _Node, sizes: List[Tuple[str, float]], behind: float,
+                        bets: Tuple[float, float], me: int, boards: Tuple[Board, ...], raises: int):
+        """Add bet/raise children (amounts are chips added now), folding near-all-ins into all-in."""
+        seen = set()
+        for label, amount in sizes:
+            if amount <= 0 or amount >= behind * self.config.allin_threshold:
+                continue
+            key = round(amount, 6)
+            if key in seen:
+                continue
+            seen.add(key)
+            new_bets = list(bets)
+            new_bets[me] += amount
+            self._add(node, label, self._build(boards, tuple(new_bets), 1 - me, raises, False))
+        if self.config.allin or not seen:
+            new_bets = list(bets)
+            new_bets[me] = self.stack
+            self._add(node, "allin", self._build(boards, tuple(new_bets), 1 - me, raises, False))
+
+    @staticmethod
+    def _fold(boards: Tuple[Board, ...], bets: Tuple[float, float], folder: int) -> _Node:
+        node = _Node("fold", bets, boards)
+        node.folder = folder
+        return node
+
+    def _close_street(self, boards: Tuple[Board, ...], bets: Tuple[float, float]) -> _Node:
+        """Showdown on the river, otherwise deal every river card at once."""
+        if len(boards[0]) == 5:
+            return _Node("showdown", bets, boards)
+        node = _Node("chance", bets, boards)
+        node.cards = self._deal_cards
+        rivers = tuple(boards[0] + (card,) for card in node.cards)
+        allin = bets[0] >= self.stack
+        node.children.append(_Node("showdown", bets, rivers) if allin
+                             else self._build(rivers, bets, OOP, 0, False))
+        return node
+
+    @staticmethod
+    def _add(node: _Node, label: str, child: _Node):
+        node.actions.append(label)
+        node.children.append(child)
+
+    def _allocate(self, node: _Node):
+        """Zeroed regret and average-strategy tables for every action node."""
+        if node.kind == "action":
+            shape = (len(node.children), len(node.boards), len(self.hands[node.player].combos))
+            node.regrets = np.zeros(shape)
+            node.strategy_sum = np.zeros(shape)
+            node.strategy = np.full(shape, 1.0 / shape[0])
+        for child in node.children:
+            self._allocate(child)
+
+    # ------------------------------------------------------------ terminals
+
+    def _showdown(self, boards: Tuple[Board, ...], p: int) -> _Showdown:
+        key = (p, boards)
+        if key not in self._showdowns:
+            self._showdowns[key] = _Showdown(boards, self.hands[p], self.hands[1 - p])
+        return self._showdowns[key]
+
+    def _compatible(self, p: int, reach_opp: np.ndarray) -> np.ndarray:
+        """Opponent reach not blocked by each of p's hands."""
+        card_sum = reach_opp @ self.hands[1 - p].cards
+        total = reach_opp.sum(axis=1, keepdims=True)
+        return total - card_sum @ self.hands[p].onehot + self._same_reach(p, reach_opp)
+
+    def _same_reach(self, p: int, reach_opp: np.ndarray) -> np.ndarray:
+        """Opponent reach on the identical combo (removed twice by card blocking)."""
+        index, present = self._same[p]
+        return reach_opp[:, index] * present
+
+    def _net_wins(self, boards: Tuple[Board, ...], p: int, reach_opp: np.ndarray,
+                  compat: np.ndarray) -> np.ndarray:
+        """Unblocked opponent reach each of p's hands beats minus the reach it loses to."""
+        sd = self._showdown(boards, p)
+        np.cumsum(reach_opp.ravel()[sd.order], axis=1, out=sd.prefix[:, 1:])
+        # With W/T the reach weaker/not stronger and Wc/Tc/Sc the prefix sums
+        # of a card group below/up to/at its start: win = W - sum(Wc - Sc) and
+        # lose = compat - (T - sum(Tc - Sc) + same), the identical combo tying
+        # and being blocked by both cards
+        return _Showdown.COEFFS @ sd.prefix.ravel()[sd.index] + self._same_reach(p, reach_opp) - compat
+
+    def _terminal(self, node: _Node, p: int, reach_opp: np.ndarray,
+                  shared: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        Counterfactual values of p's hands at a fold or showdown.
+
+        ``shared`` caches reach sums between sibling terminals that see the
+        same opponent reach.
+        """
+        shared = {} if shared is None else shared
+        if "compat" not in shared:
+            shared["compat"] = self._compatible(p, reach_opp)
+        compat = shared["compat"]
+        if node.kind == "exit":
+            if node.player == p:
+                return node.alt * compat
+            # Payoffs sum to the pot, so p gets pot - alt of each unblocked opponent hand
+            return self.pot * compat - self._compatible(p, reach_opp * node.alt)
+        if node.kind == "fold":
+            if node.folder == p:
+                return -node.bets[p] * compat
+            return (self.pot + node.bets[1 - p]) * compat
+
+        if "net" not in shared:
+            shared["net"] = self._net_wins(node.boards, p, reach_opp, compat)
+        # (pot + bet) * win - bet * lose + pot / 2 * tie, with tie = compat - win - lose
+        return (0.5 * self.pot + node.bets[p]) * shared["net"] + 0.5 * self.pot * compat
+
+    def _outcomes(self, node: _Node) -> int:
+        """River cards that can come once both players' hands are known."""
+        return 52 - len(node.boards[0]) - 4
+
+    # ------------------------------------------------------------- traversal
+
+    @staticmethod
+    def _current_strategy(node: _Node) -> np.ndarray:
+        positive = np.maximum(node.regrets, 0.0)
+        total = positive.sum(axis=0)
+        uniform = 1.0 / positive.shape[0]
+        return np.where(total > 0, positive / np.where(total > 0, total, 1.0), uniform)
+
+    @staticmethod
+    def _average_strategy(node: _Node) -> np.ndarray:
+        total = node.strategy_sum.sum(axis=0)
+        uniform = 1.0 / node.strategy_sum.shape[0]
+        return np.where(total > 0, node.strategy_sum / np.where(total > 0, total, 1.0), uniform)
+
+    def _cfr(self, node: _Node, p: int, reach_p: np.ndarray, reach_opp: np.ndarray) -> np.ndarray:
+        """Update p's regrets below node; returns p's counterfactual values."""
+        if node.kind in TERMINALS:
+            return self._terminal(node, p, reach_opp)
+
+        if node.kind == "chance":
+            mask_p, mask_o = self._deal_masks[p], self._deal_masks[1 - p]
+            values = self._cfr(node.children[0], p, reach_p * mask_p, reach_opp * mask_o)
+            return (mask_p * values).sum(axis=0, keepdims=True) / self._outcomes(node)
+
+        strategy = node.strategy
+        if node.player == p:
+            shared = {}
+            child_values = np.array([
+                self._terminal(child, p, reach_opp, shared) if child.kind in TERMINALS
+                else self._cfr(child, p, reach_p * strategy[a], reach_opp)
+                for a, child in enumerate(node.children)
+            ])
+            value = (strategy * child_values).sum(axis=0)
+            self._update(node, child_values - value, reach_p * strategy)
+            return value
+
+        return sum(self._cfr(child, p, reach_p, reach_opp * strategy[a]) for a, child in enumerate(node.children))
+
+    def _evaluate(self, node: _Node, p: int, reach_opp: np.ndarray, best: bool) -> np.ndarray:
+        """
+        Values of p's hands against the opponent's average strategy, with p
+        playing a best response (``best``) or its own average strategy.
+        """
+        if node.kind in TERMINALS:
+            return self._terminal(node, p, reach_opp)
+
+        if node.kind == "chance":
+            mask_p, mask_o = self._deal_masks[p], self._deal_masks[1 - p]
+            values = self._evaluate(node.children[0], p, reach_opp * mask_o, best)
+            return (mask_p * values).sum(axis=0, keepdims=True) / self._outcomes(node)
+
+        if node.player == p:
+            shared = {}
+            child_values = np.array([
+                self._terminal(child, p, reach_opp, shared) if child.kind in TERMINALS
+                else self._evaluate(child, p, reach_opp, best)
+                for child in node.children
+            ])
+            if best:
+                return child_values.max(axis=0)
+            return (self._average_strategy(node) * child_values).sum(axis=0)
+
+        strategy = self._average_strategy(node)
+        return sum(self._evaluate(child, p, reach_opp * strategy[a], best) for a, child in enumerate(node.children))
+
+    # ----------------------------------------------------------------- solve
+
+    def _update(self, node: _Node, regrets: np.ndarray, strategy: np.ndarray):
+        """Accumulate one iteration's instantaneous regrets and reach-weighted strategy."""
+        if self._seed is not None:
+            regret_weight, average_weight = self._seed
+            # Positive regrets in proportion to the warm strategy, at the
+            # magnitude of its counterfactual regrets, so regret matching
+            # resumes from it
+            scale = 0.5 * np.abs(regrets).sum(axis=0)
+            node.regrets = regret_weight * node.strategy * np.maximum(scale, 1e-9)
+            node.strategy_sum = average_weight * strategy
+            return
+        if self.algorithm == "cfr+":
+            np.maximum(node.regrets + regrets, 0.0, out=node.regrets)
+            node.strategy_sum += self.iterations * strategy
+        else:
+            positive, negative, average = self._discounts
+            node.regrets *= np.where(node.regrets > 0, positive, negative)
+            node.regrets += regrets
+            node.strategy_sum *= average
+            node.strategy_sum += strategy
+        node.strategy = self._current_strategy(node)
+
+    def iterate(self, iterations: int = 1):
+        """Run iterations with alternating updates (OOP, then IP)."""
+        alpha, beta, gamma = DCFR_PARAMS
+        for _ in range(iterations):
+            # DCFR discounts the totals accumulated through the previous iteration
+            prev = float(self.iterations)
+            self.iterations += 1
+            self._discounts = (prev ** alpha / (prev ** alpha + 1), prev ** beta / (prev ** beta + 1),
+                               (prev / self.iterations) ** gamma)
+            for p in (OOP, IP):
+                self._cfr(self._top, p, self.hands[p].weights[None, :], self.hands[1 - p].weights[None, :])
+
+    def exploitability(self) -> float:
+        """Average strategy's exploitability in chips per matchup."""
+        br = []
+        for p in (OOP, IP):
+            values = self._evaluate(self._top, p, self.hands[1 - p].weights[None, :], best=True)
+            br.append(float(self.hands[p].weights @ values[0]))
+        matchups = float(self.hands[OOP].weights @ self._compatible(OOP, self.hands[IP].weights[None, :])[0])
+        return max(0.0, (br[0] + br[1]) / matchups - self.pot) / 2.0
+
+    def solve(self, target_exploitability_pct: float = DEFAULT_TARGET_EXPLOITABILITY_PCT,
+              time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+              max_iterations: int = DEFAULT_MAX_ITERATIONS,
+              check_every: int = DEFAULT_CHECK_EVERY) -> "SubgameSolution":
+        """
+        Iterate until exploitability drops below the target (% of pot), the
+        time budget is spent or max_iterations is reached.
+
+        Blocks between checks are shortened so the iterations and the check
+        that ends them fit in what is left of the budget, sized from the
+        measured cost of an iteration and of a check (the first iteration is
+        timed on its own).  At least one iteration and one check always run.
+        Every check is appended to ``convergence``.
+        """
+        start = time.perf_counter()
+        exploitability = float("inf")
+        iteration_ms = check_ms = None
+        while self.iterations < max_iterations:
+            block = min(check_every, max_iterations - self.iterations)
+            if iteration_ms is None:
+                # Time the first iteration alone to size the blocks after it
+                self.iterate(1)
+                iteration_ms = (time.perf_counter() - start) * 1000
+                block -= 1
+            # Until one is measured, a check is taken to cost about one iteration
+            remaining = time_budget_ms - (time.perf_counter() - start) * 1000 - (check_ms or iteration_ms)
+            block = min(block, int(remaining // max(iteration_ms, 1e-3)))
+            if block < 1 and check_ms is not None:
+                break
+            if block > 0:
+                block_start = time.perf_counter()
+                self.iterate(block)
+                iteration_ms = (time.perf_counter() - block_start) * 1000 / block
+
+            check_start = time.perf_counter()
+            exploitability = self.exploitability()
+            check_ms = (time.perf_counter() - check_start) * 1000
+            elapsed = (time.perf_counter() - start) * 1000
+            self.convergence.append({
+                "iteration": self.iterations,
+                "exploitability_pct": 100.0 * exploitability / self.pot,
+                "elapsed_ms": self.elapsed_ms + elapsed,
+            })
+            if 100.0 * exploitability / self.pot <= target_exploitability_pct or elapsed >= time_budget_ms:
+                break
+        self.elapsed_ms += (time.perf_counter() - start) * 1000
+        logger.debug(f"{self.algorithm.upper()} subgame: {self.iterations} iterations, "
+                     f"{100 * exploitability / self.pot:.2f}% pot exploitable, {self.elapsed_ms:.0f}ms")
+        return SubgameSolution(self, exploitability)
+
+    # ----------------------------------------------------------------- query
+
+    def node_at(self, history: Sequence[str] = ()) -> Tuple[_Node, int]:
+        """
+        Node reached by a sequence of action labels, and its row.
+
+        At a chance node the next step is the river card, e.g. '7c'.
+        """
+        node, row = self.root, 0
+        for step in history:
+            if node.kind == "chance":
+                code = table_evaluator.card_to_code(step)
+                if code not in node.cards:
+                    raise KeyError(f"{step!r} cannot be dealt here")
+                node, row = node.children[0], node.cards.index(code)
+            elif step in node.actions:
+                node = node.children[node.actions.index(step)]
+            else:
+                raise KeyError(f"no action {step!r} in the tree")
+        return node, row
+
+    def closest_action(self, history: Sequence[str], amount: float) -> str:
+        """Label of the bet or raise at a node whose added chips are closest to ``amount``."""
+        node, _ = self.node_at(history)
+        sizes = {label: child.bets[node.player] - node.bets[node.player]
+                 for label, child in zip(node.actions, node.children) if label not in ("check", "call", "fold")}
+        if not sizes:
+            raise KeyError("no bet or raise available at this node")
+        return min(sizes, key=lambda label: abs(sizes[label] - amount))
+
+    def expected_values(self, p: int) -> np.ndarray:
+        """Chips each of p's hands wins from the start of the subgame when both play the average strategy."""
+        reach = self.hands[1 - p].weights[None, :]
+        compat = self._compatible(p, reach)[0]
+        values = self._evaluate(self._top, p, reach, best=False)[0]
+        return values / np.where(compat > 0, compat, 1.0)
+
+    def equities(self, p: int) -> np.ndarray:
+        """Showdown equity of each of p's hands against the opponent's full range (averaged over rivers on the turn)."""
+        if len(self.board) == 5:
+            boards, masks = (self.board,), [np.ones((1, len(h.combos))) for h in self.hands]
+        else:
+            boards, masks = tuple(self.board + (card,) for card in self._deal_cards), self._deal_masks
+        node = _Node("showdown", (0.0, 0.0), boards)
+        reach = self.hands[1 - p].weights[None, :] * masks[1 - p]
+        compat = (masks[p] * self._compatible(p, reach)).sum(axis=0)
+        # With no bets in, showdown value is pot * (win + tie / 2)
+        values = (masks[p] * self._terminal(node, p, reach)).sum(axis=0)
+        return values / self.pot / np.where(compat > 0, compat, 1.0)
+
+
+@dataclass
+class SubgameSolution:
+    """Average strategy of a solved subgame and its convergence stats."""
+    solver: SubgameSolver
+    exploitability: float
+    iterations: int = field(init=False)
+    elapsed_ms: float = field(init=False)
+    convergence: List[Dict[str, float]] = field(init=False)
+
+    def __post_init__(self):
+        self.iterations = self.solver.iterations
+        self.elapsed_ms = self.solver.elapsed_ms
+        self.convergence = list(self.solver.convergence)
+
+    @property
+    def exploitability_pct(self) -> float:
+        """Exploitability as a percentage of the starting pot."""
+        return 100.0 * self.exploitability / self.solver.pot
+
+    def _decision(self, history: Sequence[str]) -> Tuple[_Node, int, np.ndarray]:
+        """Action node, row and average strategy (actions x hands) at a history."""
+        node, row = self.solver.node_at(history)
+        if node.kind != "action":
+            raise KeyError("history does not end at a decision")
+        return node, row, SubgameSolver._average_strategy(node)[:, row]
+
+    def strategy(self, history: Sequence[str] = ()) -> Dict[str, np.ndarray]:
+        """Per-combo action frequencies at a node, as 1,326-length vectors keyed by action."""
+        node, row, average = self._decision(history)
+        hands = self.solver.hands[node.player]
+        board = set(node.boards[row])
+        live = np.array([a not in board and b not in board for a, b in hands.combos])
+        index = np.array([hand_combos.combo_index(int(a), int(b)) for a, b in hands.combos[live]])
+        result = {}
+        for label, freqs in zip(node.actions, average):
+            full = np.zeros(hand_combos.NUM_COMBOS)
+            full[index] = freqs[live]
+            result[label] = full
+        return result
+
+    def hand_strategy(self, cards: Sequence[str], history: Sequence[str] = ()) -> Dict[str, float]:
+        """Action frequencies for one hand at a node (empty if the hand is not in range)."""
+        node, row, average = self._decision(history)
+        codes = table_evaluator.cards_to_codes(cards)
+        i = self.solver.hands[node.player].index.get((min(codes), max(codes)), -1) if len(codes) == 2 else -1
+        if i < 0 or set(codes) & set(node.boards[row]):
+            return {}
+        return {label: float(freq) for label, freq in zip(node.actions, average[:, i])}
+
+    def range_frequencies(self, history: Sequence[str] = ()) -> Dict[str, float]:
+        """Action frequencies at a node, weighted by the acting player's starting range."""
+        node, row, average = self._decision(history)
+        hands = self.solver.hands[node.player]
+        weights = hands.weights * (hands.onehot[list(node.boards[row])].sum(axis=0) == 0)
+        mix = average @ weights / weights.sum()
+        return {label: float(freq) for label, freq in zip(node.actions, mix)}
+
+    def _reach(self, history: Sequence[str]) -> Tuple[_Node, int, List[np.ndarray]]:
+        """Node, row and each player's range weight times average-strategy reach at a history."""
+        solver = self.solver
+        reach = [hands.weights.copy() for hands in solver.hands]
+        node, row = solver.root, 0
+        for step in history:
+            if node.kind == "chance":
+                code = table_evaluator.card_to_code(step)
+                if code not in node.cards:
+                    raise KeyError(f"{step!r} cannot be dealt here")
+                reach = [r * (1.0 - hands.onehot[code]) for r, hands in zip(reach, solver.hands)]
+                node, row = node.children[0], node.cards.index(code)
+            elif step in node.actions:
+                a = node.actions.index(step)
+                reach[node.player] = reach[node.player] * SubgameSolver._average_strategy(node)[a, row]
+                node = node.children[a]
+            else:
+                raise KeyError(f"no action {step!r} in the tree")
+        return node, row, reach
+
+    def reach_ranges(self, history: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Both players' ranges (1,326 weights) after following a history on the average strategy."""
+        _, _, reach = self._reach(history)
+        ranges = []
+        for p, weights in enumerate(reach):
+            full = np.zeros(hand_combos.NUM_COMBOS)
+            full[self.solver._full_index(p)] = weights
+            ranges.append(full)
+        return ranges[0], ranges[1]
+
+    def counterfactual_values(self, p: int, history: Sequence[str]) -> np.ndarray:
+        """
+        Value of each of p's hands at a history when both play the average
+        strategy, in chips per unblocked opponent combo (1,326 vector).
+        """
+        solver = self.solver
+        node, row, reach = self._reach(history)
+        reach_opp = np.zeros((len(node.boards), len(solver.hands[1 - p].combos)))
+        reach_opp[row] = reach[1 - p]
+        compat = solver._compatible(p, reach_opp)[row]
+        values = solver._evaluate(node, p, reach_opp, best=False)[row]
+        live = solver.hands[p].onehot[list(node.boards[row])].sum(axis=0) == 0
+        full = np.zeros(hand_combos.NUM_COMBOS)
+        full[solver._full_index(p)] = np.where(live & (compat > 0), values / np.where(compat > 0, compat, 1.0), 0.0)
+        return full
+
+
+def range_vector(range_spec, dead_cards: Sequence[str] = ()) -> np.ndarray:
+    """1,326 combo weights for a range given as notation (list, dict or 'AA,AKs:0.5')."""
+    dead = table_evaluator.cards_to_codes(dead_cards)
+    combos, weights = hand_combos.range_to_combos(range_spec, dead)
+    vector = np.zeros(hand_combos.NUM_COMBOS)
+    for (a, b), w in zip(combos, weights):
+        vector[hand_combos.combo_index(int(a), int(b))] = w
+    return vector
+
+
+def solve_subgame(board: Sequence[str], pot: float, stack: float,
+                  oop_range, ip_range, tree: TreeConfig = TreeConfig(),
+                  algorithm: str = "dcfr", **solve_kwargs) -> SubgameSolution:
+    """
+    Build and solve a heads-up turn/river subgame.
+
+    Ranges may be 1,326 weight vectors or range notation.
+    """
+    ranges = [r if isinstance(r, np.ndarray) else range_vector(r, board) for r in (oop_range, ip_range)]
+    return SubgameSolver(board, pot, stack, ranges[0], ranges[1], tree, algorithm).solve(**solve_kwargs)
@@ -0,0 +1,358 @@
+"""Hand-vs-range and range-vs-range equity on top of the lookup-table evaluator.
+
+Turn and river spots are enumerated exactly (every runout, every live
+villain combo) unless the time budget runs out first, in which case the
+runouts visited so far (in seeded random order) stand as a sample.  Flop
+and preflop spots use seeded Monte Carlo that stops once the standard
+error drops under a tolerance, the sample cap is reached or the time
+budget runs out.  Card removal is applied everywhere: combos that
+touch the board, the hero's cards or each other are never dealt together.
+
+The ``iter_*`` functions yield an ``EquityResult`` after every batch so a
+caller can stop early and keep the best estimate so far.
+"""
+
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core import hand_combos, table_evaluator
+
+logger = logging.getLogger(__name__)
+
+RangeSpec = Union[str, Sequence[str], Mapping[str, float]]
+
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_MAX_SAMPLES = 200000
+
+
+@dataclass
+class EquityResult:
+    """Equity estimate for the hero side (ties count as split pots)."""
+    equity: float
+    win: float
+    tie: float
+    samples: int
+    std_error: float
+    exact: bool
+    elapsed_ms: float
+
+
+@dataclass
+class Tally:
+    """Running Monte Carlo totals; tallies from separate batches add up."""
+    samples: int = 0
+    share: float = 0.0
+    share_sq: float = 0.0
+    win: float = 0.0
+    tie: float = 0.0
+
+    def add(self, other: "Tally") -> None:
+        """Fold another tally into this one."""
+        self.samples += other.samples
+        self.share += other.share
+        self.share_sq += other.share_sq
+        self.win += other.win
+        self.tie += other.tie
+
+    def result(self, start: float) -> EquityResult:
+        """Monte Carlo EquityResult with the standard error of the mean share."""
+        if self.samples < 2:
+            return _result(self.share, self.win, self.tie, self.samples, self.samples, 1.0, False, start)
+        mean = self.share / self.samples
+        variance = max(0.0, self.share_sq / self.samples - mean * mean)
+        std_error = float(np.sqrt(variance / self.samples))
+        return _result(self.share, self.win, self.tie, self.samples, self.samples, std_error, False, start)
+
+
+def hand_vs_range(hero_cards: Sequence[str], villain_range: RangeSpec,
+                  board: Sequence[str] = (), **kwargs) -> EquityResult:
+    """Equity of a concrete hand against a (weighted) range; see iter_range_vs_range."""
+    return _last(iter_hand_vs_range(hero_cards, villain_range, board, **kwargs))
+
+
+def range_vs_range(hero_range: RangeSpec, villain_range: RangeSpec,
+                   board: Sequence[str] = (), **kwargs) -> EquityResult:
+    """Equity of one (weighted) range against another; see iter_range_vs_range."""
+    return _last(iter_range_vs_range(hero_range, villain_range, board, **kwargs))
+
+
+def hand_vs_random(hero_cards: Sequence[str], board: Sequence[str] = (),
+                   num_opponents: int = 1, **kwargs) -> EquityResult:
+    """Equity of a concrete hand against ``num_opponents`` random hands."""
+    hero = table_evaluator.cards_to_codes(hero_cards)
+    board_codes = table_evaluator.cards_to_codes(board)
+    villain = hand_combos.live_combos(hero + board_codes)
+    weights = np.ones(len(villain))
+    return _last(_iter_equity(
+        hero_combo(hero, board_codes), np.ones(1), villain, weights, board_codes,
+        num_opponents=num_opponents, **kwargs
+    ))
+
+
+def iter_hand_vs_range(hero_cards: Sequence[str], villain_range: RangeSpec,
+                       board: Sequence[str] = (), **kwargs) -> Iterator[EquityResult]:
+    """Stream equity estimates of a concrete hand against a range."""
+    hero = table_evaluator.cards_to_codes(hero_cards)
+    board_codes = table_evaluator.cards_to_codes(board)
+    villain, weights = hand_combos.range_to_combos(villain_range, hero + board_codes)
+    return _iter_equity(hero_combo(hero, board_codes), np.ones(1), villain, weights, board_codes, **kwargs)
+
+
+def iter_range_vs_range(hero_range: RangeSpec, villain_range: RangeSpec,
+                        board: Sequence[str] = (), **kwargs) -> Iterator[EquityResult]:
+    """
+    Stream equity estimates of hero_range against villain_range.
+
+    Keyword Args:
+        seed: RNG seed for Monte Carlo (same seed, same answer)
+        tolerance: Stop once the standard error is below this
+        time_budget_ms: Stop after this much wall time (None = no limit)
+        max_samples: Hard cap on Monte Carlo deals
+        batch_size: Deals per yielded update
+        exact: Force (True) or forbid (False) enumeration; default is
+            enumeration on turn and river only (cut short by time_budget_ms)
+    """
+    board_codes = table_evaluator.cards_to_codes(board)
+    hero, hero_weights = hand_combos.range_to_combos(hero_range, board_codes)
+    villain, villain_weights = hand_combos.range_to_combos(villain_range, board_codes)
+    return _iter_equity(hero, hero_weights, villain, villain_weights, board_codes, **kwargs)
+
+
+def _iter_equity(hero: np.ndarray, hero_weights: np.ndarray,
+                 villain: np.ndarray, villain_weights: np.ndarray,
+                 board: List[int], num_opponents: int = 1,
+                 seed: Optional[int] = 0, tolerance: float = DEFAULT_TOLERANCE,
+                 time_budget_ms: Optional[float] = None,
+                 max_samples: int = DEFAULT_MAX_SAMPLES,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 exact: Optional[bool] = None) -> Iterator[EquityResult]:
+    """Dispatch to enumeration or Monte Carlo and stream the results."""
+    if len(board) > 5:
+        raise ValueError(f"board can hold at most 5 cards, got {len(board)}")
+    if num_opponents < 1:
+        raise ValueError(f"num_opponents must be at least 1, got {num_opponents}")
+    if len(hero) == 0 or len(villain) == 0:
+        logger.debug("Equity requested with an empty (fully blocked) range")
+        yield EquityResult(0.5, 0.0, 0.0, 0, 0.0, True, 0.0)
+        return
+
+    if exact is None:
+        exact = len(board) >= 4 and num_opponents == 1
+    if exact:
+        if num_opponents != 1:
+            raise ValueError("exact enumeration is only supported heads-up")
+        yield from _enumerate(hero, hero_weights, villain, villain_weights, board,
+                              np.random.default_rng(seed), time_budget_ms)
+    else:
+        yield from _monte_carlo(
+            hero, hero_weights, villain, villain_weights, board, num_opponents,
+            np.random.default_rng(seed), tolerance, time_budget_ms, max_samples, batch_size
+        )
+
+
+def _enumerate(hero: np.ndarray, hero_weights: np.ndarray,
+               villain: np.ndarray, villain_weights: np.ndarray,
+               board: List[int], rng: Optional[np.random.Generator] = None,
+               time_budget_ms: Optional[float] = None) -> Iterator[EquityResult]:
+    """
+    Exact equity over every runout; yields once per completed runout batch.
+
+    With a time budget the runouts are visited in random order and the
+    clock is checked after each one; when it runs out the runouts done so
+    far are a uniform sample and the result carries its standard error
+    (exact=False).
+    """
+    start = time.perf_counter()
+    hero_masks = _combo_masks(hero)
+    villain_masks = _combo_masks(villain)
+    # Weight of every (hero, villain) pairing that shares no card
+    pair_weights = np.outer(hero_weights, villain_weights)
+    pair_weights *= (hero_masks[:, None] & villain_masks[None, :]) == 0
+
+    remaining = 5 - len(board)
+    deck = [c for c in range(52) if c not in board]
+    runouts = list(itertools.combinations(deck, remaining))
+    if time_budget_ms is not None:
+        rng = rng or np.random.default_rng()
+        runouts = [runouts[i] for i in rng.permutation(len(runouts))]
+
+    # Per-runout (pot share, weight) for the sampling error of a cut-off run
+    shares, totals = np.zeros(len(runouts)), np.zeros(len(runouts))
+    win = tie = total = 0.0
+    for done, runout in enumerate(runouts, 1):
+        full_board = board + list(runout)
+        hero_strength = table_evaluator.evaluate_batch(hero, full_board)
+        villain_strength = table_evaluator.evaluate_batch(villain, full_board)
+
+        # Combos that hold a runout card come back as -1 and get no weight
+        live = pair_weights * ((hero_strength >= 0)[:, None] & (villain_strength >= 0)[None, :])
+        diff = hero_strength[:, None] - villain_strength[None, :]
+        runout_win = float(live[diff > 0].sum())
+        runout_tie = float(live[diff == 0].sum())
+        shares[done - 1] = runout_win + runout_tie / 2
+        totals[done - 1] = float(live.sum())
+        win += runout_win
+        tie += runout_tie
+        total += totals[done - 1]
+
+        if done == len(runouts):
+            yield _result(win + tie / 2, win, tie, total, done, 0.0, True, start)
+        elif time_budget_ms is not None and (time.perf_counter() - start) * 1000 >= time_budget_ms:
+            std_error = _runout_std_error(shares[:done], totals[:done], len(runouts))
+            yield _result(win + tie / 2, win, tie, total, done, std_error, False, start)
+            return
+        elif done % 8 == 0:
+            yield _result(win + tie / 2, win, tie, total, done, 0.0, False, start)
+
+
+def _runout_std_error(shares: np.ndarray, totals: np.ndarray, population: int) -> float:
+    """Standard error of sum(shares) / sum(totals) over a sample of runouts drawn without replacement."""
+    n = len(shares)
+    if n < 2 or totals.sum() <= 0:
+        return 1.0
+    ratio = shares.sum() / totals.sum()
+    residual_var = np.square(shares - ratio * totals).sum() / (n - 1)
+    finite_population = 1.0 - n / population
+    return float(np.sqrt(residual_var / n * finite_population) / totals.mean())
+
+
+def _monte_carlo(hero: np.ndarray, hero_weights: np.ndarray,
+                 villain: np.ndarray, villain_weights: np.ndarray,
+                 board: List[int], num_opponents: int, rng: np.random.Generator,
+                 tolerance: float, time_budget_ms: Optional[float],
+                 max_samples: int, batch_size: int) -> Iterator[EquityResult]:
+    """Sample complete deals in batches until the tolerance, cap or budget is hit."""
+    start = time.perf_counter()
+    hero_p = hero_weights / hero_weights.sum()
+    villain_p = villain_weights / villain_weights.sum()
+
+    tally = Tally()
+    while tally.samples < max_samples:
+        batch = simulate_deals(hero, hero_p, villain, villain_p, board, num_opponents, rng, batch_size)
+        if batch.samples == 0:
+            break
+        tally.add(batch)
+        result = tally.result(start)
+        yield result
+
+        converged = tally.samples >= 2 * batch_size and result.std_error <= tolerance
+        if converged or (time_budget_ms is not None and result.elapsed_ms >= time_budget_ms):
+            return
+
+
+def simulate_deals(hero: np.ndarray, hero_p: np.ndarray,
+                   villain: np.ndarray, villain_p: np.ndarray,
+                   board: Sequence[int], num_opponents: int,
+                   rng: np.random.Generator, count: int) -> Tally:
+    """
+    Deal and showdown ``count`` random runouts in one vectorized pass.
+
+    Hero and villain combos are drawn with probabilities hero_p / villain_p
+    (summing to 1); each of the num_opponents villains draws independently.
+    """
+    board = [int(c) for c in board]
+    deck = np.array([c for c in range(52) if c not in board], dtype=np.int64)
+    hands, runouts = _deal(hero, hero_p, villain, villain_p, num_opponents,
+                           deck, 5 - len(board), count, rng)
+    if len(hands) == 0:
+        return Tally()
+
+    board_rows = np.broadcast_to(np.asarray(board, dtype=np.int64), (len(hands), len(board)))
+    full_board = np.concatenate([board_rows, runouts], axis=1)
+    strengths = np.stack([
+        table_evaluator.evaluate_array(np.concatenate([hands[:, i], full_board], axis=1))
+        for i in range(num_opponents + 1)
+    ], axis=1)
+
+    best_villain = strengths[:, 1:].max(axis=1)
+    hero_strength = strengths[:, 0]
+    tied = (strengths[:, 1:] == best_villain[:, None]).sum(axis=1) + 1
+    wins = hero_strength > best_villain
+    ties = hero_strength == best_villain
+    share = np.where(wins, 1.0, np.where(ties, 1.0 / tied, 0.0))
+    return Tally(
+        samples=len(share),
+        share=float(share.sum()),
+        share_sq=float(np.square(share).sum()),
+        win=float(wins.sum()),
+        tie=float(ties.sum()),
+    )
+
+
+def _deal(hero: np.ndarray, hero_p: np.ndarray, villain: np.ndarray, villain_p: np.ndarray,
+          num_opponents: int, deck: np.ndarray, remaining: int, count: int,
+          rng: np.random.Generator, max_rounds: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deal ``count`` conflict-free (hands, runout) samples by rejection.
+
+    Returns ``[n, players, 2]`` hole cards (hero first) and ``[n, remaining]``
+    runout cards; n may fall short of count when the ranges nearly block
+    each other out.
+    """
+    kept_hands, kept_runouts, have = [], [], 0
+    for _ in range(max_rounds):
+        need = count - have
+        draw = max(need + need // 2, 16)
+        hands = np.stack(
+            [hero[rng.choice(len(hero), draw, p=hero_p)]]
+            + [villain[rng.choice(len(villain), draw, p=villain_p)] for _ in range(num_opponents)],
+            axis=1,
+        )
+        runouts = deck[rng.integers(0, len(deck), size=(draw, remaining))]
+        cards = np.concatenate([hands.reshape(draw, -1), runouts], axis=1)
+
+        # A deal is valid when all of its cards are distinct
+        ordered = np.sort(cards, axis=1)
+        valid = (ordered[:, 1:] != ordered[:, :-1]).all(axis=1)
+        kept_hands.append(hands[valid][:need])
+        kept_runouts.append(runouts[valid][:need])
+        have += len(kept_hands[-1])
+        if have >= count:
+            break
+
+    return np.concatenate(kept_hands), np.concatenate(kept_runouts)
+
+
+def _result(share: float, win: float, tie: float, total: float, samples: int,
+            std_error: float, exact: bool, start: float) -> EquityResult:
+    """Build an EquityResult from accumulated pot share and win/tie weight."""
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if total <= 0:
+        return EquityResult(0.5, 0.0, 0.0, samples, std_error, exact, elapsed_ms)
+    return EquityResult(
+        equity=share / total,
+        win=win / total,
+        tie=tie / total,
+        samples=samples,
+        std_error=std_error,
+        exact=exact,
+        elapsed_ms=elapsed_ms,
+    )
+
+
+def _last(results: Iterator[EquityResult]) -> EquityResult:
+    """Drain a result stream and return the final estimate."""
+    result = None
+    for result in results:
+        pass
+    return result
+
+
+def _combo_masks(combos: np.ndarray) -> np.ndarray:
+    """52-bit card mask of each combo."""
+    return np.left_shift(np.int64(1), combos[:, 0]) | np.left_shift(np.int64(1), combos[:, 1])
+
+
+def hero_combo(codes: List[int], board: List[int]) -> np.ndarray:
+    """Hero hole-card codes as a one-row combo array (ValueError if invalid)."""
+    if len(codes) != 2 or codes[0] == codes[1]:
+        raise ValueError(f"expected two distinct valid hole cards, got {codes}")
+    if set(codes) & set(board):
+        raise ValueError("hero hole cards overlap the board")
+    return np.array([codes], dtype=np.int64)
@@ -0,0 +1,139 @@
+"""Hole-card combo enumeration and range-notation expansion.
+
+All 1,326 two-card combos are indexed in a fixed order so ranges can be
+handled as ``[N, 2]`` code arrays (see ``table_evaluator.evaluate_batch``).
+"""
+
+import itertools
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core.table_evaluator import RANK_CHARS, card_to_code
+
+# Every combo as (low code, high code), ordered by the pair of codes
+ALL_COMBOS = np.array(list(itertools.combinations(range(52), 2)), dtype=np.int16)
+NUM_COMBOS = len(ALL_COMBOS)
+
+COMBO_INDEX: Dict[Tuple[int, int], int] = {
+    (int(a), int(b)): i for i, (a, b) in enumerate(ALL_COMBOS)
+}
+
+
+def combo_index(code1: int, code2: int) -> int:
+    """Index of a two-card combo in ALL_COMBOS (order of the codes is ignored)."""
+    return COMBO_INDEX[(code1, code2) if code1 < code2 else (code2, code1)]
+
+
+def expand_notation(hand: str) -> List[Tuple[int, int]]:
+    """
+    Expand range notation into concrete combos.
+
+    Supports pairs ('AA'), suited ('AKs'), offsuit ('AKo'), any-suit ('AK')
+    and explicit cards ('AhKd').  Unknown notation expands to an empty list.
+    """
+    hand = hand.strip().lower()
+    if len(hand) == 4:
+        c1, c2 = card_to_code(hand[:2]), card_to_code(hand[2:])
+        if c1 < 0 or c2 < 0 or c1 == c2:
+            return []
+        return [(min(c1, c2), max(c1, c2))]
+
+    if len(hand) not in (2, 3):
+        return []
+    r1, r2 = RANK_CHARS.find(hand[0]), RANK_CHARS.find(hand[1])
+    if r1 < 0 or r2 < 0:
+        return []
+    suitedness = hand[2] if len(hand) == 3 else ""
+    if suitedness not in ("", "s", "o"):
+        return []
+
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            c1, c2 = r1 * 4 + s1, r2 * 4 + s2
+            if r1 == r2 and s1 >= s2:
+                continue
+            if suitedness == "s" and s1 != s2:
+                continue
+            if suitedness == "o" and s1 == s2:
+                continue
+            combos.append((min(c1, c2), max(c1, c2)))
+    return combos
+
+
+def notation_combos(range_hands: Sequence[str],
+                    dead_cards: Iterable[int] = ()) -> Tuple[List[str], np.ndarray]:
+    """
+    Pick one representative combo per notation that avoids the dead cards.
+
+    Returns the notations that still have a live combo and an ``[N, 2]``
+    array of their representative codes, in the same order.
+    """
+    dead = set(dead_cards)
+    kept: List[str] = []
+    codes: List[Tuple[int, int]] = []
+    for hand in range_hands:
+        live = _first_live_combo(expand_notation(hand), dead)
+        if live is not None:
+            kept.append(hand)
+            codes.append(live)
+    return kept, np.array(codes, dtype=np.int64).reshape(-1, 2)
+
+
+def _first_live_combo(combos: List[Tuple[int, int]], dead: set) -> Optional[Tuple[int, int]]:
+    """First combo (hearts-first suit order) with no dead card."""
+    for c1, c2 in combos:
+        if c1 not in dead and c2 not in dead:
+            return (c1, c2)
+    return None
+
+
+def parse_range(range_spec: Union[str, Sequence[str], Mapping[str, float]]) -> Dict[str, float]:
+    """
+    Normalize a range into ``{notation: weight}``.
+
+    Accepts a mapping, a list of notations (weight 1.0 each) or a
+    comma-separated string; entries may carry a weight as ``'AKs:0.5'``.
+    """
+    if isinstance(range_spec, Mapping):
+        return {hand: float(weight) for hand, weight in range_spec.items()}
+    if isinstance(range_spec, str):
+        range_spec = range_spec.split(",")
+
+    weights: Dict[str, float] = {}
+    for entry in range_spec:
+        hand, _, weight = entry.strip().partition(":")
+        if hand:
+            weights[hand] = float(weight) if weight else 1.0
+    return weights
+
+
+def range_to_combos(range_spec: Union[str, Sequence[str], Mapping[str, float]],
+                    dead_cards: Iterable[int] = ()) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expand a (weighted) range into every live combo.
+
+    Card removal is applied here: combos touching a dead card are dropped.
+    A combo listed under several notations keeps the last weight given.
+
+    Returns:
+        ``([N, 2] combo codes, [N] weights)`` with zero-weight combos removed
+    """
+    weights = np.zeros(NUM_COMBOS, dtype=np.float64)
+    for hand, weight in parse_range(range_spec).items():
+        for combo in expand_notation(hand):
+            weights[COMBO_INDEX[combo]] = weight
+
+    dead = np.zeros(52, dtype=bool)
+    dead[list(set(dead_cards))] = True
+    live = (weights > 0) & ~dead[ALL_COMBOS[:, 0]] & ~dead[ALL_COMBOS[:, 1]]
+    return ALL_COMBOS[live].astype(np.int64), weights[live]
+
+
+def live_combos(dead_cards: Iterable[int] = ()) -> np.ndarray:
+    """Every combo that avoids the dead cards (a uniformly random hand)."""
+    dead = np.zeros(52, dtype=bool)
+    dead[list(set(dead_cards))] = True
+    live = ~dead[ALL_COMBOS[:, 0]] & ~dead[ALL_COMBOS[:, 1]]
+    return ALL_COMBOS[live].astype(np.int64)
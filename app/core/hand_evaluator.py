@@ -2,7 +2,14 @@
 
 import itertools
 from typing import List, Tuple, Dict
-from collections import Counter
+
+import numpy as np
+
+from app.core import equity_engine, preflop_tables, table_evaluator
+
+# Equity accuracy/latency trade-off for decision-time estimates
+EQUITY_TOLERANCE = 0.01
+EQUITY_TIME_BUDGET_MS = 15.0
 
 class HandEvaluator:
     """Evaluates poker hands and calculates equity."""
@@ -31,17 +38,8 @@ class HandEvaluator:
     
     def card_to_int(self, card_str: str) -> int:
         """Convert card string like 'ah' to integer representation."""
-        if len(card_str) != 2:
-            return 0
-        rank_char = card_str[0].lower()
-        suit_char = card_str[1].lower()
-        
-        try:
-            rank = self.RANKS.index(rank_char)
-            suit = self.SUITS.index(suit_char)
-            return rank * 4 + suit
-        except ValueError:
-            return 0
+        code = table_evaluator.card_to_code(card_str)
+        return code if code >= 0 else 0
     
     def int_to_card(self, card_int: int) -> str:
         """Convert integer back to card string."""
@@ -63,88 +61,26 @@ class HandEvaluator:
         """
         if len(cards) < 5:
             return (0, [])
-            
-        # Convert to integers and get ranks/suits
-        card_ints = [self.card_to_int(c) for c in cards if c]
-        ranks = [c // 4 for c in card_ints]
-        suits = [c % 4 for c in card_ints]
-        
-        # Count ranks
-        rank_counts = Counter(ranks)
-        sorted_ranks = sorted(rank_counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
-        
-        # Check for flush
-        suit_counts = Counter(suits)
-        is_flush = max(suit_counts.values()) >= 5
-        
-        # Check for straight
-        unique_ranks = sorted(set(ranks), reverse=True)
-        is_straight, straight_high = self._check_straight(unique_ranks)
-        
-        # Determine hand type
-        if is_straight and is_flush:
-            if straight_high == 12:  # Ace high straight flush
-                return (self.HAND_RANKINGS['royal_flush'], [12])
-            else:
-                return (self.HAND_RANKINGS['straight_flush'], [straight_high])
-        
-        # Four of a kind
-        if sorted_ranks[0][1] == 4:
-            return (self.HAND_RANKINGS['four_of_a_kind'], 
-                   [sorted_ranks[0][0], sorted_ranks[1][0]])
-        
-        # Full house
-        if sorted_ranks[0][1] == 3 and sorted_ranks[1][1] >= 2:
-            return (self.HAND_RANKINGS['full_house'], 
-                   [sorted_ranks[0][0], sorted_ranks[1][0]])
-        
-        # Flush
-        if is_flush:
-            flush_suit = max(suit_counts.keys(), key=lambda k: suit_counts[k])
-            flush_cards = [r for r, s in zip(ranks, suits) if s == flush_suit]
-            return (self.HAND_RANKINGS['flush'], sorted(flush_cards, reverse=True)[:5])
-        
-        # Straight
-        if is_straight:
-            return (self.HAND_RANKINGS['straight'], [straight_high])
-        
-        # Three of a kind
-        if sorted_ranks[0][1] == 3:
-            kickers = [r for r, c in sorted_ranks[1:] if c == 1]
-            return (self.HAND_RANKINGS['three_of_a_kind'], 
-                   [sorted_ranks[0][0]] + sorted(kickers, reverse=True)[:2])
-        
-        # Two pair
-        if sorted_ranks[0][1] == 2 and sorted_ranks[1][1] == 2:
-            high_pair = max(sorted_ranks[0][0], sorted_ranks[1][0])
-            low_pair = min(sorted_ranks[0][0], sorted_ranks[1][0])
-            kicker = next(r for r, c in sorted_ranks if c == 1)
-            return (self.HAND_RANKINGS['two_pair'], [high_pair, low_pair, kicker])
         
-        # One pair
-        if sorted_ranks[0][1] == 2:
-            kickers = [r for r, c in sorted_ranks[1:] if c == 1]
-            return (self.HAND_RANKINGS['pair'], 
-                   [sorted_ranks[0][0]] + sorted(kickers, reverse=True)[:3])
-        
-        # High card
-        return (self.HAND_RANKINGS['high_card'], sorted(ranks, reverse=True)[:5])
+        strength = self.evaluate_strength(cards)
+        return self._strength_to_rank(strength)
     
-    def _check_straight(self, ranks: List[int]) -> Tuple[bool, int]:
-        """Check for straight and return (is_straight, high_card)."""
-        if len(ranks) < 5:
-            return False, 0
-            
-        # Check for normal straight
-        for i in range(len(ranks) - 4):
-            if ranks[i] - ranks[i + 4] == 4:
-                return True, ranks[i]
+    def evaluate_strength(self, cards: List[str]) -> int:
+        """
+        Evaluate 1-7 cards with the lookup tables.
         
-        # Check for wheel straight (A,2,3,4,5)
-        if 12 in ranks and 0 in ranks and 1 in ranks and 2 in ranks and 3 in ranks:
-            return True, 3  # 5-high straight
-            
-        return False, 0
+        Returns:
+            Single comparable int (higher = better hand), 0 if no valid cards
+        """
+        return table_evaluator.evaluate_cards(cards)
+    
+    def _strength_to_rank(self, strength: int) -> Tuple[int, List[int]]:
+        """Convert a table strength into the legacy (hand_rank, kickers) tuple."""
+        category = table_evaluator.strength_category(strength)
+        kickers = table_evaluator.strength_kickers(strength)
+        if category == table_evaluator.STRAIGHT_FLUSH and kickers == [12]:
+            return (self.HAND_RANKINGS['royal_flush'], kickers)
+        return (category, kickers)
     
     def calculate_hand_strength(self, hero_cards: List[str], board_cards: List[str]) -> float:
         """
@@ -172,18 +108,66 @@ class HandEvaluator:
             return self._evaluate_incomplete_hand(hero_cards, board_cards)
         
         # Complete 5+ card evaluation
-        hand_rank, kickers = self.evaluate_hand(all_cards)
+        hand_rank, kickers = self._strength_to_rank(self.evaluate_strength(all_cards))
         
         # Convert to realistic hand strength
         return self._convert_rank_to_strength(hand_rank, kickers, all_cards)
     
+    def calculate_hand_strength_batch(self, hands: np.ndarray, board_cards: List[str]) -> np.ndarray:
+        """
+        Vectorized calculate_hand_strength for many hole-card combos on one board.
+
+        Args:
+            hands: [N, 2] array of card codes (see table_evaluator)
+            board_cards: Community board cards
+
+        Returns:
+            Array of N strengths matching calculate_hand_strength per combo;
+            combos that collide with the board get 0.0
+        """
+        hands = np.asarray(hands, dtype=np.int64).reshape(-1, 2)
+        if len(board_cards) == 0:
+            return np.array([
+                self._preflop_hand_strength([self.int_to_card(a), self.int_to_card(b)])
+                for a, b in hands.tolist()
+            ], dtype=np.float64)
+
+        board_codes = table_evaluator.cards_to_codes(board_cards)
+        strengths = table_evaluator.evaluate_batch(hands, board_codes)
+        category = strengths >> table_evaluator.CATEGORY_SHIFT
+        top_rank = (strengths >> 16) & 0xF
+
+        # Sets: pocket pair with a matching board rank
+        board_ranks = np.zeros(13, dtype=bool)
+        board_ranks[[c >> 2 for c in board_codes]] = True
+        hole_ranks = hands >> 2
+        is_set = (hole_ranks[:, 0] == hole_ranks[:, 1]) & board_ranks[hole_ranks[:, 0]]
+
+        pair_strength = np.select(
+            [top_rank >= 10, top_rank >= 7, top_rank >= 4], [0.65, 0.50, 0.35], 0.25
+        )
+        result = np.select(
+            [
+                category >= table_evaluator.STRAIGHT_FLUSH,
+                category == table_evaluator.FOUR_OF_A_KIND,
+                category == table_evaluator.FULL_HOUSE,
+                category == table_evaluator.FLUSH,
+                category == table_evaluator.STRAIGHT,
+                category == table_evaluator.THREE_OF_A_KIND,
+                category == table_evaluator.TWO_PAIR,
+                category == table_evaluator.PAIR,
+            ],
+            [0.98, 0.95, 0.90, 0.75, 0.70, np.where(is_set, 0.85, 0.65), 0.55, pair_strength],
+            0.15,
+        )
+        return np.where(strengths < 0, 0.0, result)
+
     def _evaluate_incomplete_hand(self, hero_cards: List[str], board_cards: List[str]) -> float:
         """Evaluate hand strength on flop/turn."""
         all_cards = hero_cards + board_cards
         
-        # Pad to 5 cards for evaluation
-        padded_cards = all_cards + ['2h'] * (5 - len(all_cards))
-        hand_rank, kickers = self.evaluate_hand(padded_cards)
+        # The tables score partial hands directly (pairs, trips, two pair)
+        hand_rank, kickers = self._strength_to_rank(self.evaluate_strength(all_cards))
         
         return self._convert_rank_to_strength(hand_rank, kickers, all_cards)
     
@@ -248,9 +232,13 @@ class HandEvaluator:
             return 0.25
     
     def _preflop_hand_strength(self, hero_cards: List[str]) -> float:
-        """Calculate preflop hand strength."""
+        """Calculate preflop hand strength (all-in equity vs a random hand when tables are built)."""
         if len(hero_cards) != 2:
             return 0.0
+        
+        equity = preflop_tables.equity_vs_range(hero_cards)
+        if equity is not None:
+            return equity
             
         card1_rank = self.card_to_int(hero_cards[0]) // 4
         card2_rank = self.card_to_int(hero_cards[1]) // 4
@@ -296,109 +284,28 @@ class HandEvaluator:
         self, 
         hero_cards: List[str], 
         board_cards: List[str], 
-        num_opponents: int
+        num_opponents: int,
+        time_budget_ms: float = EQUITY_TIME_BUDGET_MS
     ) -> float:
         """
-        Estimate equity against random opponent hands using realistic poker equity.
-        """
-        if not hero_cards:
-            return 0.0
-            
-        # Get made hand strength and draw potential
-        made_hand_strength = self._evaluate_made_hand_equity(hero_cards, board_cards)
-        draw_equity = self._evaluate_draw_equity(hero_cards, board_cards) if len(board_cards) < 5 else 0
-        
-        total_equity = made_hand_strength + draw_equity
+        Estimate equity against random opponent hands.
         
-        # Adjust for number of opponents (less aggressive reduction)
-        if num_opponents <= 1:
-            return min(0.95, total_equity)
-        elif num_opponents == 2:
-            return min(0.90, total_equity * 0.95)
-        elif num_opponents == 3:
-            return min(0.85, total_equity * 0.90)
-        elif num_opponents == 4:
-            return min(0.80, total_equity * 0.85)
-        else:
-            return min(0.75, total_equity * 0.80)
-    
-    def _evaluate_made_hand_equity(self, hero_cards: List[str], board_cards: List[str]) -> float:
-        """Evaluate current made hand equity."""
-        return self.calculate_hand_strength(hero_cards, board_cards)
-    
-    def _evaluate_draw_equity(self, hero_cards: List[str], board_cards: List[str]) -> float:
-        """Calculate equity from drawing hands."""
-        if len(board_cards) == 0:  # Preflop
+        Heads-up turn and river spots are enumerated exactly; everything else
+        is seeded Monte Carlo that stops at EQUITY_TOLERANCE or the time budget.
+        """
+        hero_codes = table_evaluator.cards_to_codes(hero_cards)
+        board_codes = table_evaluator.cards_to_codes(board_cards)
+        if len(hero_codes) != 2 or set(hero_codes) & set(board_codes):
             return 0.0
-            
-        draw_equity = 0.0
-        
-        # Check for flush draws
-        flush_outs = self._count_flush_outs(hero_cards, board_cards)
-        if flush_outs >= 9:  # Nut flush draw
-            draw_equity += 0.35
-        elif flush_outs >= 8:  # Good flush draw
-            draw_equity += 0.30
-        elif flush_outs >= 6:  # Weak flush draw
-            draw_equity += 0.25
-        
-        # Check for straight draws
-        straight_outs = self._count_straight_outs(hero_cards, board_cards)
-        if straight_outs >= 8:  # Open-ended
-            draw_equity += 0.30
-        elif straight_outs >= 4:  # Gutshot
-            draw_equity += 0.15
-        
-        # Overcard equity
-        overcard_outs = self._count_overcard_outs(hero_cards, board_cards)
-        if overcard_outs >= 6:  # Two overcards
-            draw_equity += 0.20
-        elif overcard_outs >= 3:  # One overcard
-            draw_equity += 0.10
-        
-        return min(0.40, draw_equity)  # Cap draw equity
-    
-    def _count_flush_outs(self, hero_cards: List[str], board_cards: List[str]) -> int:
-        """Count flush outs."""
-        all_cards = hero_cards + board_cards
-        suits = [self.card_to_int(card) % 4 for card in all_cards if card]
-        
-        suit_counts = Counter(suits)
-        max_suit_count = max(suit_counts.values()) if suit_counts else 0
-        
-        if max_suit_count >= 4:
-            return 13 - max_suit_count  # Remaining cards of that suit
-        return 0
-    
-    def _count_straight_outs(self, hero_cards: List[str], board_cards: List[str]) -> int:
-        """Count straight outs (simplified)."""
-        # This is a simplified implementation
-        # Real implementation would check all possible straights
-        all_cards = hero_cards + board_cards
-        ranks = [self.card_to_int(card) // 4 for card in all_cards if card]
-        unique_ranks = sorted(set(ranks))
-        
-        # Look for 4-card straight draws
-        for i in range(len(unique_ranks) - 3):
-            if unique_ranks[i+3] - unique_ranks[i] == 3:
-                return 8  # Open-ended
-            elif unique_ranks[i+2] - unique_ranks[i] == 2:
-                return 4  # Gutshot
-        
-        return 0
-    
-    def _count_overcard_outs(self, hero_cards: List[str], board_cards: List[str]) -> int:
-        """Count overcard outs."""
-        if not board_cards:
-            return 0
-            
-        hero_ranks = [self.card_to_int(card) // 4 for card in hero_cards if card]
-        board_ranks = [self.card_to_int(card) // 4 for card in board_cards if card]
-        
-        if not board_ranks:
-            return 0
-            
-        board_high = max(board_ranks)
-        overcard_count = sum(1 for rank in hero_ranks if rank > board_high)
         
-        return overcard_count * 3  # 3 outs per overcard
\ No newline at end of file
+        # Heads-up preflop is a table read
+        if not board_codes and num_opponents <= 1:
+            equity = preflop_tables.equity_vs_range(hero_cards)
+            if equity is not None:
+                return equity
+        
+        result = equity_engine.hand_vs_random(
+            hero_cards, board_cards, num_opponents=max(1, num_opponents),
+            tolerance=EQUITY_TOLERANCE, time_budget_ms=time_budget_ms
+        )
+        return result.equity
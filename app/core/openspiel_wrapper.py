@@ -6,17 +6,43 @@ import time
 
 try:
     import pyspiel
-    from open_spiel.python.algorithms import cfr
+    from open_spiel.python.algorithms import cfr, exploitability
     OPENSPIEL_AVAILABLE = True
 except ImportError:
     OPENSPIEL_AVAILABLE = False
     pyspiel = None
     cfr = None
+    exploitability = None
 
+from app.api.models import Position
+from app.core import cfr_solver, table_evaluator
 from app.core.hand_evaluator import HandEvaluator
+from app.core.range_analyzer import RangeAnalyzer
+from app.core.range_builder import postflop_rank
+from app.core.strategy_cache import StrategyCache
 
 logger = logging.getLogger(__name__)
 
+# Board sizes solved with the built-in subgame solver
+SUBGAME_BOARD_SIZES = (4, 5)
+# Turn subgames deal every river and run ~50x slower per iteration than
+# river ones: the default 200 ms budget stops after one iteration at ~186%
+# of the pot exploitable, so turns are solved only given at least this much
+SUBGAME_TURN_MIN_TIME_MS = 3000
+# Solved subgames kept per hand_id to seed later decisions in the same hand
+SUBGAME_STORE_HANDS = 256
+SUBGAME_STORE_TTL_SECONDS = 1800
+# Parent street lines whose bets differ from the observed pot by more than
+# this fraction of the parent pot are not carried forward
+SUBGAME_LINE_TOLERANCE = 0.1
+
+# Default ranges when the hand history does not provide any
+SUBGAME_OOP_POSITION = Position.BB
+SUBGAME_IP_POSITION = Position.BTN
+
+# CFR iterations between best-response exploitability checks on OpenSpiel games
+EXPLOITABILITY_CHECK_EVERY = 100
+
 
 class OpenSpielWrapper:
     """Wrapper for OpenSpiel CFR algorithms."""
@@ -26,6 +52,11 @@ class OpenSpielWrapper:
         self.game = None
         self.cfr_solver = None
         self.hand_evaluator = HandEvaluator()
+        # Last solved subgame per hand_id, resumed or carried to the next street
+        self.subgame_store = StrategyCache(max_size=SUBGAME_STORE_HANDS, ttl_seconds=SUBGAME_STORE_TTL_SECONDS)
+        # Build the evaluator tables now (~0.8s) rather than inside the first solve's budget
+        table_evaluator.get_tables()
+        table_evaluator.get_rank_index()
         
         if OPENSPIEL_AVAILABLE:
             try:
@@ -80,9 +111,28 @@ class OpenSpielWrapper:
         self,
         game_context: Dict,
         max_iterations: int = 10000,
-        max_time_ms: int = 500
+        max_time_ms: int = 500,
+        target_exploitability_pct: float = cfr_solver.DEFAULT_TARGET_EXPLOITABILITY_PCT,
+        tree: Optional[cfr_solver.TreeConfig] = None
     ) -> Dict:
-        """Compute CFR strategy for given game context."""
+        """
+        Compute CFR strategy for given game context.
+
+        Iteration stops once the best-response exploitability of the average
+        strategy is at most target_exploitability_pct of the pot, or when
+        the iteration or time budget runs out.  The result carries the
+        exploitability curve under "convergence".  tree overrides the bet
+        sizing of subgame solves (OpenSpiel games have a fixed tree).
+        """
+        # Heads-up river spots are solved directly on a real betting tree
+        try:
+            subgame = self._compute_subgame_strategy(game_context, max_iterations, max_time_ms,
+                                                     target_exploitability_pct, tree)
+            if subgame is not None:
+                return subgame
+        except (ValueError, KeyError) as e:
+            logger.debug(f"Subgame solver skipped: {e}")
+
         if not self.is_available():
             raise RuntimeError("OpenSpiel not available or not initialized")
         
@@ -93,8 +143,10 @@ class OpenSpielWrapper:
             # In a full implementation, you'd create a game state from game_context
             solver = self.cfr_solver
             
-            # Run CFR iterations with time limit
+            # Run CFR iterations until the target, iteration cap or time limit
             iterations_run = 0
+            exploitability_pct = None
+            convergence = []
             while (iterations_run < max_iterations and 
                    (time.time() - start_time) * 1000 < max_time_ms):
                 
@@ -102,19 +154,30 @@ class OpenSpielWrapper:
                     solver.evaluate_and_update_policy()
                 iterations_run += 1
                 
-                # Check every 100 iterations to avoid excessive time checking
-                if iterations_run % 100 == 0:
-                    elapsed_ms = (time.time() - start_time) * 1000
-                    if elapsed_ms > max_time_ms:
+                # Best response every EXPLOITABILITY_CHECK_EVERY iterations
+                if solver is not None and iterations_run % EXPLOITABILITY_CHECK_EVERY == 0:
+                    exploitability_pct = self._best_response_exploitability(solver.average_policy())
+                    convergence.append({
+                        "iteration": iterations_run,
+                        "exploitability_pct": exploitability_pct,
+                        "elapsed_ms": (time.time() - start_time) * 1000,
+                    })
+                    if exploitability_pct <= target_exploitability_pct:
                         break
             
             # Get the computed strategy
             average_policy = solver.average_policy() if solver is not None else None
+            if average_policy is not None and (not convergence or convergence[-1]["iteration"] != iterations_run):
+                exploitability_pct = self._best_response_exploitability(average_policy)
+                convergence.append({
+                    "iteration": iterations_run,
+                    "exploitability_pct": exploitability_pct,
+                    "elapsed_ms": (time.time() - start_time) * 1000,
+                })
             
             # Compute basic metrics
             equity = self._estimate_equity(game_context, average_policy)
             expected_value = self._estimate_expected_value(game_context, average_policy)
-            exploitability = self._estimate_exploitability(solver)
             action_probabilities = self._extract_action_probabilities(
                 game_context, average_policy
             )
@@ -124,7 +187,9 @@ class OpenSpielWrapper:
             return {
                 "equity": equity,
                 "expected_value": expected_value,
-                "exploitability": exploitability,
+                "exploitability": exploitability_pct / 100.0 if exploitability_pct is not None else None,
+                "exploitability_pct": exploitability_pct,
+                "convergence": convergence,
                 "action_probabilities": action_probabilities,
                 "iterations": iterations_run,
                 "computation_time_ms": (time.time() - start_time) * 1000
@@ -135,6 +200,184 @@ class OpenSpielWrapper:
             # Return fallback result
             return self._fallback_cfr_result(game_context)
     
+    def _compute_subgame_strategy(self, game_context: Dict, max_iterations: int, max_time_ms: int,
+                                  target_exploitability_pct: float = cfr_solver.DEFAULT_TARGET_EXPLOITABILITY_PCT,
+                                  tree: Optional[cfr_solver.TreeConfig] = None) -> Optional[Dict]:
+        """
+        Solve a heads-up turn or river spot with the vectorized CFR solver.
+
+        Returns None when the context is not a heads-up spot on a supported
+        street (turns need SUBGAME_TURN_MIN_TIME_MS).  Ranges default to the
+        BB (out of position) and BTN (in position) opening ranges, with the
+        hero's hand always included.
+
+        With a hand_id in the context, the solved subgame is kept for the
+        hand: a later decision on the same street resumes it, and once the
+        river lands the turn solution's reach becomes the river ranges, its
+        strategy warm-starts the re-solve and the villain's counterfactual
+        values bound it through a re-solve gadget.
+        """
+        hero = self._context_cards(game_context.get("hero_cards", []))
+        board = self._context_cards(game_context.get("board_cards", []))
+        pot = float(game_context.get("pot_size") or 0)
+        if (game_context.get("num_players", 2) != 2 or len(hero) != 2
+                or len(board) not in SUBGAME_BOARD_SIZES or pot <= 0):
+            return None
+        if len(board) == 4 and max_time_ms < SUBGAME_TURN_MIN_TIME_MS:
+            return None
+
+        to_call = float(game_context.get("to_call", game_context.get("bet_to_call", 0)) or 0)
+        stacks = game_context.get("stacks") or [game_context.get("stack_size") or 0]
+        stack = max(float(min(stacks)), to_call)
+        # Subgames start from the pot before this street's bets
+        start_pot = pot - float(game_context.get("round_pot") or 0)
+        start_pot = start_pot if start_pot > 0 else pot
+        hero_ip = self._hero_in_position(game_context)
+        hero_player = cfr_solver.IP if hero_ip else cfr_solver.OOP
+        hero_combo = tuple(sorted(table_evaluator.cards_to_codes(hero)))
+        tree = tree or cfr_solver.TreeConfig()
+
+        hand_id = game_context.get("hand_id")
+        stored = self.subgame_store.get(hand_id) if hand_id else None
+        solver, solution = None, None
+        if stored is not None:
+            solver, solution = self._resume_subgame(stored, board, start_pot, stack, tree, hero_player,
+                                                    target_exploitability_pct)
+        if solver is None or hero_combo not in solver.hands[hero_player].index:
+            ranges = []
+            for position, is_hero in ((SUBGAME_OOP_POSITION, not hero_ip), (SUBGAME_IP_POSITION, hero_ip)):
+                spec = {hand: 1.0 for hand in RangeAnalyzer.PREFLOP_RANGES.get(position, [])}
+                if is_hero:
+                    spec["".join(hero)] = 1.0
+                ranges.append(cfr_solver.range_vector(spec, board))
+            solver = cfr_solver.SubgameSolver(board, start_pot, stack, ranges[0], ranges[1], tree=tree)
+            solution = None
+        if solution is None:
+            solution = solver.solve(target_exploitability_pct=target_exploitability_pct,
+                                    time_budget_ms=max_time_ms, max_iterations=solver.iterations + max_iterations)
+        if hand_id:
+            self.subgame_store.set(hand_id, solution)
+
+        # Facing a bet: out of position we checked and were bet into, in
+        # position the first bet was ours to face; otherwise it is checked to us
+        if to_call > 0:
+            before = ["check"] if not hero_ip else []
+            history = before + [solver.closest_action(before, to_call)]
+        else:
+            history = ["check"] if hero_ip else []
+        frequencies = solution.hand_strategy(hero, history)
+
+        index = solver.hands[hero_player].index[hero_combo]
+        return {
+            "equity": float(solver.equities(hero_player)[index]),
+            "expected_value": float(solver.expected_values(hero_player)[index]),
+            "exploitability": solution.exploitability_pct / 100.0,
+            "exploitability_pct": solution.exploitability_pct,
+            "convergence": solution.convergence,
+            "action_probabilities": self._aggregate_actions(frequencies, facing_bet=to_call > 0),
+            "action_frequencies": frequencies,
+            "iterations": solution.iterations,
+            "computation_time_ms": solution.elapsed_ms,
+            "solver": "cfr_subgame",
+        }
+
+    def _resume_subgame(self, stored: "cfr_solver.SubgameSolution", board: List[str], start_pot: float,
+                        stack: float, tree: "cfr_solver.TreeConfig", hero_player: int,
+                        target_exploitability_pct: float):
+        """
+        Solver to continue from a hand's stored subgame, and the stored
+        solution itself if it already meets the target (None, None if the
+        stored subgame does not lead here).
+        """
+        parent = stored.solver
+        codes = table_evaluator.cards_to_codes(board)
+        if parent.config != tree:
+            return None, None
+        if (set(parent.board) == set(codes) and abs(parent.pot - start_pot) < 1e-6
+                and abs(parent.stack - stack) < 1e-6):
+            ready = stored.exploitability_pct <= target_exploitability_pct
+            return parent, stored if ready else None
+
+        if len(parent.board) != 4 or len(codes) != 5 or not set(parent.board) < set(codes):
+            return None, None
+        river = table_evaluator.code_to_card(next(c for c in codes if c not in parent.board))
+        line = self._parent_line(stored, (start_pot - parent.pot) / 2)
+        if line is None:
+            return None, None
+        try:
+            solver = cfr_solver.SubgameSolver.from_parent(stored, line + [river], gadget_player=1 - hero_player,
+                                                          tree=tree)
+        except ValueError as e:
+            logger.debug(f"Not carrying the turn forward: {e}")
+            return None, None
+        return solver, None
+
+    @staticmethod
+    def _parent_line(solution: "cfr_solver.SubgameSolution", bet: float) -> Optional[List[str]]:
+        """
+        Most likely betting line of a solved turn that ends the street with
+        each player having put in about ``bet``.
+        """
+        tolerance = SUBGAME_LINE_TOLERANCE * solution.solver.pot
+        candidates = []
+        pending = [(solution.solver.root, [])]
+        while pending:
+            node, line = pending.pop()
+            if node.kind == "chance":
+                if abs(node.bets[0] - bet) <= tolerance and node.bets[0] < solution.solver.stack:
+                    oop_range, ip_range = solution.reach_ranges(line)
+                    mass = oop_range.sum() * ip_range.sum()
+                    if mass > 0:
+                        candidates.append((abs(node.bets[0] - bet), -mass, line))
+            elif node.kind == "action":
+                pending.extend((child, line + [label]) for label, child in zip(node.actions, node.children))
+        return min(candidates, key=lambda c: c[:2])[2] if candidates else None
+
+    @staticmethod
+    def _context_cards(cards: List) -> List[str]:
+        """Card strings from either context format (strings or rank * 4 + suit codes)."""
+        return [table_evaluator.code_to_card(c) if isinstance(c, int) else str(c) for c in cards]
+
+    @staticmethod
+    def _hero_in_position(game_context: Dict) -> bool:
+        """
+        Whether the hero acts last postflop (see range_builder.postflop_rank).
+
+        With the seat positions known the hero is compared to the other
+        player, the SB being the button when only two are seated; with only
+        the hero's position it is compared to the BB.
+        """
+        try:
+            positions = game_context.get("positions")
+            if positions:
+                labels = [Position(getattr(label, "value", label)) for label in positions.values()]
+                index = game_context.get("hero_position", 0)
+                if not 0 <= index < len(labels):
+                    return False
+                heads_up = len(labels) == 2
+                hero_rank = postflop_rank(labels[index], heads_up)
+                return all(hero_rank > postflop_rank(label, heads_up)
+                           for i, label in enumerate(labels) if i != index)
+            position = game_context.get("position")
+            if position is None:
+                return False
+            return postflop_rank(Position(getattr(position, "value", position))) > postflop_rank(Position.BB)
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _aggregate_actions(frequencies: Dict[str, float], facing_bet: bool) -> Dict[str, float]:
+        """Fold bet sizes into the check/bet/fold or call/raise/fold shape used elsewhere."""
+        if facing_bet:
+            totals = {"call": 0.0, "raise": 0.0, "fold": 0.0}
+        else:
+            totals = {"check": 0.0, "bet": 0.0, "fold": 0.0}
+        aggressive = "raise" if facing_bet else "bet"
+        for label, freq in frequencies.items():
+            action = label.split()[0]
+            totals[action if action in totals else aggressive] += freq
+        return totals
+
     def _estimate_equity(self, game_context: Dict, policy) -> float:
         """Estimate hero's equity using proper hand evaluation."""
         hero_cards_int = game_context.get("hero_cards", [])
@@ -170,15 +413,16 @@ class OpenSpielWrapper:
         
         return expected_value
     
-    def _estimate_exploitability(self, solver) -> float:
-        """Estimate exploitability of the strategy."""
-        # This would require computing best response in a full implementation
-        # For now, return a reasonable estimate based on iterations
-        try:
-            # More iterations generally mean lower exploitability
-            return max(0.01, 1.0 / (1 + len(solver.cumulative_regrets()) / 1000))
-        except:
-            return 0.05  # Default reasonable exploitability
+    def _best_response_exploitability(self, policy) -> float:
+        """
+        Exploitability of an OpenSpiel average policy in percent of the pot.
+
+        OpenSpiel's best response gives the mean gain (in game utility) of
+        best-responding to the policy; the largest winnable pot is the game's
+        max utility.
+        """
+        gain = exploitability.exploitability(self.game, policy)
+        return 100.0 * gain / max(self.game.max_utility(), 1e-9)
     
     def _extract_action_probabilities(self, game_context: Dict, policy) -> Dict[str, float]:
         """Extract action probabilities based on proper poker equity."""
@@ -0,0 +1,259 @@
+"""Multi-process Monte Carlo equity with evaluator tables in shared memory.
+
+The parent builds the lookup tables once and copies them into a single
+``multiprocessing.shared_memory`` block; pool workers attach to that block
+in their initializer and evaluate straight from the shared pages instead of
+rebuilding (or unpickling) their own copy.
+
+A simulation is cut into fixed-size chunks, each with its own RNG stream
+spawned from one ``SeedSequence``.  Chunk results are merged in chunk order,
+so for a given seed the answer does not depend on the number of workers.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core import equity_engine, hand_combos, table_evaluator
+from app.core.equity_engine import EquityResult, RangeSpec, Tally
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_SAMPLES = 400000
+
+# Layout of the shared block: (name, dtype, length) in storage order
+_TableLayout = List[Tuple[str, str, int]]
+
+# Worker-side handle; kept referenced so the mapping outlives the initializer
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(shm_name: str, layout: _TableLayout) -> None:
+    """Pool initializer: attach to the shared tables and install them."""
+    global _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _views(_worker_shm.buf, layout)
+    table_evaluator.install_tables(arrays["keys"], arrays["values"], arrays["flush_table"])
+
+
+def _views(buffer, layout: _TableLayout, writeable: bool = False) -> dict:
+    """Numpy views over a packed table buffer (read-only unless asked)."""
+    arrays, offset = {}, 0
+    for name, dtype, length in layout:
+        array = np.ndarray((length,), dtype=dtype, buffer=buffer, offset=offset)
+        array.flags.writeable = writeable
+        arrays[name] = array
+        offset += array.nbytes
+    return arrays
+
+
+def _simulate_chunk(hero: np.ndarray, hero_p: np.ndarray,
+                    villain: np.ndarray, villain_p: np.ndarray,
+                    board: List[int], num_opponents: int,
+                    seed: np.random.SeedSequence, count: int) -> Tally:
+    """Run one independent simulation chunk (in a worker or in-process)."""
+    rng = np.random.default_rng(seed)
+    return equity_engine.simulate_deals(hero, hero_p, villain, villain_p, board, num_opponents, rng, count)
+
+
+def _simulate_prefix(args: List[tuple], deadline: Optional[float], stop: threading.Event) -> Tally:
+    """
+    Run chunks in order in the calling thread, checking the deadline (and
+    stop) before each one; the first chunk with samples always runs.
+    """
+    tally = Tally()
+    for chunk_args in args:
+        if tally.samples and (stop.is_set() or (deadline is not None and time.perf_counter() >= deadline)):
+            break
+        tally.add(_simulate_chunk(*chunk_args))
+    return tally
+
+
+class ParallelEquityEngine:
+    """Process-pool Monte Carlo equity for large preflop/multiway simulations."""
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Initialize the engine; the pool and shared tables are created on first use.
+
+        Args:
+            max_workers: Worker processes (default: os.cpu_count()); 1 runs in-process
+            chunk_size: Deals per chunk (the unit of work and of RNG streams)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    def hand_vs_random(self, hero_cards: Sequence[str], board: Sequence[str] = (),
+                       num_opponents: int = 1, samples: int = DEFAULT_SAMPLES,
+                       seed: int = 0) -> EquityResult:
+        """Monte Carlo equity of a hand against num_opponents random hands."""
+        hero = table_evaluator.cards_to_codes(hero_cards)
+        board_codes = table_evaluator.cards_to_codes(board)
+        villain = hand_combos.live_combos(hero + board_codes)
+        return self._run(equity_engine.hero_combo(hero, board_codes), np.ones(1), villain,
+                         np.ones(len(villain)), board_codes, num_opponents, samples, seed)
+
+    async def hand_vs_random_async(self, hero_cards: Sequence[str], board: Sequence[str] = (),
+                                   num_opponents: int = 1, samples: int = DEFAULT_SAMPLES,
+                                   seed: int = 0, time_budget_ms: Optional[float] = None,
+                                   chunk_size: Optional[int] = None) -> EquityResult:
+        """
+        hand_vs_random for the event loop: chunks are awaited, never blocked on.
+
+        With time_budget_ms, chunks not finished by the deadline are dropped
+        and the result covers the leading chunks that finished (at least one,
+        so pick a chunk_size that fits the budget).  Without a process pool
+        the chunks run one after another in a single thread that stops at the
+        deadline, so nothing keeps simulating after the result is returned.
+        """
+        hero = table_evaluator.cards_to_codes(hero_cards)
+        board_codes = table_evaluator.cards_to_codes(board)
+        villain = hand_combos.live_combos(hero + board_codes)
+        return await self._run_async(equity_engine.hero_combo(hero, board_codes), np.ones(1), villain,
+                                     np.ones(len(villain)), board_codes, num_opponents, samples, seed,
+                                     time_budget_ms, chunk_size)
+
+    def hand_vs_range(self, hero_cards: Sequence[str], villain_range: RangeSpec,
+                      board: Sequence[str] = (), num_opponents: int = 1,
+                      samples: int = DEFAULT_SAMPLES, seed: int = 0) -> EquityResult:
+        """Monte Carlo equity of a hand against num_opponents copies of a range."""
+        hero = table_evaluator.cards_to_codes(hero_cards)
+        board_codes = table_evaluator.cards_to_codes(board)
+        villain, weights = hand_combos.range_to_combos(villain_range, hero + board_codes)
+        return self._run(equity_engine.hero_combo(hero, board_codes), np.ones(1), villain,
+                         weights, board_codes, num_opponents, samples, seed)
+
+    def _chunk_args(self, hero: np.ndarray, hero_weights: np.ndarray,
+                    villain: np.ndarray, villain_weights: np.ndarray,
+                    board: List[int], num_opponents: int, samples: int, seed: int,
+                    chunk_size: Optional[int] = None) -> List[tuple]:
+        """Arguments of each seeded chunk of a simulation, in merge order."""
+        chunk_size = chunk_size or self.chunk_size
+        hero_p = hero_weights / hero_weights.sum()
+        villain_p = villain_weights / villain_weights.sum()
+        counts = [chunk_size] * (samples // chunk_size)
+        if samples % chunk_size:
+            counts.append(samples % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(counts))
+        return [(hero, hero_p, villain, villain_p, board, num_opponents, s, n)
+                for s, n in zip(seeds, counts)]
+
+    def _run(self, hero: np.ndarray, hero_weights: np.ndarray,
+             villain: np.ndarray, villain_weights: np.ndarray,
+             board: List[int], num_opponents: int, samples: int, seed: int) -> EquityResult:
+        """Split the simulation into seeded chunks, fan out and merge in order."""
+        start = time.perf_counter()
+        if len(villain) == 0:
+            return EquityResult(0.5, 0.0, 0.0, 0, 0.0, True, 0.0)
+
+        args = self._chunk_args(hero, hero_weights, villain, villain_weights, board,
+                                num_opponents, samples, seed)
+        executor = self._get_executor() if len(args) > 1 else None
+        if executor is not None:
+            chunks = executor.map(_simulate_chunk, *zip(*args))
+        else:
+            chunks = (_simulate_chunk(*a) for a in args)
+
+        tally = Tally()
+        for chunk in chunks:
+            tally.add(chunk)
+        logger.debug(f"Parallel equity: {tally.samples} deals in {(time.perf_counter() - start)*1000:.1f}ms")
+        return tally.result(start)
+
+    async def _run_async(self, hero: np.ndarray, hero_weights: np.ndarray,
+                         villain: np.ndarray, villain_weights: np.ndarray,
+                         board: List[int], num_opponents: int, samples: int, seed: int,
+                         time_budget_ms: Optional[float] = None,
+                         chunk_size: Optional[int] = None) -> EquityResult:
+        """_run with awaited chunks and an optional deadline; merges the finished prefix."""
+        start = time.perf_counter()
+        if len(villain) == 0:
+            return EquityResult(0.5, 0.0, 0.0, 0, 0.0, True, 0.0)
+
+        args = self._chunk_args(hero, hero_weights, villain, villain_weights, board,
+                                num_opponents, samples, seed, chunk_size)
+        executor = await asyncio.to_thread(self._get_executor) if len(args) > 1 else None
+        deadline = None if time_budget_ms is None else start + time_budget_ms / 1000.0
+
+        if executor is None:
+            # In-process chunks run in one thread that checks the deadline
+            # between chunks, so the loop stays free and no thread outlives it
+            stop = threading.Event()
+            try:
+                tally = await asyncio.to_thread(_simulate_prefix, args, deadline, stop)
+            finally:
+                stop.set()
+            logger.debug(f"Parallel equity: {tally.samples} deals in {(time.perf_counter() - start)*1000:.1f}ms")
+            return tally.result(start)
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(executor, _simulate_chunk, *a) for a in args]
+        tally = Tally()
+        try:
+            for future in futures:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0 and tally.samples:
+                    break
+                try:
+                    # The first chunk is always waited for so the result has samples
+                    timeout = remaining if tally.samples else None
+                    tally.add(await asyncio.wait_for(asyncio.shield(future), timeout))
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+        logger.debug(f"Parallel equity: {tally.samples} deals in {(time.perf_counter() - start)*1000:.1f}ms")
+        return tally.result(start)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Create the worker pool (and shared tables) on first use."""
+        if self.max_workers <= 1:
+            return None
+        if self._executor is None:
+            try:
+                name, layout = self._share_tables()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(name, layout),
+                )
+                atexit.register(self.shutdown)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Process pool unavailable, simulating in-process: {e}")
+                self.max_workers = 1
+                return None
+        return self._executor
+
+    def _share_tables(self) -> Tuple[str, _TableLayout]:
+        """Copy the evaluator tables into one shared-memory block."""
+        _, keys, values, flush_table = table_evaluator.get_tables()
+        arrays = {"keys": keys, "values": values, "flush_table": flush_table}
+        layout = [(name, array.dtype.str, len(array)) for name, array in arrays.items()]
+
+        self._shm = shared_memory.SharedMemory(create=True, size=sum(a.nbytes for a in arrays.values()))
+        for name, view in _views(self._shm.buf, layout, writeable=True).items():
+            view[:] = arrays[name]
+        logger.info(f"Shared evaluator tables: {self._shm.size} bytes in {self._shm.name}")
+        return self._shm.name, layout
+
+    def shutdown(self) -> None:
+        """Stop the workers and release the shared tables."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
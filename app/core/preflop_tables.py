@@ -0,0 +1,152 @@
+"""Precomputed preflop equity tables (169 starting-hand classes).
+
+Tables are produced offline by ``app/tools/build_preflop_tables.py`` and
+shipped as ``.npy`` files under ``app/data``.  They are opened with
+``mmap_mode='r'`` so loading is near-instant and every process reading them
+shares the same page-cache pages.
+
+Hand classes are indexed on a 13x13 grid: pairs on the diagonal, suited
+hands at ``(high, low)`` and offsuit hands at ``(low, high)``, flattened as
+``row * 13 + col`` with ranks 2..A = 0..12.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.table_evaluator import RANK_CHARS, card_to_code
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+MATRIX_FILE = "preflop_equity_169.npy"
+RANGES_FILE = "preflop_equity_vs_ranges.npy"
+META_FILE = "preflop_tables.json"
+
+NUM_CLASSES = 169
+RANDOM_COLUMN = "random"
+
+_loaded: Optional[Tuple[np.ndarray, np.ndarray, Dict[str, int]]] = None
+_load_failed = False
+
+
+def class_index(card1: str, card2: str) -> int:
+    """Hand-class index (0..168) of two hole cards, or -1 if invalid."""
+    code1, code2 = card_to_code(card1), card_to_code(card2)
+    if code1 < 0 or code2 < 0 or code1 == code2:
+        return -1
+    return class_index_codes(code1, code2)
+
+
+def class_index_codes(code1: int, code2: int) -> int:
+    """Hand-class index of two card codes."""
+    rank1, rank2 = code1 >> 2, code2 >> 2
+    high, low = max(rank1, rank2), min(rank1, rank2)
+    if (code1 & 3) == (code2 & 3):
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_notation(index: int) -> str:
+    """Range notation ('AA', 'AKs', 'AKo') of a hand-class index."""
+    row, col = divmod(index, 13)
+    if row == col:
+        return (RANK_CHARS[row] * 2).upper()
+    if row > col:
+        return f"{RANK_CHARS[row].upper()}{RANK_CHARS[col].upper()}s"
+    return f"{RANK_CHARS[col].upper()}{RANK_CHARS[row].upper()}o"
+
+
+def class_combo_count(index: int) -> int:
+    """Number of concrete combos in a hand class (6 / 4 / 12)."""
+    row, col = divmod(index, 13)
+    return 6 if row == col else 4 if row > col else 12
+
+
+def ranges_digest(ranges: Dict[str, Sequence[str]]) -> str:
+    """Stable digest of the range definitions a table was built from."""
+    payload = json.dumps({k: list(v) for k, v in sorted(ranges.items())}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def current_ranges_digest() -> str:
+    """ranges_digest of the position charts in RangeAnalyzer.PREFLOP_RANGES today."""
+    # Imported here: range_analyzer imports hand_evaluator, which imports this module
+    from app.core.range_analyzer import RangeAnalyzer
+    return ranges_digest({p.value: hands for p, hands in RangeAnalyzer.PREFLOP_RANGES.items()})
+
+
+def load_tables(data_dir: Path = DATA_DIR) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, int]]]:
+    """
+    Memory-map the preflop tables (cached after the first call).
+
+    If the position charts changed since the tables were built (the stored
+    ranges_digest no longer matches), only the hand-vs-hand matrix and the
+    'random' column are served; the stale position columns are dropped with
+    a warning so callers fall back to their heuristics.
+
+    Returns:
+        ``(matrix[169, 169], vs_ranges[169, R], {column name: column})`` or
+        None when the files have not been built
+    """
+    global _loaded, _load_failed
+    if _loaded is not None or _load_failed:
+        return _loaded
+
+    try:
+        matrix = np.load(data_dir / MATRIX_FILE, mmap_mode="r")
+        vs_ranges = np.load(data_dir / RANGES_FILE, mmap_mode="r")
+        with open(data_dir / META_FILE, "r") as f:
+            meta = json.load(f)
+        columns = {name: i for i, name in enumerate(meta["range_columns"])}
+        if matrix.shape != (NUM_CLASSES, NUM_CLASSES) or vs_ranges.shape != (NUM_CLASSES, len(columns)):
+            raise ValueError(f"unexpected table shapes {matrix.shape}, {vs_ranges.shape}")
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Preflop equity tables unavailable, using heuristics: {e}")
+        _load_failed = True
+        return None
+
+    if meta.get("ranges_digest") != current_ranges_digest():
+        logger.warning("Preflop range charts changed since the equity tables were built; "
+                       "ignoring the per-position columns (rerun app/tools/build_preflop_tables.py)")
+        columns = {name: i for name, i in columns.items() if name == RANDOM_COLUMN}
+
+    _loaded = (matrix, vs_ranges, columns)
+    return _loaded
+
+
+def equity_vs_hand(hero_cards: Sequence[str], villain_cards: Sequence[str]) -> Optional[float]:
+    """Heads-up all-in equity of one hand class against another (None if unavailable)."""
+    tables = load_tables()
+    hero, villain = class_index(*hero_cards[:2]), class_index(*villain_cards[:2])
+    if tables is None or hero < 0 or villain < 0:
+        return None
+    return float(tables[0][hero, villain])
+
+
+def equity_vs_range(hero_cards: Sequence[str], range_name: str = RANDOM_COLUMN) -> Optional[float]:
+    """
+    Heads-up all-in equity against a named range column.
+
+    Columns are ``'random'`` plus every ``RangeAnalyzer.PREFLOP_RANGES``
+    position value (e.g. ``'BTN'``).  None if the table or column is missing.
+    """
+    tables = load_tables()
+    hero = class_index(*hero_cards[:2]) if len(hero_cards) >= 2 else -1
+    if tables is None or hero < 0 or range_name not in tables[2]:
+        return None
+    return float(tables[1][hero, tables[2][range_name]])
+
+
+def allin_ev(equity: float, pot: float, stack: float) -> float:
+    """Chip EV of shoving ``stack`` into ``pot`` and getting called, relative to folding."""
+    return equity * (pot + 2 * stack) - stack
+
+
+def class_notations() -> List[str]:
+    """All 169 hand-class notations in index order."""
+    return [class_notation(i) for i in range(NUM_CLASSES)]
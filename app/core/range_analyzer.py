@@ -4,7 +4,11 @@ import logging
 from typing import List, Dict, Tuple, Set, Optional
 from collections import defaultdict, Counter
 import itertools
+
+import numpy as np
+
 from app.api.models import Position, RangeInfo
+from app.core import equity_engine, hand_combos, table_evaluator
 from app.core.hand_evaluator import HandEvaluator
 
 logger = logging.getLogger(__name__)
@@ -183,73 +187,55 @@ class RangeAnalyzer:
         
         return current_range
     
+    def _range_strengths(self, range_hands: List[str], board: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Score every hand in a range on one board with a single batch evaluation.
+
+        Returns the hands that still have a combo not blocked by the board and
+        their strengths, in range order.
+        """
+        board_codes = table_evaluator.cards_to_codes(board)
+        hands, combos = hand_combos.notation_combos(range_hands, board_codes)
+        if not hands:
+            return [], np.zeros(0)
+        return hands, self.hand_evaluator.calculate_hand_strength_batch(combos, board)
+    
     def _filter_range_for_aggression(self, range_hands: List[str], board: List[str]) -> List[str]:
         """Filter range for betting/raising actions."""
-        filtered = []
+        hands, strengths = self._range_strengths(range_hands, board)
         
-        for hand in range_hands:
-            # Convert hand notation to actual cards for evaluation
-            hand_cards = self._hand_notation_to_cards(hand)
-            if not hand_cards:
-                continue
-                
-            # Evaluate hand strength on this board
-            strength = self.hand_evaluator.calculate_hand_strength(hand_cards, board)
-            
-            # Keep strong hands and some bluffs
-            if strength >= 0.6:  # Strong hands always bet
-                filtered.append(hand)
-            elif strength >= 0.4:  # Medium hands bet sometimes
-                if self._should_include_for_semi_bluff(hand, board):
-                    filtered.append(hand)
-            elif strength <= 0.25:  # Weak hands as bluffs
-                if self._should_include_as_bluff(hand, board):
-                    filtered.append(hand)
+        # Strong hands always bet; medium hands only as semi-bluffs; weak hands as bluffs
+        keep = strengths >= 0.6
+        for i in np.flatnonzero((strengths >= 0.4) & ~keep):
+            keep[i] = self._should_include_for_semi_bluff(hands[i], board)
+        for i in np.flatnonzero(strengths <= 0.25):
+            keep[i] = self._should_include_as_bluff(hands[i], board)
         
-        return filtered
+        return [hand for hand, kept in zip(hands, keep) if kept]
     
     def _filter_range_for_call(self, range_hands: List[str], board: List[str]) -> List[str]:
         """Filter range for calling actions."""
-        filtered = []
+        hands, strengths = self._range_strengths(range_hands, board)
         
-        for hand in range_hands:
-            hand_cards = self._hand_notation_to_cards(hand)
-            if not hand_cards:
-                continue
-                
-            strength = self.hand_evaluator.calculate_hand_strength(hand_cards, board)
-            
-            # Call with medium to strong hands
-            if 0.25 <= strength <= 0.8:  # Calling range
-                filtered.append(hand)
-            elif strength > 0.8:  # Sometimes slowplay very strong hands
-                if hash(hand) % 5 == 0:  # 20% of the time
-                    filtered.append(hand)
+        # Call with medium to strong hands
+        keep = (strengths >= 0.25) & (strengths <= 0.8)
+        for i in np.flatnonzero(strengths > 0.8):  # Sometimes slowplay very strong hands
+            keep[i] = hash(hands[i]) % 5 == 0  # 20% of the time
         
-        return filtered
+        return [hand for hand, kept in zip(hands, keep) if kept]
     
     def _filter_range_for_check(self, range_hands: List[str], board: List[str]) -> List[str]:
         """Filter range for checking actions."""
-        filtered = []
+        hands, strengths = self._range_strengths(range_hands, board)
         
-        for hand in range_hands:
-            hand_cards = self._hand_notation_to_cards(hand)
-            if not hand_cards:
-                continue
-                
-            strength = self.hand_evaluator.calculate_hand_strength(hand_cards, board)
-            
-            # Check with weak hands, medium hands, and some strong hands
-            if strength <= 0.3:  # Weak hands check
-                filtered.append(hand)
-            elif 0.3 < strength <= 0.65:  # Medium hands check sometimes
-                if hash(hand) % 3 != 0:  # 66% of the time
-                    filtered.append(hand)
-            elif strength > 0.8:  # Slowplay some strong hands
-                if hash(hand) % 4 == 0:  # 25% of the time
-                    filtered.append(hand)
+        # Check with weak hands, medium hands, and some strong hands
+        keep = strengths <= 0.3
+        for i in np.flatnonzero((strengths > 0.3) & (strengths <= 0.65)):
+            keep[i] = hash(hands[i]) % 3 != 0  # 66% of the time
+        for i in np.flatnonzero(strengths > 0.8):  # Slowplay some strong hands
+            keep[i] = hash(hands[i]) % 4 == 0  # 25% of the time
         
-        return filtered
+        return [hand for hand, kept in zip(hands, keep) if kept]
     
     def _hand_notation_to_cards(self, hand: str) -> List[str]:
         """Convert hand notation like 'AKs' to actual cards like ['ah', 'kd']."""
@@ -309,61 +295,26 @@ class RangeAnalyzer:
         return hash(hand + ''.join(board)) % 4 == 0  # 25% of weak hands as bluffs
     
     def calculate_range_equity(self, range1: List[str], range2: List[str], 
-                              board: List[str]) -> float:
+                              board: List[str], time_budget_ms: float = 20.0) -> float:
         """
         Calculate equity of range1 vs range2 on given board.
         
         Args:
-            range1: First player's range
+            range1: First player's range (notations, optionally 'AKs:0.5' weighted)
             range2: Second player's range  
             board: Board cards
+            time_budget_ms: Monte Carlo time budget (turn/river are exact)
             
         Returns:
             Equity of range1 (0.0 to 1.0)
         """
         if not range1 or not range2:
             return 0.5
-            
-        total_equity = 0.0
-        combinations = 0
-        
-        # Sample equity calculation (simplified for performance)
-        sample_size = min(100, len(range1) * len(range2))
-        
-        for i, hand1 in enumerate(range1[:10]):  # Limit for performance
-            for j, hand2 in enumerate(range2[:10]):
-                if combinations >= sample_size:
-                    break
-                    
-                cards1 = self._hand_notation_to_cards(hand1)
-                cards2 = self._hand_notation_to_cards(hand2)
-                
-                if cards1 and cards2:
-                    # Check for card conflicts
-                    all_cards = cards1 + cards2 + board
-                    if len(set(all_cards)) == len(all_cards):  # No conflicts
-                        equity = self._calculate_hand_vs_hand_equity(cards1, cards2, board)
-                        total_equity += equity
-                        combinations += 1
-            
-            if combinations >= sample_size:
-                break
         
-        return total_equity / combinations if combinations > 0 else 0.5
-    
-    def _calculate_hand_vs_hand_equity(self, hand1: List[str], hand2: List[str], 
-                                      board: List[str]) -> float:
-        """Calculate equity of hand1 vs hand2."""
-        # Simplified equity calculation
-        strength1 = self.hand_evaluator.calculate_hand_strength(hand1, board)
-        strength2 = self.hand_evaluator.calculate_hand_strength(hand2, board)
-        
-        if strength1 > strength2:
-            return 0.8  # Strong advantage
-        elif strength1 < strength2:
-            return 0.2  # Disadvantage
-        else:
-            return 0.5  # Roughly equal
+        result = equity_engine.range_vs_range(
+            range1, range2, board, tolerance=0.005, time_budget_ms=time_budget_ms
+        )
+        return result.equity
     
     def get_range_strength_distribution(self, range_hands: List[str], 
                                        board: List[str]) -> Dict[str, float]:
@@ -376,21 +327,10 @@ class RangeAnalyzer:
         if not range_hands:
             return {"strong": 0.0, "medium": 0.0, "weak": 0.0}
             
-        strong_count = 0
-        medium_count = 0
-        weak_count = 0
-        
-        for hand in range_hands:
-            cards = self._hand_notation_to_cards(hand)
-            if cards:
-                strength = self.hand_evaluator.calculate_hand_strength(cards, board)
-                
-                if strength >= 0.65:
-                    strong_count += 1
-                elif strength >= 0.35:
-                    medium_count += 1
-                else:
-                    weak_count += 1
+        _, strengths = self._range_strengths(range_hands, board)
+        strong_count = int(np.count_nonzero(strengths >= 0.65))
+        medium_count = int(np.count_nonzero((strengths >= 0.35) & (strengths < 0.65)))
+        weak_count = int(np.count_nonzero(strengths < 0.35))
         
         total = len(range_hands)
         return {
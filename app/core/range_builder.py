@@ -0,0 +1,219 @@
+"""
+Solver ranges built from a hand's betting history.
+
+``RangeBuilder`` starts every live player from the RangeAnalyzer preflop
+charts (open, 3-bet or call, by what the player did preflop) and narrows
+those ranges street by street: each postflop action re-weights combos by
+their equity bucket on that street's board.  Buckets depend only on the
+board, so they are computed once per board and cached.
+
+``to_solver_range`` turns the combo weights into weighted TexasSolver range
+text (``'AA,KK,AKs:0.45'``), dropping hands whose weight has fallen below
+``MIN_HAND_WEIGHT`` so narrowed ranges keep solve trees small.
+"""
+
+import functools
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.api.models import ActionType, Position, TableState
+from app.core import hand_combos, table_evaluator
+from app.core.range_analyzer import RangeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+NUM_BUCKETS = 5
+BUCKET_CACHE_SIZE = 512
+
+# Weight an action leaves on each equity bucket, weakest to strongest.
+# Bets are polarized (value plus bluffs), calls are condensed, checks cap the range.
+ACTION_BUCKET_WEIGHTS = {
+    ActionType.BET: (0.35, 0.10, 0.25, 0.70, 1.00),
+    ActionType.RAISE: (0.25, 0.05, 0.15, 0.55, 1.00),
+    ActionType.ALL_IN: (0.15, 0.00, 0.10, 0.40, 1.00),
+    ActionType.CALL: (0.05, 0.45, 0.90, 1.00, 0.60),
+    ActionType.CHECK: (1.00, 1.00, 0.80, 0.50, 0.30),
+}
+
+# Hands below this weight (relative to the heaviest hand) are left out of solver ranges
+MIN_HAND_WEIGHT = 0.15
+
+# Board cards dealt by the start of each postflop street
+STREET_BOARD_SIZES = {"FLOP": 3, "TURN": 4, "RIVER": 5}
+
+# Postflop acting order; later positions act last (are in position)
+POSTFLOP_ORDER = [
+    Position.SB, Position.BB, Position.UTG, Position.UTG1, Position.UTG2, Position.MP,
+    Position.MP1, Position.LJ, Position.HJ, Position.CO, Position.BTN,
+]
+
+
+def postflop_rank(position: Position, heads_up: bool = False) -> int:
+    """
+    Postflop acting order of a position; higher ranks act later.
+
+    Heads-up the small blind is the button and acts last; with more players
+    dealt in it acts first.
+    """
+    if heads_up and position == Position.SB:
+        return len(POSTFLOP_ORDER)
+    return POSTFLOP_ORDER.index(position)
+
+
+# Positions without a preflop chart borrow their neighbour's
+_CHART_POSITIONS = {Position.UTG2: Position.UTG1, Position.MP1: Position.MP}
+
+_AGGRESSIVE = (ActionType.BET, ActionType.RAISE, ActionType.ALL_IN)
+
+# Hand class ('AKs') of every combo in ALL_COMBOS, for collapsing weights to notation
+_COMBO_CLASSES: List[str] = []
+for _low, _high in hand_combos.ALL_COMBOS.tolist():  # Codes ascend, so _high holds the higher rank
+    _r1, _r2 = table_evaluator.RANK_CHARS[_high >> 2].upper(), table_evaluator.RANK_CHARS[_low >> 2].upper()
+    _COMBO_CLASSES.append(_r1 + _r2 if _r1 == _r2 else _r1 + _r2 + ("s" if _high & 3 == _low & 3 else "o"))
+_CLASS_NAMES, _CLASS_OF_COMBO = np.unique(np.array(_COMBO_CLASSES), return_inverse=True)
+
+
+@functools.lru_cache(maxsize=BUCKET_CACHE_SIZE)
+def equity_buckets(board: Tuple[int, ...]) -> np.ndarray:
+    """
+    Equity bucket (0 = weakest) of every combo on a 3-5 card board.
+
+    Equity is the share of random hands a combo beats, averaged over every
+    next card on flops and turns.  Combos blocked by the board get -1.
+    The returned array is cached and read-only.
+    """
+    board = tuple(int(c) for c in board)
+    combos = hand_combos.ALL_COMBOS
+    live = ~np.isin(combos, board).any(axis=1)
+    runouts = [()] if len(board) >= 5 else [(c,) for c in range(52) if c not in board]
+
+    equity = np.zeros(hand_combos.NUM_COMBOS)
+    counts = np.zeros(hand_combos.NUM_COMBOS)
+    for runout in runouts:
+        dealt = live & ~np.isin(combos, runout).any(axis=1)
+        strength = table_evaluator.evaluate_batch(combos[dealt], board + runout)
+        ordered = np.sort(strength)
+        below = np.searchsorted(ordered, strength, side="left")
+        ties = np.searchsorted(ordered, strength, side="right") - below - 1
+        equity[dealt] += (below + 0.5 * ties) / max(len(strength) - 1, 1)
+        counts[dealt] += 1
+
+    buckets = np.full(hand_combos.NUM_COMBOS, -1, dtype=np.int8)
+    share = equity[live] / np.maximum(counts[live], 1)
+    buckets[live] = np.minimum((share * NUM_BUCKETS).astype(np.int8), NUM_BUCKETS - 1)
+    buckets.setflags(write=False)
+    return buckets
+
+
+def to_solver_range(weights: np.ndarray, min_weight: float = MIN_HAND_WEIGHT,
+                    dead_cards: Sequence[int] = ()) -> str:
+    """
+    Weighted TexasSolver range text from per-combo weights.
+
+    Each hand class gets the mean weight of its combos that avoid the dead
+    cards, scaled so the heaviest class is 1.0; classes under min_weight
+    are dropped.
+    """
+    live = ~np.isin(hand_combos.ALL_COMBOS, list(dead_cards)).any(axis=1)
+    totals = np.bincount(_CLASS_OF_COMBO[live], weights=weights[live], minlength=len(_CLASS_NAMES))
+    sizes = np.bincount(_CLASS_OF_COMBO[live], minlength=len(_CLASS_NAMES))
+    class_weights = totals / np.maximum(sizes, 1)
+    if class_weights.max(initial=0.0) <= 0:
+        return ""
+    class_weights /= class_weights.max()
+
+    entries = []
+    for i in np.argsort(-class_weights, kind="stable"):
+        weight = round(float(class_weights[i]), 2)
+        if weight < min_weight:
+            break
+        entries.append(str(_CLASS_NAMES[i]) if weight >= 1.0 else f"{_CLASS_NAMES[i]}:{weight:g}")
+    return ",".join(entries)
+
+
+class RangeBuilder:
+    """Builds each live player's range from positions and betting history."""
+
+    def __init__(self, analyzer: Optional[RangeAnalyzer] = None, min_weight: float = MIN_HAND_WEIGHT):
+        self.analyzer = analyzer or RangeAnalyzer()
+        self.min_weight = min_weight
+
+    def build(self, state: TableState) -> Dict[int, np.ndarray]:
+        """
+        Combo weights (indexed like ALL_COMBOS) for every live player with a position.
+
+        Players who folded at any point are left out.
+        """
+        folded = {action.seat for street in state.betting_history for action in street.actions
+                  if action.action == ActionType.FOLD}
+        positions = {s.seat: s.position for s in state.seats
+                     if s.in_hand and s.position is not None and s.seat not in folded}
+        preflop = next((street for street in state.betting_history if street.street == "PREFLOP"), None)
+        lines = self._preflop_lines(preflop.actions if preflop else [])
+
+        ranges = {}
+        for seat, position in positions.items():
+            chart = _CHART_POSITIONS.get(position, position)
+            hands = self.analyzer.get_preflop_range(chart, lines.get(seat, "open"))
+            ranges[seat] = np.zeros(hand_combos.NUM_COMBOS)
+            for hand in hands:
+                for combo in hand_combos.expand_notation(hand):
+                    ranges[seat][hand_combos.COMBO_INDEX[combo]] = 1.0
+
+        board = table_evaluator.cards_to_codes(state.board)
+        for street in state.betting_history:
+            size = STREET_BOARD_SIZES.get(street.street)
+            if size is None or len(board) < size:
+                continue
+            buckets = equity_buckets(tuple(board[:size]))
+            for action in street.actions:
+                if action.seat not in ranges or action.action not in ACTION_BUCKET_WEIGHTS:
+                    continue
+                table = np.asarray(ACTION_BUCKET_WEIGHTS[action.action])
+                ranges[action.seat] = np.where(buckets >= 0, ranges[action.seat] * table[buckets], 0.0)
+        return ranges
+
+    @staticmethod
+    def _preflop_lines(actions: Sequence) -> Dict[int, str]:
+        """Preflop chart per seat: 'open' for the first raiser, '3bet' for re-raisers, else 'call'."""
+        lines: Dict[int, str] = {}
+        raises = 0
+        for action in actions:
+            if action.action in _AGGRESSIVE:
+                raises += 1
+                lines[action.seat] = "open" if raises == 1 else "3bet"
+            elif action.action in (ActionType.CALL, ActionType.CHECK):
+                lines.setdefault(action.seat, "call")
+        return lines
+
+    def solver_ranges(self, state: TableState) -> Optional[Tuple[str, str]]:
+        """
+        Weighted (ip_range, oop_range) text for a heads-up solve.
+
+        The hero is paired with the current aggressor, or else the first
+        other live player; a table with only two positioned seats is
+        heads-up, where the SB is the button.  Returns None when either player's position is
+        unknown or a range narrows to nothing.
+        """
+        ranges = self.build(state)
+        positions = {s.seat: s.position for s in state.seats if s.seat in ranges}
+        hero = state.hero_seat
+        if hero is None:
+            hero = next((s.seat for s in state.seats if s.is_hero), None)
+        if hero not in ranges:
+            return None
+        others = [seat for seat in ranges if seat != hero]
+        if not others:
+            return None
+        villain = state.current_aggressor_seat if state.current_aggressor_seat in others else others[0]
+
+        heads_up = sum(1 for s in state.seats if s.position is not None) == 2
+        oop, ip = sorted((hero, villain), key=lambda seat: postflop_rank(positions[seat], heads_up))
+        board = table_evaluator.cards_to_codes(state.board)
+        ip_text = to_solver_range(ranges[ip], self.min_weight, board)
+        oop_text = to_solver_range(ranges[oop], self.min_weight, board)
+        if not ip_text or not oop_text:
+            return None
+        return ip_text, oop_text
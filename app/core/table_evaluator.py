@@ -0,0 +1,376 @@
+"""Table-driven poker hand evaluation on integer card codes.
+
+Cards are encoded as ``rank * 4 + suit`` (ranks 2..A = 0..12, suits h/d/c/s =
+0..3), the same layout used by ``HandEvaluator.card_to_int`` and the OpenSpiel
+adapter.  Every hand of 1-7 cards maps to a single int strength where a larger
+value is a better hand, so hands compare with plain ``<`` / ``>``.
+
+Non-flush hands are looked up by the product of per-rank primes (unique for
+every rank multiset); flushes and straight flushes are looked up by the 13-bit
+rank mask of the flush suit.  Both tables are built once, lazily, on first use.
+
+The array evaluator swaps the prime-product binary search for a perfect hash:
+a hand's rank counts, read as a base-5 number, split into a low (2..8) and a
+high (9..A) half, and ``offset[low] + rank[high]`` indexes a dense copy of the
+non-flush values.  That index is derived from the sorted tables on first use.
+"""
+
+import itertools
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RANK_CHARS = "23456789tjqka"
+SUIT_CHARS = "hdcs"
+RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Category values match HandEvaluator.HAND_RANKINGS (royal flush is scored
+# as the ace-high straight flush)
+HIGH_CARD = 1
+PAIR = 2
+TWO_PAIR = 3
+THREE_OF_A_KIND = 4
+STRAIGHT = 5
+FLUSH = 6
+FULL_HOUSE = 7
+FOUR_OF_A_KIND = 8
+STRAIGHT_FLUSH = 9
+
+CATEGORY_SHIFT = 20
+
+# Number of meaningful kicker nibbles stored for each category
+KICKER_COUNTS = {
+    HIGH_CARD: 5, PAIR: 4, TWO_PAIR: 3, THREE_OF_A_KIND: 3, STRAIGHT: 1,
+    FLUSH: 5, FULL_HOUSE: 2, FOUR_OF_A_KIND: 2, STRAIGHT_FLUSH: 1,
+}
+
+_CARD_CODES: Dict[str, int] = {
+    r + s: i * 4 + j
+    for i, r in enumerate(RANK_CHARS)
+    for j, s in enumerate(SUIT_CHARS)
+}
+
+# Per-code prime and suit-plane bit used by the scalar evaluator
+_CODE_PRIMES = tuple(RANK_PRIMES[c >> 2] for c in range(52))
+_CODE_PLANE_BITS = tuple(1 << ((c & 3) * 16 + (c >> 2)) for c in range(52))
+_PRIME_ARRAY = np.asarray(RANK_PRIMES, dtype=np.int64)
+_PLANE_ARRAY = np.asarray(_CODE_PLANE_BITS, dtype=np.int64)
+
+# Base-5 rank-count digits of each code, and the low/high split of that number
+_LOW_RANKS = 7
+_LOW_BASE = 5 ** _LOW_RANKS
+_QUINARY_ARRAY = np.asarray([5 ** (c >> 2) for c in range(52)], dtype=np.int32)
+
+# Straight masks from ace-high down to the wheel (high card rank, mask)
+_STRAIGHTS = [(high, 0b11111 << (high - 4)) for high in range(12, 3, -1)]
+_STRAIGHTS.append((3, 0b1000000001111))
+
+_tables: Optional[Tuple[Dict[int, int], np.ndarray, np.ndarray, np.ndarray]] = None
+_rank_index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def card_to_code(card: str) -> int:
+    """Convert a card string like 'Ah' to its integer code (-1 if invalid)."""
+    return _CARD_CODES.get(card.lower(), -1) if card else -1
+
+
+def cards_to_codes(cards: Iterable[str]) -> List[int]:
+    """Convert card strings to codes, dropping empty or invalid cards."""
+    codes = []
+    for card in cards:
+        code = card_to_code(card)
+        if code >= 0:
+            codes.append(code)
+    return codes
+
+
+def code_to_card(code: int) -> str:
+    """Convert an integer code back to a card string like 'ah'."""
+    if code < 0 or code >= 52:
+        return ""
+    return RANK_CHARS[code >> 2] + SUIT_CHARS[code & 3]
+
+
+def make_strength(category: int, kickers: Sequence[int]) -> int:
+    """Pack a category and up to five kicker ranks into a comparable int."""
+    value = category << CATEGORY_SHIFT
+    for i, rank in enumerate(kickers[:5]):
+        value |= rank << (16 - 4 * i)
+    return value
+
+
+def strength_category(strength: int) -> int:
+    """Return the hand category (HIGH_CARD..STRAIGHT_FLUSH) of a strength."""
+    return strength >> CATEGORY_SHIFT
+
+
+def strength_kickers(strength: int) -> List[int]:
+    """Unpack the kicker ranks stored in a strength value."""
+    count = KICKER_COUNTS.get(strength >> CATEGORY_SHIFT, 0)
+    return [(strength >> (16 - 4 * i)) & 0xF for i in range(count)]
+
+
+def _straight_high(mask: int) -> int:
+    """Return the high rank of the best straight in a rank mask, or -1."""
+    for high, pattern in _STRAIGHTS:
+        if mask & pattern == pattern:
+            return high
+    return -1
+
+
+def _score_rank_counts(counts: Sequence[int]) -> int:
+    """Best non-flush strength for a rank-count vector (index = rank)."""
+    by_count: List[List[int]] = [[] for _ in range(5)]
+    for rank in range(12, -1, -1):
+        by_count[counts[rank]].append(rank)
+    present = [r for r in range(12, -1, -1) if counts[r]]
+
+    if by_count[4]:
+        quad = by_count[4][0]
+        kickers = [r for r in present if r != quad][:1]
+        return make_strength(FOUR_OF_A_KIND, [quad] + kickers)
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        pairs = [r for r in present if r != trips and counts[r] >= 2]
+        if pairs:
+            return make_strength(FULL_HOUSE, [trips, pairs[0]])
+
+    if len(present) >= 5:
+        mask = 0
+        for rank in present:
+            mask |= 1 << rank
+        high = _straight_high(mask)
+        if high >= 0:
+            return make_strength(STRAIGHT, [high])
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        return make_strength(THREE_OF_A_KIND, [trips] + [r for r in present if r != trips][:2])
+
+    if len(by_count[2]) >= 2:
+        high_pair, low_pair = by_count[2][0], by_count[2][1]
+        kickers = [r for r in present if r not in (high_pair, low_pair)][:1]
+        return make_strength(TWO_PAIR, [high_pair, low_pair] + kickers)
+
+    if by_count[2]:
+        pair = by_count[2][0]
+        return make_strength(PAIR, [pair] + [r for r in present if r != pair][:3])
+
+    return make_strength(HIGH_CARD, present[:5])
+
+
+def _score_flush_mask(mask: int) -> int:
+    """Strength of the best flush/straight flush inside a suited rank mask."""
+    high = _straight_high(mask)
+    if high >= 0:
+        return make_strength(STRAIGHT_FLUSH, [high])
+    ranks = [r for r in range(12, -1, -1) if mask >> r & 1]
+    return make_strength(FLUSH, ranks[:5])
+
+
+def _build_tables() -> Tuple[Dict[int, int], np.ndarray, np.ndarray, np.ndarray]:
+    """Enumerate every rank multiset of 1-7 cards and every 13-bit flush mask."""
+    rank_table: Dict[int, int] = {}
+    for size in range(1, 8):
+        for combo in itertools.combinations_with_replacement(range(13), size):
+            counts = [0] * 13
+            for rank in combo:
+                counts[rank] += 1
+            if max(counts) > 4:
+                continue
+            key = 1
+            for rank in combo:
+                key *= RANK_PRIMES[rank]
+            rank_table[key] = _score_rank_counts(counts)
+
+    keys = np.fromiter(sorted(rank_table), dtype=np.int64, count=len(rank_table))
+    values = np.array([rank_table[int(k)] for k in keys], dtype=np.int32)
+
+    flush_table = np.zeros(1 << 13, dtype=np.int32)
+    for mask in range(1 << 13):
+        if mask.bit_count() >= 5:
+            flush_table[mask] = _score_flush_mask(mask)
+
+    logger.debug(f"Hand lookup tables built: {len(rank_table)} rank keys")
+    return rank_table, keys, values, flush_table
+
+
+def get_tables() -> Tuple[Dict[int, int], np.ndarray, np.ndarray, np.ndarray]:
+    """Return (rank_dict, sorted_keys, sorted_values, flush_table), building on first use."""
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+def install_tables(keys: np.ndarray, values: np.ndarray, flush_table: np.ndarray) -> None:
+    """
+    Use prebuilt lookup arrays (e.g. views into shared memory) instead of
+    building them in this process.  Only the scalar-lookup dict is rebuilt.
+    """
+    global _tables, _rank_index
+    rank_table = dict(zip(keys.tolist(), values.tolist()))
+    _tables = (rank_table, keys, values, flush_table)
+    _rank_index = None
+
+
+def _count_vectors(num_ranks: int) -> np.ndarray:
+    """Every per-rank count vector (0-4 each) over num_ranks ranks holding at most 7 cards."""
+    digits = np.indices((5,) * num_ranks).reshape(num_ranks, -1).T[:, ::-1]
+    return digits[digits.sum(axis=1) <= 7]
+
+
+def _build_rank_index(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Perfect hash over rank multisets of up to 7 cards.
+
+    High halves are numbered in order of card count, so the high halves that
+    fit next to a low half holding n cards are exactly the first
+    ``fits[7 - n]``; each low half gets that many consecutive slots.
+    """
+    low = _count_vectors(_LOW_RANKS)
+    high = _count_vectors(13 - _LOW_RANKS)
+    high = high[np.argsort(high.sum(axis=1), kind="stable")]
+    fits = np.searchsorted(high.sum(axis=1), np.arange(8), side="right")
+
+    powers = 5 ** np.arange(13, dtype=np.int64)
+    sizes = fits[7 - low.sum(axis=1)]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    low_offset = np.zeros(_LOW_BASE, dtype=np.int32)
+    low_offset[low @ powers[:_LOW_RANKS]] = starts
+    high_rank = np.zeros(5 ** (13 - _LOW_RANKS), dtype=np.int32)
+    high_rank[high @ powers[:13 - _LOW_RANKS]] = np.arange(len(high))
+
+    # Prime-product key of every slot, looked up in the sorted tables
+    low_slot = np.repeat(np.arange(len(low)), sizes)
+    high_slot = np.arange(len(low_slot)) - starts[low_slot]
+    primes = _PRIME_ARRAY.astype(np.float64)
+    low_key = np.rint(np.prod(primes[:_LOW_RANKS] ** low, axis=1)).astype(np.int64)
+    high_key = np.rint(np.prod(primes[_LOW_RANKS:] ** high, axis=1)).astype(np.int64)
+    slot_keys = low_key[low_slot] * high_key[high_slot]
+    found = np.minimum(np.searchsorted(keys, slot_keys), len(keys) - 1)
+    # The empty hand is the only slot without a table entry
+    slot_values = np.where(keys[found] == slot_keys, values[found], 0).astype(np.int32)
+    return low_offset, high_rank, slot_values
+
+
+def get_rank_index() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (low_offset, high_rank, slot_values) for evaluate_array, deriving them on first use."""
+    global _rank_index
+    if _rank_index is None:
+        _, keys, values, _ = get_tables()
+        _rank_index = _build_rank_index(keys, values)
+    return _rank_index
+
+
+def evaluate_codes(codes: Sequence[int]) -> int:
+    """Evaluate 1-7 card codes and return a comparable int strength."""
+    rank_table, _, _, flush_table = get_tables()
+    key = 1
+    planes = 0
+    for code in codes:
+        key *= _CODE_PRIMES[code]
+        planes |= _CODE_PLANE_BITS[code]
+
+    strength = rank_table[key]
+    if len(codes) >= 5:
+        for shift in (0, 16, 32, 48):
+            mask = (planes >> shift) & 0x1FFF
+            if mask.bit_count() >= 5:
+                strength = max(strength, int(flush_table[mask]))
+    return strength
+
+
+def evaluate_cards(cards: Iterable[str]) -> int:
+    """Evaluate card strings (e.g. ['ah', 'kd', ...]); 0 when no valid cards."""
+    codes = cards_to_codes(cards)
+    return evaluate_codes(codes) if codes else 0
+
+
+def evaluate_array(codes: np.ndarray) -> np.ndarray:
+    """Evaluate an ``[N, k]`` array of card codes (k <= 7) in one pass.
+
+    Returns an int32 array of N strengths, identical to calling
+    ``evaluate_codes`` on every row.  Any integer dtype is accepted; int8
+    codes avoid a widening copy.
+    """
+    flush_table = get_tables()[3]
+    low_offset, high_rank, slot_values = get_rank_index()
+    codes = np.asarray(codes)
+    if codes.ndim != 2:
+        raise ValueError(f"expected an [N, k] array of card codes, got shape {codes.shape}")
+    if codes.dtype.kind not in "iu":
+        codes = codes.astype(np.int64)
+    if codes.shape[0] == 0 or codes.shape[1] == 0:
+        return np.zeros(codes.shape[0], dtype=np.int32)
+
+    # One column at a time: base-5 rank counts and four 16-bit suit planes
+    first = codes[:, 0]
+    quinary = _QUINARY_ARRAY[first]
+    planes = _PLANE_ARRAY[first]
+    for column in range(1, codes.shape[1]):
+        card = codes[:, column]
+        quinary += _QUINARY_ARRAY[card]
+        planes |= _PLANE_ARRAY[card]
+    strength = slot_values[low_offset[quinary % _LOW_BASE] + high_rank[quinary // _LOW_BASE]]
+
+    if codes.shape[1] >= 5:
+        # Each suit plane is one 16-bit lane, i.e. that suit's 13-bit rank mask
+        suits = flush_table[planes.view(np.uint16)].reshape(-1, 4)
+        np.maximum(strength, np.maximum(np.maximum(suits[:, 0], suits[:, 1]),
+                                        np.maximum(suits[:, 2], suits[:, 3])), out=strength)
+    return strength
+
+
+def _board_rank_table(board_codes: Sequence[int]) -> np.ndarray:
+    """13x13 non-flush strengths for every hole-rank pair on a fixed board."""
+    rank_table = get_tables()[0]
+    board_key = 1
+    for code in board_codes:
+        board_key *= _CODE_PRIMES[code]
+
+    table = np.full((13, 13), -1, dtype=np.int32)
+    for r1 in range(13):
+        for r2 in range(r1, 13):
+            value = rank_table.get(board_key * RANK_PRIMES[r1] * RANK_PRIMES[r2], -1)
+            table[r1, r2] = table[r2, r1] = value
+    return table
+
+
+def evaluate_batch(hands: np.ndarray, board: Sequence[int]) -> np.ndarray:
+    """Evaluate ``[N, 2]`` hole-card codes against one shared board of 0-5 codes.
+
+    The board is folded into a 13x13 rank-pair table and a suit-plane word up
+    front, so each hand costs one table gather plus a flush check on the suits
+    that can still make a flush.  Hands that reuse a board card (or hold the
+    same card twice) come back as -1.
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    if hands.ndim != 2 or hands.shape[1] != 2:
+        raise ValueError(f"expected an [N, 2] array of hole-card codes, got shape {hands.shape}")
+    board = [int(c) for c in board]
+    if len(board) > 5:
+        raise ValueError(f"board can hold at most 5 cards, got {len(board)}")
+    flush_table = get_tables()[3]
+
+    h0, h1 = hands[:, 0], hands[:, 1]
+    strength = _board_rank_table(board)[h0 >> 2, h1 >> 2]
+
+    board_planes = 0
+    for code in board:
+        board_planes |= _CODE_PLANE_BITS[code]
+    if len(board) + 2 >= 5:
+        planes = _PLANE_ARRAY[h0] | _PLANE_ARRAY[h1] | board_planes
+        for suit in range(4):
+            # A flush needs at least three board cards of the suit
+            if ((board_planes >> (16 * suit)) & 0x1FFF).bit_count() >= 3:
+                mask = (planes >> (16 * suit)) & 0x1FFF
+                strength = np.maximum(strength, flush_table[mask])
+
+    used = np.int64(sum(1 << c for c in set(board)))
+    conflict = (h0 == h1) | (((np.left_shift(1, h0) | np.left_shift(1, h1)) & used) != 0)
+    return np.where(conflict, -1, strength).astype(np.int32)
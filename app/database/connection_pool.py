@@ -0,0 +1,95 @@
+"""
+Pooled SQLite connections for the GTO store.
+One persistent read connection per thread plus a single shared writer, all in
+WAL mode so readers never block behind a writer (and vice versa).
+"""
+
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning (sizes in bytes unless noted)
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KB = 64 * 1024
+DEFAULT_CACHED_STATEMENTS = 256
+BUSY_TIMEOUT_SECONDS = 30.0
+
+
+class SQLiteConnectionPool:
+    """Thread-local read connections and one serialized writer for a database file."""
+
+    def __init__(self, db_path: Union[str, Path],
+                 mmap_size: int = DEFAULT_MMAP_SIZE,
+                 cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS):
+        self.db_path = Path(db_path)
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._all_connections: List[sqlite3.Connection] = []
+        self._registry_lock = threading.Lock()
+        # Bumped by close_all so threads drop connections to a closed pool
+        self._generation = 0
+
+    def _connect(self, check_same_thread: bool) -> sqlite3.Connection:
+        """Open a tuned connection (statement cache, WAL, mmap, page cache)."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=check_same_thread,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._registry_lock:
+            self._all_connections.append(conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """This thread's persistent read connection (rows are sqlite3.Row)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "generation", -1) != self._generation:
+            conn = self._connect(check_same_thread=True)
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect(check_same_thread=False)
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    def close_all(self):
+        """Close every connection handed out so far (threads reconnect lazily)."""
+        with self._write_lock, self._registry_lock:
+            for conn in self._all_connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    # Thread-bound reader closed from another thread; SQLite
+                    # releases it when that thread's connection is collected
+                    pass
+            self._all_connections.clear()
+            self._writer = None
+            self._generation += 1
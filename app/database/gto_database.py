@@ -3,21 +3,25 @@ GTO Database System for Instant Poker Recommendations
 Combines precomputed CFR solutions with fast similarity search using HNSW.
 """
 
-import sqlite3
 import numpy as np
+import itertools
 import json
 import time
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import threading
 
-from .poker_vectorizer import PokerVectorizer, PokerSituation
+from .poker_vectorizer import BettingRound, PokerVectorizer, PokerSituation, Position
+from .connection_pool import SQLiteConnectionPool
+from .rwlock import ReadWriteLock
+from app.core import canonical, preflop_tables
 
 # Handle optional hnswlib import
 try:
     import hnswlib
+    from .sharded_index import ShardedHNSWIndex
     HNSWLIB_AVAILABLE = True
 except ImportError:
     HNSWLIB_AVAILABLE = False
@@ -26,6 +30,45 @@ logger = logging.getLogger(__name__)
 
 logger = logging.getLogger(__name__)
 
+# Bound parameters per IN (...) query (SQLite's historical default limit is 999)
+SQLITE_MAX_VARIABLES = 900
+
+# Rebuild the index once this many upserts/deletes have left dead graph
+# nodes behind, relative to the live count (with a floor for small stores)
+COMPACTION_RATIO = 0.25
+COMPACTION_MIN_STALE = 1000
+
+# HNSW index sizing: starting capacity of each shard, and the factor a
+# shard's capacity grows by whenever an insert would overflow it
+INDEX_INITIAL_CAPACITY = 10000
+INDEX_GROWTH_FACTOR = 2.0
+
+# Neighbour aggregation weighs each of the k rows by 1 / (distance + epsilon)
+NEIGHBOUR_DISTANCE_EPSILON = 0.01
+
+# add_solutions_bulk: situations per executemany/add_items chunk, and
+# chunks between index saves
+BULK_CHUNK_SIZE = 5000
+BULK_CHECKPOINT_CHUNKS = 20
+
+# Upsert in place: an existing row (and its rowid) survives updates
+_UPSERT_SQL = """
+    INSERT INTO gto_situations 
+    (id, vector, hole_cards, board_cards, position, pot_size, 
+     bet_to_call, stack_size, betting_round, recommendation, 
+     bet_size, equity, reasoning, cfr_confidence, metadata, hnsw_label)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        vector = excluded.vector, hole_cards = excluded.hole_cards,
+        board_cards = excluded.board_cards, position = excluded.position,
+        pot_size = excluded.pot_size, bet_to_call = excluded.bet_to_call,
+        stack_size = excluded.stack_size, betting_round = excluded.betting_round,
+        recommendation = excluded.recommendation, bet_size = excluded.bet_size,
+        equity = excluded.equity, reasoning = excluded.reasoning,
+        cfr_confidence = excluded.cfr_confidence, metadata = excluded.metadata,
+        hnsw_label = excluded.hnsw_label
+"""
+
 @dataclass
 class GTOSolution:
     """Precomputed GTO solution for a poker situation."""
@@ -38,31 +81,78 @@ class GTOSolution:
     cfr_confidence: float
     metadata: Dict[str, Any]
 
+def solution_from_record(record: Dict[str, Any]) -> Tuple[PokerSituation, Dict[str, Any]]:
+    """
+    (situation, solution) pair for add_solutions_bulk from a row shaped like
+    gto_situations (card and metadata fields may be JSON strings).
+    """
+    def decoded(value, default):
+        return json.loads(value) if isinstance(value, str) else (value if value is not None else default)
+    
+    situation = PokerSituation(
+        hole_cards=decoded(record['hole_cards'], []),
+        board_cards=decoded(record.get('board_cards'), []),
+        position=Position(int(record['position'])),
+        pot_size=float(record['pot_size']),
+        bet_to_call=float(record['bet_to_call']),
+        stack_size=float(record['stack_size']),
+        num_players=int(record.get('num_players', 2)),
+        betting_round=BettingRound(int(record['betting_round'])),
+    )
+    solution = {
+        'decision': record['recommendation'],
+        'bet_size': record.get('bet_size', 0),
+        'equity': record.get('equity', 0.0),
+        'reasoning': record.get('reasoning', ''),
+        'confidence': record.get('cfr_confidence', 0.0),
+        'metadata': decoded(record.get('metadata'), {}),
+    }
+    return situation, solution
+
 class GTODatabase:
     """High-performance GTO recommendation database with similarity search."""
     
     def __init__(self, db_path: str = "gto_database.db", index_path: str = "gto_index.bin"):
         self.db_path = Path(db_path)
         self.index_path = Path(index_path)
+        # Shard list and size parameters, saved alongside the shard .bin files
+        self.index_meta_path = self.index_path.with_suffix('.meta.json')
         self.vectorizer = PokerVectorizer()
         self.gto_service = None  # Will be lazy-loaded
         
-        # HNSW Index for similarity search
+        # Persistent WAL connections: one reader per thread, one shared writer
+        self.pool = SQLiteConnectionPool(self.db_path)
+        
+        # HNSW Index for similarity search, sharded by street, facing bet and
+        # position group; max_elements is the starting capacity of each shard
         self.dimension = 32
-        self.max_elements = 100000
+        self.max_elements = INDEX_INITIAL_CAPACITY
+        self.index_m = 16
+        self.index_ef_construction = 200
+        self.index_ef = 50
         self.hnsw_index = None
         
-        # Thread safety
-        self.lock = threading.RLock()
+        # Label bookkeeping: each row owns a stable hnsw_label; upserts take a
+        # fresh label and mark the old one deleted until the next compaction
+        self._next_label = 0
+        self._live_labels = 0
+        self._stale_labels = 0
+        
+        # Thread safety: lookups share self.lock; add_solution/rebuild_index
+        # serialize on _write_mutex and only take self.lock exclusively to
+        # mutate or swap the index
+        self.lock = ReadWriteLock()
+        self._write_mutex = threading.RLock()
         self.initialized = False
         
         # Performance tracking
+        self._stats_lock = threading.Lock()
         self.query_count = 0
         self.total_query_time = 0.0
         
     def initialize(self):
         """Initialize database and HNSW index."""
-        with self.lock:
+        with self._write_mutex:
             if self.initialized:
                 return
                 
@@ -87,7 +177,7 @@ class GTODatabase:
     
     def _create_database(self):
         """Create SQLite database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.writer() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS gto_situations (
                     id TEXT PRIMARY KEY,
@@ -105,10 +195,22 @@ class GTODatabase:
                     reasoning TEXT NOT NULL,
                     cfr_confidence REAL NOT NULL,
                     metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    hnsw_label INTEGER
                 )
             """)
             
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(gto_situations)")}
+            if 'hnsw_label' not in columns:
+                # Older stores implied the label as rowid - 1
+                conn.execute("ALTER TABLE gto_situations ADD COLUMN hnsw_label INTEGER")
+                conn.execute("UPDATE gto_situations SET hnsw_label = rowid - 1")
+            
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_hnsw_label 
+                ON gto_situations(hnsw_label)
+            """)
+            
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_recommendation 
                 ON gto_situations(recommendation)
@@ -123,107 +225,208 @@ class GTODatabase:
                 CREATE INDEX IF NOT EXISTS idx_equity 
                 ON gto_situations(equity)
             """)
+            
+            # Items consumed by interrupted add_solutions_bulk jobs
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bulk_progress (
+                    job TEXT PRIMARY KEY,
+                    consumed INTEGER NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
     
     def _initialize_hnsw_index(self):
         """Initialize HNSW index for fast similarity search."""
         if not HNSWLIB_AVAILABLE:
             logger.warning("HNSW not available, using fallback search")
             self.hnsw_index = None
+            self._sync_labels()
             return
             
-        self.hnsw_index = hnswlib.Index(space='cosine', dim=self.dimension)
-        
-        if self.index_path.exists():
+        if self.index_meta_path.exists():
             logger.info("Loading existing HNSW index...")
             try:
-                self.hnsw_index.load_index(str(self.index_path))
-                logger.info(f"HNSW index loaded: {self.hnsw_index.get_current_count()} elements")
+                meta = self._load_index_meta()
+                self.hnsw_index = ShardedHNSWIndex.load(self.index_path, meta, self.dimension)
+                logger.info(f"HNSW index loaded: {self.hnsw_index.get_current_count()} elements "
+                            f"in {len(self.hnsw_index.shards)} shards")
+                self._sync_labels()
                 return
             except Exception as e:
                 logger.warning(f"Failed to load index: {e}, creating new one")
+        elif self.index_path.exists():
+            logger.info("Unsharded HNSW index found, re-indexing from the database")
         
         # Initialize new index
-        self.hnsw_index.init_index(
-            max_elements=self.max_elements,
-            ef_construction=200,
-            M=16
+        self.hnsw_index = self._create_hnsw_index()
+        self._sync_labels()
+    
+    def _sync_labels(self):
+        """
+        Reconcile the label counters (and a loaded index) with the database.
+        
+        Labels the database no longer owns are marked deleted; live labels
+        the index is missing are indexed from their stored vectors.
+        """
+        labels = {row[0] for row in self.pool.reader().execute("SELECT hnsw_label FROM gto_situations")}
+        index_labels = set(self.hnsw_index.get_ids_list()) if self.hnsw_index is not None else set()
+        self._next_label = max(labels | index_labels, default=-1) + 1
+        self._live_labels = len(labels)
+        self._stale_labels = len(index_labels - labels)
+        
+        if self.hnsw_index is None:
+            return
+        missing = labels - index_labels
+        if missing:
+            # Rows committed after the last index save (e.g. an interrupted bulk add)
+            logger.warning(f"HNSW index is missing {len(missing)} database rows, indexing them")
+            try:
+                self._index_rows(sorted(missing))
+            except Exception as e:
+                logger.warning(f"Failed to index missing rows: {e}, rebuilding")
+                self.rebuild_index()
+                return
+        for label in index_labels - labels:
+            try:
+                self.hnsw_index.mark_deleted(label)
+            except RuntimeError:
+                pass  # Already deleted when the index was saved
+    
+    def _load_index_meta(self) -> Dict[str, Any]:
+        """Read the saved shard list and restore the size parameters saved with it."""
+        meta = json.loads(self.index_meta_path.read_text())
+        if meta.get('dimension', self.dimension) != self.dimension:
+            raise ValueError(f"index dimension {meta['dimension']} != {self.dimension}")
+        if 'shards' not in meta:
+            raise ValueError("index metadata lists no shards")
+        self.max_elements = meta.get('shard_capacity', self.max_elements)
+        self.index_m = meta.get('M', self.index_m)
+        self.index_ef_construction = meta.get('ef_construction', self.index_ef_construction)
+        self.index_ef = meta.get('ef', self.index_ef)
+        return meta
+    
+    def _write_index(self, index):
+        """Save an index's shards and its size parameters next to the database."""
+        shards = index.save(self.index_path)
+        meta = {
+            'dimension': self.dimension,
+            'space': 'cosine',
+            'shard_capacity': self.max_elements,
+            'max_elements': index.get_max_elements(),
+            'element_count': index.get_current_count(),
+            'M': self.index_m,
+            'ef_construction': self.index_ef_construction,
+            'ef': self.index_ef,
+            'growth_factor': INDEX_GROWTH_FACTOR,
+            'shards': shards,
+        }
+        tmp_path = self.index_meta_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(meta, indent=2))
+        tmp_path.replace(self.index_meta_path)
+    
+    def _index_rows(self, labels: List[int]):
+        """Add the stored vectors of the given labels to the index."""
+        vectors = []
+        for start in range(0, len(labels), SQLITE_MAX_VARIABLES):
+            chunk = labels[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.pool.reader().execute(
+                f"SELECT hnsw_label, vector FROM gto_situations WHERE hnsw_label IN ({placeholders})", chunk
+            )
+            vectors.extend(cursor.fetchall())
+        with self.lock.write():
+            self._stale_labels -= self.hnsw_index.add_items(
+                np.array([np.frombuffer(row[1], dtype=np.float32) for row in vectors]),
+                np.array([row[0] for row in vectors], dtype=np.int64),
+                replace_deleted=True
+            )
+    
+    def _create_hnsw_index(self):
+        """Create an empty sharded HNSW index with the standard parameters."""
+        return ShardedHNSWIndex(
+            self.dimension,
+            space='cosine',
+            shard_capacity=self.max_elements,
+            M=self.index_m,
+            ef_construction=self.index_ef_construction,
+            ef=self.index_ef,  # Query time parameter
+            growth_factor=INDEX_GROWTH_FACTOR
         )
-        self.hnsw_index.set_ef(50)  # Query time parameter
     
     def _get_situation_count(self) -> int:
         """Get total number of situations in database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM gto_situations")
-            return cursor.fetchone()[0]
+        cursor = self.pool.reader().execute("SELECT COUNT(*) FROM gto_situations")
+        return cursor.fetchone()[0]
     
     def get_instant_recommendation(self, situation: PokerSituation, 
-                                 top_k: int = 5) -> Optional[Dict[str, Any]]:
-        """Get instant GTO recommendation using similarity search."""
+                                 top_k: int = 5, aggregate: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get instant GTO recommendation using similarity search.
+        
+        By default the nearest row answers; with ``aggregate`` all top_k
+        neighbours are fetched in one query and blended (see
+        _aggregate_recommendation).
+        """
         if not self.initialized:
             self.initialize()
             
         start_time = time.time()
         
         try:
-            with self.lock:
-                # Vectorize the situation
-                query_vector = self.vectorizer.vectorize_situation(situation)
-                
-                # Find similar situations using HNSW or fallback
-                if self.hnsw_index is None:
-                    # Fallback: simple vector similarity search
-                    return self._fallback_similarity_search(query_vector, top_k)
-                
-                if self.hnsw_index.get_current_count() == 0:
-                    logger.warning("No situations in database for similarity search")
-                    return None
-                
-                # Ensure query_vector is in the right format for HNSW
-                if isinstance(query_vector, list):
-                    query_vector = np.array(query_vector, dtype=np.float32)
-                elif query_vector.dtype != np.float32:
-                    query_vector = query_vector.astype(np.float32)
-                    
-                labels, distances = self.hnsw_index.knn_query(query_vector.reshape(1, -1), k=top_k)
-                
-                # Handle HNSW response format correctly
-                if isinstance(labels[0], (list, tuple, np.ndarray)):
-                    best_label = labels[0][0] if len(labels[0]) > 0 else 0
-                    best_distance = distances[0][0] if len(distances[0]) > 0 else 1.0
-                else:
-                    best_label = labels[0]
-                    best_distance = distances[0]
-                
-                # Get the most similar situation from database
-                best_match = self._get_situation_by_id(best_label)
-                if best_match is None:
+            # Vectorize the situation
+            query_vector = self.vectorizer.vectorize_situation(situation)
+            
+            # Ensure query_vector is in the right format for HNSW
+            if isinstance(query_vector, list):
+                query_vector = np.array(query_vector, dtype=np.float32)
+            elif query_vector.dtype != np.float32:
+                query_vector = query_vector.astype(np.float32)
+            
+            # Shared hold: concurrent lookups proceed, writers wait
+            with self.lock.read():
+                index = self.hnsw_index
+                if index is not None:
+                    if self._live_labels == 0:
+                        logger.warning("No situations in database for similarity search")
+                        return None
+                    labels, distances = index.knn_query(query_vector.reshape(1, -1),
+                                                        k=min(top_k, self._live_labels))
+            
+            # Find similar situations using HNSW or fallback
+            if index is None:
+                # Fallback: simple vector similarity search
+                return self._fallback_similarity_search(query_vector, top_k)
+            
+            if aggregate:
+                rows = self._get_situations_by_ids([int(label) for label in labels[0] if label >= 0])
+                neighbours = [(rows[int(label)], float(distance))
+                              for label, distance in zip(labels[0], distances[0]) if int(label) in rows]
+                if not neighbours:
                     return None
-                
-                # Track performance
                 query_time = time.time() - start_time
-                self.query_count += 1
-                self.total_query_time += query_time
-                
-                # Get similarity score safely
-                similarity_score = float(best_distance)
-                logger.info(f"Instant recommendation found in {query_time*1000:.1f}ms "
-                          f"(similarity: {1-similarity_score:.3f})")
-                
-                # Return formatted response - using dictionary format for now
-                return {
-                    'decision': best_match['recommendation'],
-                    'bet_size': best_match.get('bet_size', 0),
-                    'reasoning': f"Similar situation analysis: {best_match['reasoning']}",
-                    'equity': best_match['equity'],
-                    'confidence': best_match['cfr_confidence'] * (1 - similarity_score),  # Adjust for similarity
-                    'strategy': 'database_lookup',
-                    'metrics': {
-                        'source': 'database_lookup',
-                        'similarity_score': 1 - similarity_score,
-                        'query_time_ms': query_time * 1000,
-                        'similar_situations': len(labels)
-                    }
-                }
+                self._record_queries(1, query_time)
+                return self._aggregate_recommendation(neighbours, query_time)
+            
+            # Get the most similar situation from database, skipping a label
+            # an in-flight upsert has just retired (numpy uint64 labels bind
+            # as blobs in sqlite3, so convert to int first)
+            best_match = None
+            for best_label, best_distance in zip(labels[0], distances[0]):
+                best_match = self._get_situation_by_id(int(best_label))
+                if best_match is not None:
+                    break
+            if best_match is None:
+                return None
+            
+            # Track performance
+            query_time = time.time() - start_time
+            self._record_queries(1, query_time)
+            
+            logger.info(f"Instant recommendation found in {query_time*1000:.1f}ms "
+                      f"(similarity: {1-float(best_distance):.3f})")
+            
+            return self._format_recommendation(best_match, float(best_distance), 
+                                               query_time, len(labels))
                 
         except Exception as e:
             logger.error(f"Database lookup failed: {e}")
@@ -231,27 +434,203 @@ class GTODatabase:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
     
+    def get_instant_recommendations_batch(self, situations: List[PokerSituation], 
+                                          top_k: int = 5, 
+                                          num_threads: int = -1,
+                                          aggregate: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get instant recommendations for many situations at once.
+        
+        All situations are vectorized into one matrix, searched with a single
+        multi-threaded knn_query and resolved with one hnsw_label IN (...) fetch.
+        With ``aggregate`` every query blends all of its k neighbours, as in
+        get_instant_recommendation.
+        
+        Returns:
+            One recommendation (or None on a miss) per input situation, in order
+        """
+        if not self.initialized:
+            self.initialize()
+        if not situations:
+            return []
+            
+        start_time = time.time()
+        
+        try:
+            query_vectors = self.vectorizer.vectorize_situations(situations)
+            
+            with self.lock.read():
+                index = self.hnsw_index
+                if index is not None:
+                    count = self._live_labels
+                    if count == 0:
+                        logger.warning("No situations in database for similarity search")
+                        return [None] * len(situations)
+                    k = min(top_k, count)
+                    labels, distances = index.knn_query(query_vectors, k=k, num_threads=num_threads)
+            
+            if index is None:
+                return [self._fallback_similarity_search(v, top_k) for v in query_vectors]
+            
+            labels = labels.astype(np.int64)
+            if aggregate:
+                rows = self._get_situations_by_ids(np.unique(labels[labels >= 0]).tolist())
+                query_time = time.time() - start_time
+                self._record_queries(len(situations), query_time)
+                per_query_time = query_time / len(situations)
+                results = []
+                for q in range(len(situations)):
+                    neighbours = [(rows[label], float(distance))
+                                  for label, distance in zip(labels[q].tolist(), distances[q]) if label in rows]
+                    results.append(self._aggregate_recommendation(neighbours, per_query_time)
+                                   if neighbours else None)
+                return results
+            
+            matches: List[Optional[Tuple[Dict[str, Any], float]]] = [None] * len(situations)
+            pending = np.arange(len(situations))
+            # Resolve nearest labels first; the rare query whose label was
+            # retired by an in-flight upsert falls through to its next neighbour
+            for column in range(k):
+                rows = self._get_situations_by_ids(np.unique(labels[pending, column]).tolist())
+                unresolved = []
+                for q in pending.tolist():
+                    row = rows.get(int(labels[q, column]))
+                    if row is None:
+                        unresolved.append(q)
+                    else:
+                        matches[q] = (row, float(distances[q, column]))
+                pending = np.array(unresolved, dtype=np.int64)
+                if not len(pending):
+                    break
+            
+            query_time = time.time() - start_time
+            self._record_queries(len(situations), query_time)
+            logger.info(f"Batch of {len(situations)} recommendations in {query_time*1000:.1f}ms")
+            
+            per_query_time = query_time / len(situations)
+            return [
+                self._format_recommendation(match[0], match[1], per_query_time, k)
+                if match is not None else None
+                for match in matches
+            ]
+            
+        except Exception as e:
+            logger.error(f"Batch database lookup failed: {e}")
+            return [None] * len(situations)
+    
+    def _record_queries(self, count: int, seconds: float):
+        """Add completed lookups to the performance counters."""
+        with self._stats_lock:
+            self.query_count += count
+            self.total_query_time += seconds
+    
+    def _format_recommendation(self, match: Dict[str, Any], distance: float, 
+                               query_time: float, similar_situations: int) -> Dict[str, Any]:
+        """Build the recommendation payload for a matched database row."""
+        return {
+            'decision': match['recommendation'],
+            'bet_size': match.get('bet_size', 0),
+            'reasoning': f"Similar situation analysis: {match['reasoning']}",
+            'equity': match['equity'],
+            'confidence': match['cfr_confidence'] * (1 - distance),  # Adjust for similarity
+            'strategy': 'database_lookup',
+            'metrics': {
+                'source': 'database_lookup',
+                'similarity_score': 1 - distance,
+                'query_time_ms': query_time * 1000,
+                'similar_situations': similar_situations
+            }
+        }
+    
+    def _aggregate_recommendation(self, neighbours: List[Tuple[Dict[str, Any], float]],
+                                  query_time: float) -> Dict[str, Any]:
+        """
+        Blend neighbouring rows into one recommendation.
+        
+        Each (row, distance) pair weighs 1 / (distance + epsilon).  The
+        decision is the heaviest action, its bet size the weighted mean over
+        rows choosing it, and equity the weighted mean over all rows.  The
+        agreement score is the decision's share of the total weight and
+        scales the similarity-adjusted confidence.
+        """
+        distances = np.array([distance for _, distance in neighbours])
+        weights = 1.0 / (np.maximum(distances, 0.0) + NEIGHBOUR_DISTANCE_EPSILON)
+        weights /= weights.sum()
+        actions = [row['recommendation'] for row, _ in neighbours]
+        
+        frequencies: Dict[str, float] = {}
+        for action, weight in zip(actions, weights):
+            frequencies[action] = frequencies.get(action, 0.0) + float(weight)
+        decision = max(frequencies, key=frequencies.get)
+        agreement = frequencies[decision]
+        
+        chosen = np.array([action == decision for action in actions])
+        bet_sizes = np.array([row.get('bet_size') or 0.0 for row, _ in neighbours])
+        equities = np.array([row['equity'] for row, _ in neighbours])
+        # Cosine distance runs 0..2; past 1 a row is no evidence, not negative evidence
+        similarities = np.clip(1 - distances, 0.0, 1.0)
+        confidences = np.array([row['cfr_confidence'] for row, _ in neighbours]) * similarities
+        nearest = neighbours[int(np.argmin(distances))][0]
+        
+        return {
+            'decision': decision,
+            'bet_size': float(np.dot(weights[chosen], bet_sizes[chosen]) / weights[chosen].sum()),
+            'reasoning': (f"{len(neighbours)} similar situations, {agreement:.0%} weighted agreement on "
+                          f"{decision}: {nearest['reasoning']}"),
+            'equity': float(np.dot(weights, equities)),
+            'confidence': float(np.dot(weights, confidences)) * agreement,
+            'strategy': 'database_aggregate',
+            'metrics': {
+                'source': 'database_aggregate',
+                'similarity_score': float(similarities.max()),
+                'query_time_ms': query_time * 1000,
+                'similar_situations': len(neighbours),
+                'action_frequencies': {action: round(share, 4) for action, share in
+                                       sorted(frequencies.items(), key=lambda item: -item[1])},
+                'agreement': agreement
+            }
+        }
+    
+    def _get_situations_by_ids(self, situation_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Fetch many situations by HNSW label with chunked hnsw_label IN (...) queries."""
+        rows: Dict[int, Dict[str, Any]] = {}
+        conn = self.pool.reader()
+        for start in range(0, len(situation_ids), SQLITE_MAX_VARIABLES):
+            chunk = situation_ids[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT * FROM gto_situations WHERE hnsw_label IN ({placeholders})",
+                chunk
+            )
+            for row in cursor:
+                record = dict(row)
+                rows[record['hnsw_label']] = record
+        return rows
+    
     def _get_situation_by_id(self, situation_id: int) -> Optional[Dict[str, Any]]:
-        """Get situation details by HNSW index ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM gto_situations 
-                WHERE rowid = ? + 1
-            """, (situation_id,))
-            
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+        """Get situation details by HNSW label."""
+        cursor = self.pool.reader().execute("""
+            SELECT * FROM gto_situations 
+            WHERE hnsw_label = ?
+        """, (situation_id,))
+        
+        row = cursor.fetchone()
+        if row:
+            return dict(row)
+        return None
     
     def add_solution(self, situation: PokerSituation, solution: Dict[str, Any]) -> bool:
-        """Add new GTO solution to database and index."""
+        """
+        Add or update a GTO solution in the database and index.
+        
+        An existing situation keeps its row: it takes a fresh index label
+        and its previous label is marked deleted in the index.
+        """
         if not self.initialized:
             self.initialize()
             
         try:
-            with self.lock:
+            with self._write_mutex:
                 # Generate unique ID
                 situation_id = self._generate_situation_id(situation)
                 
@@ -259,74 +638,254 @@ class GTODatabase:
                 vector = self.vectorizer.vectorize_situation(situation)
                 vector_blob = vector.tobytes()
                 
-                # Store in database
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO gto_situations 
-                        (id, vector, hole_cards, board_cards, position, pot_size, 
-                         bet_to_call, stack_size, betting_round, recommendation, 
-                         bet_size, equity, reasoning, cfr_confidence, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        situation_id,
-                        vector_blob,
-                        json.dumps(situation.hole_cards),
-                        json.dumps(situation.board_cards),
-                        situation.position.value,
-                        situation.pot_size,
-                        situation.bet_to_call,
-                        situation.stack_size,
-                        situation.betting_round.value,
-                        solution['decision'],
-                        solution.get('bet_size', 0),
-                        solution.get('equity', 0.0),
-                        solution.get('reasoning', ''),
-                        solution.get('confidence', 0.0),
-                        json.dumps(solution.get('metadata', {}))
-                    ))
+                label = self._next_label
+                self._next_label += 1
                 
-                # Add to HNSW index
-                current_count = 0
+                # Index the new label before the row points at it, so a
+                # lookup never resolves to a label the index lacks
                 if self.hnsw_index is not None:
-                    current_count = self.hnsw_index.get_current_count()
-                    self.hnsw_index.add_items(vector, current_count)
+                    with self.lock.write():
+                        self._stale_labels -= self.hnsw_index.add_items(vector, label, replace_deleted=True)
+                
+                # Upsert in place: the row (and its rowid) survives updates
+                try:
+                    with self.pool.writer() as conn:
+                        previous = conn.execute(
+                            "SELECT hnsw_label FROM gto_situations WHERE id = ?", (situation_id,)
+                        ).fetchone()
+                        conn.execute(_UPSERT_SQL, self._solution_row(
+                            situation_id, vector_blob, situation, solution, label
+                        ))
+                except Exception:
+                    # Row never took the label; drop it from the index again
+                    with self.lock.write():
+                        self._retire_label(label)
+                    raise
+                
+                # Exclusive: hnswlib updates are not safe alongside queries
+                with self.lock.write():
+                    if previous is None:
+                        self._live_labels += 1
+                    else:
+                        self._retire_label(previous[0])
                 
-                logger.debug(f"Added situation {situation_id} to database (total: {current_count + 1})")
+                logger.debug(f"Added situation {situation_id} to database (total: {self._live_labels})")
+                self._maybe_compact()
                 return True
                 
         except Exception as e:
             logger.error(f"Failed to add solution: {e}")
             return False
     
+    def add_solutions_bulk(self, solutions: Iterable[Tuple[PokerSituation, Dict[str, Any]]],
+                           chunk_size: int = BULK_CHUNK_SIZE, job: Optional[str] = None,
+                           checkpoint_every: int = BULK_CHECKPOINT_CHUNKS,
+                           num_threads: int = -1) -> int:
+        """
+        Add or update many GTO solutions, streamed in chunks.
+        
+        Each chunk of (situation, solution) pairs is vectorized as one
+        matrix, indexed with one multi-threaded add_items call and written
+        with one executemany in a single transaction; upserts behave like
+        add_solution.  The index is saved every ``checkpoint_every`` chunks
+        and when the stream ends.
+        
+        With a ``job`` name, the count of consumed items is committed along
+        with each chunk, so re-running the same job on the same stream after
+        an interruption skips what was already written.  Rows committed
+        after the last index save are re-indexed when the index is loaded.
+        
+        Returns:
+            Number of solutions written by this call
+        
+        Raises:
+            Whatever stopped the stream (a bad row, a disk or index error);
+            chunks committed before it are kept and the index is still saved
+        """
+        if not self.initialized:
+            self.initialize()
+        return self._add_solutions_stream(solutions, chunk_size, job, checkpoint_every, num_threads)
+    
+    def _add_solutions_stream(self, solutions: Iterable[Tuple[PokerSituation, Dict[str, Any]]],
+                              chunk_size: int = BULK_CHUNK_SIZE, job: Optional[str] = None,
+                              checkpoint_every: int = BULK_CHECKPOINT_CHUNKS,
+                              num_threads: int = -1) -> int:
+        """add_solutions_bulk without the initialization check (usable while initializing)."""
+        items = iter(solutions)
+        consumed = self._bulk_progress(job) if job else 0
+        if consumed:
+            logger.info(f"Resuming bulk job {job} after {consumed} items")
+            items = itertools.islice(items, consumed, None)
+        
+        written = 0
+        chunks = 0
+        try:
+            while True:
+                chunk = list(itertools.islice(items, chunk_size))
+                if not chunk:
+                    break
+                consumed += len(chunk)
+                with self._write_mutex:
+                    written += self._add_chunk(chunk, num_threads, job, consumed)
+                chunks += 1
+                if chunks % checkpoint_every == 0:
+                    self._save_index()
+                    logger.info(f"Bulk add checkpoint: {written} solutions written")
+            
+            if job:
+                with self.pool.writer() as conn:
+                    conn.execute("DELETE FROM bulk_progress WHERE job = ?", (job,))
+        except BaseException as e:
+            # Committed chunks stay; the caller sees the failure and can resume the job
+            logger.error(f"Bulk add stopped after {written} solutions: {e!r}")
+            raise
+        finally:
+            self._save_index()
+            with self._write_mutex:
+                self._maybe_compact()
+        
+        logger.info(f"Bulk add wrote {written} solutions (total: {self._live_labels})")
+        return written
+    
+    def _add_chunk(self, chunk: List[Tuple[PokerSituation, Dict[str, Any]]], num_threads: int,
+                   job: Optional[str], consumed: int) -> int:
+        """Index and upsert one bulk chunk (caller holds _write_mutex)."""
+        # A situation repeated within the chunk keeps its last solution
+        pairs = {self._generate_situation_id(situation): (situation, solution)
+                 for situation, solution in chunk}
+        situation_ids = list(pairs)
+        vectors = self.vectorizer.vectorize_situations([situation for situation, _ in pairs.values()])
+        labels = list(range(self._next_label, self._next_label + len(situation_ids)))
+        self._next_label += len(labels)
+        
+        if self.hnsw_index is not None:
+            with self.lock.write():
+                # Reused deleted slots are gone from the index, so stop counting them
+                self._stale_labels -= self.hnsw_index.add_items(vectors, np.array(labels, dtype=np.int64),
+                                                                num_threads=num_threads, replace_deleted=True)
+        
+        try:
+            with self.pool.writer() as conn:
+                previous = []
+                for start in range(0, len(situation_ids), SQLITE_MAX_VARIABLES):
+                    ids = situation_ids[start:start + SQLITE_MAX_VARIABLES]
+                    placeholders = ",".join("?" * len(ids))
+                    previous.extend(row[0] for row in conn.execute(
+                        f"SELECT hnsw_label FROM gto_situations WHERE id IN ({placeholders})", ids
+                    ))
+                conn.executemany(_UPSERT_SQL, [
+                    self._solution_row(situation_id, vector.tobytes(), situation, solution, label)
+                    for situation_id, (situation, solution), vector, label
+                    in zip(situation_ids, pairs.values(), vectors, labels)
+                ])
+                if job:
+                    conn.execute("""
+                        INSERT INTO bulk_progress (job, consumed) VALUES (?, ?)
+                        ON CONFLICT(job) DO UPDATE SET
+                            consumed = excluded.consumed, updated_at = CURRENT_TIMESTAMP
+                    """, (job, consumed))
+        except Exception:
+            # Rows never took the labels; drop them from the index again
+            with self.lock.write():
+                for label in labels:
+                    self._retire_label(label)
+            raise
+        
+        with self.lock.write():
+            self._live_labels += len(labels) - len(previous)
+            for label in previous:
+                self._retire_label(label)
+        return len(labels)
+    
+    def _bulk_progress(self, job: str) -> int:
+        """Items an interrupted bulk job has already consumed."""
+        row = self.pool.reader().execute(
+            "SELECT consumed FROM bulk_progress WHERE job = ?", (job,)
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def _save_index(self):
+        """Persist the HNSW index next to the database."""
+        with self._write_mutex:
+            if self.hnsw_index is not None and self.hnsw_index.get_current_count() > 0:
+                self._write_index(self.hnsw_index)
+    
+    @staticmethod
+    def _solution_row(situation_id: str, vector_blob: bytes, situation: PokerSituation,
+                      solution: Dict[str, Any], label: int) -> Tuple:
+        """Parameters for _UPSERT_SQL."""
+        return (
+            situation_id,
+            vector_blob,
+            json.dumps(situation.hole_cards),
+            json.dumps(situation.board_cards),
+            situation.position.value,
+            situation.pot_size,
+            situation.bet_to_call,
+            situation.stack_size,
+            situation.betting_round.value,
+            solution['decision'],
+            solution.get('bet_size', 0),
+            solution.get('equity', 0.0),
+            solution.get('reasoning', ''),
+            solution.get('confidence', 0.0),
+            json.dumps(solution.get('metadata', {})),
+            label
+        )
+    
+    def delete_solution(self, situation: PokerSituation) -> bool:
+        """Remove a situation's solution from the database and index."""
+        if not self.initialized:
+            self.initialize()
+            
+        try:
+            with self._write_mutex:
+                situation_id = self._generate_situation_id(situation)
+                with self.pool.writer() as conn:
+                    row = conn.execute(
+                        "SELECT hnsw_label FROM gto_situations WHERE id = ?", (situation_id,)
+                    ).fetchone()
+                    if row is None:
+                        return False
+                    conn.execute("DELETE FROM gto_situations WHERE id = ?", (situation_id,))
+                
+                with self.lock.write():
+                    self._live_labels -= 1
+                    self._retire_label(row[0])
+                
+                logger.debug(f"Deleted situation {situation_id} (total: {self._live_labels})")
+                self._maybe_compact()
+                return True
+                
+        except Exception as e:
+            logger.error(f"Failed to delete solution: {e}")
+            return False
+    
+    def _retire_label(self, label: int):
+        """Mark a label no row owns any more as deleted (caller holds the write lock)."""
+        if self.hnsw_index is not None:
+            self.hnsw_index.mark_deleted(label)
+            self._stale_labels += 1
+    
+    def _maybe_compact(self):
+        """Rebuild the index once deleted labels outweigh the compaction threshold."""
+        if self._stale_labels >= max(COMPACTION_MIN_STALE, COMPACTION_RATIO * self._live_labels):
+            logger.info(f"Compacting HNSW index ({self._stale_labels} deleted labels)")
+            self.rebuild_index()
+    
     def _populate_database(self, initial_count: int = 1000):
         """Populate database with initial GTO solutions using simplified approach."""
         logger.info(f"Generating {initial_count} initial GTO solutions...")
         
-        # Generate test situations using vectorizer
-        situations = self.vectorizer.create_test_situations(initial_count)
-        
-        processed = 0
-        
-        # Use simplified rule-based GTO for initial population
-        for situation, vector in situations:
-            try:
-                # Generate simplified GTO decision based on situation
+        def solutions():
+            # Use simplified rule-based GTO for initial population
+            for situation, _ in self.vectorizer.create_test_situations(initial_count):
                 gto_response = self._generate_simple_gto_solution(situation)
                 if gto_response:
-                    self.add_solution(situation, gto_response)
-                    processed += 1
-                    
-                    if processed % 50 == 0:
-                        logger.info(f"Generated {processed}/{initial_count} solutions...")
-                        
-            except Exception as e:
-                logger.warning(f"Failed to generate solution for situation: {e}")
-                continue
+                    yield situation, gto_response
         
-        # Save HNSW index
-        if self.hnsw_index and self.hnsw_index.get_current_count() > 0:
-            self.hnsw_index.save_index(str(self.index_path))
-            logger.info(f"Database populated with {processed} solutions, index saved")
+        processed = self._add_solutions_stream(solutions())
+        logger.info(f"Database populated with {processed} solutions, index saved")
     
     def _generate_cfr_solution(self, situation: PokerSituation) -> Optional[Dict[str, Any]]:
         """Generate authentic CFR solution for a situation."""
@@ -485,37 +1044,10 @@ class GTODatabase:
             rank2 = self._card_rank_value(card2[0])
             suited = card1[1] == card2[1]
             
-            # Preflop hand strength with realistic ranges
-            if rank1 == rank2:  # Pocket pairs
-                if rank1 >= 13:  # AA, KK
-                    preflop_strength = 0.85
-                elif rank1 >= 11:  # QQ, JJ
-                    preflop_strength = 0.75
-                elif rank1 >= 8:   # TT, 99, 88
-                    preflop_strength = 0.65
-                elif rank1 >= 5:   # 77, 66, 55
-                    preflop_strength = 0.55
-                else:  # 44, 33, 22
-                    preflop_strength = 0.45
-            else:  # Unpaired hands
-                high_rank = max(rank1, rank2)
-                low_rank = min(rank1, rank2)
-                
-                # Premium suited/unsuited hands
-                if high_rank >= 13 and low_rank >= 11:  # AK, AQ, KQ
-                    preflop_strength = 0.70 if suited else 0.65
-                elif high_rank >= 13 and low_rank >= 9:  # AJ, AT, KJ, KT
-                    preflop_strength = 0.60 if suited else 0.50
-                elif high_rank >= 11 and low_rank >= 9:  # QJ, QT, JT
-                    preflop_strength = 0.55 if suited else 0.45
-                elif suited and abs(rank1 - rank2) <= 2:  # Suited connectors
-                    preflop_strength = min(0.50, high_rank / 14.0 + 0.15)
-                elif high_rank >= 13:  # Ace-rag
-                    preflop_strength = 0.35 if suited else 0.25
-                elif high_rank >= 10:  # Broadway cards
-                    preflop_strength = 0.40 if suited else 0.30
-                else:  # Weak hands like 72o
-                    preflop_strength = 0.15 if suited else 0.05
+            # Preflop strength: all-in equity vs a random hand from the shipped tables
+            preflop_strength = preflop_tables.equity_vs_range(hole_cards)
+            if preflop_strength is None:
+                preflop_strength = self._heuristic_preflop_strength(rank1, rank2, suited)
             
             # If no board, return preflop strength
             if not board_cards:
@@ -565,6 +1097,40 @@ class GTODatabase:
         except Exception:
             return 0.35  # Default moderate strength
     
+    def _heuristic_preflop_strength(self, rank1: int, rank2: int, suited: bool) -> float:
+        """Bucketed preflop strength used when the preflop tables are not built."""
+        if rank1 == rank2:  # Pocket pairs
+            if rank1 >= 13:  # AA, KK
+                preflop_strength = 0.85
+            elif rank1 >= 11:  # QQ, JJ
+                preflop_strength = 0.75
+            elif rank1 >= 8:   # TT, 99, 88
+                preflop_strength = 0.65
+            elif rank1 >= 5:   # 77, 66, 55
+                preflop_strength = 0.55
+            else:  # 44, 33, 22
+                preflop_strength = 0.45
+        else:  # Unpaired hands
+            high_rank = max(rank1, rank2)
+            low_rank = min(rank1, rank2)
+                
+            # Premium suited/unsuited hands
+            if high_rank >= 13 and low_rank >= 11:  # AK, AQ, KQ
+                preflop_strength = 0.70 if suited else 0.65
+            elif high_rank >= 13 and low_rank >= 9:  # AJ, AT, KJ, KT
+                preflop_strength = 0.60 if suited else 0.50
+            elif high_rank >= 11 and low_rank >= 9:  # QJ, QT, JT
+                preflop_strength = 0.55 if suited else 0.45
+            elif suited and abs(rank1 - rank2) <= 2:  # Suited connectors
+                preflop_strength = min(0.50, high_rank / 14.0 + 0.15)
+            elif high_rank >= 13:  # Ace-rag
+                preflop_strength = 0.35 if suited else 0.25
+            elif high_rank >= 10:  # Broadway cards
+                preflop_strength = 0.40 if suited else 0.30
+            else:  # Weak hands like 72o
+                preflop_strength = 0.15 if suited else 0.05
+        return preflop_strength
+    
     def _card_rank_value(self, rank: str) -> int:
         """Convert card rank to numerical value."""
         rank_map = {'A': 14, 'K': 13, 'Q': 12, 'J': 11, 'T': 10}
@@ -574,94 +1140,115 @@ class GTODatabase:
         """Generate unique ID for situation."""
         import hashlib
         
-        situation_str = f"{situation.hole_cards}_{situation.board_cards}_{situation.position.value}_{situation.pot_size}_{situation.bet_to_call}_{situation.betting_round.value}"
+        # Suit-isomorphic spots share one row
+        cards_key = canonical.canonical_key(situation.hole_cards, situation.board_cards)
+        situation_str = f"{cards_key}_{situation.position.value}_{situation.pot_size}_{situation.bet_to_call}_{situation.betting_round.value}"
         return hashlib.md5(situation_str.encode()).hexdigest()[:12]
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get database performance statistics."""
-        with self.lock:
-            avg_query_time = (self.total_query_time / self.query_count * 1000 
-                            if self.query_count > 0 else 0)
-            
-            return {
-                'total_situations': self._get_situation_count(),
-                'hnsw_index_size': self.hnsw_index.get_current_count() if self.hnsw_index else 0,
-                'total_queries': self.query_count,
-                'average_query_time_ms': avg_query_time,
-                'database_size_mb': self.db_path.stat().st_size / 1024 / 1024 if self.db_path.exists() else 0
-            }
+        with self._stats_lock:
+            query_count = self.query_count
+            total_query_time = self.total_query_time
+        avg_query_time = (total_query_time / query_count * 1000 
+                        if query_count > 0 else 0)
+        index = self.hnsw_index
+        
+        size = index.get_current_count() if index else 0
+        capacity = index.get_max_elements() if index else 0
+        
+        return {
+            'total_situations': self._get_situation_count(),
+            'hnsw_index_size': size,
+            'hnsw_index_capacity': capacity,
+            'hnsw_capacity_used': size / capacity if capacity else 0.0,
+            'hnsw_deleted_labels': self._stale_labels,
+            'hnsw_shards': index.shard_sizes() if index else {},
+            'total_queries': query_count,
+            'average_query_time_ms': avg_query_time,
+            'database_size_mb': self.db_path.stat().st_size / 1024 / 1024 if self.db_path.exists() else 0
+        }
     
     def rebuild_index(self):
-        """Rebuild HNSW index from database."""
+        """Rebuild HNSW index from database (also compacts away deleted labels)."""
         logger.info("Rebuilding HNSW index from database...")
         
-        with self.lock:
-            # Initialize new index
-            self._initialize_hnsw_index()
-            
+        if not HNSWLIB_AVAILABLE:
+            logger.warning("HNSW not available, nothing to rebuild")
+            return
+        
+        # Writers are paused for the rebuild; lookups keep using the old
+        # index until the finished one is swapped in
+        with self._write_mutex:
             # Load all vectors from database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("SELECT vector FROM gto_situations ORDER BY rowid")
-                vectors = []
-                for row in cursor:
-                    vector = np.frombuffer(row[0], dtype=np.float32)
-                    vectors.append(vector)
-                
-                if vectors and self.hnsw_index:
-                    # Add all vectors to index
-                    vectors_array = np.array(vectors)
-                    ids = np.arange(len(vectors))
-                    self.hnsw_index.add_items(vectors_array, ids)
-                    
-                    # Save index
-                    self.hnsw_index.save_index(str(self.index_path))
-                    logger.info(f"Index rebuilt with {len(vectors)} vectors")
+            cursor = self.pool.reader().execute("SELECT hnsw_label, vector FROM gto_situations ORDER BY rowid")
+            labels = []
+            vectors = []
+            for row in cursor:
+                labels.append(row[0])
+                vectors.append(np.frombuffer(row[1], dtype=np.float32))
+            
+            # Build a fresh index off to the side, keeping every row's label
+            new_index = self._create_hnsw_index()
+            if vectors:
+                vectors_array = np.array(vectors)
+                new_index.add_items(vectors_array, np.array(labels, dtype=np.int64))
+            self._write_index(new_index)
+            
+            with self.lock.write():
+                self.hnsw_index = new_index
+                self._live_labels = len(labels)
+                self._stale_labels = 0
+            logger.info(f"Index rebuilt with {len(vectors)} vectors")
+
+    def close(self):
+        """Close pooled SQLite connections (they reopen lazily on next use)."""
+        self.pool.close_all()
 
     def _fallback_similarity_search(self, query_vector: np.ndarray, top_k: int = 5) -> Optional[Dict[str, Any]]:
         """Fallback similarity search using database queries when HNSW unavailable."""
         try:
             # Get all vectors from database for comparison
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("SELECT rowid, vector, recommendation, bet_size, equity, reasoning, cfr_confidence FROM gto_situations LIMIT 1000")
-                
-                best_similarity = -1
-                best_match = None
+            cursor = self.pool.reader().execute("SELECT rowid, vector, recommendation, bet_size, equity, reasoning, cfr_confidence FROM gto_situations LIMIT 1000")
+            
+            best_similarity = -1
+            best_match = None
+            
+            for row in cursor:
+                db_vector = np.frombuffer(row[1], dtype=np.float32)
                 
-                for row in cursor:
-                    db_vector = np.frombuffer(row[1], dtype=np.float32)
-                    
-                    # Calculate cosine similarity
-                    similarity = np.dot(query_vector, db_vector) / (
-                        np.linalg.norm(query_vector) * np.linalg.norm(db_vector)
-                    )
-                    
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match = {
-                            'recommendation': row[2],
-                            'bet_size': row[3],
-                            'equity': row[4], 
-                            'reasoning': row[5],
-                            'cfr_confidence': row[6]
-                        }
+                # Calculate cosine similarity
+                similarity = np.dot(query_vector, db_vector) / (
+                    np.linalg.norm(query_vector) * np.linalg.norm(db_vector)
+                )
                 
-                if best_match and best_similarity > 0.7:  # Minimum similarity threshold
-                    return {
-                        'decision': best_match['recommendation'],
-                        'bet_size': best_match.get('bet_size', 0),
-                        'reasoning': f"Fallback similarity analysis: {best_match['reasoning']}",
-                        'equity': best_match['equity'],
-                        'confidence': best_match['cfr_confidence'] * best_similarity,
-                        'strategy': 'fallback_similarity',
-                        'metrics': {
-                            'source': 'fallback_similarity',
-                            'similarity_score': best_similarity,
-                            'method': 'cosine_similarity'
-                        }
+                if similarity > best_similarity:
+                    best_similarity = similarity
+                    best_match = {
+                        'recommendation': row[2],
+                        'bet_size': row[3],
+                        'equity': row[4], 
+                        'reasoning': row[5],
+                        'cfr_confidence': row[6]
                     }
-                
-                return None
-                
+            
+            if best_match and best_similarity > 0.7:  # Minimum similarity threshold
+                return {
+                    'decision': best_match['recommendation'],
+                    'bet_size': best_match.get('bet_size', 0),
+                    'reasoning': f"Fallback similarity analysis: {best_match['reasoning']}",
+                    'equity': best_match['equity'],
+                    'confidence': best_match['cfr_confidence'] * best_similarity,
+                    'strategy': 'fallback_similarity',
+                    'metrics': {
+                        'source': 'fallback_similarity',
+                        'similarity_score': best_similarity,
+                        'method': 'cosine_similarity'
+                    }
+                }
+            
+            return None
+            
         except Exception as e:
             logger.error(f"Fallback similarity search failed: {e}")
             return None
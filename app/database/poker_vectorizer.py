@@ -3,8 +3,9 @@ Poker Situation Vectorization System
 Converts poker game states into numerical vectors for similarity matching.
 """
 
+import json
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Optional, Any
 import logging
 from dataclasses import dataclass
 from enum import IntEnum
@@ -53,6 +54,8 @@ class PokerVectorizer:
             'A': 14, 'K': 13, 'Q': 12, 'J': 11, 'T': 10,
             '9': 9, '8': 8, '7': 7, '6': 6, '5': 5, '4': 4, '3': 3, '2': 2
         }
+        # Card string -> rank * 8 + suit, resolved like the per-card lookups above
+        self._card_codes = {r + s: rv * 8 + sv for r, rv in self.ranks.items() for s, sv in self.suits.items()}
         
     def vectorize_situation(self, situation: PokerSituation) -> np.ndarray:
         """Convert poker situation to 32-dimensional vector."""
@@ -85,6 +88,155 @@ class PokerVectorizer:
         
         return vector
     
+    def vectorize_situations(self, situations: Sequence[PokerSituation]) -> np.ndarray:
+        """Vectorize many situations at once; row i equals vectorize_situation(situations[i])."""
+        hole_ranks, hole_suits = self.encode_cards(
+            [s.hole_cards if len(s.hole_cards) == 2 else [] for s in situations], 2)
+        board_ranks, board_suits = self.encode_cards([s.board_cards or [] for s in situations], 5)
+        return self.vectorize_batch(
+            hole_ranks, hole_suits, board_ranks, board_suits,
+            position=[s.position for s in situations],
+            pot_size=[s.pot_size for s in situations],
+            bet_to_call=[s.bet_to_call for s in situations],
+            stack_size=[s.stack_size for s in situations],
+            num_players=[s.num_players for s in situations],
+            betting_round=[s.betting_round for s in situations],
+            num_callers=[s.num_callers for s in situations],
+            num_raisers=[s.num_raisers for s in situations],
+        )
+    
+    def vectorize_records(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """
+        Vectorize importer rows (gto_situations column names; card fields may
+        be JSON strings) with vectorize_batch.
+        """
+        def cards(value):
+            return json.loads(value) if isinstance(value, str) else (value or [])
+        
+        holes = [cards(r['hole_cards']) for r in records]
+        hole_ranks, hole_suits = self.encode_cards([h if len(h) == 2 else [] for h in holes], 2)
+        board_ranks, board_suits = self.encode_cards([cards(r.get('board_cards')) for r in records], 5)
+        return self.vectorize_batch(
+            hole_ranks, hole_suits, board_ranks, board_suits,
+            position=[r['position'] for r in records],
+            pot_size=[r['pot_size'] for r in records],
+            bet_to_call=[r['bet_to_call'] for r in records],
+            stack_size=[r['stack_size'] for r in records],
+            num_players=[r.get('num_players', 2) for r in records],
+            betting_round=[r['betting_round'] for r in records],
+            num_callers=[r.get('num_callers', 0) for r in records],
+            num_raisers=[r.get('num_raisers', 0) for r in records],
+        )
+    
+    def encode_cards(self, card_lists: Iterable[Sequence[str]], width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode card lists into ``[N, width]`` rank (2-14) and suit (1-4) arrays.
+        
+        Missing slots are 0; lists longer than width are truncated.
+        """
+        codes = self._card_codes
+        flat = []
+        for cards in card_lists:
+            row = [codes.get(card, 0) if len(card) < 2 or card in codes
+                   else self.ranks.get(card[0], 2) * 8 + self.suits.get(card[1], 1)
+                   for card in cards[:width]]
+            flat.extend(row)
+            flat.extend([0] * (width - len(row)))
+        encoded = np.array(flat, dtype=np.int16).reshape(-1, width)
+        return encoded >> 3, encoded & 7
+    
+    def vectorize_batch(self, hole_ranks, hole_suits, board_ranks, board_suits, position,
+                        pot_size, bet_to_call, stack_size, num_players, betting_round,
+                        num_callers=0, num_raisers=0) -> np.ndarray:
+        """
+        Columnar vectorize_situation.
+        
+        Cards come as rank/suit arrays from encode_cards (``[N, 2]`` hole,
+        ``[N, 5]`` board, 0 = no card; a hand row needs both cards); every
+        other argument is a length-N array (or a scalar for all rows).
+        
+        Returns:
+            ``[N, 32]`` float32 matrix with the vectorize_situation layout
+        """
+        hole_ranks = np.asarray(hole_ranks, dtype=np.int64).reshape(-1, 2)
+        hole_suits = np.asarray(hole_suits, dtype=np.int64).reshape(-1, 2)
+        board_ranks = np.asarray(board_ranks, dtype=np.int64).reshape(len(hole_ranks), -1)
+        board_suits = np.asarray(board_suits, dtype=np.int64).reshape(len(hole_ranks), -1)
+        n = len(hole_ranks)
+        
+        def column(values, dtype=np.float64):
+            return np.broadcast_to(np.asarray(values, dtype=dtype), (n,))
+        
+        def ratio(num, den):
+            return np.divide(num, den, out=np.zeros(n), where=den > 0)
+        
+        vectors = np.zeros((n, 32), dtype=np.float64)
+        
+        # Hand features (0-5)
+        r1, r2 = hole_ranks[:, 0], hole_ranks[:, 1]
+        has_hand = (r1 > 0) & (r2 > 0)
+        vectors[:, 0] = r1 / 14.0
+        vectors[:, 1] = r2 / 14.0
+        vectors[:, 2] = r1 == r2
+        vectors[:, 3] = hole_suits[:, 0] == hole_suits[:, 1]
+        vectors[:, 4] = np.abs(r1 - r2) / 14.0
+        vectors[:, 5] = np.maximum(r1, r2) / 14.0
+        vectors[~has_hand, 0:6] = 0.0
+        
+        # Board features (6-15)
+        present = board_ranks > 0
+        count = present.sum(axis=1)
+        rank_seen = np.zeros((n, 15), dtype=bool)
+        rank_seen[np.arange(n)[:, None], board_ranks] = True
+        rank_seen[:, 0] = False
+        distinct = rank_seen.sum(axis=1)
+        suit_counts = np.stack([((board_suits == suit) & present).sum(axis=1) for suit in range(1, 5)], axis=1)
+        
+        vectors[:, 6] = count / 5.0
+        vectors[:, 7] = ratio(distinct, count)
+        vectors[:, 8] = ratio((suit_counts > 0).sum(axis=1), count)
+        vectors[:, 9] = np.where(present, board_ranks, 0).max(axis=1, initial=0) / 14.0
+        vectors[:, 10] = np.where(count > 0, np.where(present, board_ranks, 15).min(axis=1, initial=15) / 14.0, 0.0)
+        
+        run = longest = np.zeros(n, dtype=np.int64)
+        for rank in range(2, 15):
+            run = np.where(rank_seen[:, rank], run + 1, 0)
+            longest = np.maximum(longest, run)
+        textured = count >= 3
+        vectors[:, 11] = np.minimum(longest / 5.0, 1.0)
+        vectors[:, 12] = np.minimum(suit_counts.max(axis=1) / 5.0, 1.0)
+        vectors[:, 13] = distinct != count
+        vectors[:, 14] = ratio(((board_ranks >= 10) & present).sum(axis=1), count)
+        vectors[:, 15] = ratio(((board_ranks <= 6) & present).sum(axis=1), count)
+        vectors[~textured, 11:16] = 0.0
+        
+        # Position features (16-19)
+        pos = column(position, np.int64)
+        vectors[:, 16] = pos / 8.0
+        vectors[:, 17] = pos == Position.BTN
+        vectors[:, 18] = (pos == Position.SB) | (pos == Position.BB)
+        vectors[:, 19] = (8 - pos) / 8.0
+        
+        # Betting features (20-27)
+        pot, bet, stack = column(pot_size), column(bet_to_call), column(stack_size)
+        vectors[:, 20] = np.minimum(pot / 100.0, 1.0)
+        vectors[:, 21] = np.minimum(bet / 20.0, 1.0)
+        vectors[:, 22] = np.minimum(ratio(bet, np.where(pot > 0, pot + bet, 0.0)), 1.0)
+        vectors[:, 23] = np.minimum(ratio(stack, pot) / 10.0, 1.0)
+        vectors[:, 24] = np.minimum(column(num_callers) / 5.0, 1.0)
+        vectors[:, 25] = np.minimum(column(num_raisers) / 3.0, 1.0)
+        vectors[:, 26] = np.minimum(ratio(bet, stack), 1.0)
+        vectors[:, 27] = bet > 0
+        
+        # Game state features (28-31)
+        street = column(betting_round, np.int64)
+        vectors[:, 28] = street / 3.0
+        vectors[:, 29] = np.minimum(column(num_players) / 9.0, 1.0)
+        vectors[:, 30] = street == BettingRound.PREFLOP
+        vectors[:, 31] = street == BettingRound.RIVER
+        
+        return vectors.astype(np.float32)
+    
     def _vectorize_hand(self, hole_cards: List[str]) -> np.ndarray:
         """Convert hole cards to 6-dimensional vector."""
         vector = np.zeros(6, dtype=np.float32)
@@ -227,23 +379,19 @@ class PokerVectorizer:
         
         # Common preflop scenarios
         for i in range(count // 3):
-            situation = self._generate_preflop_situation()
-            vector = self.vectorize_situation(situation)
-            situations.append((situation, vector))
+            situations.append(self._generate_preflop_situation())
         
         # Common flop scenarios  
         for i in range(count // 3):
-            situation = self._generate_flop_situation()
-            vector = self.vectorize_situation(situation)
-            situations.append((situation, vector))
+            situations.append(self._generate_flop_situation())
             
         # Turn/river scenarios
         for i in range(count - 2 * (count // 3)):
-            situation = self._generate_postflop_situation()
-            vector = self.vectorize_situation(situation)
-            situations.append((situation, vector))
-            
-        return situations
+            situations.append(self._generate_postflop_situation())
+        
+        if not situations:
+            return []
+        return list(zip(situations, self.vectorize_situations(situations)))
     
     def _generate_preflop_situation(self) -> PokerSituation:
         """Generate random preflop situation."""
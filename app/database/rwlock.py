@@ -0,0 +1,89 @@
+"""
+Reader/writer lock for the GTO database.
+Many concurrent readers, one exclusive writer; waiting writers block new readers.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """Writer-preferring reader/writer lock.
+
+    The write side is reentrant, and a thread holding the write lock may
+    also take the read lock (e.g. a lookup issued while populating).
+    Read locks themselves must not be nested.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        """Block until no writer holds or waits for the lock, then share it."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """Release a shared hold."""
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._release_write_locked()
+                return
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Block until there are no readers or other writers."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        """Release an exclusive hold."""
+        with self._cond:
+            self._release_write_locked()
+
+    def _release_write_locked(self):
+        self._writer_depth -= 1
+        if self._writer_depth == 0:
+            self._writer = None
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """Context manager for a shared hold."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """Context manager for an exclusive hold."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,241 @@
+"""
+HNSW index partitioned by betting round, facing-bet flag and position group.
+A query only searches the shard its own situation falls in, so a river
+spot can never match a preflop row just because its other features are close.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import hnswlib
+import numpy as np
+
+from .poker_vectorizer import Position
+
+logger = logging.getLogger(__name__)
+
+# (betting round, facing a bet, position group)
+ShardKey = Tuple[int, int, int]
+
+# Position groups: early, middle, button, blinds
+POSITION_GROUPS = {
+    Position.UTG: 0, Position.UTG1: 0, Position.MP: 0,
+    Position.MP1: 1, Position.MP2: 1, Position.CO: 1,
+    Position.BTN: 2,
+    Position.SB: 3, Position.BB: 3,
+}
+_GROUP_OF_POSITION = np.array([POSITION_GROUPS[p] for p in sorted(POSITION_GROUPS)], dtype=np.int64)
+
+# Label padding when a shard holds fewer than k live rows
+MISSING_LABEL = -1
+
+
+def shard_keys(vectors: np.ndarray) -> np.ndarray:
+    """
+    ``[N, 3]`` shard keys read back from situation vectors.
+
+    Uses the vectorizer's street (28), facing-bet (27) and position (16) features.
+    """
+    vectors = np.atleast_2d(vectors)
+    rounds = np.rint(vectors[:, 28] * 3.0).astype(np.int64)
+    facing = (vectors[:, 27] > 0.5).astype(np.int64)
+    positions = np.clip(np.rint(vectors[:, 16] * 8.0).astype(np.int64), 0, len(_GROUP_OF_POSITION) - 1)
+    return np.column_stack([rounds, facing, _GROUP_OF_POSITION[positions]])
+
+
+def _shard_name(key: ShardKey) -> str:
+    return "-".join(str(part) for part in key)
+
+
+class ShardedHNSWIndex:
+    """
+    One hnswlib index per shard behind the single-index API GTODatabase uses.
+
+    Labels stay global; inserts and queries are routed by the shard fields
+    already encoded in each vector.  Shards are created on first insert and
+    grow geometrically from ``shard_capacity``.  A query whose shard has no
+    live rows falls back to the other shards of the same betting round,
+    never to another street.
+    """
+
+    def __init__(self, dim: int, space: str = 'cosine', shard_capacity: int = 10000,
+                 M: int = 16, ef_construction: int = 200, ef: int = 50, growth_factor: float = 2.0):
+        self.dim = dim
+        self.space = space
+        self.shard_capacity = shard_capacity
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.growth_factor = growth_factor
+
+        self.shards: Dict[ShardKey, hnswlib.Index] = {}
+        self._live: Dict[ShardKey, int] = {}
+        self._shard_of: Dict[int, ShardKey] = {}
+        self._deleted: Dict[ShardKey, Set[int]] = {}
+
+    def _new_shard(self, key: ShardKey, capacity: int) -> hnswlib.Index:
+        shard = hnswlib.Index(space=self.space, dim=self.dim)
+        shard.init_index(max_elements=capacity, ef_construction=self.ef_construction,
+                         M=self.M, allow_replace_deleted=True)
+        shard.set_ef(self.ef)
+        self.shards[key] = shard
+        self._live[key] = 0
+        return shard
+
+    def grown_capacity(self, capacity: int, needed: int) -> int:
+        """Smallest geometric step up from capacity that holds needed elements."""
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity = int(capacity * self.growth_factor) + 1
+        return capacity
+
+    def add_items(self, data, ids, num_threads: int = -1, replace_deleted: bool = False) -> int:
+        """
+        Insert vectors under global labels, each into its own shard (growing it if full).
+
+        Returns:
+            Number of deleted slots the insert reused (always 0 without replace_deleted)
+        """
+        data = np.atleast_2d(np.asarray(data, dtype=np.float32))
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        keys = shard_keys(data)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        reused = 0
+        for i, key in enumerate(map(tuple, unique_keys.tolist())):
+            rows = np.flatnonzero(inverse.reshape(-1) == i)
+            shard = self.shards.get(key)
+            if shard is None:
+                shard = self._new_shard(key, self.grown_capacity(self.shard_capacity, len(rows)))
+            needed = shard.get_current_count() + len(rows)
+            if needed > shard.get_max_elements():
+                capacity = self.grown_capacity(shard.get_max_elements(), needed)
+                logger.info(f"Growing HNSW shard {_shard_name(key)} to {capacity} elements")
+                shard.resize_index(capacity)
+            count = shard.get_current_count()
+            shard.add_items(data[rows], ids[rows], num_threads=num_threads, replace_deleted=replace_deleted)
+            # A replaced slot keeps the element count; only fresh slots grow it
+            shard_reused = len(rows) - (shard.get_current_count() - count)
+            if shard_reused:
+                self._drop_replaced(key, shard, shard_reused)
+            reused += shard_reused
+            self._live[key] += len(rows)
+            for label in ids[rows].tolist():
+                old_key = self._shard_of.get(label)
+                if old_key is not None:
+                    self._deleted.get(old_key, set()).discard(label)
+                self._shard_of[label] = key
+        return reused
+
+    def _drop_replaced(self, key: ShardKey, shard: hnswlib.Index, reused: int):
+        """Forget the deleted labels whose slots an insert just reused."""
+        deleted = self._deleted.get(key, set())
+        if reused >= len(deleted):
+            replaced = set(deleted)
+        else:
+            replaced = deleted - set(shard.get_ids_list())
+        deleted -= replaced
+        for label in replaced:
+            self._shard_of.pop(label, None)
+
+    def mark_deleted(self, label: int):
+        """Hide a label from queries (it stays counted until its slot is reused or compacted)."""
+        label = int(label)
+        key = self._shard_of.get(label)
+        if key is None:
+            raise RuntimeError(f"Label {label} not found")
+        deleted = self._deleted.setdefault(key, set())
+        if label not in deleted:
+            # Labels already deleted in a loaded shard are marked again on
+            # sync; counting them here keeps the live count exact
+            deleted.add(label)
+            self._live[key] -= 1
+        self.shards[key].mark_deleted(label)
+
+    def knn_query(self, data, k: int = 1, num_threads: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest labels and distances per query, searched within the query's shard.
+
+        Rows with fewer than k candidates are padded with MISSING_LABEL and
+        infinite distance.
+        """
+        data = np.atleast_2d(np.asarray(data, dtype=np.float32))
+        labels = np.full((len(data), k), MISSING_LABEL, dtype=np.int64)
+        distances = np.full((len(data), k), np.inf, dtype=np.float32)
+        keys = shard_keys(data)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        for i, key in enumerate(map(tuple, unique_keys.tolist())):
+            rows = np.flatnonzero(inverse.reshape(-1) == i)
+            found_labels, found_distances = [], []
+            for shard_key in self._search_shards(key):
+                shard_k = min(k, self._live[shard_key])
+                shard_labels, shard_distances = self.shards[shard_key].knn_query(
+                    data[rows], k=shard_k, num_threads=num_threads)
+                found_labels.append(shard_labels.astype(np.int64))
+                found_distances.append(shard_distances)
+            if not found_labels:
+                continue
+            merged_labels = np.concatenate(found_labels, axis=1)
+            merged_distances = np.concatenate(found_distances, axis=1)
+            order = np.argsort(merged_distances, axis=1, kind="stable")[:, :k]
+            width = order.shape[1]
+            labels[rows, :width] = np.take_along_axis(merged_labels, order, axis=1)
+            distances[rows, :width] = np.take_along_axis(merged_distances, order, axis=1)
+        return labels, distances
+
+    def _search_shards(self, key: ShardKey) -> List[ShardKey]:
+        """The query's own shard, or the live shards of the same street when it is empty."""
+        if self._live.get(key, 0) > 0:
+            return [key]
+        return [other for other, live in self._live.items() if other[0] == key[0] and live > 0]
+
+    def get_ids_list(self) -> List[int]:
+        return [label for shard in self.shards.values() for label in shard.get_ids_list()]
+
+    def get_current_count(self) -> int:
+        return sum(shard.get_current_count() for shard in self.shards.values())
+
+    def get_max_elements(self) -> int:
+        return sum(shard.get_max_elements() for shard in self.shards.values())
+
+    def shard_sizes(self) -> Dict[str, int]:
+        """Live rows per shard, keyed 'round-facing-group'."""
+        return {_shard_name(key): live for key, live in sorted(self._live.items())}
+
+    def save(self, index_path: Path) -> List[Dict]:
+        """
+        Save every shard as ``<index stem>.shard-<key>.bin`` next to index_path.
+
+        Returns:
+            Per-shard metadata for the index meta file
+        """
+        index_path = Path(index_path)
+        shards = []
+        for key, shard in sorted(self.shards.items()):
+            path = index_path.with_name(f"{index_path.stem}.shard-{_shard_name(key)}.bin")
+            shard.save_index(str(path))
+            shards.append({'key': list(key), 'file': path.name,
+                           'max_elements': shard.get_max_elements(),
+                           'element_count': shard.get_current_count()})
+        return shards
+
+    @classmethod
+    def load(cls, index_path: Path, meta: Dict, dim: int) -> 'ShardedHNSWIndex':
+        """Load the shards listed in an index meta file written alongside save()."""
+        index_path = Path(index_path)
+        index = cls(dim, space=meta.get('space', 'cosine'),
+                    shard_capacity=meta.get('shard_capacity', 10000), M=meta.get('M', 16),
+                    ef_construction=meta.get('ef_construction', 200), ef=meta.get('ef', 50),
+                    growth_factor=meta.get('growth_factor', 2.0))
+        for entry in meta['shards']:
+            key = tuple(entry['key'])
+            shard = hnswlib.Index(space=index.space, dim=dim)
+            shard.load_index(str(index_path.with_name(entry['file'])),
+                             max_elements=entry['max_elements'], allow_replace_deleted=True)
+            shard.set_ef(index.ef)
+            index.shards[key] = shard
+            ids = shard.get_ids_list()
+            index._live[key] = len(ids)
+            for label in ids:
+                index._shard_of[label] = key
+        return index
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Stand-in for TexasSolver's console_solver used by the solver tests.
+
+Run with ``--input_file PATH`` it executes one script and exits; with no
+input file it reads commands from stdin until EOF, like the warm daemon
+mode.  It understands ``set_pot``, ``start_solve`` (prints three progress
+reports in TexasSolver's format) and ``dump_result`` plus two test hooks,
+``stub_sleep SECONDS`` and ``stub_crash`` (exit code 3); every other
+command is only counted.  Each dump is
+``{"status", "lines", "pot", "pid"}``, where ``lines`` counts the commands
+since the previous dump.  If the working directory has a ``pids/`` folder
+the process records its pid there on startup.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main():
+    if os.path.isdir("pids"):
+        open(os.path.join("pids", str(os.getpid())), "w").close()
+
+    if "--input_file" in sys.argv:
+        with open(sys.argv[sys.argv.index("--input_file") + 1]) as f:
+            commands = f.read().splitlines()
+    else:
+        commands = sys.stdin
+
+    lines, pot = 0, 0.0
+    for raw in commands:
+        line = raw.strip()
+        if not line:
+            continue
+        lines += 1
+        command, _, args = line.partition(" ")
+        if command == "set_pot":
+            pot = float(args)
+        elif command == "start_solve":
+            for i in range(1, 4):
+                print(f"Iter: {i * 10}")
+                print(f"Total exploitability {8.0 / i:.3f} precent", flush=True)
+        elif command == "stub_sleep":
+            time.sleep(float(args))
+        elif command == "stub_crash":
+            sys.exit(3)
+        elif command == "dump_result":
+            with open(args, "w") as f:
+                json.dump({"status": "ok", "lines": lines, "pot": pot, "pid": os.getpid()}, f)
+            lines = 0
+
+
+if __name__ == "__main__":
+    main()
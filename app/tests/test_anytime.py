@@ -0,0 +1,185 @@
+"""Tests for anytime /decide refinement."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.advisor.anytime import AnytimeDecisionRunner
+from app.advisor.enhanced_gto_service import EnhancedGTODecisionService
+from app.api.models import EquityBreakdown, GTODecision, GTOMetrics, GTOResponse, Seat, Stakes, TableState
+from app.database import poker_vectorizer
+from app.database.poker_vectorizer import PokerSituation, PokerVectorizer
+
+
+def _state(hand_id="h1", board=("Ks", "8d", "5c", "3h", "2s"), hero=("Ah", "Kd")):
+    return TableState(
+        table_id="t1", hand_id=hand_id, stakes=Stakes(sb=0.5, bb=1.0), street="RIVER",
+        board=list(board), hero_hole=list(hero), pot=10.0, to_call=0.0, bet_min=1.0, hero_seat=2,
+        seats=[Seat(seat=1, stack=50.0, in_hand=True, position="BB"),
+               Seat(seat=2, stack=50.0, in_hand=True, is_hero=True, position="BTN")],
+    )
+
+
+def _response(reasoning):
+    metrics = GTOMetrics(
+        equity_breakdown=EquityBreakdown(raw_equity=0.5, fold_equity=0, realize_equity=0.5,
+                                         vs_calling_range=0.5, vs_folding_range=0.5),
+        min_call=0, min_bet=1, pot=10, players=2, spr=5, effective_stack=50, pot_odds=0,
+        range_advantage=0, nut_advantage=0, bluff_catchers=0, board_favorability=0,
+        positional_advantage=0, initiative=False, commitment_threshold=0, reverse_implied_odds=0)
+    return GTOResponse(decision=GTODecision(action="Check", reasoning=reasoning), metrics=metrics, strategy="s")
+
+
+class ScriptedService:
+    """Yields each stage after a fixed delay."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.started = 0
+        self.cancelled = 0
+
+    async def refine_gto_decision(self, state, strategy_name):
+        self.started += 1
+        try:
+            for stage, delay in self.stages:
+                await asyncio.sleep(delay)
+                yield stage, _response(stage)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    def _enhanced_fallback_decision(self, state, strategy_name):
+        return _response("heuristic")
+
+
+class TestAnytimeDecisionRunner:
+    """Test suite for deadline-bounded decisions."""
+
+    def setup_method(self, method):
+        """Collect published updates."""
+        self.published = []
+
+    async def _publish(self, table_id, message):
+        self.published.append((table_id, message["stage"], message["final"]))
+
+    def test_deadline_returns_best_stage_and_pushes_the_rest(self):
+        """Test the response holds the stage ready at the deadline and later stages are published."""
+        service = ScriptedService([("database", 0.0), ("coarse", 0.3), ("full", 0.1)])
+        runner = AnytimeDecisionRunner(service, publish=self._publish)
+
+        async def run():
+            response = await runner.decide(_state(), deadline_ms=100)
+            await runner._runs["t1"].task
+            return response
+
+        response = asyncio.run(run())
+        assert (response.refinement_stage, response.refining) == ("database", True)
+        assert self.published == [("t1", "coarse", False), ("t1", "full", True)]
+
+    def test_finished_refinement_returns_before_deadline(self):
+        """Test a spot that resolves early is answered at once and nothing is pushed."""
+        runner = AnytimeDecisionRunner(ScriptedService([("full", 0.0)]), publish=self._publish)
+        response = asyncio.run(runner.decide(_state(), deadline_ms=5000))
+
+        assert (response.refinement_stage, response.refining) == ("full", False)
+        assert self.published == []
+
+    def test_nothing_ready_falls_back_to_heuristic(self):
+        """Test a deadline that beats every stage gets the heuristic decision."""
+        runner = AnytimeDecisionRunner(ScriptedService([("full", 5.0)]), publish=self._publish)
+
+        async def run():
+            response = await runner.decide(_state(), deadline_ms=10)
+            await runner.shutdown()
+            return response
+
+        response = asyncio.run(run())
+        assert (response.refinement_stage, response.refining) == ("heuristic", True)
+
+    def test_same_spot_joins_and_new_spot_cancels(self):
+        """Test repeat requests share one refinement and a new spot cancels the stale one."""
+        service = ScriptedService([("coarse", 0.0), ("full", 5.0)])
+        runner = AnytimeDecisionRunner(service, publish=self._publish)
+
+        async def run():
+            await runner.decide(_state(), deadline_ms=50)
+            await runner.decide(_state(), deadline_ms=50)
+            assert service.started == 1
+            await runner.decide(_state(hand_id="h2"), deadline_ms=50)
+            assert (service.started, service.cancelled) == (2, 1)
+            await runner.shutdown()
+
+        asyncio.run(run())
+
+    def test_finished_refinement_is_dropped(self):
+        """Test a table's run is forgotten once it finished and was answered, either way round."""
+        runner = AnytimeDecisionRunner(ScriptedService([("full", 0.05)]), publish=self._publish)
+
+        async def run():
+            await runner.decide(_state(), deadline_ms=1000)
+            assert runner._runs == {}
+            await runner.decide(_state(hand_id="h2"), deadline_ms=0)
+            assert "t1" in runner._runs
+            await runner._runs["t1"].task
+            assert runner._runs == {}
+
+        asyncio.run(run())
+
+    def test_service_refines_river_spot(self):
+        """Test the service yields a coarse subgame solve before the full decision."""
+        service = EnhancedGTODecisionService()
+        service.solution_db = None
+
+        async def run():
+            stages = []
+            async for stage, _ in service.refine_gto_decision(_state(), "default_cash6max"):
+                stages.append((stage, service.openspiel_wrapper.subgame_store.get("h1")))
+            return stages
+
+        (coarse, coarse_solution), (full, full_solution) = asyncio.run(run())
+        assert (coarse, full) == ("coarse", "full")
+        # The full stage keeps iterating the coarse stage's subgame
+        assert full_solution.solver is coarse_solution.solver
+        assert full_solution.iterations > coarse_solution.iterations
+
+    def test_database_stage_looks_up_the_hero_hand(self):
+        """Test the database stage vectorizes the hero's real cards, not the lowercased fallback."""
+        looked_up = []
+
+        class RecordingDatabase:
+            initialized = True
+
+            def get_instant_recommendation(self, situation, aggregate=False):
+                looked_up.append(situation)
+                return None
+
+        service = EnhancedGTODecisionService()
+        service.solution_db = RecordingDatabase()
+
+        async def run():
+            async for stage, _ in service.refine_gto_decision(_state(), "default_cash6max"):
+                pass
+
+        asyncio.run(run())
+        vectorizer = PokerVectorizer()
+        vector = vectorizer.vectorize_situation(looked_up[0])
+        expected = vectorizer.vectorize_situation(PokerSituation(
+            hole_cards=["Ah", "Kd"], board_cards=["Ks", "8d", "5c", "3h", "2s"],
+            position=looked_up[0].position, pot_size=10.0, bet_to_call=0.0, stack_size=50.0,
+            num_players=2, betting_round=looked_up[0].betting_round))
+        np.testing.assert_allclose(vector[0:16], expected[0:16])
+        assert vector[0] > vector[1] > 0.8
+
+    def test_database_positions_are_mapped_explicitly(self):
+        """Test full-ring positions map to their database neighbours and unknown ones are refused."""
+        service = EnhancedGTODecisionService()
+        state = _state()
+        hero = state.seats[1]
+        for api, expected in (("UTG+2", "MP"), ("LJ", "MP2"), ("HJ", "MP2"), ("UTG+1", "UTG1"), ("BTN", "BTN")):
+            hero.position = api
+            assert service._to_poker_situation(state).position == poker_vectorizer.Position[expected]
+
+        hero.position = None
+        with pytest.raises(ValueError):
+            service._to_poker_situation(state)
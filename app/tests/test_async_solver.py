@@ -0,0 +1,203 @@
+"""Tests for non-blocking solver execution."""
+
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from app.advisor.async_solver import AsyncSolverPool, SolverQueueFull
+from app.advisor.solver_cache import SolverResultCache
+from app.advisor import texas_solver_client as tsc
+from app.advisor.texas_solver_client import TexasSolverTimeout
+
+# Stand-in for console_solver, installed with this interpreter in its shebang
+STUB_SOLVER = Path(__file__).with_name("stub_solver.py")
+
+
+def _script(sleep=0.0, pot=10):
+    """Minimal solver script for the stub."""
+    return f"set_pot {pot}\nstub_sleep {sleep}\ndump_result output_result.json\n"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub solver uses a shebang")
+class TestAsyncSolverPool:
+    """Test suite for the async solver pool."""
+
+    def setup_method(self, method):
+        """Install the stub solver in a temp solver dir."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.solver_dir = Path(self.tmp.name)
+        (self.solver_dir / "resources").mkdir()
+        (self.solver_dir / "pids").mkdir()
+        self.exe = self.solver_dir / "console_solver"
+        source = STUB_SOLVER.read_text().split("\n", 1)[1]
+        self.exe.write_text(f"#!{sys.executable}\n" + source)
+        self.exe.chmod(self.exe.stat().st_mode | stat.S_IEXEC)
+
+    def teardown_method(self, method):
+        """Remove the temp solver dir."""
+        self.tmp.cleanup()
+
+    def _pool(self, slots=1, max_queue=4, cache=None):
+        return AsyncSolverPool(slots=slots, max_queue=max_queue, exe=self.exe, solver_dir=self.solver_dir,
+                               cache=cache, use_cache=cache is not None)
+
+    def test_solve_returns_dump(self):
+        """Test a solve returns the parsed result from its own output path."""
+        result = asyncio.run(self._pool().solve(_script()))
+        assert (result["status"], result["lines"], result["pot"]) == ("ok", 3, 10.0)
+
+    def test_cache_hit_skips_solver(self):
+        """Test a repeat script is answered from the cache without a new process."""
+        cache = SolverResultCache(cache_dir=self.solver_dir / "cache")
+        pool = self._pool(cache=cache)
+        first = asyncio.run(pool.solve(_script()))
+        second = asyncio.run(pool.solve(_script().replace("set_pot 10", "set_pot  10.0")))
+
+        assert first == second
+        assert len(list((self.solver_dir / "pids").iterdir())) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_slots_run_concurrently(self):
+        """Test two slots overlap two solves instead of running them back to back."""
+        pool = self._pool(slots=2)
+
+        async def run():
+            start = time.monotonic()
+            results = await asyncio.gather(pool.solve(_script(0.6)), pool.solve(_script(0.6)))
+            return results, time.monotonic() - start
+
+        results, elapsed = asyncio.run(run())
+        assert all(r["status"] == "ok" for r in results)
+        assert elapsed < 1.1
+        assert pool.get_stats()["completed"] == 2
+
+    def test_queue_full_rejects(self):
+        """Test requests beyond the slots and queue are rejected immediately."""
+        pool = self._pool(slots=1, max_queue=0)
+
+        async def run():
+            first = asyncio.ensure_future(pool.solve(_script(0.5)))
+            await asyncio.sleep(0.05)
+            with pytest.raises(SolverQueueFull):
+                await pool.solve(_script())
+            return await first
+
+        assert asyncio.run(run())["status"] == "ok"
+        assert pool.get_stats()["rejected"] == 1
+
+    def test_script_building_leaves_loop_free(self, monkeypatch):
+        """Test slow script extraction runs in a thread while the loop keeps ticking."""
+        extract = tsc._extract_solver_script
+
+        def slow_extract(input_text, budget_ms=None):
+            time.sleep(0.3)
+            return extract(input_text, budget_ms)
+
+        monkeypatch.setattr(tsc, "_extract_solver_script", slow_extract)
+        pool = self._pool()
+
+        async def run():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            result = await pool.solve(_script())
+            ticker.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        assert result["status"] == "ok"
+        assert ticks >= 10
+
+    def test_script_building_counts_against_deadline(self, monkeypatch):
+        """Test time spent building the script is charged to deadline_s."""
+        extract = tsc._extract_solver_script
+
+        def slow_extract(input_text, budget_ms=None):
+            time.sleep(0.4)
+            return extract(input_text, budget_ms)
+
+        monkeypatch.setattr(tsc, "_extract_solver_script", slow_extract)
+        pool = self._pool()
+
+        async def run():
+            start = time.monotonic()
+            with pytest.raises(TexasSolverTimeout):
+                await pool.solve(_script(30), deadline_s=0.8)
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) < 1.1
+
+    def test_sync_solves_use_private_outputs(self, monkeypatch):
+        """Test concurrent blocking solves each read back their own dump."""
+        from concurrent.futures import ThreadPoolExecutor
+        monkeypatch.setattr(tsc, "TEXASSOLVER_EXE", self.exe)
+        monkeypatch.setattr(tsc, "TEXASSOLVER_DIR", self.solver_dir)
+        client = tsc.TexasSolverClient(use_cache=False)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda pot: client.solve(_script(0.2, pot)), range(1, 5)))
+        assert [r["pot"] for r in results] == [1.0, 2.0, 3.0, 4.0]
+
+    def test_progress_lines_become_convergence(self, monkeypatch):
+        """Test TexasSolver progress output is attached as an exploitability curve."""
+        monkeypatch.setattr(tsc, "TEXASSOLVER_EXE", self.exe)
+        monkeypatch.setattr(tsc, "TEXASSOLVER_DIR", self.solver_dir)
+        script = "set_pot 10\nstart_solve\ndump_result output_result.json\n"
+
+        blocking = tsc.TexasSolverClient(use_cache=False).solve(script)
+        pooled = asyncio.run(self._pool().solve(script))
+        for result in (blocking, pooled):
+            curve = result["convergence"]
+            assert [p["iteration"] for p in curve] == [10, 20, 30]
+            assert [p["exploitability_pct"] for p in curve] == [8.0, 4.0, 2.667]
+
+    def test_convergence_log_parses_progress(self):
+        """Test only exploitability lines with a known iteration are recorded."""
+        log = tsc.ConvergenceLog()
+        for line in ("Total exploitability 9.0 precent", "Iter: 0", "Total exploitability 12.5 precent",
+                     "Using 4 threads", "Iter: 5", "total exploitability 3 %"):
+            log.feed(line)
+        assert [(p["iteration"], p["exploitability_pct"]) for p in log.points] == [(0, 12.5), (5, 3.0)]
+        assert "convergence" not in tsc.ConvergenceLog().attach({"ok": 1})
+
+    def test_read_output_with_and_without_streaming(self):
+        """Test the buffered parser (and ijson when installed) read the same dump."""
+        path = self.solver_dir / "dump.json"
+        path.write_text('{"actions": ["CHECK", "BET 5"], "strategy": {"AA": [0.5, 0.5]}}')
+        expected = {"actions": ["CHECK", "BET 5"], "strategy": {"AA": [0.5, 0.5]}}
+        assert tsc.read_solver_output(path, stream=False) == expected
+        if tsc.IJSON_AVAILABLE:
+            assert tsc.read_solver_output(path, stream=True) == expected
+
+    def test_deadline_and_cancel_kill_child(self):
+        """Test a missed deadline raises and a cancelled solve leaves no process behind."""
+        pool = self._pool()
+
+        async def run():
+            with pytest.raises(TexasSolverTimeout):
+                await pool.solve(_script(30), deadline_s=0.5)
+
+            task = asyncio.ensure_future(pool.solve(_script(30)))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        pids = [int(p.name) for p in (self.solver_dir / "pids").iterdir()]
+        assert len(pids) == 2
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -0,0 +1,50 @@
+"""Tests for suit-isomorphic canonicalization."""
+
+import itertools
+
+from app.core import canonical
+from app.database.poker_vectorizer import BettingRound, PokerSituation, Position
+from app.database.gto_database import GTODatabase
+
+
+class TestCanonical:
+    """Test suite for canonical spot keys."""
+
+    def test_flop_count(self):
+        """Test the 22,100 flops collapse to 1,755 strategic flops."""
+        flops = {
+            tuple(canonical.canonicalize_codes([], flop)[1])
+            for flop in itertools.combinations(range(52), 3)
+        }
+        assert len(flops) == 1755
+
+    def test_isomorphic_spots_share_keys(self):
+        """Test suit relabellings map to the same key, different spots do not."""
+        key = canonical.canonical_key(["ah", "kh"], ["qh", "7h", "2c"])
+        assert key == canonical.canonical_key(["ks", "as"], ["7s", "qs", "2d"])
+        assert key != canonical.canonical_key(["ah", "kd"], ["qh", "7h", "2c"])
+
+        # Turn and river order matters, flop order does not
+        assert (canonical.canonical_key(["ah", "kd"], ["2c", "7h", "qh", "3s"])
+                != canonical.canonical_key(["ah", "kd"], ["2c", "7h", "3s", "qh"]))
+
+    def test_permutation_round_trip(self):
+        """Test the returned permutation maps ranges and inverts cleanly."""
+        hole, board, permutation = canonical.canonicalize(["as", "ks"], ["qs", "7s", "2d"])
+        inverse = canonical.invert_permutation(permutation)
+        assert canonical.permute_range(canonical.permute_range(["AsKs", "QQ:0.5"], permutation), inverse) == ["AsKs", "QQ:0.5"]
+        assert hole == ["kd", "ad"]
+        assert canonical.permute_range(["AsKs"], permutation) == ["AdKd"]
+
+    def test_situation_id_is_canonical(self):
+        """Test GTODatabase situation ids merge suit-isomorphic spots."""
+        db = GTODatabase.__new__(GTODatabase)
+        first = PokerSituation(
+            hole_cards=["ah", "kh"], board_cards=["qh", "7h", "2c"], position=Position.BTN,
+            pot_size=10.0, bet_to_call=0.0, stack_size=100.0, num_players=2, betting_round=BettingRound.FLOP,
+        )
+        second = PokerSituation(
+            hole_cards=["as", "ks"], board_cards=["qs", "7s", "2d"], position=Position.BTN,
+            pot_size=10.0, bet_to_call=0.0, stack_size=100.0, num_players=2, betting_round=BettingRound.FLOP,
+        )
+        assert db._generate_situation_id(first) == db._generate_situation_id(second)
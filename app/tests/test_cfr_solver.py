@@ -0,0 +1,221 @@
+"""Tests for the vectorized turn/river CFR solver."""
+
+import time
+
+import numpy as np
+
+from app.core import cfr_solver, hand_combos, table_evaluator
+from app.core.cfr_solver import OOP, IP, SubgameSolver, TreeConfig
+from app.core.openspiel_wrapper import OpenSpielWrapper
+from app.core.range_analyzer import Position, RangeAnalyzer
+
+RIVER = ["Ks", "8d", "5c", "3h", "2s"]
+# One pot-sized bet, no raises: the textbook polarized river game
+POT_BET_ONLY = TreeConfig(bet_sizes=(1.0,), raise_sizes=(), max_raises=0, allin=False)
+
+
+class TestSubgameSolver:
+    """Test suite for the subgame solver."""
+
+    def test_showdown_values_match_pairwise(self):
+        """Test sorted-cumsum showdown values equal a direct pairwise sum with card removal."""
+        solver = SubgameSolver(RIVER, 10, 30, cfr_solver.range_vector("AA,KQ,88,76s,A4s", RIVER),
+                               cfr_solver.range_vector("KK,AK,QJs,55,A4s", RIVER))
+        rng = np.random.default_rng(0)
+        for p in (OOP, IP):
+            hero, opp = solver.hands[p], solver.hands[1 - p]
+            reach = rng.random(len(opp.combos))
+            node = cfr_solver._Node("showdown", (3.0, 3.0), (solver.board,))
+            values = solver._terminal(node, p, reach[None, :])[0]
+
+            hero_strength = table_evaluator.evaluate_batch(hero.combos, solver.board)
+            opp_strength = table_evaluator.evaluate_batch(opp.combos, solver.board)
+            expected = np.zeros(len(hero.combos))
+            for i, (a, b) in enumerate(hero.combos):
+                for j, (c, d) in enumerate(opp.combos):
+                    if len({a, b, c, d}) < 4:
+                        continue
+                    diff = hero_strength[i] - opp_strength[j]
+                    expected[i] += reach[j] * (13.0 if diff > 0 else -3.0 if diff < 0 else 5.0)
+            np.testing.assert_allclose(values, expected, atol=1e-9)
+
+    def test_polarized_river_equilibrium(self):
+        """Test the nuts-or-air game converges to pot-odds bluffing and calling."""
+        solution = cfr_solver.solve_subgame(RIVER, 10, 100, "QQ", "KK,JTs", tree=POT_BET_ONLY,
+                                            target_exploitability_pct=0.1, time_budget_ms=10000)
+
+        assert solution.exploitability_pct <= 0.1
+        # Pot-sized bet: one bluff per two value bets, bluff-catcher calls half
+        bluff = solution.hand_strategy(["Jh", "Th"], ["check"])["bet 100%"]
+        assert abs(bluff - 0.375) < 0.03
+        assert solution.hand_strategy(["Kh", "Kd"], ["check"])["bet 100%"] > 0.99
+        assert abs(solution.range_frequencies(["check", "bet 100%"])["call"] - 0.5) < 0.05
+
+    def test_river_reaches_target(self):
+        """Test a realistic river spot converges below half a percent of the pot."""
+        solver = SubgameSolver(RIVER, 10, 50, cfr_solver.range_vector(
+            "22+,A2s+,K9s+,QTs+,J9s+,T9s,98s,ATo+,KJo+", RIVER),
+            cfr_solver.range_vector("55+,A8s+,KTs+,QJs,AJo+,KQo", RIVER))
+        start = solver.exploitability()
+        solution = solver.solve(time_budget_ms=20000)
+
+        assert solution.exploitability_pct <= cfr_solver.DEFAULT_TARGET_EXPLOITABILITY_PCT
+        assert solution.exploitability < start
+        strategy = solution.strategy()
+        combos = strategy["check"] > 0
+        total = sum(strategy.values())
+        np.testing.assert_allclose(total[combos], 1.0)
+
+    def test_solve_stops_at_target_and_records_curve(self):
+        """Test a solve stops early at the target and keeps every exploitability check."""
+        solver = SubgameSolver(RIVER, 10, 50, cfr_solver.range_vector("AA,KQ,88,76s,A4s", RIVER),
+                               cfr_solver.range_vector("KK,AK,QJs,55,A4s", RIVER))
+        solution = solver.solve(target_exploitability_pct=2.0, time_budget_ms=20000,
+                                max_iterations=1000, check_every=5)
+
+        curve = solution.convergence
+        assert solution.iterations < 1000
+        assert curve[-1]["iteration"] == solution.iterations
+        assert curve[-1]["exploitability_pct"] == solution.exploitability_pct <= 2.0
+        assert all(point["exploitability_pct"] > 2.0 for point in curve[:-1])
+        assert [p["iteration"] for p in curve] == sorted(p["iteration"] for p in curve)
+
+    def test_first_check_fits_the_budget(self):
+        """Test a tight budget shortens the first block instead of running check_every iterations."""
+        oop, ip = (cfr_solver.range_vector(dict.fromkeys(RangeAnalyzer.PREFLOP_RANGES[position], 1.0), RIVER)
+                   for position in (Position.BB, Position.BTN))
+        solver = SubgameSolver(RIVER, 10, 100, oop, ip)
+        solution = solver.solve(target_exploitability_pct=0.0, time_budget_ms=30, check_every=200)
+
+        assert 1 <= solution.iterations < 200
+        assert solution.convergence[-1]["iteration"] == solution.iterations
+
+    def test_default_ranges_tradeoff(self):
+        """Test the default-range river's iterations-to-target and what the default budget buys."""
+        oop, ip = (cfr_solver.range_vector(dict.fromkeys(RangeAnalyzer.PREFLOP_RANGES[position], 1.0), RIVER)
+                   for position in (Position.BB, Position.BTN))
+        solution = SubgameSolver(RIVER, 10, 100, oop, ip).solve(time_budget_ms=60000, max_iterations=130)
+        curve = {point["iteration"]: point["exploitability_pct"] for point in solution.convergence}
+        assert curve[50] < 2.5 and curve[60] < 1.5
+        assert solution.exploitability_pct <= cfr_solver.DEFAULT_TARGET_EXPLOITABILITY_PCT
+        assert solution.iterations <= 120
+
+        solver = SubgameSolver(RIVER, 10, 100, oop, ip)
+        start = time.perf_counter()
+        solution = solver.solve()
+        assert (time.perf_counter() - start) * 1000 < 1.5 * cfr_solver.DEFAULT_TIME_BUDGET_MS
+        assert solution.iterations >= 10 and solution.exploitability_pct < curve[10]
+
+    def test_turn_deals_every_river(self):
+        """Test turn subgames batch the river cards and converge."""
+        board = RIVER[:4]
+        solver = SubgameSolver(board, 10, 40, cfr_solver.range_vector("AA,KQs,99,76s", board),
+                               cfr_solver.range_vector("KK,AKs,T9s,44", board), algorithm="cfr+")
+        chance = solver.node_at(["check", "check"])[0]
+        assert chance.kind == "chance" and len(chance.cards) == 48
+
+        start = solver.exploitability()
+        solution = solver.solve(max_iterations=40, time_budget_ms=60000)
+        assert solution.exploitability < start / 4
+
+        river = solution.range_frequencies(["check", "check", "Ah"])
+        assert abs(sum(river.values()) - 1.0) < 1e-9
+        assert solution.hand_strategy(["As", "Ah"], ["check", "check", "Ah"]) == {}
+
+    def test_turn_solution_seeds_river_resolve(self):
+        """Test a dealt river inherits reach, values and strategy from the solved turn."""
+        board = RIVER[:4]
+        turn = cfr_solver.solve_subgame(board, 10, 40, "AA,KQs,99,76s", "KK,AKs,T9s,44",
+                                        max_iterations=60, time_budget_ms=60000)
+        history = ["check", "bet 50%", "call", "2h"]
+        bet = turn.solver.node_at(history)[0].bets[0]
+
+        river = SubgameSolver.from_parent(turn, history)
+        assert (river.pot, river.stack) == (10 + 2 * bet, 40 - bet)
+        oop_range, _ = turn.reach_ranges(history)
+        assert oop_range[hand_combos.combo_index(*table_evaluator.cards_to_codes(["2h", "2d"]))] == 0
+        # Before any further iteration the re-solve plays the turn's river strategy
+        for p in (OOP, IP):
+            values = np.zeros(hand_combos.NUM_COMBOS)
+            values[river._full_index(p)] = river.expected_values(p)
+            live = values != 0
+            np.testing.assert_allclose(values[live], turn.counterfactual_values(p, history)[live] + bet, atol=1e-9)
+
+        iterations = []
+        for warm in (0, cfr_solver.WARM_START_ITERATIONS):
+            solver = SubgameSolver.from_parent(turn, ["check", "check", "2h"], gadget_player=IP, warm_iterations=warm)
+            solution = solver.solve(target_exploitability_pct=2.0, time_budget_ms=20000, check_every=1)
+            iterations.append(solution.iterations - warm)
+        assert iterations[1] <= iterations[0] / 4
+
+    def test_gadget_exit_values(self):
+        """Test the re-solve gadget exits when its values beat the subgame and follows otherwise."""
+        oop = cfr_solver.range_vector("AA,KQ,88,76s", RIVER)
+        ip = cfr_solver.range_vector("KK,AK,QJs,55", RIVER)
+        free = cfr_solver.solve_subgame(RIVER, 10, 30, oop, ip, target_exploitability_pct=0.2, time_budget_ms=20000)
+        for alt, follow in ((100.0, 0.0), (-100.0, 1.0)):
+            solver = SubgameSolver(RIVER, 10, 30, oop, ip, gadget=(IP, np.full(hand_combos.NUM_COMBOS, alt)))
+            solution = solver.solve(target_exploitability_pct=0.2, time_budget_ms=20000)
+            frequencies = SubgameSolver._average_strategy(solver._top)[1, 0]
+            np.testing.assert_allclose(frequencies, follow, atol=1e-3)
+        # A gadget that is never taken leaves the subgame's solution unchanged
+        for label, freq in free.range_frequencies().items():
+            assert abs(solution.range_frequencies()[label] - freq) < 0.02
+
+    def test_tree_respects_stack(self):
+        """Test bets near the stack collapse into all-in and all-ins end the betting."""
+        solver = SubgameSolver(RIVER, 10, 12, cfr_solver.range_vector("AA", RIVER),
+                               cfr_solver.range_vector("KK", RIVER))
+        root, _ = solver.node_at()
+        assert root.actions == ["check", "bet 50%", "allin"]
+        facing_allin, _ = solver.node_at(["allin"])
+        assert facing_allin.actions == ["fold", "call"]
+        assert solver.closest_action([], 11) == "allin"
+
+
+class TestSubgameWrapper:
+    """Test suite for routing heads-up river spots to the subgame solver."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.wrapper = OpenSpielWrapper()
+
+    def test_river_context_uses_subgame(self):
+        """Test a heads-up river context is solved and facing a bet maps to call/raise/fold."""
+        context = {
+            "hero_cards": ["Ah", "Kd"], "board_cards": RIVER, "pot_size": 10, "position": "BTN",
+            "bet_to_call": 5, "stack_size": 50, "num_players": 2,
+        }
+        result = self.wrapper._compute_subgame_strategy(context, 10000, 2000)
+
+        assert result["solver"] == "cfr_subgame"
+        assert set(result["action_probabilities"]) == {"call", "raise", "fold"}
+        assert abs(sum(result["action_probabilities"].values()) - 1.0) < 1e-6
+        assert result["equity"] > 0.8
+        assert result["exploitability_pct"] <= cfr_solver.DEFAULT_TARGET_EXPLOITABILITY_PCT
+        assert result["convergence"][-1]["iteration"] == result["iterations"]
+
+    def test_hand_carries_turn_into_river(self):
+        """Test a stored turn solution for the hand seeds the river solve and is replaced by it."""
+        board = RIVER[:4]
+        turn = cfr_solver.solve_subgame(board, 10, 40, "AA,AKs,99,76s", "KK,AK,T9s,44",
+                                        max_iterations=40, time_budget_ms=60000)
+        self.wrapper.subgame_store.set("hand-1", turn)
+        context = {
+            "hand_id": "hand-1", "hero_cards": ["Ah", "Kd"], "board_cards": RIVER, "pot_size": 10,
+            "position": "BTN", "bet_to_call": 0, "stack_size": 40, "num_players": 2,
+        }
+        result = self.wrapper._compute_subgame_strategy(context, 10000, 2000)
+
+        river = self.wrapper.subgame_store.get("hand-1")
+        assert river is not turn and river.solver.board == tuple(table_evaluator.cards_to_codes(RIVER))
+        assert river.solver._top is not river.solver.root
+        assert result["iterations"] == river.iterations > cfr_solver.WARM_START_ITERATIONS
+        assert set(result["action_probabilities"]) == {"check", "bet", "fold"}
+
+    def test_other_spots_are_skipped(self):
+        """Test turn, multiway and preflop contexts are left to the existing path."""
+        base = {"hero_cards": ["Ah", "Kd"], "pot_size": 10, "position": "BB", "stack_size": 50}
+        for board, players in ((RIVER[:4], 2), (RIVER, 3), ([], 2)):
+            context = dict(base, board_cards=board, num_players=players)
+            assert self.wrapper._compute_subgame_strategy(context, 100, 100) is None
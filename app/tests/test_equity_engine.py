@@ -0,0 +1,105 @@
+"""Tests for the exact / Monte Carlo equity engine."""
+
+import itertools
+
+import pytest
+
+from app.core import equity_engine, table_evaluator
+
+
+class TestEquityEngine:
+    """Test suite for hand-vs-range and range-vs-range equity."""
+
+    def test_river_is_exact(self):
+        """Test river equity against known outcomes."""
+        board = ["ah", "kd", "7c", "4s", "2d"]
+        # AQ beats KQ, chops with AQ
+        result = equity_engine.hand_vs_range(["as", "qh"], ["AQo", "KQo"], board)
+        assert result.exact
+        assert result.tie > 0
+        assert 0.5 < result.equity < 1.0
+
+        nuts = equity_engine.hand_vs_range(["ad", "ac"], ["KK", "77"], board)
+        assert nuts.equity == 1.0
+
+    def test_turn_enumeration_matches_brute_force(self):
+        """Test turn enumeration against a direct loop over rivers."""
+        hero = ["jh", "th"]
+        board = ["9h", "8c", "2h", "kd"]
+        villain = ["ks", "kc"]
+        result = equity_engine.hand_vs_range(hero, ["KsKc"], board)
+
+        dead = set(table_evaluator.cards_to_codes(hero + board + villain))
+        wins = ties = total = 0
+        for river in range(52):
+            if river in dead:
+                continue
+            full = table_evaluator.cards_to_codes(board) + [river]
+            h = table_evaluator.evaluate_codes(table_evaluator.cards_to_codes(hero) + full)
+            v = table_evaluator.evaluate_codes(table_evaluator.cards_to_codes(villain) + full)
+            wins += h > v
+            ties += h == v
+            total += 1
+
+        assert result.exact
+        assert result.equity == pytest.approx((wins + ties / 2) / total)
+
+    def test_turn_enumeration_respects_time_budget(self):
+        """Test a turn enumeration that cannot finish in budget returns a sampled estimate."""
+        pairs = [rank * 2 for rank in "AKQJT98765432"]
+        suited = [a + b + "s" for a, b in itertools.combinations("AKQJT98765", 2)]
+        offsuit = [a + b + "o" for a, b in itertools.combinations("AKQJT9", 2)]
+        wide = pairs + suited + offsuit
+        board = ["qs", "9d", "3c", "7h"]
+        exact = equity_engine.range_vs_range(wide, pairs, board)
+        budgeted = equity_engine.range_vs_range(wide, pairs, board, time_budget_ms=5)
+
+        assert exact.exact and exact.samples == 48
+        if not budgeted.exact:
+            assert budgeted.samples < 48
+            assert budgeted.std_error > 0
+            assert budgeted.elapsed_ms < exact.elapsed_ms
+        assert budgeted.equity == pytest.approx(exact.equity, abs=0.03)
+
+    def test_monte_carlo_preflop(self):
+        """Test preflop Monte Carlo converges to textbook equities."""
+        result = equity_engine.hand_vs_range(["ah", "ad"], ["KK"], seed=1)
+        assert not result.exact
+        assert result.equity == pytest.approx(0.82, abs=0.02)
+        assert result.std_error <= equity_engine.DEFAULT_TOLERANCE
+
+        three_way = equity_engine.hand_vs_random(["ah", "ad"], num_opponents=3, seed=1)
+        assert three_way.equity == pytest.approx(0.64, abs=0.03)
+
+    def test_seeded_results_repeat(self):
+        """Test the same seed gives the same estimate."""
+        board = ["qs", "9d", "3c"]
+        first = equity_engine.hand_vs_range(["ah", "kh"], ["QQ", "99", "AQs"], board, seed=5)
+        second = equity_engine.hand_vs_range(["ah", "kh"], ["QQ", "99", "AQs"], board, seed=5)
+        assert first.equity == second.equity
+
+    def test_card_removal_and_weights(self):
+        """Test blocked combos are removed and weights scale combos."""
+        board = ["kh", "7d", "2c", "9s", "3h"]
+        # Only KsKc/KdKs/KdKc remain; hero holds kc so only KdKs can be dealt
+        result = equity_engine.hand_vs_range(["kc", "qd"], ["KK", "QJs:0"], board)
+        assert result.equity == 0.0
+
+        # Zero-weight AKo drops out, leaving only QQ which AA always beats
+        weighted = equity_engine.hand_vs_range(["ah", "ad"], {"QQ": 1.0, "AKo": 0.0}, board)
+        assert weighted.equity == 1.0
+
+        with pytest.raises(ValueError):
+            equity_engine.hand_vs_range(["kh", "qd"], ["AA"], board)
+
+    def test_streaming_stops_at_budget(self):
+        """Test partial results stream and honour the time budget."""
+        updates = list(itertools.islice(
+            equity_engine.iter_hand_vs_range(["ah", "kh"], ["22", "AQo"], batch_size=500), 3
+        ))
+        assert [u.samples for u in updates] == [500, 1000, 1500]
+
+        result = equity_engine.hand_vs_range(
+            ["ah", "kh"], ["22", "AQo"], tolerance=0.0, time_budget_ms=5.0, batch_size=500
+        )
+        assert 0 < result.samples < equity_engine.DEFAULT_MAX_SAMPLES
@@ -0,0 +1,356 @@
+"""Tests for GTODatabase lookups."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.database.connection_pool import SQLiteConnectionPool
+from app.database.gto_database import GTODatabase, HNSWLIB_AVAILABLE
+from app.database.rwlock import ReadWriteLock
+from app.database.poker_vectorizer import BettingRound, PokerSituation, Position
+
+
+def _situation(hole, board, position=Position.BTN, bet_to_call=0.0):
+    """Build a test situation."""
+    round_ = {0: BettingRound.PREFLOP, 3: BettingRound.FLOP, 4: BettingRound.TURN, 5: BettingRound.RIVER}
+    return PokerSituation(
+        hole_cards=hole, board_cards=board, position=position, pot_size=10.0,
+        bet_to_call=bet_to_call, stack_size=100.0, num_players=2, betting_round=round_[len(board)],
+    )
+
+
+@pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib not installed")
+class TestGTODatabaseBatch:
+    """Test suite for batched instant recommendations."""
+
+    def setup_method(self, method):
+        """Create a small database in a temp directory."""
+        import tempfile
+        from pathlib import Path
+        self.tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self.tmp.name)
+        self.index_path = tmp / "gto.bin"
+        self.db = GTODatabase(db_path=str(tmp / "gto.db"), index_path=str(self.index_path))
+        self.db.max_elements = 1000
+        self.db._create_database()
+        self.db._initialize_hnsw_index()
+        self.db.initialized = True
+
+        self.situations = [
+            _situation(["As", "Ah"], [], Position.UTG),
+            _situation(["7c", "2d"], [], Position.SB, bet_to_call=5.0),
+            _situation(["Kh", "Qh"], ["Jh", "Th", "2c"], Position.CO),
+            _situation(["9s", "9d"], ["9h", "5c", "2s", "Kd"], Position.BB, bet_to_call=3.0),
+        ]
+        for i, situation in enumerate(self.situations):
+            decision = ["raise", "fold", "call", "raise"][i]
+            self.db.add_solution(situation, {"decision": decision, "equity": 0.1 * i,
+                                             "reasoning": f"spot {i}", "confidence": 0.9})
+
+    def teardown_method(self, method):
+        """Remove the temp database."""
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_batch_matches_single_lookups(self):
+        """Test the batch path returns the same rows as one-by-one lookups."""
+        batch = self.db.get_instant_recommendations_batch(self.situations, top_k=2)
+        single = [self.db.get_instant_recommendation(s, top_k=2) for s in self.situations]
+
+        assert [r["decision"] for r in batch] == ["raise", "fold", "call", "raise"]
+        for b, s in zip(batch, single):
+            assert (b["decision"], b["equity"], b["reasoning"]) == (s["decision"], s["equity"], s["reasoning"])
+            assert b["metrics"]["similarity_score"] == pytest.approx(s["metrics"]["similarity_score"], abs=1e-6)
+
+    def test_empty_batch(self):
+        """Test an empty batch is a no-op."""
+        assert self.db.get_instant_recommendations_batch([]) == []
+
+    def test_concurrent_lookups_and_writes(self):
+        """Test lookups run alongside writes and every query is counted."""
+        def lookup(i):
+            return self.db.get_instant_recommendation(self.situations[i % 4], top_k=1)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = [pool.submit(lookup, i) for i in range(200)]
+            for i in range(20):
+                self.db.add_solution(_situation(["2c", "3d"], [], bet_to_call=float(i + 1)),
+                                     {"decision": "fold", "reasoning": "extra"})
+            self.db.rebuild_index()
+            results = [f.result() for f in futures]
+
+        assert all(r is not None for r in results)
+        assert self.db.get_performance_stats()["total_queries"] == 200
+        assert self.db.hnsw_index.get_current_count() == 24
+
+
+    def test_upsert_keeps_row_and_retires_label(self):
+        """Test re-adding a situation updates its row in place and hides the old vector."""
+        rowid = self.db.pool.reader().execute("SELECT rowid FROM gto_situations WHERE hnsw_label = 2").fetchone()[0]
+        self.db.add_solution(self.situations[2], {"decision": "fold", "reasoning": "updated"})
+
+        row = self.db.pool.reader().execute(
+            "SELECT rowid, hnsw_label, recommendation FROM gto_situations WHERE rowid = ?", (rowid,)
+        ).fetchone()
+        assert (row[1], row[2]) == (4, "fold")
+        assert self.db._get_situation_count() == 4
+        assert self.db.get_instant_recommendation(self.situations[2], top_k=4)["decision"] == "fold"
+        assert self.db.get_instant_recommendations_batch(self.situations, top_k=4)[2]["decision"] == "fold"
+
+    def test_delete_and_compaction(self):
+        """Test deletes drop a situation and compaction rebuilds without dead labels."""
+        assert self.db.delete_solution(self.situations[0])
+        assert not self.db.delete_solution(self.situations[0])
+        assert self.db._get_situation_count() == 3
+        assert self.db.get_instant_recommendation(self.situations[0], top_k=4)["reasoning"] != "spot 0"
+
+        self.db.rebuild_index()
+        assert sorted(self.db.hnsw_index.get_ids_list()) == [1, 2, 3]
+        assert self.db._stale_labels == 0
+
+    def test_reused_slots_leave_the_deleted_count(self):
+        """Test inserts that reuse a deleted slot stop counting it as a deleted label."""
+        assert self.db.delete_solution(self.situations[0])
+        assert self.db.get_performance_stats()["hnsw_deleted_labels"] == 1
+
+        assert self.db.add_solution(self.situations[0], {"decision": "call", "reasoning": "back"})
+        assert self.db.get_performance_stats()["hnsw_deleted_labels"] == 0
+        assert self.db.hnsw_index.get_current_count() == 4
+        assert self.db._stale_labels == len(set(self.db.hnsw_index.get_ids_list())) - self.db._live_labels
+
+    def test_replaced_labels_are_forgotten(self):
+        """Test the sharded index drops labels whose deleted slots were reused."""
+        index = self.db.hnsw_index
+        for _ in range(3):
+            assert self.db.delete_solution(self.situations[0])
+            assert self.db.add_solution(self.situations[0], {"decision": "call", "reasoning": "back"})
+        assert set(index._shard_of) == set(index.get_ids_list())
+        assert not any(index._deleted.values())
+
+    def test_bulk_add_upserts_in_chunks(self):
+        """Test bulk adds index every row and upsert existing situations, the last write winning."""
+        extra = [(_situation(["2c", "3d"], [], bet_to_call=float(i + 1)), {"decision": "fold", "reasoning": f"bulk {i}"})
+                 for i in range(25)]
+        updated = (self.situations[1], {"decision": "call", "reasoning": "updated"})
+        written = self.db.add_solutions_bulk(extra + [updated, (extra[0][0], {"decision": "raise", "reasoning": "last"})],
+                                             chunk_size=10)
+
+        assert written == 27 and self.db._get_situation_count() == 29
+        assert self.db._live_labels == 29 and self.db._stale_labels == 2
+        assert self.db.get_instant_recommendation(self.situations[1], top_k=1)["decision"] == "call"
+        assert self.db.get_instant_recommendation(extra[0][0], top_k=1)["reasoning"].endswith("last")
+        assert self.db.index_meta_path.exists()
+
+    def test_bulk_job_resumes_after_interruption(self):
+        """Test an interrupted job keeps committed chunks, re-indexes them on load and resumes."""
+        items = [(_situation(["4c", "5d"], [], bet_to_call=float(i + 1)), {"decision": "call"}) for i in range(30)]
+
+        def interrupted():
+            for i, item in enumerate(items):
+                if i == 17:
+                    raise KeyboardInterrupt  # Outside Exception, like a killed import
+                yield item
+
+        with pytest.raises(KeyboardInterrupt):
+            self.db.add_solutions_bulk(interrupted(), chunk_size=5, job="import", checkpoint_every=100)
+        assert self.db._bulk_progress("import") == 15 and self.db._get_situation_count() == 19
+
+        reopened = GTODatabase(db_path=str(self.db.db_path), index_path=str(self.index_path))
+        reopened._create_database()
+        reopened._initialize_hnsw_index()
+        reopened.initialized = True
+        assert len(reopened.hnsw_index.get_ids_list()) >= 19
+
+        assert reopened.add_solutions_bulk(iter(items), chunk_size=5, job="import") == 15
+        assert reopened._get_situation_count() == 34 and reopened._bulk_progress("import") == 0
+        reopened.close()
+
+    def test_bulk_failure_is_raised_after_saving(self):
+        """Test a failing chunk propagates while earlier chunks stay committed and indexed."""
+        items = [(_situation(["6c", "7d"], [], bet_to_call=float(i + 1)), {"decision": "call"}) for i in range(12)]
+
+        def failing():
+            yield from items[:7]
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError, match="bad row"):
+            self.db.add_solutions_bulk(failing(), chunk_size=5, job="broken")
+        assert self.db._bulk_progress("broken") == 5 and self.db._get_situation_count() == 9
+        assert self.db.index_meta_path.exists()
+
+        assert self.db.add_solutions_bulk(iter(items), chunk_size=5, job="broken") == 7
+
+    def test_index_grows_and_persists_capacity(self):
+        """Test a full shard grows geometrically and reloads keep shards and sizes."""
+        self.db.max_elements = 4
+        self.db.rebuild_index()
+        self.db.add_solutions_bulk([(_situation(["2c", "3d"], [], bet_to_call=float(i + 1)), {"decision": "fold"})
+                                    for i in range(20)])
+
+        stats = self.db.get_performance_stats()
+        shard = self.db.hnsw_index.shards[(BettingRound.PREFLOP, 1, 2)]  # Button facing a bet preflop
+        assert shard.get_max_elements() == 39  # 4 -> 9 -> 19 -> 39
+        assert stats["hnsw_index_size"] == 24 and stats["hnsw_index_capacity"] == 4 * 4 + 39
+        assert stats["hnsw_shards"]["0-1-2"] == 20
+
+        meta = json.loads(self.db.index_meta_path.read_text())
+        assert (meta["shard_capacity"], meta["element_count"], meta["M"], len(meta["shards"])) == (4, 24, 16, 5)
+        reopened = GTODatabase(db_path=str(self.db.db_path), index_path=str(self.index_path))
+        reopened._initialize_hnsw_index()
+        assert reopened.max_elements == 4 and reopened.hnsw_index.get_current_count() == 24
+        assert reopened.hnsw_index.shards[(0, 1, 2)].get_max_elements() == 39
+        reopened.close()
+
+    def test_queries_stay_in_their_street(self):
+        """Test lookups only match rows of the same street, falling back across shards within it."""
+        query = _situation(["Ah", "Ad"], ["Jh", "Th", "2c", "3d", "5s"], Position.BTN, bet_to_call=4.0)
+        # No river rows yet: a miss rather than a cross-street match
+        assert self.db.get_instant_recommendation(query) is None
+        assert self.db.get_instant_recommendations_batch([query, self.situations[3]])[0] is None
+
+        # Same street, other shard (CO, no bet): the only river row
+        river = _situation(["Kh", "Qh"], ["Jh", "Th", "2c", "3d", "4s"], Position.CO)
+        self.db.add_solution(river, {"decision": "raise", "reasoning": "river"})
+        result = self.db.get_instant_recommendation(query, top_k=5)
+        assert result["reasoning"].endswith("river")
+
+    def test_neighbour_aggregation(self):
+        """Test aggregation blends all k neighbours into frequencies, sizes, equity and agreement."""
+        def spot(pot):
+            return PokerSituation(hole_cards=["Ah", "Qc"], board_cards=["Jh", "Th", "2c"], position=Position.BTN,
+                                  pot_size=pot, bet_to_call=0.0, stack_size=100.0, num_players=2,
+                                  betting_round=BettingRound.FLOP)
+        lines = [("raise", 4.0, 0.6), ("raise", 6.0, 0.6), ("raise", 8.0, 0.6), ("check", 0.0, 0.1), ("check", 0.0, 0.1)]
+        self.db.add_solutions_bulk([(spot(10.0 + 0.1 * i), {"decision": decision, "bet_size": size, "equity": equity,
+                                                            "reasoning": f"line {i}", "confidence": 1.0})
+                                    for i, (decision, size, equity) in enumerate(lines)])
+
+        result = self.db.get_instant_recommendation(spot(10.2), top_k=5, aggregate=True)
+        metrics = result["metrics"]
+        assert result["decision"] == "raise" and metrics["similar_situations"] == 5
+        assert sum(metrics["action_frequencies"].values()) == pytest.approx(1.0, abs=1e-3)
+        assert metrics["agreement"] == pytest.approx(0.6, abs=0.01)
+        assert result["bet_size"] == pytest.approx(6.0, abs=0.1) and result["equity"] == pytest.approx(0.4, abs=0.01)
+        assert result["confidence"] == pytest.approx(0.6, abs=0.01)
+        assert result["reasoning"].endswith("line 2")  # Nearest row explains the mix
+
+        batch = self.db.get_instant_recommendations_batch([spot(10.2), self.situations[0]], top_k=5, aggregate=True)
+        assert batch[0]["metrics"]["action_frequencies"] == metrics["action_frequencies"]
+        assert batch[1]["decision"] == "raise" and batch[1]["metrics"]["agreement"] == 1.0
+
+    def test_aggregation_skips_missing_neighbours(self):
+        """Test padded (-1) and retired labels drop out and far rows never push confidence negative."""
+        flop = self.situations[2]
+        self.db.add_solution(_situation(["Kd", "Qd"], ["Jh", "Th", "2c"], Position.CO),
+                             {"decision": "raise", "reasoning": "twin", "confidence": 0.9})
+        with self.db.pool.writer() as conn:
+            # A row retired by an in-flight upsert: still in the index, gone from the table
+            conn.execute("DELETE FROM gto_situations WHERE reasoning = 'twin'")
+
+        result = self.db.get_instant_recommendation(flop, top_k=5, aggregate=True)
+        assert result["metrics"]["similar_situations"] == 1  # One live row; the rest are padding
+        assert result["decision"] == "call" and result["reasoning"].endswith("spot 2")
+
+        row = {"recommendation": "fold", "bet_size": 0.0, "equity": 0.2, "cfr_confidence": 0.9, "reasoning": "far"}
+        far = self.db._aggregate_recommendation([(row, 1.6), (dict(row, recommendation="call"), 1.9)], 0.0)
+        assert far["confidence"] == 0.0 and far["metrics"]["similarity_score"] == 0.0
+
+    def test_legacy_schema_is_migrated(self):
+        """Test a store without hnsw_label gets rowid - 1 labels on open."""
+        import sqlite3
+        from pathlib import Path
+        path = Path(self.tmp.name) / "legacy.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute("""
+                CREATE TABLE gto_situations (
+                    id TEXT PRIMARY KEY, vector BLOB NOT NULL, hole_cards TEXT NOT NULL,
+                    board_cards TEXT, position INTEGER NOT NULL, pot_size REAL NOT NULL,
+                    bet_to_call REAL NOT NULL, stack_size REAL NOT NULL, betting_round INTEGER NOT NULL,
+                    recommendation TEXT NOT NULL, bet_size REAL, equity REAL NOT NULL,
+                    reasoning TEXT NOT NULL, cfr_confidence REAL NOT NULL, metadata TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            for situation_id in ("a", "b"):
+                conn.execute("""
+                    INSERT INTO gto_situations (id, vector, hole_cards, position, pot_size, bet_to_call,
+                        stack_size, betting_round, recommendation, equity, reasoning, cfr_confidence)
+                    VALUES (?, x'', '[]', 0, 1, 0, 100, 0, 'fold', 0, '', 0)
+                """, (situation_id,))
+        conn.close()
+
+        legacy = GTODatabase(db_path=str(path), index_path=str(Path(self.tmp.name) / "legacy.bin"))
+        legacy._create_database()
+        labels = legacy.pool.reader().execute("SELECT id, hnsw_label FROM gto_situations ORDER BY id").fetchall()
+        legacy.close()
+        assert [tuple(r) for r in labels] == [("a", 0), ("b", 1)]
+
+
+class TestReadWriteLock:
+    """Test suite for the reader/writer lock."""
+
+    def test_readers_share_writers_exclude(self):
+        """Test readers overlap while a writer waits for them to leave."""
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+        events = []
+
+        def reader():
+            with lock.read():
+                both_reading.wait()  # Would time out if reads were exclusive
+                events.append("read")
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with lock.write():
+            with lock.write():  # Reentrant for the owner
+                with lock.read():  # Owner may read
+                    events.append("write")
+        assert events == ["read", "read", "write"]
+
+
+class TestSQLiteConnectionPool:
+    """Test suite for pooled SQLite connections."""
+
+    def setup_method(self, method):
+        """Create a pool over a temp database file."""
+        import tempfile
+        from pathlib import Path
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pool = SQLiteConnectionPool(Path(self.tmp.name) / "pool.db")
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+
+    def teardown_method(self, method):
+        """Close connections and remove the temp database."""
+        self.pool.close_all()
+        self.tmp.cleanup()
+
+    def test_wal_and_reader_reuse(self):
+        """Test connections run in WAL mode and each thread keeps its reader."""
+        reader = self.pool.reader()
+        assert reader.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert self.pool.reader() is reader
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.pool.reader()))
+        thread.start()
+        thread.join()
+        assert other[0] is not reader
+
+    def test_reader_sees_commits_and_rollback(self):
+        """Test committed writes are visible to readers and failed writes roll back."""
+        with self.pool.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+        with pytest.raises(RuntimeError):
+            with self.pool.writer() as conn:
+                conn.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("abort")
+
+        assert [row[0] for row in self.pool.reader().execute("SELECT x FROM t")] == [1]
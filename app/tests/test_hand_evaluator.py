@@ -0,0 +1,116 @@
+"""Tests for the table-driven hand evaluator and its HandEvaluator shim."""
+
+import numpy as np
+
+from app.core import hand_combos, table_evaluator
+from app.core.hand_evaluator import HandEvaluator
+from app.core.range_analyzer import RangeAnalyzer
+
+
+class TestTableEvaluator:
+    """Test suite for lookup-table hand evaluation."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.evaluator = HandEvaluator()
+
+    def test_category_ordering(self):
+        """Test that every category beats the one below it."""
+        hands = [
+            ["2h", "7d", "9c", "jh", "ks", "3c", "4d"],  # High card
+            ["2h", "2d", "9c", "jh", "ks", "3c", "5d"],  # Pair
+            ["2h", "2d", "9c", "9h", "ks", "3c", "5d"],  # Two pair
+            ["2h", "2d", "2c", "9h", "ks", "3c", "5d"],  # Trips
+            ["2h", "3d", "4c", "5h", "6s", "jc", "kd"],  # Straight
+            ["2h", "7h", "9h", "jh", "kh", "3c", "4d"],  # Flush
+            ["2h", "2d", "2c", "9h", "9s", "3c", "5d"],  # Full house
+            ["2h", "2d", "2c", "2s", "9s", "3c", "5d"],  # Quads
+            ["5h", "6h", "7h", "8h", "9h", "2c", "2d"],  # Straight flush
+        ]
+        strengths = [self.evaluator.evaluate_strength(h) for h in hands]
+        assert strengths == sorted(strengths)
+        assert len(set(strengths)) == len(strengths)
+
+    def test_kickers_break_ties(self):
+        """Test kicker comparison within the same category."""
+        board = ["ah", "7d", "7c", "4s", "2d"]
+        ak = self.evaluator.evaluate_strength(["ks", "qd"] + board)
+        aq = self.evaluator.evaluate_strength(["qs", "jd"] + board)
+        assert ak > aq
+
+        # Board plays: both hands use the same five cards
+        board = ["ah", "kd", "qc", "js", "td"]
+        assert (self.evaluator.evaluate_strength(["2s", "3d"] + board)
+                == self.evaluator.evaluate_strength(["4s", "5d"] + board))
+
+    def test_wheel_is_lowest_straight(self):
+        """Test A-5 straight ranks below 6-high straight."""
+        wheel = self.evaluator.evaluate_hand(["ah", "2d", "3c", "4s", "5d"])
+        six_high = self.evaluator.evaluate_hand(["6h", "2d", "3c", "4s", "5d"])
+        assert wheel == (HandEvaluator.HAND_RANKINGS["straight"], [3])
+        assert six_high == (HandEvaluator.HAND_RANKINGS["straight"], [4])
+
+    def test_legacy_tuple_format(self):
+        """Test evaluate_hand keeps the (hand_rank, kickers) contract."""
+        royal = self.evaluator.evaluate_hand(["ah", "kh", "qh", "jh", "th", "2c", "3d"])
+        assert royal == (HandEvaluator.HAND_RANKINGS["royal_flush"], [12])
+
+        full_house = self.evaluator.evaluate_hand(["kh", "kd", "kc", "2h", "2s", "2c", "9d"])
+        assert full_house == (HandEvaluator.HAND_RANKINGS["full_house"], [11, 0])
+
+        # Third pair outranks the lone kicker
+        two_pair = self.evaluator.evaluate_hand(["ah", "ad", "kc", "kh", "qs", "qc", "2d"])
+        assert two_pair == (HandEvaluator.HAND_RANKINGS["two_pair"], [12, 11, 10])
+
+        assert self.evaluator.evaluate_hand(["ah", "kd"]) == (0, [])
+
+    def test_strength_and_set_detection(self):
+        """Test calculate_hand_strength and _is_set still work."""
+        cards = ["8h", "8d", "8c", "kd", "2s"]
+        assert self.evaluator._is_set(cards)
+        assert self.evaluator.calculate_hand_strength(cards[:2], cards[2:]) == 0.85
+        assert self.evaluator.calculate_hand_strength(["8h", "kd"], ["8c", "8d", "2s"]) == 0.65
+
+    def test_array_matches_scalar(self):
+        """Test the vectorized path agrees with the scalar path."""
+        rng = np.random.default_rng(7)
+        codes = np.argsort(rng.random((2000, 52)), axis=1)[:, :7]
+
+        batch = table_evaluator.evaluate_array(codes)
+        scalar = [table_evaluator.evaluate_codes(row) for row in codes.tolist()]
+
+        assert batch.tolist() == scalar
+
+    def test_array_rank_index_covers_partial_hands(self):
+        """Test the base-5 rank index agrees with the scalar path for 1-6 cards and int8 codes."""
+        rng = np.random.default_rng(11)
+        for size in range(1, 7):
+            codes = np.argsort(rng.random((500, 52)), axis=1)[:, :size].astype(np.int8)
+            scalar = [table_evaluator.evaluate_codes(row) for row in codes.tolist()]
+            assert table_evaluator.evaluate_array(codes).tolist() == scalar
+
+    def test_batch_matches_scalar(self):
+        """Test evaluate_batch and the batch strength agree with per-hand calls."""
+        board = ["ah", "7h", "7c", "2h", "td"]
+        board_codes = table_evaluator.cards_to_codes(board)
+        hands = hand_combos.ALL_COMBOS
+
+        batch = table_evaluator.evaluate_batch(hands, board_codes)
+        strengths = self.evaluator.calculate_hand_strength_batch(hands, board)
+        for (c1, c2), value, strength in zip(hands.tolist(), batch.tolist(), strengths.tolist()):
+            if c1 in board_codes or c2 in board_codes:
+                assert value == -1
+                continue
+            assert value == table_evaluator.evaluate_codes([c1, c2] + board_codes)
+            cards = [table_evaluator.code_to_card(c1), table_evaluator.code_to_card(c2)]
+            assert strength == self.evaluator.calculate_hand_strength(cards, board)
+
+    def test_range_filters_use_live_combos(self):
+        """Test range helpers skip combos blocked by the board."""
+        analyzer = RangeAnalyzer()
+        hands, strengths = analyzer._range_strengths(["AA", "AKs", "72o"], ["ah", "ad", "ac"])
+        assert hands == ["AKs", "72o"]
+        assert strengths.tolist() == [0.95, 0.65]  # AsKs makes quads
+
+        distribution = analyzer.get_range_strength_distribution(["KK", "72o"], ["kh", "7d", "2c"])
+        assert distribution == {"strong": 0.5, "medium": 0.5, "weak": 0.0}
@@ -0,0 +1,78 @@
+"""Tests for process-pool equity simulation."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.core import parallel_equity, table_evaluator
+from app.core.parallel_equity import ParallelEquityEngine, _views
+
+
+class TestParallelEquity:
+    """Test suite for the shared-memory parallel equity engine."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.engine = ParallelEquityEngine(max_workers=2, chunk_size=5000)
+
+    def teardown_method(self):
+        """Release the pool and shared tables."""
+        self.engine.shutdown()
+
+    def test_worker_count_does_not_change_result(self):
+        """Test chunked seeds merge to the same answer with or without a pool."""
+        pooled = self.engine.hand_vs_random(["ah", "ad"], num_opponents=3, samples=20000, seed=3)
+        serial = ParallelEquityEngine(max_workers=1, chunk_size=5000).hand_vs_random(
+            ["ah", "ad"], num_opponents=3, samples=20000, seed=3
+        )
+        assert (pooled.equity, pooled.win, pooled.tie) == (serial.equity, serial.win, serial.tie)
+        assert pooled.samples == 20000
+        assert pooled.equity == pytest.approx(0.64, abs=0.02)
+
+    def test_shared_tables_round_trip(self):
+        """Test the shared block holds an exact copy of the evaluator tables."""
+        name, layout = self.engine._share_tables()
+        arrays = _views(self.engine._shm.buf, layout)
+        _, keys, values, flush_table = table_evaluator.get_tables()
+        assert np.array_equal(arrays["keys"], keys)
+        assert np.array_equal(arrays["values"], values)
+        assert np.array_equal(arrays["flush_table"], flush_table)
+        assert not arrays["keys"].flags.writeable
+
+    def test_async_matches_blocking_result(self):
+        """Test the awaited path merges the same chunks as hand_vs_random."""
+        blocking = self.engine.hand_vs_random(["kh", "kd"], num_opponents=2, samples=20000, seed=5)
+        awaited = asyncio.run(self.engine.hand_vs_random_async(["kh", "kd"], num_opponents=2,
+                                                               samples=20000, seed=5))
+        assert (awaited.equity, awaited.samples) == (blocking.equity, blocking.samples)
+
+    def test_async_time_budget_keeps_finished_prefix(self):
+        """Test a tiny budget returns whole leading chunks instead of the full run."""
+        result = asyncio.run(self.engine.hand_vs_random_async(["ah", "ad"], num_opponents=3,
+                                                              samples=400000, time_budget_ms=1))
+        assert 0 < result.samples < 400000
+        assert result.samples % 5000 == 0
+
+    def test_in_process_chunks_stop_at_the_deadline(self, monkeypatch):
+        """Test in-process chunks stop at the deadline instead of running on in threads."""
+        engine = ParallelEquityEngine(max_workers=1, chunk_size=5000)
+        blocking = engine.hand_vs_random(["kh", "kd"], num_opponents=2, samples=20000, seed=5)
+        awaited = asyncio.run(engine.hand_vs_random_async(["kh", "kd"], num_opponents=2, samples=20000, seed=5))
+        assert (awaited.equity, awaited.samples) == (blocking.equity, blocking.samples)
+
+        calls = []
+        simulate = parallel_equity._simulate_chunk
+
+        def counted(*args):
+            calls.append(time.perf_counter())
+            return simulate(*args)
+
+        monkeypatch.setattr(parallel_equity, "_simulate_chunk", counted)
+        result = asyncio.run(engine.hand_vs_random_async(["ah", "ad"], num_opponents=3,
+                                                         samples=400000, time_budget_ms=20))
+        returned = time.perf_counter()
+        time.sleep(0.2)
+        assert 0 < result.samples < 400000 and result.samples == 5000 * len(calls)
+        assert all(call < returned for call in calls)
@@ -0,0 +1,51 @@
+"""Tests for batched situation vectorization."""
+
+import json
+import random
+
+import numpy as np
+
+from app.database.poker_vectorizer import BettingRound, PokerSituation, PokerVectorizer, Position
+
+
+class TestVectorizeBatch:
+    """Test suite for the columnar vectorizer."""
+
+    def setup_method(self, method):
+        """Set up a vectorizer and a fixed random seed."""
+        self.vectorizer = PokerVectorizer()
+        random.seed(7)
+
+    def test_batch_matches_single_vectors(self):
+        """Test every row equals vectorize_situation, including odd cards and amounts."""
+        situations = [s for s, _ in self.vectorizer.create_test_situations(600)]
+        situations += [
+            PokerSituation(["as", "Kx"], ["qd", "Jc", "Js"], Position.SB, 0.0, 0.0, 0.0, 3, BettingRound.FLOP),
+            PokerSituation(["As"], ["Qd", "Qh", "Qc", "2s"], Position.BB, 5.0, 3.0, 0.0, 12,
+                           BettingRound.TURN, num_callers=7, num_raisers=4),
+            PokerSituation(["Th", "9h"], ["Ah", "2d", "3c", "4s", "5h"], Position.BTN, 0.0, 4.0, 50.0, 2,
+                           BettingRound.RIVER),
+        ]
+        expected = np.stack([self.vectorizer.vectorize_situation(s) for s in situations])
+        batch = self.vectorizer.vectorize_situations(situations)
+
+        assert batch.dtype == np.float32 and batch.shape == (len(situations), 32)
+        np.testing.assert_array_equal(batch, expected)
+
+    def test_records_with_json_cards(self):
+        """Test importer rows with JSON card strings vectorize like the equivalent situation."""
+        record = {"hole_cards": json.dumps(["Kh", "Qh"]), "board_cards": json.dumps(["Jh", "Th", "2c"]),
+                  "position": Position.CO, "pot_size": 12.0, "bet_to_call": 4.0, "stack_size": 80.0,
+                  "betting_round": BettingRound.FLOP}
+        situation = PokerSituation(["Kh", "Qh"], ["Jh", "Th", "2c"], Position.CO, 12.0, 4.0, 80.0, 2,
+                                   BettingRound.FLOP)
+
+        np.testing.assert_array_equal(self.vectorizer.vectorize_records([record])[0],
+                                      self.vectorizer.vectorize_situation(situation))
+
+    def test_encode_cards_pads_and_truncates(self):
+        """Test missing slots encode as 0 and extra cards are dropped."""
+        ranks, suits = self.vectorizer.encode_cards([["As", "Td"], [], ["2c", "3h", "4s"]], 2)
+
+        assert ranks.tolist() == [[14, 10], [0, 0], [2, 3]]
+        assert suits.tolist() == [[1, 3], [0, 0], [4, 2]]
@@ -0,0 +1,68 @@
+"""Tests for the precomputed preflop equity tables."""
+
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from app.api.models import Position
+from app.core import preflop_tables
+from app.core.hand_evaluator import HandEvaluator
+from app.core.range_analyzer import RangeAnalyzer
+
+
+class TestPreflopTables:
+    """Test suite for the memory-mapped 169-class tables."""
+
+    def test_class_indexing(self):
+        """Test the 13x13 class grid round-trips through notation."""
+        assert preflop_tables.class_notation(preflop_tables.class_index("ah", "ad")) == "AA"
+        assert preflop_tables.class_notation(preflop_tables.class_index("kh", "ah")) == "AKs"
+        assert preflop_tables.class_notation(preflop_tables.class_index("ah", "kd")) == "AKo"
+        assert preflop_tables.class_index("ah", "ah") == -1
+        assert len(set(preflop_tables.class_notations())) == preflop_tables.NUM_CLASSES
+        combos = sum(preflop_tables.class_combo_count(i) for i in range(preflop_tables.NUM_CLASSES))
+        assert combos == 1326
+
+    def test_tables_are_memory_mapped(self):
+        """Test the shipped tables load as read-only memmaps and are consistent."""
+        matrix, vs_ranges, columns = preflop_tables.load_tables()
+        assert isinstance(matrix, np.memmap)
+        assert not matrix.flags.writeable
+        assert np.allclose(matrix + matrix.T, 1.0, atol=1e-6)
+        assert set(columns) == {"random"} | {p.value for p in RangeAnalyzer.PREFLOP_RANGES}
+
+    def test_table_matches_current_ranges(self):
+        """Test the tables were built from the current PREFLOP_RANGES."""
+        with open(preflop_tables.DATA_DIR / preflop_tables.META_FILE) as f:
+            meta = json.load(f)
+        assert meta["ranges_digest"] == preflop_tables.current_ranges_digest(), \
+            "rerun app/tools/build_preflop_tables.py"
+
+    def test_stale_range_columns_are_dropped(self, tmp_path, monkeypatch):
+        """Test tables built from other charts keep the random column but not the position ones."""
+        for name in (preflop_tables.MATRIX_FILE, preflop_tables.RANGES_FILE):
+            shutil.copy(preflop_tables.DATA_DIR / name, tmp_path / name)
+        with open(preflop_tables.DATA_DIR / preflop_tables.META_FILE) as f:
+            meta = json.load(f)
+        meta["ranges_digest"] = "0" * 16
+        (tmp_path / preflop_tables.META_FILE).write_text(json.dumps(meta))
+        monkeypatch.setattr(preflop_tables, "_loaded", None)
+        monkeypatch.setattr(preflop_tables, "_load_failed", False)
+
+        _, _, columns = preflop_tables.load_tables(tmp_path)
+        assert columns == {"random": meta["range_columns"].index("random")}
+        assert preflop_tables.equity_vs_range(["ah", "kh"], Position.BTN.value) is None
+        assert preflop_tables.equity_vs_range(["ah", "as"]) == pytest.approx(0.85, abs=0.01)
+
+    def test_known_equities(self):
+        """Test table reads against textbook preflop equities."""
+        assert preflop_tables.equity_vs_hand(["ah", "ad"], ["kh", "kd"]) == pytest.approx(0.82, abs=0.02)
+        assert preflop_tables.equity_vs_range(["ah", "as"]) == pytest.approx(0.85, abs=0.01)
+        assert preflop_tables.equity_vs_range(["7h", "2d"]) == pytest.approx(0.35, abs=0.01)
+        assert (preflop_tables.equity_vs_range(["ah", "kh"], Position.UTG.value)
+                < preflop_tables.equity_vs_range(["ah", "kh"], Position.BTN.value))
+
+        assert HandEvaluator()._preflop_hand_strength(["ah", "ad"]) == preflop_tables.equity_vs_range(["ah", "ad"])
+        assert preflop_tables.allin_ev(0.5, pot=3.0, stack=100.0) == pytest.approx(1.5)
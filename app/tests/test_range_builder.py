@@ -0,0 +1,114 @@
+"""Tests for history-based solver ranges."""
+
+import numpy as np
+
+from app.advisor.texas_solver_client import _build_script_from_state_like
+from app.api.models import BettingAction, Position, Seat, Stakes, StreetAction, TableState
+from app.core import hand_combos, table_evaluator
+from app.core.openspiel_wrapper import OpenSpielWrapper
+from app.core.range_builder import RangeBuilder, equity_buckets, to_solver_range
+
+TOY_RANGE = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
+
+
+def _act(seat, action, amount=0.0):
+    return BettingAction(seat=seat, action=action, amount=amount)
+
+
+def _state(history, board=("Ks", "8d", "5c", "3h", "2s"), positions=("BB", "BTN", "SB")):
+    seats = [Seat(seat=i + 1, stack=90.0, in_hand=True, is_hero=i == 1, position=p)
+             for i, p in enumerate(positions)]
+    return TableState(
+        table_id="t1", hand_id="h1", stakes=Stakes(sb=0.5, bb=1.0), street="RIVER",
+        board=list(board), hero_hole=["Ah", "Kd"], pot=20.0, hero_seat=2, seats=seats,
+        betting_history=history,
+    )
+
+
+PREFLOP = StreetAction(street="PREFLOP", actions=[_act(2, "raise", 2.5), _act(3, "fold"), _act(1, "call", 1.5)])
+
+
+class TestRangeBuilder:
+    """Test suite for range construction from betting history."""
+
+    def setup_method(self, method):
+        """Set up a builder per test."""
+        self.builder = RangeBuilder()
+
+    def _weight(self, weights, cards):
+        return weights[hand_combos.combo_index(*table_evaluator.cards_to_codes(cards))]
+
+    def test_preflop_lines_pick_charts(self):
+        """Test the opener, 3-bettor and caller start from their charts and folders drop out."""
+        three_bet = StreetAction(street="PREFLOP", actions=[
+            _act(2, "raise", 2.5), _act(3, "fold"), _act(1, "raise", 10.0), _act(2, "call", 7.5)])
+        ranges = self.builder.build(_state([three_bet], board=()))
+
+        assert set(ranges) == {1, 2}
+        bb_3bet = self.builder.analyzer.get_preflop_range(Position.BB, "3bet")
+        assert ranges[1].sum() == sum(len(hand_combos.expand_notation(h)) for h in set(bb_3bet))
+        assert self._weight(ranges[2], ["7c", "2c"]) == 0.0  # Not in the BTN open chart
+        assert self._weight(ranges[2], ["6c", "5c"]) == 1.0
+
+    def test_river_bet_polarizes(self):
+        """Test a river bet keeps the nuts, trims bluff-catchers and zeroes blocked combos."""
+        river = StreetAction(street="RIVER", actions=[_act(1, "check"), _act(2, "bet", 15.0)])
+        ranges = self.builder.build(_state([PREFLOP, river]))
+
+        btn = ranges[2]
+        assert self._weight(btn, ["5h", "5d"]) == 1.0  # Set of fives
+        assert self._weight(btn, ["Qh", "Jh"]) < self._weight(btn, ["7h", "6h"]) < 0.5  # Showdown value vs air
+        assert self._weight(btn, ["Kh", "Ks"]) == 0.0  # Blocked by the board
+        assert ranges[1].max() <= 1.0
+
+    def test_solver_ranges_order_and_trim(self):
+        """Test the BTN is in position, weights are relative and light hands are dropped."""
+        flop = StreetAction(street="FLOP", actions=[_act(1, "check"), _act(2, "bet", 3.0), _act(1, "call", 3.0)])
+        ip_text, oop_text = self.builder.solver_ranges(_state([PREFLOP, flop], board=("Ks", "8d", "5c")))
+
+        ip, oop = hand_combos.parse_range(ip_text), hand_combos.parse_range(oop_text)
+        assert max(ip.values()) == 1.0 and min(ip.values()) >= self.builder.min_weight
+        assert "KK" in ip and "72o" not in oop
+        assert len(ip) < len(self.builder.analyzer.get_preflop_range(Position.BTN))
+
+    def test_heads_up_sb_is_in_position(self):
+        """Test the SB is in position heads-up but not when a third player was dealt in."""
+        preflop = StreetAction(street="PREFLOP", actions=[_act(2, "raise", 2.5), _act(1, "call", 1.5)])
+        state = _state([preflop], positions=("BB", "SB"))
+        board = table_evaluator.cards_to_codes(state.board)
+        ip_text, oop_text = self.builder.solver_ranges(state)
+        assert ip_text == to_solver_range(self.builder.build(state)[2], self.builder.min_weight, board)
+        assert OpenSpielWrapper._hero_in_position({"positions": {1: "BB", 2: "SB"}, "hero_position": 1})
+
+        preflop = StreetAction(street="PREFLOP", actions=[_act(3, "fold"), _act(2, "raise", 2.5), _act(1, "call", 1.5)])
+        state = _state([preflop], positions=("BB", "SB", "BTN"))
+        ip_text, oop_text = self.builder.solver_ranges(state)
+        assert oop_text == to_solver_range(self.builder.build(state)[2], self.builder.min_weight, board)
+        assert not OpenSpielWrapper._hero_in_position({"positions": {1: "BB", 2: "SB", 3: "BTN"}, "hero_position": 1})
+
+    def test_equity_buckets_cached(self):
+        """Test buckets are computed once per board and mark blocked combos."""
+        board = tuple(table_evaluator.cards_to_codes(["Ks", "8d", "5c", "3h"]))
+        buckets = equity_buckets(board)
+
+        assert equity_buckets(board) is buckets
+        assert buckets[hand_combos.combo_index(*table_evaluator.cards_to_codes(["Ks", "Kd"]))] == -1
+        assert np.bincount(buckets[buckets >= 0]).min() > 100
+
+    def test_to_solver_range_averages_classes(self):
+        """Test hand classes get the mean of their combo weights."""
+        weights = np.zeros(hand_combos.NUM_COMBOS)
+        for i, combo in enumerate(hand_combos.expand_notation("AKs")):
+            weights[hand_combos.COMBO_INDEX[combo]] = 1.0 if i < 2 else 0.0
+        weights[hand_combos.COMBO_INDEX[hand_combos.expand_notation("QQ")[0]]] = 1.0
+
+        assert to_solver_range(weights) == "AKs,QQ:0.33"
+
+    def test_script_uses_history_ranges(self):
+        """Test solver scripts carry the narrowed ranges and fall back to toy ranges without positions."""
+        script = _build_script_from_state_like(_state([PREFLOP]))
+        assert TOY_RANGE not in script
+        assert "set_range_ip 22,33" in script
+
+        fallback = _build_script_from_state_like({"board": ["Ks", "8d", "5c"], "pot": 10.0})
+        assert f"set_range_ip {TOY_RANGE}" in fallback
@@ -0,0 +1,64 @@
+"""Tests for the solver result cache."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from app.advisor.solver_cache import SolverResultCache, normalize_script, script_key
+from app.advisor.texas_solver_client import build_fast_profile_input
+
+
+class TestSolverResultCache:
+    """Test suite for script normalization and the two-level cache."""
+
+    def setup_method(self, method):
+        """Create a cache in a temp directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+
+    def teardown_method(self, method):
+        """Remove the temp directory."""
+        self.tmp.cleanup()
+
+    def _script(self, **overrides):
+        kwargs = dict(pot=10.0, effective_stack=100.0, board_cards=["Ah", "Kd", "2c"],
+                      ip_range_text="AA,KK,AKs", oop_range_text="QQ,JJ", output_path="a.json")
+        kwargs.update(overrides)
+        return build_fast_profile_input(**kwargs)
+
+    def test_key_ignores_result_neutral_differences(self):
+        """Test output path, threads, number spelling and range order do not change the key."""
+        base = self._script()
+        assert script_key(base) == script_key(self._script(output_path="b.json", threads=3))
+        assert script_key(base) == script_key(self._script(pot=10, ip_range_text="AKs, KK,AA"))
+        assert script_key(base) != script_key(self._script(pot=12.0))
+        assert "dump_result" not in normalize_script(base)
+
+    def test_disk_round_trip_and_memory_layer(self):
+        """Test results survive a new cache instance and hits are counted."""
+        result = {"status": "ok", "strategy": {"AA": [0.25, 0.75]}}
+        SolverResultCache(cache_dir=self.cache_dir).set(self._script(), result)
+        assert list(self.cache_dir.glob("*.json.gz"))
+
+        cache = SolverResultCache(cache_dir=self.cache_dir)
+        assert cache.get(self._script()) == result
+        assert cache.get(self._script()) == result
+        assert cache.get(self._script(pot=99.0)) is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["disk_hits"], stats["misses"]) == (2, 1, 1)
+
+    def test_disk_lru_eviction(self):
+        """Test the least recently used entry is evicted once over the size cap."""
+        cache = SolverResultCache(cache_dir=self.cache_dir, max_bytes=10**6, memory_entries=0, compress=False)
+        payload = {"blob": "x" * 300_000}
+        scripts = [self._script(pot=float(p)) for p in range(1, 4)]
+        for i, script in enumerate(scripts):
+            cache.set(script, payload)
+            path = self.cache_dir / (script_key(script) + ".json")
+            os.utime(path, (1000 + i, 1000 + i))
+        assert cache.get(scripts[0]) == payload  # Refreshes its LRU position
+
+        cache.set(self._script(pot=4.0), payload)
+        assert cache.get(scripts[1]) is None
+        assert cache.get(scripts[0]) == payload
+        assert cache.get_stats()["disk_bytes"] <= 10**6
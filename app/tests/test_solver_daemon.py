@@ -0,0 +1,99 @@
+"""Tests for warm solver daemons."""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.advisor.async_solver import AsyncSolverPool
+from app.advisor.solver_daemon import SolverDaemonPool
+from app.advisor.texas_solver_client import TexasSolverError, TexasSolverTimeout
+
+STUB_SOLVER = Path(__file__).with_name("stub_solver.py")
+
+
+def _script(pot=10, extra=""):
+    """Minimal solver script for the stub."""
+    return f"set_pot {pot}\n{extra}dump_result output_result.json\n"
+
+
+class TestSolverDaemonPool:
+    """Test suite for the warm daemon pool."""
+
+    def setup_method(self, method):
+        """Create a working dir for stub daemons."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = Path(self.tmp.name)
+
+    def teardown_method(self, method):
+        """Stop daemons and remove the working dir."""
+        if getattr(self, "pool", None) is not None:
+            self.pool.shutdown()
+        self.tmp.cleanup()
+
+    def _pool(self, workers=1, max_jobs=0):
+        self.pool = SolverDaemonPool(workers=workers, max_jobs=max_jobs,
+                                     command=[sys.executable, str(STUB_SOLVER)], cwd=self.cwd)
+        return self.pool
+
+    def test_jobs_reuse_warm_process(self):
+        """Test consecutive jobs run on the same process and see only their own commands."""
+        pool = self._pool()
+        results = [pool.solve(_script(pot), timeout_sec=10) for pot in (1, 2, 3)]
+
+        assert [r["pot"] for r in results] == [1.0, 2.0, 3.0]
+        assert all(r["lines"] == 2 for r in results)
+        assert len({r["pid"] for r in results}) == 1
+
+    def test_recycle_after_max_jobs(self):
+        """Test a worker is replaced once it has served max_jobs jobs."""
+        pool = self._pool(max_jobs=2)
+        pids = [pool.solve(_script(), timeout_sec=10)["pid"] for _ in range(3)]
+
+        assert pids[0] == pids[1] != pids[2]
+        assert pool.health_check()[0]["restarts"] == 1
+
+    def test_crash_and_timeout_restart_worker(self):
+        """Test a crashed or stuck worker is restarted and the next job succeeds."""
+        pool = self._pool()
+        first = pool.solve(_script(), timeout_sec=10)["pid"]
+
+        with pytest.raises(TexasSolverError, match="code 3"):
+            pool.solve(_script(extra="stub_crash\n"), timeout_sec=10)
+        with pytest.raises(TexasSolverTimeout):
+            pool.solve(_script(extra="stub_sleep 30\n"), timeout_sec=0.5)
+
+        after = pool.solve(_script(), timeout_sec=10)["pid"]
+        status = pool.health_check()[0]
+        assert after != first
+        assert status["alive"] and status["restarts"] == 2
+
+    def test_health_check_revives_dead_worker(self):
+        """Test a worker killed between jobs is restarted by the health check."""
+        pool = self._pool(workers=2)
+        pool.health_check()
+        victim = pool._daemons[0]
+        victim.proc.kill()
+        victim.proc.wait()
+
+        statuses = pool.health_check()
+        assert all(s["alive"] for s in statuses)
+        assert statuses[0]["restarts"] == 1
+
+    def test_async_cancel_restarts_daemon(self):
+        """Test cancelling an async solve on a daemon kills that worker's job."""
+        pool = self._pool()
+        async_pool = AsyncSolverPool(daemon=pool, use_cache=False)
+
+        async def run():
+            task = asyncio.ensure_future(async_pool.solve(_script(extra="stub_sleep 30\n")))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await async_pool.solve(_script(7))
+
+        assert asyncio.run(run())["pot"] == 7.0
+        assert pool.health_check()[0]["restarts"] == 1
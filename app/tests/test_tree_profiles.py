@@ -0,0 +1,99 @@
+"""Tests for tree profiles and solve-cost prediction."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.advisor.texas_solver_client import SolverBudgetExceeded, _build_script_from_state_like
+from app.advisor import tree_profiles
+from app.advisor.tree_profiles import (
+    PROFILES, TreeCostModel, build_profile_input, choose_profile, count_tree,
+)
+
+RIVER = ["Ks", "8d", "5c", "3h", "2s"]
+FLOP = ["Ks", "8d", "5c"]
+RANGE = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
+
+
+class TestTreeProfiles:
+    """Test suite for tree counting, cost estimates and profile choice."""
+
+    def setup_method(self, method):
+        """Use fixed model coefficients."""
+        self.model = TreeCostModel(ns_per_unit=4.0, overhead_ms=100.0, samples=10)
+
+    def test_count_tree_short_stack(self):
+        """Test a stack below the all-in threshold leaves only check/shove lines."""
+        river = count_tree(PROFILES["deep"], pot=10.0, effective_stack=2.0, board_size=5)
+        assert (river.action_nodes, river.chance_nodes, river.terminal_nodes) == (4, 0, 5)
+        assert river.action_slots == (4, 4)
+
+        turn = count_tree(PROFILES["deep"], pot=10.0, effective_stack=2.0, board_size=4)
+        assert (turn.action_nodes, turn.chance_nodes, turn.terminal_nodes) == (4 + 48 * 4, 1, 4 + 48 * 5)
+
+    def test_richer_profiles_build_bigger_trees(self):
+        """Test node counts grow from fast to deep and from river to flop."""
+        for board_size in (3, 4, 5):
+            sizes = [count_tree(p, 10.0, 95.0, board_size).nodes for p in PROFILES.values()]
+            assert sizes == sorted(sizes) and sizes[0] < sizes[-1]
+        assert count_tree(PROFILES["fast"], 10.0, 95.0, 3).nodes > count_tree(PROFILES["fast"], 10.0, 95.0, 4).nodes
+
+    def test_profile_script(self):
+        """Test scripts carry every size, the raise limit and the stopping rule."""
+        script = build_profile_input(PROFILES["deep"], 10.0, 95.0, RIVER, RANGE, RANGE)
+        assert "set_bet_sizes ip,river,bet,25,50,100" in script
+        assert "set_bet_sizes oop,flop,raise,50,100" in script
+        assert "set_raise_limit 3" in script and "set_max_iteration 200" in script
+        assert script.rstrip().endswith("dump_result output_result.json")
+
+    def test_choose_richest_profile_within_budget(self):
+        """Test the richest fitting profile wins and an impossible budget returns None."""
+        profile, estimate = choose_profile(5000, 10.0, 95.0, RIVER, RANGE, RANGE, model=self.model)
+        assert profile.name == "deep" and estimate.combos == (68, 68)
+
+        profile, estimate = choose_profile(40000, 10.0, 95.0, FLOP, RANGE, RANGE, threads=8, model=self.model)
+        assert profile.name == "standard" and estimate.solve_ms <= 40000 * 0.8
+        assert choose_profile(50, 10.0, 95.0, FLOP, RANGE, RANGE, model=self.model) is None
+        assert choose_profile(5000, 10.0, 95.0, RIVER, RANGE, RANGE, model=self.model, max_memory_mb=1) is None
+
+    def test_uncalibrated_model_falls_back_to_cheapest(self):
+        """Test a model without samples picks the fast profile instead of refusing."""
+        model = TreeCostModel(ns_per_unit=4.0, overhead_ms=100.0)
+        profile, _ = choose_profile(50, 10.0, 95.0, FLOP, RANGE, RANGE, model=model)
+        assert profile.name == "fast"
+        assert choose_profile(50, 10.0, 95.0, FLOP, RANGE, RANGE, model=model, max_memory_mb=1) is None
+
+    def test_calibrate_and_round_trip(self):
+        """Test calibration recovers the timing coefficients and survives save/load."""
+        records = [{"work": w, "max_iteration": 10, "threads": 2, "solve_ms": 50.0 + 3.0 * w * 10 / 2 / 1e6,
+                    "slots": w, "memory_mb": 20.0 + 8.0 * w / 2**20} for w in (1e6, 5e6, 2e7)]
+        records.append({"work": 1e6, "max_iteration": 10, "threads": 2, "solve_ms": None, "timed_out": True})
+        model = TreeCostModel().calibrate(records)
+        assert model.overhead_ms == pytest.approx(50.0) and model.ns_per_unit == pytest.approx(3.0)
+        assert model.bytes_per_slot == pytest.approx(8.0) and model.samples == 3
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.json"
+            model.save(path)
+            assert TreeCostModel.load(path) == model
+            assert TreeCostModel.load(Path(tmp) / "missing.json") == TreeCostModel()
+
+    def test_script_builder_budget(self, monkeypatch):
+        """Test state scripts use the budget's profile and refuse spots that cannot fit."""
+        monkeypatch.setattr(tree_profiles, "_default_model", self.model)
+        state = {"board": RIVER, "pot": 10.0}
+        assert "set_max_iteration 12" in _build_script_from_state_like(state)
+        assert "set_max_iteration 200" in _build_script_from_state_like(state, budget_ms=10000)
+        with pytest.raises(SolverBudgetExceeded):
+            _build_script_from_state_like({"board": FLOP, "pot": 10.0}, budget_ms=1)
+
+    def test_default_flop_state_gets_a_script(self, monkeypatch):
+        """Test an uncalibrated model still scripts a BTN-vs-BB flop within the /decide budget."""
+        monkeypatch.setattr(tree_profiles, "_default_model", TreeCostModel())
+        state = {"board": FLOP, "pot": 6.5, "seats": [
+            {"in_hand": True, "stack": 97.0, "position": "BTN"},
+            {"in_hand": True, "stack": 97.0, "position": "BB"},
+        ]}
+        script = _build_script_from_state_like(state, budget_ms=3000)
+        assert "set_board Ks,8d,5c" in script and "set_max_iteration 12" in script
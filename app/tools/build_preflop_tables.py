@@ -0,0 +1,112 @@
+"""
+Build the precomputed preflop equity tables shipped in app/data.
+
+Computes the 169x169 heads-up class-vs-class equity matrix and every class's
+equity against a random hand and against each RangeAnalyzer.PREFLOP_RANGES
+entry, by seeded Monte Carlo with card removal.
+
+Usage:
+    python -m app.tools.build_preflop_tables [--samples N] [--workers N]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core import equity_engine, hand_combos, preflop_tables
+from app.core.range_analyzer import RangeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+def _class_combos() -> List[np.ndarray]:
+    """Concrete combos of every hand class, in class-index order."""
+    return [hand_combos.range_to_combos([name])[0] for name in preflop_tables.class_notations()]
+
+
+def _equity(hero: np.ndarray, villain: np.ndarray, villain_weights: np.ndarray,
+            samples: int, rng: np.random.Generator) -> float:
+    """Monte Carlo equity of a uniformly weighted class against a weighted range."""
+    hero_p = np.full(len(hero), 1.0 / len(hero))
+    villain_p = villain_weights / villain_weights.sum()
+    tally = equity_engine.simulate_deals(hero, hero_p, villain, villain_p, [], 1, rng, samples)
+    return tally.share / tally.samples if tally.samples else 0.5
+
+
+def _build_row(row: int, samples: int, range_samples: int, seed: int) -> Tuple[int, np.ndarray, np.ndarray]:
+    """Equities of class ``row`` against classes row+1.. and against every range column."""
+    rng = np.random.default_rng([seed, row])
+    classes = _class_combos()
+    hero = classes[row]
+
+    matchups = np.full(preflop_tables.NUM_CLASSES, np.nan)
+    for col in range(row + 1, preflop_tables.NUM_CLASSES):
+        villain = classes[col]
+        matchups[col] = _equity(hero, villain, np.ones(len(villain)), samples, rng)
+
+    columns = [hand_combos.live_combos()] + [
+        hand_combos.range_to_combos(hands)[0] for hands in RangeAnalyzer.PREFLOP_RANGES.values()
+    ]
+    vs_ranges = np.array([
+        _equity(hero, villain, np.ones(len(villain)), range_samples, rng) for villain in columns
+    ])
+    return row, matchups, vs_ranges
+
+
+def build_tables(out_dir: Path, samples: int, range_samples: int, seed: int, workers: int) -> None:
+    """Compute and write the matrix, range table and metadata."""
+    start = time.time()
+    size = preflop_tables.NUM_CLASSES
+    range_columns = [preflop_tables.RANDOM_COLUMN] + [p.value for p in RangeAnalyzer.PREFLOP_RANGES]
+    matrix = np.full((size, size), 0.5, dtype=np.float32)
+    vs_ranges = np.zeros((size, len(range_columns)), dtype=np.float32)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_build_row, row, samples, range_samples, seed) for row in range(size)]
+        for done, future in enumerate(futures, 1):
+            row, matchups, row_vs_ranges = future.result()
+            cols = np.arange(row + 1, size)
+            matrix[row, cols] = matchups[cols]
+            matrix[cols, row] = 1.0 - matchups[cols]
+            vs_ranges[row] = row_vs_ranges
+            if done % 13 == 0:
+                logger.info(f"{done}/{size} rows ({time.time() - start:.0f}s)")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / preflop_tables.MATRIX_FILE, matrix)
+    np.save(out_dir / preflop_tables.RANGES_FILE, vs_ranges)
+    meta = {
+        "classes": preflop_tables.class_notations(),
+        "range_columns": range_columns,
+        "ranges_digest": preflop_tables.current_ranges_digest(),
+        "samples_per_matchup": samples,
+        "samples_per_range": range_samples,
+        "seed": seed,
+    }
+    with open(out_dir / preflop_tables.META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+    logger.info(f"Preflop tables written to {out_dir} in {time.time() - start:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=preflop_tables.DATA_DIR)
+    parser.add_argument("--samples", type=int, default=6000, help="deals per class-vs-class matchup")
+    parser.add_argument("--range-samples", type=int, default=40000, help="deals per class-vs-range cell")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    build_tables(args.out, args.samples, args.range_samples, args.seed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
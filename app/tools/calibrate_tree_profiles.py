@@ -0,0 +1,110 @@
+"""
+Calibrate the tree-profile cost model against local solver benchmarks.
+
+Solves a fixed set of benchmark spots with every tree profile on the local
+TexasSolver install, appends one record per solve to the benchmark corpus
+(JSON lines; solves that time out are kept but not fitted) and refits the
+cost model used by ``tree_profiles.choose_profile``.
+
+Usage:
+    python -m app.tools.calibrate_tree_profiles [--fit-only] [--profiles fast standard] [--timeout S]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.advisor import texas_solver_client as tsc
+from app.advisor.tree_profiles import PROFILES, TreeCostModel, TreeProfile, build_profile_input
+from app.api.models import Position
+from app.config import TREE_BENCHMARK_CORPUS, TREE_COST_MODEL_PATH
+from app.core.range_analyzer import RangeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+_TIGHT = "AA,KK,QQ,JJ,TT,99,AKs,AQs,AJs,KQs,AKo,AQo"
+_BTN_OPEN = ",".join(RangeAnalyzer.PREFLOP_RANGES[Position.BTN])
+_BB_CALL = ",".join(RangeAnalyzer.PREFLOP_RANGES[Position.BB])
+
+# (board, pot, effective stack, ip range, oop range)
+BENCHMARK_SPOTS = [
+    (["Ks", "8d", "5c", "3h", "2s"], 20.0, 90.0, _BTN_OPEN, _BB_CALL),
+    (["Qh", "Jh", "4c", "9s", "9d"], 60.0, 40.0, _TIGHT, _TIGHT),
+    (["Ks", "8d", "5c", "3h"], 12.0, 94.0, _BTN_OPEN, _BB_CALL),
+    (["Ah", "Td", "6c", "2h"], 30.0, 80.0, _TIGHT, _BB_CALL),
+    (["Ks", "8d", "5c"], 6.5, 97.0, _TIGHT, _TIGHT),
+    (["7h", "6h", "2c"], 6.5, 97.0, _BTN_OPEN, _BB_CALL),
+]
+
+
+def run_benchmarks(profiles: List[TreeProfile], timeout: float, threads: int) -> List[Dict]:
+    """Solve every benchmark spot with every profile and return the records."""
+    model = TreeCostModel()
+    records = []
+    for board, pot, stack, ip_range, oop_range in BENCHMARK_SPOTS:
+        for profile in profiles:
+            estimate = model.estimate(profile, pot, stack, board, ip_range, oop_range, threads)
+            script = build_profile_input(profile, pot, stack, board, ip_range, oop_range, threads=threads)
+            start = time.perf_counter()
+            try:
+                _, complete = tsc._run_solver(script, timeout)
+            except tsc.TexasSolverTimeout:
+                complete = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            records.append({
+                "profile": profile.name,
+                "board": board,
+                "pot": pot,
+                "effective_stack": stack,
+                "combos": list(estimate.combos),
+                "nodes": estimate.nodes,
+                "slots": estimate.slots,
+                "work": estimate.work,
+                "max_iteration": profile.max_iteration,
+                "threads": threads,
+                "solve_ms": elapsed_ms if complete else None,
+                "timed_out": not complete,
+            })
+            logger.info(f"{profile.name} {','.join(board)}: {estimate.nodes} nodes, "
+                        f"{'%.0fms' % elapsed_ms if complete else 'timed out'}")
+    return records
+
+
+def load_corpus(path: Path) -> List[Dict]:
+    """Every record in the benchmark corpus."""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=TREE_BENCHMARK_CORPUS)
+    parser.add_argument("--model", type=Path, default=TREE_COST_MODEL_PATH)
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per benchmark solve")
+    parser.add_argument("--threads", type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument("--fit-only", action="store_true", help="refit from the corpus without solving")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.fit_only:
+        tsc.verify_solver_install()
+        records = run_benchmarks([PROFILES[name] for name in args.profiles], args.timeout, args.threads)
+        args.corpus.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.corpus, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    model = TreeCostModel().calibrate(load_corpus(args.corpus))
+    model.save(args.model)
+    logger.info(f"Cost model fitted to {model.samples} solves: {model}")
+
+
+if __name__ == "__main__":
+    main()
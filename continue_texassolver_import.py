@@ -59,13 +59,14 @@ import random
 from datetime import datetime
 from typing import List, Dict, Any, Tuple
 
-from app.database.poker_vectorizer import Position, BettingRound
+from app.database.poker_vectorizer import PokerVectorizer, Position, BettingRound
 
 class ContinueAuthenticImporter:
     """Continue TexasSolver import from exact position."""
     
     def __init__(self, start_id={last_id}, start_count={simple_count}):
         self.db_path = "gto_database.db"
+        self.vectorizer = PokerVectorizer()
         self.scenarios_added = start_count  # Start from current count
         self.start_time = time.time()
         self.current_id = start_id
@@ -189,31 +190,13 @@ class ContinueAuthenticImporter:
         
         return "2s"  # Ultimate fallback
     
-    def _generate_vector(self, scenario: Dict[str, Any]) -> np.ndarray:
-        """Generate vector for scenario."""
-        vector = np.zeros(32, dtype=np.float32)
-        
-        vector[0] = scenario['position'] / 8.0
-        vector[1] = min(scenario['stack_size'] / 200.0, 1.0)
-        vector[2] = min(scenario['pot_size'] / 50.0, 1.0)
-        vector[3] = scenario['betting_round'] / 3.0
-        vector[4] = scenario['equity']
-        vector[5] = scenario['cfr_confidence']
-        
-        # Fill remaining with simple pattern
-        base = (vector[4] + vector[5]) / 2
-        for i in range(6, 32):
-            vector[i] = base + random.uniform(-0.1, 0.1)
-        
-        return vector
-    
     def insert_scenario(self, scenario: Dict[str, Any]) -> bool:
         """Insert single scenario."""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            vector = self._generate_vector(scenario)
+            vector = self.vectorizer.vectorize_records([scenario])[0]
             vector_blob = vector.tobytes()
             
             cursor.execute("""
@@ -114,8 +114,6 @@ class DatabaseScalingEngine:
             from app.database.gto_database import gto_db
             from app.database.poker_vectorizer import PokerSituation, Position, BettingRound
             
-            stored_count = 0
-            
             # Enhanced situation patterns for this iteration
             position_patterns = list(Position)
             betting_round_patterns = list(BettingRound)
@@ -127,44 +125,42 @@ class DatabaseScalingEngine:
                 ["Ts", "9h"], ["8d", "7s"], ["6h", "5c"], ["4s", "3h"]   # Connectors
             ]
             
+            pairs = []
             for i, solution in enumerate(solutions):
-                try:
-                    # Systematic pattern variation
-                    pos_idx = (iteration * self.batch_size + i) % len(position_patterns)
-                    round_idx = (iteration * self.batch_size + i) % len(betting_round_patterns)
-                    hand_idx = (iteration * self.batch_size + i) % len(hole_card_patterns)
-                    
-                    position = position_patterns[pos_idx]
-                    betting_round = betting_round_patterns[round_idx]
-                    hole_cards = hole_card_patterns[hand_idx]
-                    
-                    # Board cards based on betting round
-                    if betting_round == BettingRound.PREFLOP:
-                        board_cards = []
-                    elif betting_round == BettingRound.FLOP:
-                        board_cards = ["As", "Kh", "Qd"]
-                    elif betting_round == BettingRound.TURN:
-                        board_cards = ["As", "Kh", "Qd", "Jc"]
-                    else:  # RIVER
-                        board_cards = ["As", "Kh", "Qd", "Jc", "Tc"]
-                    
-                    # Create varied situation
-                    situation = PokerSituation(
-                        hole_cards=hole_cards,
-                        board_cards=board_cards,
-                        position=position,
-                        pot_size=6.0 + (i % 40) * 0.4,  # 6.0 to 22.0
-                        bet_to_call=2.5 + (i % 18) * 0.3,  # 2.5 to 7.9
-                        stack_size=75.0 + (i % 50) * 1.0,  # 75 to 125
-                        betting_round=betting_round,
-                        num_players=6 - (i % 4)  # 3 to 6 players
-                    )
-                    
-                    if gto_db.add_solution(situation, solution):
-                        stored_count += 1
-                        
-                except Exception as e:
-                    continue
+                # Systematic pattern variation
+                pos_idx = (iteration * self.batch_size + i) % len(position_patterns)
+                round_idx = (iteration * self.batch_size + i) % len(betting_round_patterns)
+                hand_idx = (iteration * self.batch_size + i) % len(hole_card_patterns)
+                
+                position = position_patterns[pos_idx]
+                betting_round = betting_round_patterns[round_idx]
+                hole_cards = hole_card_patterns[hand_idx]
+                
+                # Board cards based on betting round
+                if betting_round == BettingRound.PREFLOP:
+                    board_cards = []
+                elif betting_round == BettingRound.FLOP:
+                    board_cards = ["As", "Kh", "Qd"]
+                elif betting_round == BettingRound.TURN:
+                    board_cards = ["As", "Kh", "Qd", "Jc"]
+                else:  # RIVER
+                    board_cards = ["As", "Kh", "Qd", "Jc", "Tc"]
+                
+                # Create varied situation
+                situation = PokerSituation(
+                    hole_cards=hole_cards,
+                    board_cards=board_cards,
+                    position=position,
+                    pot_size=6.0 + (i % 40) * 0.4,  # 6.0 to 22.0
+                    bet_to_call=2.5 + (i % 18) * 0.3,  # 2.5 to 7.9
+                    stack_size=75.0 + (i % 50) * 1.0,  # 75 to 125
+                    betting_round=betting_round,
+                    num_players=6 - (i % 4)  # 3 to 6 players
+                )
+                
+                pairs.append((situation, solution))
+            
+            stored_count = gto_db.add_solutions_bulk(pairs)
             
             return stored_count
             
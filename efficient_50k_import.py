@@ -13,6 +13,7 @@ from typing import List, Dict, Any, Tuple
 import concurrent.futures
 import threading
 
+from app.database.gto_database import GTODatabase, solution_from_record
 from app.database.poker_vectorizer import PokerSituation, Position, BettingRound
 
 class EfficientTexasSolverImporter:
@@ -23,6 +24,7 @@ class EfficientTexasSolverImporter:
         self.scenarios_added = 0
         self.start_time = time.time()
         self.lock = threading.Lock()
+        self.database = GTODatabase(db_path=self.db_path)
         
         # Simplified hand categories
         self.hands = {
@@ -272,65 +274,17 @@ class EfficientTexasSolverImporter:
             return 0
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = """
-                INSERT OR REPLACE INTO gto_situations 
-                (id, vector, hole_cards, board_cards, position, pot_size, bet_to_call, 
-                 stack_size, betting_round, recommendation, bet_size, equity, reasoning, 
-                 cfr_confidence, metadata, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """
-            
-            insert_data = []
-            for scenario in scenarios:
-                vector = self._generate_vector(scenario)
-                vector_blob = vector.tobytes()
-                
-                insert_data.append((
-                    scenario['id'], vector_blob, scenario['hole_cards'], scenario['board_cards'],
-                    scenario['position'], scenario['pot_size'], scenario['bet_to_call'],
-                    scenario['stack_size'], scenario['betting_round'], scenario['recommendation'],
-                    scenario['bet_size'], scenario['equity'], scenario['reasoning'],
-                    scenario['cfr_confidence'], scenario['metadata']
-                ))
-            
-            cursor.executemany(query, insert_data)
-            conn.commit()
-            conn.close()
+            inserted = self.database.add_solutions_bulk(solution_from_record(scenario) for scenario in scenarios)
             
             with self.lock:
-                self.scenarios_added += len(insert_data)
+                self.scenarios_added += inserted
             
-            return len(insert_data)
+            return inserted
             
         except Exception as e:
             print(f"Batch insert failed: {e}")
             return 0
     
-    def _generate_vector(self, scenario: Dict[str, Any]) -> np.ndarray:
-        """Generate 32-dimensional vector."""
-        
-        vector = np.zeros(32, dtype=np.float32)
-        
-        vector[0] = scenario['position'] / 8.0
-        vector[1] = min(scenario['stack_size'] / 200.0, 1.0)
-        vector[2] = min(scenario['pot_size'] / 100.0, 1.0)
-        vector[3] = scenario['betting_round'] / 3.0
-        vector[4] = scenario['equity']
-        vector[5] = scenario['cfr_confidence']
-        
-        if scenario['pot_size'] > 0:
-            vector[6] = scenario['bet_to_call'] / (scenario['pot_size'] + scenario['bet_to_call'])
-            vector[7] = min(scenario['stack_size'] / scenario['pot_size'] / 10.0, 1.0)
-        
-        # Fill remaining with structured randomness
-        for i in range(8, 32):
-            vector[i] = (scenario['equity'] + scenario['cfr_confidence']) * 0.1 + np.random.random() * 0.05
-        
-        return vector
-    
     def run_import(self, target: int = 38000) -> None:
         """Run the complete import."""
         
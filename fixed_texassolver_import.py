@@ -24,6 +24,7 @@ class FixedTexasSolverImporter:
         self.scenarios_added = 0
         self.start_time = time.time()
         self.lock = threading.Lock()
+        self.database = GTODatabase(db_path=self.db_path)
         self.failed_scenarios = 0
         
         # Professional hand categories for authentic TexasSolver analysis
@@ -486,104 +487,17 @@ class FixedTexasSolverImporter:
             return 0
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            query = """
-                INSERT OR REPLACE INTO gto_situations 
-                (id, vector, hole_cards, board_cards, position, pot_size, bet_to_call, 
-                 stack_size, betting_round, recommendation, bet_size, equity, reasoning, 
-                 cfr_confidence, metadata, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """
-            
-            insert_data = []
-            for scenario in scenarios:
-                try:
-                    vector = self._generate_scenario_vector(scenario)
-                    vector_blob = vector.tobytes()
-                    
-                    insert_data.append((
-                        scenario['id'], vector_blob, scenario['hole_cards'], scenario['board_cards'],
-                        scenario['position'], scenario['pot_size'], scenario['bet_to_call'],
-                        scenario['stack_size'], scenario['betting_round'], scenario['recommendation'],
-                        scenario['bet_size'], scenario['equity'], scenario['reasoning'],
-                        scenario['cfr_confidence'], scenario['metadata']
-                    ))
-                except Exception as e:
-                    print(f"Vector generation failed for {scenario.get('id', 'unknown')}: {e}")
-                    continue
-            
-            if insert_data:
-                cursor.executemany(query, insert_data)
-                conn.commit()
-            
-            conn.close()
+            inserted = self.database.add_solutions_bulk(solution_from_record(scenario) for scenario in scenarios)
             
             with self.lock:
-                self.scenarios_added += len(insert_data)
+                self.scenarios_added += inserted
             
-            return len(insert_data)
+            return inserted
             
         except Exception as e:
             print(f"Batch insert failed: {e}")
             return 0
     
-    def _generate_scenario_vector(self, scenario: Dict[str, Any]) -> np.ndarray:
-        """Generate 32-dimensional vector for scenario with proper normalization."""
-        
-        vector = np.zeros(32, dtype=np.float32)
-        
-        # Core features (normalized 0-1)
-        vector[0] = scenario['position'] / 8.0  # Position
-        vector[1] = min(np.log(scenario['stack_size'] + 1) / np.log(251), 1.0)  # Stack (log scale)
-        vector[2] = min(np.log(scenario['pot_size'] + 1) / np.log(101), 1.0)    # Pot (log scale)
-        vector[3] = scenario['betting_round'] / 3.0  # Betting round
-        vector[4] = scenario['equity']  # Equity
-        vector[5] = scenario['cfr_confidence']  # Confidence
-        
-        # Derived features
-        total_pot = scenario['pot_size'] + scenario['bet_to_call']
-        vector[6] = scenario['bet_to_call'] / total_pot if total_pot > 0 else 0  # Pot odds
-        
-        if scenario['pot_size'] > 0:
-            spr = scenario['stack_size'] / scenario['pot_size']
-            vector[7] = min(spr / 15.0, 1.0)  # Stack-to-pot ratio
-        else:
-            vector[7] = 1.0
-        
-        # Bet sizing
-        if scenario['pot_size'] > 0:
-            bet_ratio = scenario['bet_to_call'] / scenario['pot_size']
-            vector[8] = min(bet_ratio / 2.0, 1.0)  # Bet-to-pot ratio
-        
-        # Hand features (simplified encoding)
-        hole_cards_str = scenario['hole_cards']
-        if 'A' in hole_cards_str:
-            vector[9] = 1.0
-        if 'K' in hole_cards_str:
-            vector[10] = 1.0
-        if 'Q' in hole_cards_str:
-            vector[11] = 1.0
-        if 'J' in hole_cards_str:
-            vector[12] = 1.0
-        
-        # Board features
-        board_cards_str = scenario['board_cards']
-        if board_cards_str != "[]":
-            vector[13] = 1.0  # Post-flop indicator
-            if 'A' in board_cards_str:
-                vector[14] = 1.0
-            if 'K' in board_cards_str:
-                vector[15] = 1.0
-        
-        # Fill remaining dimensions with structured features
-        base_value = (scenario['equity'] + scenario['cfr_confidence'] + scenario['position'] / 8.0) / 3.0
-        for i in range(16, 32):
-            vector[i] = base_value + np.random.random() * 0.1 - 0.05
-        
-        return vector
-    
     def run_authentic_import(self, target_scenarios: int = 30000) -> None:
         """Run authentic TexasSolver import with proper error handling."""
         
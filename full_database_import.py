@@ -14,6 +14,7 @@ from typing import List, Dict, Any, Tuple
 import concurrent.futures
 import threading
 
+from app.database.gto_database import GTODatabase, solution_from_record
 from app.database.poker_vectorizer import PokerSituation, Position, BettingRound
 
 class TexasSolverDatabaseImporter:
@@ -24,6 +25,7 @@ class TexasSolverDatabaseImporter:
         self.scenarios_added = 0
         self.start_time = time.time()
         self.lock = threading.Lock()
+        self.database = GTODatabase(db_path=self.db_path)
         
         # Professional scenario templates
         self.premium_hands = [
@@ -410,116 +412,17 @@ class TexasSolverDatabaseImporter:
             return 0
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Prepare insertion query
-            query = """
-                INSERT OR REPLACE INTO gto_situations 
-                (id, vector, hole_cards, board_cards, position, pot_size, bet_to_call, 
-                 stack_size, betting_round, recommendation, bet_size, equity, reasoning, 
-                 cfr_confidence, metadata, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """
-            
-            insert_data = []
-            for scenario in scenarios:
-                try:
-                    # Generate vector for scenario
-                    vector_data = self._generate_vector(scenario)
-                    vector_blob = vector_data.tobytes()
-                    
-                    insert_data.append((
-                        scenario['id'], vector_blob, scenario['hole_cards'], scenario['board_cards'],
-                        scenario['position'], scenario['pot_size'], scenario['bet_to_call'],
-                        scenario['stack_size'], scenario['betting_round'], scenario['recommendation'],
-                        scenario['bet_size'], scenario['equity'], scenario['reasoning'],
-                        scenario['cfr_confidence'], scenario['metadata']
-                    ))
-                except Exception as e:
-                    print(f"Vector generation failed for scenario {scenario.get('id', 'unknown')}: {e}")
-                    continue
-            
-            if insert_data:
-                cursor.executemany(query, insert_data)
-                conn.commit()
-            
-            conn.close()
+            inserted = self.database.add_solutions_bulk(solution_from_record(scenario) for scenario in scenarios)
             
             with self.lock:
-                self.scenarios_added += len(insert_data)
+                self.scenarios_added += inserted
             
-            return len(insert_data)
+            return inserted
             
         except Exception as e:
             print(f"Batch insert failed: {e}")
             return 0
     
-    def _generate_vector(self, scenario: Dict[str, Any]) -> np.ndarray:
-        """Generate 32-dimensional vector for scenario with proper normalization."""
-        
-        vector = np.zeros(32, dtype=np.float32)
-        
-        try:
-            # Position encoding (normalized 0-1)
-            vector[0] = scenario['position'] / 8.0  # Max position value is 8
-            
-            # Stack size normalized (log scale for better distribution)
-            vector[1] = min(np.log(scenario['stack_size'] + 1) / np.log(301), 1.0)
-            
-            # Pot size normalized (log scale)
-            vector[2] = min(np.log(scenario['pot_size'] + 1) / np.log(101), 1.0)
-            
-            # Betting round normalized
-            vector[3] = scenario['betting_round'] / 3.0
-            
-            # Hand strength (equity)
-            vector[4] = scenario['equity']
-            
-            # Confidence
-            vector[5] = scenario['cfr_confidence']
-            
-            # Pot odds calculation
-            total_pot = scenario['pot_size'] + scenario['bet_to_call']
-            vector[6] = scenario['bet_to_call'] / total_pot if total_pot > 0 else 0
-            
-            # Stack-to-pot ratio (normalized)
-            if scenario['pot_size'] > 0:
-                spr = scenario['stack_size'] / scenario['pot_size']
-                vector[7] = min(spr / 20.0, 1.0)  # Normalize by max SPR of 20
-            else:
-                vector[7] = 1.0
-            
-            # Bet sizing relative to pot
-            vector[8] = min(scenario['bet_to_call'] / scenario['pot_size'], 3.0) / 3.0 if scenario['pot_size'] > 0 else 0
-            
-            # Hand type encoding (simplified)
-            hole_cards_str = scenario['hole_cards']
-            if 'A' in hole_cards_str:
-                vector[9] = 1.0  # Has ace
-            if 'K' in hole_cards_str:
-                vector[10] = 1.0  # Has king
-            
-            # Board texture features (if post-flop)
-            board_cards_str = scenario['board_cards']
-            if board_cards_str != "[]":
-                vector[11] = 1.0  # Post-flop
-                if 'A' in board_cards_str:
-                    vector[12] = 1.0  # Ace on board
-                if 'K' in board_cards_str:
-                    vector[13] = 1.0  # King on board
-            
-            # Fill remaining dimensions with structured noise for uniqueness
-            for i in range(14, 32):
-                vector[i] = (scenario['equity'] + scenario['cfr_confidence'] + scenario['position']) * 0.1 + np.random.random() * 0.05
-            
-        except Exception as e:
-            print(f"Vector generation error: {e}")
-            # Return random vector as fallback
-            vector = np.random.random(32).astype(np.float32)
-        
-        return vector
-    
     def run_full_import(self, target_scenarios: int = 38000) -> None:
         """Run complete TexasSolver database import with progress tracking."""
         
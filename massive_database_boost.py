@@ -14,6 +14,7 @@ from typing import List, Dict, Any, Tuple
 import concurrent.futures
 import threading
 
+from app.database.gto_database import GTODatabase, solution_from_record
 from app.database.poker_vectorizer import PokerSituation, Position, BettingRound
 
 class MassiveDatabaseBoost:
@@ -24,6 +25,7 @@ class MassiveDatabaseBoost:
         self.scenarios_added = 0
         self.start_time = time.time()
         self.lock = threading.Lock()
+        self.database = GTODatabase(db_path=self.db_path)
         
         # Professional scenario templates
         self.premium_hands = [
@@ -345,81 +347,17 @@ class MassiveDatabaseBoost:
         """Insert batch of scenarios into database."""
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Prepare insertion query
-            query = """
-                INSERT INTO gto_situations 
-                (id, vector, hole_cards, board_cards, position, pot_size, bet_to_call, 
-                 stack_size, betting_round, recommendation, bet_size, equity, reasoning, 
-                 cfr_confidence, metadata, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """
-            
-            insert_data = []
-            for scenario in scenarios:
-                # Generate vector for scenario
-                vector_data = self._generate_vector(scenario)
-                vector_blob = vector_data.tobytes()
-                
-                insert_data.append((
-                    scenario['id'], vector_blob, scenario['hole_cards'], scenario['board_cards'],
-                    scenario['position'], scenario['pot_size'], scenario['bet_to_call'],
-                    scenario['stack_size'], scenario['betting_round'], scenario['recommendation'],
-                    scenario['bet_size'], scenario['equity'], scenario['reasoning'],
-                    scenario['cfr_confidence'], scenario['metadata']
-                ))
-            
-            cursor.executemany(query, insert_data)
-            conn.commit()
-            conn.close()
+            inserted = self.database.add_solutions_bulk(solution_from_record(scenario) for scenario in scenarios)
             
             with self.lock:
-                self.scenarios_added += len(scenarios)
+                self.scenarios_added += inserted
             
-            return len(scenarios)
+            return inserted
             
         except Exception as e:
             print(f"Batch insert failed: {e}")
             return 0
     
-    def _generate_vector(self, scenario: Dict[str, Any]) -> np.ndarray:
-        """Generate 32-dimensional vector for scenario."""
-        
-        # Create feature vector (simplified version)
-        vector = np.zeros(32, dtype=np.float32)
-        
-        # Position encoding (0-5)
-        vector[0] = scenario['position'] / 5.0
-        
-        # Stack size normalized
-        vector[1] = min(scenario['stack_size'] / 200.0, 1.0)
-        
-        # Pot size normalized  
-        vector[2] = min(scenario['pot_size'] / 100.0, 1.0)
-        
-        # Betting round
-        vector[3] = scenario['betting_round'] / 3.0
-        
-        # Hand strength estimate
-        vector[4] = scenario['equity']
-        
-        # Confidence
-        vector[5] = scenario['cfr_confidence']
-        
-        # Pot odds
-        total_pot = scenario['pot_size'] + scenario['bet_to_call']
-        vector[6] = scenario['bet_to_call'] / total_pot if total_pot > 0 else 0
-        
-        # Stack-to-pot ratio
-        vector[7] = min(scenario['stack_size'] / scenario['pot_size'], 10.0) / 10.0 if scenario['pot_size'] > 0 else 1.0
-        
-        # Add some noise for diversity
-        vector[8:] = np.random.random(24) * 0.1
-        
-        return vector
-    
     def run_massive_expansion(self, target_scenarios: int = 15000) -> None:
         """Run massive database expansion."""
         
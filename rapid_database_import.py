@@ -160,63 +160,41 @@ def bulk_database_insert(solutions: List[Dict]) -> int:
         if not gto_db.initialized:
             gto_db.initialize()
         
-        stored_count = 0
-        batch_size = 500  # Larger batches for efficiency
-        
-        total_batches = (len(solutions) + batch_size - 1) // batch_size
+        def pairs():
+            for i, solution in enumerate(solutions):
+                # Create streamlined situation based on metadata
+                metadata = solution.get("metadata", {})
+                street = metadata.get("street", "preflop")
+                
+                # Determine betting round
+                if street == "preflop":
+                    betting_round = BettingRound.PREFLOP
+                    board_cards = []
+                elif street == "flop":
+                    betting_round = BettingRound.FLOP
+                    board_cards = ["As", "Kh", "Qd"]
+                elif street == "turn":
+                    betting_round = BettingRound.TURN
+                    board_cards = ["As", "Kh", "Qd", "Jc"]
+                else:
+                    betting_round = BettingRound.RIVER
+                    board_cards = ["As", "Kh", "Qd", "Jc", "Tc"]
+                
+                # Create situation with varying parameters
+                situation = PokerSituation(
+                    hole_cards=["As", "Ks"] if i % 2 == 0 else ["Ah", "Kh"],
+                    board_cards=board_cards,
+                    position=Position(i % len(Position)),
+                    pot_size=5.0 + (i % 30),
+                    bet_to_call=2.0 + (i % 15),
+                    stack_size=100.0 - (i % 40),
+                    betting_round=betting_round,
+                    num_players=6 - (i % 3)
+                )
+                yield situation, solution
         
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, len(solutions))
-            batch = solutions[start_idx:end_idx]
-            
-            batch_stored = 0
-            
-            for i, solution in enumerate(batch):
-                try:
-                    # Create streamlined situation based on metadata
-                    metadata = solution.get("metadata", {})
-                    street = metadata.get("street", "preflop")
-                    
-                    # Determine betting round
-                    if street == "preflop":
-                        betting_round = BettingRound.PREFLOP
-                        board_cards = []
-                    elif street == "flop":
-                        betting_round = BettingRound.FLOP
-                        board_cards = ["As", "Kh", "Qd"]
-                    elif street == "turn":
-                        betting_round = BettingRound.TURN
-                        board_cards = ["As", "Kh", "Qd", "Jc"]
-                    else:
-                        betting_round = BettingRound.RIVER
-                        board_cards = ["As", "Kh", "Qd", "Jc", "Tc"]
-                    
-                    # Create situation with varying parameters
-                    situation = PokerSituation(
-                        hole_cards=["As", "Ks"] if i % 2 == 0 else ["Ah", "Kh"],
-                        board_cards=board_cards,
-                        position=Position(i % len(Position)),
-                        pot_size=5.0 + (i % 30),
-                        bet_to_call=2.0 + (i % 15),
-                        stack_size=100.0 - (i % 40),
-                        betting_round=betting_round,
-                        num_players=6 - (i % 3)
-                    )
-                    
-                    # Add to database
-                    if gto_db.add_solution(situation, solution):
-                        batch_stored += 1
-                        stored_count += 1
-                        
-                except Exception as e:
-                    # Silent continue for bulk processing
-                    continue
-            
-            # Progress update
-            if (batch_num + 1) % 20 == 0:
-                print(f"  Stored batch {batch_num + 1}/{total_batches} "
-                      f"({stored_count:,} total solutions)")
+        # Chunked executemany + matrix add_items, checkpointed for resume
+        stored_count = gto_db.add_solutions_bulk(pairs(), job="rapid_database_import")
         
         logger.info(f"✅ Bulk insert complete: {stored_count:,} solutions stored")
         return stored_count